@@ -0,0 +1,49 @@
+"""add date shadow columns
+
+Revision ID: 4f8d2c6b1e07
+Revises: a3f9c1d27e84
+Create Date: 2026-10-19 14:36:52.118406
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '4f8d2c6b1e07'
+down_revision = 'a3f9c1d27e84'
+branch_labels = None
+depends_on = None
+
+
+def _day_number_sql(column_name):
+    return f"CAST(julianday(substr(\"{column_name}\", 1, 10)) - 1721424.5 AS INTEGER)"
+
+
+def _timestamp_sql(column_name):
+    return f"CAST(strftime('%s', \"{column_name}\") AS INTEGER)"
+
+
+def upgrade() -> None:
+    # Virtual generated columns can be added without rewriting the tables
+    op.execute(f"ALTER TABLE Sightings ADD COLUMN dayNumber INTEGER "
+               f"GENERATED ALWAYS AS ({_day_number_sql('date')}) VIRTUAL")
+    op.execute(f"ALTER TABLE SpeciesStatusRatings ADD COLUMN startDay INTEGER "
+               f"GENERATED ALWAYS AS ({_day_number_sql('start')}) VIRTUAL")
+    op.execute(f"ALTER TABLE SpeciesStatusRatings ADD COLUMN endDay INTEGER "
+               f"GENERATED ALWAYS AS ({_day_number_sql('end')}) VIRTUAL")
+    op.execute(f"ALTER TABLE JobStatuses ADD COLUMN startTimestamp INTEGER "
+               f"GENERATED ALWAYS AS ({_timestamp_sql('start')}) VIRTUAL")
+    op.execute("CREATE INDEX IF NOT EXISTS IX_Sightings_dayNumber ON Sightings (dayNumber)")
+    op.execute("CREATE INDEX IF NOT EXISTS IX_SpeciesStatusRatings_speciesId_endDay "
+               "ON SpeciesStatusRatings (speciesId, endDay)")
+    op.execute("CREATE INDEX IF NOT EXISTS IX_JobStatuses_startTimestamp ON JobStatuses (startTimestamp)")
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS IX_JobStatuses_startTimestamp")
+    op.execute("DROP INDEX IF EXISTS IX_SpeciesStatusRatings_speciesId_endDay")
+    op.execute("DROP INDEX IF EXISTS IX_Sightings_dayNumber")
+    op.execute("ALTER TABLE JobStatuses DROP COLUMN startTimestamp")
+    op.execute("ALTER TABLE SpeciesStatusRatings DROP COLUMN endDay")
+    op.execute("ALTER TABLE SpeciesStatusRatings DROP COLUMN startDay")
+    op.execute("ALTER TABLE Sightings DROP COLUMN dayNumber")
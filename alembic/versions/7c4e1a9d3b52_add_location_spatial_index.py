@@ -0,0 +1,27 @@
+"""add location spatial index
+
+Revision ID: 7c4e1a9d3b52
+Revises: 2cdd34308ad3
+Create Date: 2026-10-19 09:12:41.305118
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '7c4e1a9d3b52'
+down_revision = '2cdd34308ad3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE VIRTUAL TABLE IF NOT EXISTS LocationIndex "
+               "USING rtree(id, minLatitude, maxLatitude, minLongitude, maxLongitude)")
+    op.execute("INSERT INTO LocationIndex (id, minLatitude, maxLatitude, minLongitude, maxLongitude) "
+               "SELECT Id, Latitude, Latitude, Longitude, Longitude FROM Locations "
+               "WHERE Latitude IS NOT NULL AND Longitude IS NOT NULL")
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE IF EXISTS LocationIndex")
@@ -0,0 +1,35 @@
+"""add sighting sync keys
+
+Revision ID: 9b3e7a1d5c24
+Revises: 4f8d2c6b1e07
+Create Date: 2026-10-19 14:58:06.523917
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9b3e7a1d5c24'
+down_revision = '4f8d2c6b1e07'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'SightingSyncKeys',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('idempotencyKey', sa.String(), nullable=False),
+        sa.Column('sightingId', sa.Integer(), nullable=True),
+        sa.Column('created_by', sa.Integer(), nullable=False),
+        sa.Column('date_created', sa.DateTime(), nullable=False),
+        sa.CheckConstraint('LENGTH(TRIM(idempotencyKey)) > 0'),
+        sa.ForeignKeyConstraint(['sightingId'], ['Sightings.id'], ondelete='SET NULL'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('idempotencyKey', name='SIGHTING_SYNC_KEY_UX')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('SightingSyncKeys')
@@ -0,0 +1,61 @@
+"""add full text search
+
+Revision ID: a3f9c1d27e84
+Revises: 7c4e1a9d3b52
+Create Date: 2026-10-19 11:02:17.418236
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'a3f9c1d27e84'
+down_revision = '7c4e1a9d3b52'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE VIRTUAL TABLE IF NOT EXISTS SightingSearch "
+               "USING fts5(notes, content='Sightings', content_rowid='id', tokenize='unicode61 remove_diacritics 2')")
+    op.execute("CREATE TRIGGER IF NOT EXISTS SightingSearch_AI AFTER INSERT ON Sightings BEGIN "
+               "INSERT INTO SightingSearch (rowid, notes) VALUES (new.id, new.notes); "
+               "END")
+    op.execute("CREATE TRIGGER IF NOT EXISTS SightingSearch_AD AFTER DELETE ON Sightings BEGIN "
+               "INSERT INTO SightingSearch (SightingSearch, rowid, notes) VALUES ('delete', old.id, old.notes); "
+               "END")
+    op.execute("CREATE TRIGGER IF NOT EXISTS SightingSearch_AU AFTER UPDATE OF notes ON Sightings BEGIN "
+               "INSERT INTO SightingSearch (SightingSearch, rowid, notes) VALUES ('delete', old.id, old.notes); "
+               "INSERT INTO SightingSearch (rowid, notes) VALUES (new.id, new.notes); "
+               "END")
+    op.execute("INSERT INTO SightingSearch (SightingSearch) VALUES ('rebuild')")
+
+    op.execute("CREATE VIRTUAL TABLE IF NOT EXISTS SpeciesSearch "
+               "USING fts5(name, scientific_name, content='Species', content_rowid='id', "
+               "tokenize='unicode61 remove_diacritics 2', prefix='2 3 4')")
+    op.execute("CREATE TRIGGER IF NOT EXISTS SpeciesSearch_AI AFTER INSERT ON Species BEGIN "
+               "INSERT INTO SpeciesSearch (rowid, name, scientific_name) "
+               "VALUES (new.id, new.name, new.scientific_name); "
+               "END")
+    op.execute("CREATE TRIGGER IF NOT EXISTS SpeciesSearch_AD AFTER DELETE ON Species BEGIN "
+               "INSERT INTO SpeciesSearch (SpeciesSearch, rowid, name, scientific_name) "
+               "VALUES ('delete', old.id, old.name, old.scientific_name); "
+               "END")
+    op.execute("CREATE TRIGGER IF NOT EXISTS SpeciesSearch_AU AFTER UPDATE OF name, scientific_name ON Species BEGIN "
+               "INSERT INTO SpeciesSearch (SpeciesSearch, rowid, name, scientific_name) "
+               "VALUES ('delete', old.id, old.name, old.scientific_name); "
+               "INSERT INTO SpeciesSearch (rowid, name, scientific_name) "
+               "VALUES (new.id, new.name, new.scientific_name); "
+               "END")
+    op.execute("INSERT INTO SpeciesSearch (SpeciesSearch) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS SpeciesSearch_AU")
+    op.execute("DROP TRIGGER IF EXISTS SpeciesSearch_AD")
+    op.execute("DROP TRIGGER IF EXISTS SpeciesSearch_AI")
+    op.execute("DROP TABLE IF EXISTS SpeciesSearch")
+    op.execute("DROP TRIGGER IF EXISTS SightingSearch_AU")
+    op.execute("DROP TRIGGER IF EXISTS SightingSearch_AD")
+    op.execute("DROP TRIGGER IF EXISTS SightingSearch_AI")
+    op.execute("DROP TABLE IF EXISTS SightingSearch")
@@ -0,0 +1,81 @@
+"""add species current statuses
+
+Revision ID: e1c5a9f3b764
+Revises: 9b3e7a1d5c24
+Create Date: 2026-10-19 15:21:44.807352
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e1c5a9f3b764'
+down_revision = '9b3e7a1d5c24'
+branch_labels = None
+depends_on = None
+
+
+def _refresh_sql(row):
+    # Recompute the current status for the species, scheme and region of the trigger row
+    scheme = f"(SELECT statusSchemeId FROM StatusRatings WHERE id = {row}.statusRatingId)"
+    return f"DELETE FROM SpeciesCurrentStatuses " \
+           f"WHERE speciesId = {row}.speciesId AND statusSchemeId = {scheme} AND region = {row}.region; " \
+           f"INSERT INTO SpeciesCurrentStatuses " \
+           f"(speciesId, statusSchemeId, region, speciesStatusRatingId, statusRatingId, startDay, endDay) " \
+           f"SELECT r.speciesId, s.statusSchemeId, r.region, r.id, r.statusRatingId, r.startDay, r.endDay " \
+           f"FROM SpeciesStatusRatings r JOIN StatusRatings s ON s.id = r.statusRatingId " \
+           f"WHERE r.speciesId = {row}.speciesId AND s.statusSchemeId = {scheme} AND r.region = {row}.region " \
+           f"ORDER BY r.\"end\" IS NULL DESC, r.startDay DESC, r.id DESC LIMIT 1; "
+
+
+def upgrade() -> None:
+    op.create_table(
+        'SpeciesCurrentStatuses',
+        sa.Column('speciesId', sa.Integer(), nullable=False),
+        sa.Column('statusSchemeId', sa.Integer(), nullable=False),
+        sa.Column('region', sa.String(), nullable=False),
+        sa.Column('speciesStatusRatingId', sa.Integer(), nullable=False),
+        sa.Column('statusRatingId', sa.Integer(), nullable=False),
+        sa.Column('startDay', sa.Integer(), nullable=False),
+        sa.Column('endDay', sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(['speciesId'], ['Species.id'], ),
+        sa.ForeignKeyConstraint(['statusSchemeId'], ['StatusSchemes.id'], ),
+        sa.ForeignKeyConstraint(['speciesStatusRatingId'], ['SpeciesStatusRatings.id'], ),
+        sa.ForeignKeyConstraint(['statusRatingId'], ['StatusRatings.id'], ),
+        sa.PrimaryKeyConstraint('speciesId', 'statusSchemeId', 'region')
+    )
+    op.create_index('IX_SpeciesCurrentStatuses_startDay_endDay', 'SpeciesCurrentStatuses', ['startDay', 'endDay'])
+    op.create_index('IX_SpeciesCurrentStatuses_speciesStatusRatingId', 'SpeciesCurrentStatuses',
+                    ['speciesStatusRatingId'])
+
+    op.execute("CREATE TRIGGER IF NOT EXISTS SpeciesCurrentStatuses_AI AFTER INSERT ON SpeciesStatusRatings BEGIN "
+               f"{_refresh_sql('new')}"
+               "END")
+    op.execute("CREATE TRIGGER IF NOT EXISTS SpeciesCurrentStatuses_AD AFTER DELETE ON SpeciesStatusRatings BEGIN "
+               f"{_refresh_sql('old')}"
+               "END")
+    op.execute("CREATE TRIGGER IF NOT EXISTS SpeciesCurrentStatuses_AU AFTER UPDATE ON SpeciesStatusRatings BEGIN "
+               f"{_refresh_sql('old')}"
+               f"{_refresh_sql('new')}"
+               "END")
+
+    # Populate the cache from the existing ratings, taking the open-ended rating for each species, scheme and region
+    # or, if there isn't one, the one that started most recently
+    op.execute("INSERT INTO SpeciesCurrentStatuses "
+               "(speciesId, statusSchemeId, region, speciesStatusRatingId, statusRatingId, startDay, endDay) "
+               "SELECT speciesId, statusSchemeId, region, id, statusRatingId, startDay, endDay FROM ("
+               "SELECT r.*, s.statusSchemeId, ROW_NUMBER() OVER ("
+               "PARTITION BY r.speciesId, s.statusSchemeId, r.region "
+               "ORDER BY r.\"end\" IS NULL DESC, r.startDay DESC, r.id DESC) AS position "
+               "FROM SpeciesStatusRatings r JOIN StatusRatings s ON s.id = r.statusRatingId) "
+               "WHERE position = 1")
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS SpeciesCurrentStatuses_AU")
+    op.execute("DROP TRIGGER IF EXISTS SpeciesCurrentStatuses_AD")
+    op.execute("DROP TRIGGER IF EXISTS SpeciesCurrentStatuses_AI")
+    op.drop_index('IX_SpeciesCurrentStatuses_speciesStatusRatingId', table_name='SpeciesCurrentStatuses')
+    op.drop_index('IX_SpeciesCurrentStatuses_startDay_endDay', table_name='SpeciesCurrentStatuses')
+    op.drop_table('SpeciesCurrentStatuses')
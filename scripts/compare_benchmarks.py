@@ -0,0 +1,78 @@
+import argparse
+import json
+import sys
+
+STATISTICS = ["min", "max", "mean", "median"]
+
+
+def load_benchmarks(filename, statistic):
+    """
+    Load a pytest-benchmark JSON results file
+
+    :param filename: Path to the results file
+    :param statistic: Name of the timing statistic to compare
+    :return: Dictionary of (statistic, dataset size) tuples, keyed by the full name of the benchmark
+    """
+    with open(filename, mode="rt", encoding="UTF-8") as f:
+        results = json.load(f)
+
+    return {benchmark["fullname"]: (benchmark["stats"][statistic], benchmark["extra_info"].get("sightings"))
+            for benchmark in results["benchmarks"]}
+
+
+def compare_benchmarks(old, new, threshold):
+    """
+    Compare two sets of benchmark results
+
+    :param old: Baseline results, as returned by load_benchmarks()
+    :param new: Results to compare with the baseline
+    :param threshold: Relative change in time, as a fraction of the baseline, above which a change is flagged
+    :return: List of (name, old time, new time, relative change, flag) tuples, ordered by name
+    """
+    comparisons = []
+    for name in sorted(old.keys() & new.keys()):
+        change = (new[name][0] - old[name][0]) / old[name][0]
+        if old[name][1] != new[name][1]:
+            flag = "SIZE MISMATCH"
+        elif change > threshold:
+            flag = "REGRESSION"
+        elif change < -threshold:
+            flag = "improvement"
+        else:
+            flag = ""
+        comparisons.append((name, old[name][0], new[name][0], change, flag))
+    return comparisons
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare two pytest-benchmark runs and flag regressions.")
+    parser.add_argument("old", help="Baseline pytest-benchmark JSON results file")
+    parser.add_argument("new", help="pytest-benchmark JSON results file to compare with the baseline")
+    parser.add_argument("-t", "--threshold", type=float, default=0.1,
+                        help="Relative slow-down, as a fraction, treated as a regression")
+    parser.add_argument("-s", "--statistic", choices=STATISTICS, default="median", help="Timing statistic to compare")
+    args = parser.parse_args()
+
+    old = load_benchmarks(args.old, args.statistic)
+    new = load_benchmarks(args.new, args.statistic)
+    comparisons = compare_benchmarks(old, new, args.threshold)
+
+    width = max([len(name) for name, *_ in comparisons] + [len("Benchmark")])
+    print(f"{'Benchmark':<{width}}  {'Old (ms)':>10}  {'New (ms)':>10}  {'Change':>8}")
+    for name, old_time, new_time, change, flag in comparisons:
+        print(f"{name:<{width}}  {old_time * 1000:>10.3f}  {new_time * 1000:>10.3f}  {change:>+8.1%}  {flag}")
+
+    for name in sorted(old.keys() - new.keys()):
+        print(f"Missing from {args.new}: {name}")
+    for name in sorted(new.keys() - old.keys()):
+        print(f"Missing from {args.old}: {name}")
+
+    # Results for different dataset sizes aren't comparable, so a mismatch fails the comparison, too
+    failures = [comparison for comparison in comparisons if comparison[4] in ["REGRESSION", "SIZE MISMATCH"]]
+    print(f"{len(failures)} of {len(comparisons)} benchmarks regressed by more than {args.threshold:.0%} "
+          f"or were run against a different dataset size")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+import argparse
+import csv
+import datetime
+import io
+import random
+import time
+from naturerec_model.model import Category, Species, Location, Sighting, Gender, parse_date, parse_date_time, \
+    format_date
+
+
+def legacy_display_date(sighting):
+    """
+    Display date for a sighting, parsed and formatted on every access as the model did before the date codec
+    """
+    return datetime.datetime.strptime(sighting.date, Sighting.DATE_FORMAT).date().strftime(Sighting.DATE_DISPLAY_FORMAT)
+
+
+def codec_display_date(sighting):
+    """
+    Display date for a sighting, using the date codec and instance cache
+    """
+    return sighting.display_date
+
+
+def create_sightings(count, days):
+    """
+    Create sightings, without writing them to the database, spread over a range of dates
+
+    :param count: Number of sightings
+    :param days: Number of distinct dates
+    :return: List of Sighting instances
+    """
+    category = Category(name="Birds")
+    species = [Species(name=f"Species {i}", category=category) for i in range(50)]
+    locations = [Location(name=f"Location {i}", county="Oxfordshire", country="United Kingdom") for i in range(20)]
+    start = datetime.date(2000, 1, 1)
+    return [Sighting(date=(start + datetime.timedelta(days=random.randrange(days))).strftime(Sighting.DATE_FORMAT),
+                     species=random.choice(species),
+                     location=random.choice(locations),
+                     gender=Gender.UNKNOWN,
+                     withYoung=0)
+            for _ in range(count)]
+
+
+def render_list(sightings, display_date):
+    """
+    Build the values shown for each sighting in the sightings list
+    """
+    return [(display_date(s), s.location.name, s.species.name, s.gender_name, s.with_young_name) for s in sightings]
+
+
+def export(sightings, display_date):
+    """
+    Write the sightings in the export file's CSV format
+    """
+    writer = csv.writer(io.StringIO())
+    for s in sightings:
+        writer.writerow([s.species.name, s.species.scientific_name, s.species.category.name, s.number, s.gender_name,
+                         s.with_young_name, display_date(s), s.location.name, s.location.address, s.location.city,
+                         s.location.county, s.location.postcode, s.location.country, s.location.latitude,
+                         s.location.longitude, s.notes])
+
+
+def clear_caches():
+    """
+    Clear the date codec's LRU caches
+    """
+    for function in [parse_date, parse_date_time, format_date]:
+        function.cache_clear()
+
+
+def time_call(function, repeats):
+    """
+    Return the best time, in seconds, for a callable over a number of runs
+    """
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare date parsing and formatting with and without the codec.")
+    parser.add_argument("-n", "--sightings", type=int, default=20000, help="Number of sightings")
+    parser.add_argument("-d", "--days", type=int, default=1000, help="Number of distinct sighting dates")
+    parser.add_argument("-r", "--repeats", type=int, default=5, help="Number of runs of each benchmark")
+    args = parser.parse_args()
+
+    sightings = create_sightings(args.sightings, args.days)
+    print(f"{args.sightings} sightings over {args.days} dates, best of {args.repeats} runs")
+    for title, operation in [("List rendering", render_list), ("Export", export)]:
+        legacy = time_call(lambda: operation(sightings, legacy_display_date), args.repeats)
+
+        # The first run with the codec uses new instances and empty caches, as it would for a newly loaded page
+        fresh_sightings = create_sightings(args.sightings, args.days)
+        clear_caches()
+        cold = time_call(lambda: operation(fresh_sightings, codec_display_date), 1)
+        warm = time_call(lambda: operation(sightings, codec_display_date), args.repeats)
+
+        print(title)
+        print(f"  strptime:      {legacy * 1000:.1f} ms")
+        print(f"  Codec, cold:   {cold * 1000:.1f} ms ({legacy / cold:.1f}x)")
+        print(f"  Codec, warm:   {warm * 1000:.1f} ms ({legacy / warm:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
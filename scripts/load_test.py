@@ -0,0 +1,92 @@
+import argparse
+import math
+import re
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+import requests
+
+CSRF_TOKEN_PATTERN = re.compile(r'name="csrf_token" value="([^"]+)"')
+
+
+def login(base_url, username, password):
+    """
+    Create an HTTP session and log in to the application
+
+    :param base_url: Base URL for the application
+    :param username: Username
+    :param password: Password
+    :return: Logged-in requests Session
+    """
+    session = requests.Session()
+    response = session.get(f"{base_url}/auth/login")
+    response.raise_for_status()
+    match = CSRF_TOKEN_PATTERN.search(response.text)
+    data = {"username": username, "password": password, "csrf_token": match.group(1) if match else ""}
+    response = session.post(f"{base_url}/auth/login", data=data)
+    response.raise_for_status()
+    return session
+
+
+def run_client(base_url, path, username, password, count):
+    """
+    Log in and request a page repeatedly, timing each request
+
+    :return: Tuple of a list of latencies, in seconds, and the number of failed requests
+    """
+    session = login(base_url, username, password)
+    latencies = []
+    errors = 0
+    for _ in range(count):
+        start = time.perf_counter()
+        response = session.get(f"{base_url}{path}")
+        latencies.append(time.perf_counter() - start)
+        if response.status_code != 200 or "auth/login" in response.url:
+            errors += 1
+    return latencies, errors
+
+
+def percentile(values, percent):
+    """
+    Return the specified percentile of a list of values, using the nearest-rank method
+    """
+    ordered = sorted(values)
+    rank = max(0, math.ceil(percent / 100 * len(ordered)) - 1)
+    return ordered[rank]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test a running Nature Recorder server, reporting "
+                                                 "requests/sec and latency.")
+    parser.add_argument("-u", "--url", default="http://localhost:5000", help="Base URL of the running server")
+    parser.add_argument("-p", "--path", default="/sightings/list", help="Path of the page to request")
+    parser.add_argument("-n", "--username", required=True, help="Username to log in with")
+    parser.add_argument("-w", "--password", required=True, help="Password to log in with")
+    parser.add_argument("-c", "--concurrency", type=int, default=8, help="Number of concurrent clients")
+    parser.add_argument("-r", "--requests", type=int, default=100, help="Number of requests made by each client")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        futures = [executor.submit(run_client, args.url, args.path, args.username, args.password, args.requests)
+                   for _ in range(args.concurrency)]
+        results = [future.result() for future in futures]
+    elapsed = time.perf_counter() - start
+
+    latencies = [latency for client_latencies, _ in results for latency in client_latencies]
+    errors = sum(client_errors for _, client_errors in results)
+
+    print(f"URL:          {args.url}{args.path}")
+    print(f"Clients:      {args.concurrency}")
+    print(f"Requests:     {len(latencies)}")
+    print(f"Errors:       {errors}")
+    print(f"Elapsed:      {elapsed:.2f} s")
+    print(f"Requests/sec: {len(latencies) / elapsed:.1f}")
+    print(f"Mean:         {statistics.mean(latencies) * 1000:.1f} ms")
+    print(f"p50:          {percentile(latencies, 50) * 1000:.1f} ms")
+    print(f"p95:          {percentile(latencies, 95) * 1000:.1f} ms")
+    print(f"p99:          {percentile(latencies, 99) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
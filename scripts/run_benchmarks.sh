@@ -0,0 +1,27 @@
+#!/usr/bin/env bash
+
+export PROJECT_ROOT=$( cd "$( dirname "$0" )/.." && pwd )
+. $PROJECT_ROOT/venv/bin/activate
+export PYTHONPATH=$PROJECT_ROOT/src
+
+# The dataset sizes to benchmark can be given on the command line, defaulting to 10k, 100k and 1M sightings. Each
+# size has its own database, generated on the first run and reused after that
+SCALES=${@:-10000 100000 1000000}
+RESULTS_FOLDER="$PROJECT_ROOT/data/benchmarks"
+TIMESTAMP=$(date +%Y%m%d-%H%M%S)
+mkdir -p "$RESULTS_FOLDER"
+
+echo "Project root      = $PROJECT_ROOT"
+echo "Python Path       = $PYTHONPATH"
+echo "Results Folder    = $RESULTS_FOLDER"
+
+for SCALE in $SCALES; do
+    export NATURE_RECORDER_DB="$PROJECT_ROOT/data/benchmark_$SCALE.db"
+    export NATURE_RECORDER_BENCHMARK_SIGHTINGS=$SCALE
+
+    echo "Database Path     = $NATURE_RECORDER_DB"
+    echo "Sightings         = $NATURE_RECORDER_BENCHMARK_SIGHTINGS"
+
+    python -m pytest "$PROJECT_ROOT/tests/benchmarks" -o python_files="bench_*.py" \
+        --benchmark-json="$RESULTS_FOLDER/${TIMESTAMP}_$SCALE.json"
+done
@@ -0,0 +1,12 @@
+#!/usr/bin/env bash
+
+export PROJECT_ROOT=$( cd "$( dirname "$0" )/.." && pwd )
+. $PROJECT_ROOT/venv/bin/activate
+export PYTHONPATH=$PROJECT_ROOT/src
+export NATURE_RECORDER_DB="$PROJECT_ROOT/data/naturerecorder_dev.db"
+
+echo "Project root      = $PROJECT_ROOT"
+echo "Python Path       = $PYTHONPATH"
+echo "Database Path     = $NATURE_RECORDER_DB"
+
+python -m naturerec_model.data_exchange.maintenance_scheduler "$@"
@@ -0,0 +1,91 @@
+import argparse
+import datetime
+import os
+import random
+import tempfile
+import time
+
+# The benchmark re-creates the database, so it's pointed at a temporary file before the model's imported
+os.environ["NATURE_RECORDER_DB"] = os.path.join(tempfile.mkdtemp(), "status_import_benchmark.db")
+
+from naturerec_model.model import create_database, User  # noqa: E402
+from naturerec_model.logic import get_category, create_category, create_species, get_status_scheme, \
+    create_status_scheme, create_status_rating, create_species_status_rating, import_species_status_ratings, \
+    StatusRatingImport  # noqa: E402
+
+SCHEMES = {"BOCC5": ["Red", "Amber", "Green"], "IUCN": ["Least Concern", "Near Threatened", "Vulnerable"]}
+REGIONS = ["United Kingdom", "Europe"]
+
+
+def create_rows(count, species):
+    """
+    Create the rows to import, assigning random ratings to a set of species so some of them overlap
+
+    :param count: Number of rows
+    :param species: Number of distinct species
+    :return: List of StatusRatingImport instances
+    """
+    start = datetime.date(2000, 1, 1)
+    rows = []
+    for _ in range(count):
+        scheme = random.choice(list(SCHEMES.keys()))
+        rows.append(StatusRatingImport(category="Birds",
+                                       species=f"Species {random.randrange(species)}",
+                                       scheme=scheme,
+                                       rating=random.choice(SCHEMES[scheme]),
+                                       region=random.choice(REGIONS),
+                                       start=start + datetime.timedelta(days=random.randrange(7000))))
+    return rows
+
+
+def import_row_by_row(rows, user):
+    """
+    Import the rows one at a time, as the status import helper did before the bulk import
+    """
+    for row in rows:
+        try:
+            category = get_category(row.category)
+            species_ids = [species.id for species in category.species if species.name == row.species]
+            species_id = species_ids[0] if species_ids else create_species(category.id, row.species, None, user).id
+        except ValueError:
+            category = create_category(row.category, True, user)
+            species_id = create_species(category.id, row.species, None, user).id
+
+        try:
+            scheme = get_status_scheme(row.scheme)
+            rating_ids = [rating.id for rating in scheme.ratings if rating.name == row.rating]
+            rating_id = rating_ids[0] if rating_ids else create_status_rating(scheme.id, row.rating, user).id
+        except ValueError:
+            scheme = create_status_scheme(row.scheme, user)
+            rating_id = create_status_rating(scheme.id, row.rating, user).id
+
+        _ = create_species_status_rating(species_id, rating_id, row.region, row.start, user, row.end)
+
+
+def time_import(function, rows, user):
+    """
+    Return the time, in seconds, to import the rows into a new database
+    """
+    create_database()
+    start = time.perf_counter()
+    function(rows, user)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare row by row and bulk conservation status imports.")
+    parser.add_argument("-n", "--rows", type=int, default=5000, help="Number of ratings to import")
+    parser.add_argument("-s", "--species", type=int, default=1000, help="Number of distinct species")
+    args = parser.parse_args()
+
+    user = User(id=1)
+    rows = create_rows(args.rows, args.species)
+    print(f"{args.rows} ratings for {args.species} species")
+    row_by_row = time_import(import_row_by_row, rows, user)
+    bulk = time_import(import_species_status_ratings, rows, user)
+    print(f"  Row by row: {row_by_row:.2f} s ({args.rows / row_by_row:.0f} rows/s)")
+    print(f"  Bulk:       {bulk:.2f} s ({args.rows / bulk:.0f} rows/s, {row_by_row / bulk:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+import argparse
+import datetime
+import os
+import statistics
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# The benchmark re-creates the database, so it's pointed at a temporary file before the model's imported
+os.environ["NATURE_RECORDER_DB"] = os.path.join(tempfile.mkdtemp(), "write_queue_benchmark.db")
+
+from naturerec_model.model import create_database, Gender, User, WriteQueue  # noqa: E402
+from naturerec_model.logic import create_category, create_species, create_location, create_sighting  # noqa: E402
+
+
+def create_reference_data(user):
+    """
+    Create the category, species and location the benchmark's sightings refer to
+
+    :return: Tuple of the location ID and species ID
+    """
+    category = create_category("Birds", True, user)
+    species = create_species(category.id, "Robin", None, user)
+    location = create_location(name="Radley Lakes", county="Oxfordshire", country="United Kingdom", user=user)
+    return location.id, species.id
+
+
+def run_submitters(submitters, writes, write):
+    """
+    Run concurrent submitters, each of which writes a number of sightings, timing each write
+
+    :param submitters: Number of concurrent submitters
+    :param writes: Number of sightings written by each submitter
+    :param write: Callable that writes the sighting for a date, returning once it's been committed
+    :return: Tuple of the elapsed time and a list of write latencies, in seconds
+    """
+    start_date = datetime.date(2000, 1, 1)
+    barrier = threading.Barrier(submitters)
+
+    def submitter(index):
+        barrier.wait()
+        latencies = []
+        for offset in range(writes):
+            start = time.perf_counter()
+            write(start_date + datetime.timedelta(days=index * writes + offset))
+            latencies.append(time.perf_counter() - start)
+        return latencies
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=submitters) as executor:
+        results = list(executor.map(submitter, range(submitters)))
+    elapsed = time.perf_counter() - start
+    return elapsed, [latency for latencies in results for latency in latencies]
+
+
+def report(title, elapsed, latencies):
+    """
+    Print the throughput and latency for a benchmark run
+    """
+    ordered = sorted(latencies)
+    print(title)
+    print(f"  Writes:       {len(latencies)}")
+    print(f"  Elapsed:      {elapsed:.2f} s")
+    print(f"  Writes/sec:   {len(latencies) / elapsed:.1f}")
+    print(f"  Mean latency: {statistics.mean(latencies) * 1000:.1f} ms")
+    print(f"  p95 latency:  {ordered[int(0.95 * (len(ordered) - 1))] * 1000:.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare sighting write throughput with and without the write queue.")
+    parser.add_argument("-s", "--submitters", type=int, default=50, help="Number of concurrent submitters")
+    parser.add_argument("-w", "--writes", type=int, default=20, help="Number of writes made by each submitter")
+    parser.add_argument("-b", "--batch-size", type=int, default=100, help="Maximum write queue batch size")
+    parser.add_argument("-l", "--latency", type=float, default=0.005, help="Write queue latency budget, in seconds")
+    args = parser.parse_args()
+
+    user = User(id=1)
+
+    create_database()
+    location_id, species_id = create_reference_data(user)
+    elapsed, latencies = run_submitters(args.submitters, args.writes,
+                                        lambda date: create_sighting(location_id, species_id, date, 1,
+                                                                     Gender.UNKNOWN, False, None, user))
+    report("Separate transactions", elapsed, latencies)
+
+    create_database()
+    location_id, species_id = create_reference_data(user)
+    queue = WriteQueue(args.batch_size, args.latency)
+    elapsed, latencies = run_submitters(args.submitters, args.writes,
+                                        lambda date: queue.submit(create_sighting, location_id, species_id, date, 1,
+                                                                  Gender.UNKNOWN, False, None, user).result())
+    queue.stop()
+    report("Write queue", elapsed, latencies)
+    print(f"  Batches:      {queue.batch_count} (mean size {queue.mean_batch_size:.1f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,20 @@
 from .status_import_helper import StatusImportHelper
 from .sightings_import_helper import SightingsImportHelper
 from .sightings_export_helper import SightingsExportHelper
+from .duplicate_locations_report_helper import DuplicateLocationsReportHelper
+from .database_backup_helper import DatabaseBackupHelper
+from .database_optimise_helper import DatabaseOptimiseHelper
+from .database_vacuum_helper import DatabaseVacuumHelper
+from .reference_data_prune_helper import ReferenceDataPruneHelper
 
 
 __all__ = [
     "StatusImportHelper",
     "SightingsImportHelper",
-    "SightingsExportHelper"
+    "SightingsExportHelper",
+    "DuplicateLocationsReportHelper",
+    "DatabaseBackupHelper",
+    "DatabaseOptimiseHelper",
+    "DatabaseVacuumHelper",
+    "ReferenceDataPruneHelper"
 ]
@@ -9,6 +9,7 @@ from collections import namedtuple
 from ..logic import create_category, get_category
 from ..logic import create_species
 from ..logic import create_job_status, complete_job_status
+from ..model import suspend_unit_of_work
 
 
 class DataExchangeHelperBase(threading.Thread):
@@ -86,9 +87,12 @@ class DataExchangeHelperBase(threading.Thread):
 
     def create_job_status(self):
         """
-        Create a job status record for this job
+        Create a job status record for this job. The record's committed immediately, even within a unit of work,
+        as it's completed by the background thread
         """
-        self._job_status_id = create_job_status(self.JOB_NAME, repr(self), datetime.datetime.now(), self._user).id
+        with suspend_unit_of_work():
+            self._job_status_id = create_job_status(self.JOB_NAME, repr(self), datetime.datetime.now(),
+                                                    self._user).id
 
     def complete_job_status(self):
         """
@@ -0,0 +1,78 @@
+"""
+This module implements a helper that takes a backup of the database on a background thread, while it's in use. The
+backup is written to the "backups" folder under the data folder and, optionally, older backups are removed so only
+the most recent are kept
+"""
+
+import datetime
+import glob
+import os
+from .data_exchange_helper_base import DataExchangeHelperBase
+from ..model import get_data_path, backup_database
+
+
+class DatabaseBackupHelper(DataExchangeHelperBase):
+    JOB_NAME = "Database backup"
+
+    #: Prefix and extension of the file names of timestamped backups
+    BACKUP_PREFIX = "naturerecorder-"
+    BACKUP_EXTENSION = ".db"
+
+    #: Format of the timestamp in the file names of timestamped backups
+    TIMESTAMP_FORMAT = "%Y%m%d-%H%M%S"
+
+    def __init__(self, user, filename=None, keep=None):
+        """
+        Initialiser
+
+        :param user: Current user
+        :param filename: Name of the backup file or None to generate a timestamped name
+        :param keep: Number of timestamped backups to keep or None to keep them all
+        :raises ValueError: If the number of backups to keep isn't positive
+        """
+        if keep is not None and keep < 1:
+            raise ValueError("Number of backups to keep must be positive")
+
+        super().__init__(self.backup, user)
+        self._filename = filename if filename else \
+            f"{self.BACKUP_PREFIX}{datetime.datetime.now().strftime(self.TIMESTAMP_FORMAT)}{self.BACKUP_EXTENSION}"
+        self._keep = keep
+        self.create_job_status()
+
+    def __repr__(self):
+        return f"{type(self).__name__}(" \
+               f"filename={self._filename!r}, " \
+               f"keep={self._keep!r})"
+
+    def backup(self):
+        """
+        Back up the database then remove the oldest timestamped backups, if required
+        """
+        _ = backup_database(self.get_backup_path())
+        if self._keep:
+            # The timestamp format means the names sort in the order the backups were taken
+            backups = sorted(glob.glob(os.path.join(self.get_backup_folder(),
+                                                    f"{self.BACKUP_PREFIX}*{self.BACKUP_EXTENSION}")))
+            for path in backups[:-self._keep]:
+                os.unlink(path)
+
+    @staticmethod
+    def get_backup_folder():
+        """
+        Construct and return the full path to the backup folder, creating it if it doesn't exist
+
+        :return: Full path to the backup folder
+        """
+        backup_folder = os.path.join(get_data_path(), "backups")
+        if not os.path.exists(backup_folder):
+            os.makedirs(backup_folder)
+
+        return backup_folder
+
+    def get_backup_path(self):
+        """
+        Construct and return the full path to the backup file
+
+        :return: Full path to the backup file
+        """
+        return os.path.join(self.get_backup_folder(), self._filename)
@@ -0,0 +1,31 @@
+"""
+This module implements a helper that refreshes the statistics used by the query planner on a background thread
+"""
+
+from .data_exchange_helper_base import DataExchangeHelperBase
+from ..model import optimise_database
+from ..model.maintenance import DEFAULT_ANALYSIS_LIMIT
+
+
+class DatabaseOptimiseHelper(DataExchangeHelperBase):
+    JOB_NAME = "Database optimisation"
+
+    def __init__(self, user, analysis_limit=DEFAULT_ANALYSIS_LIMIT):
+        """
+        Initialiser
+
+        :param user: Current user
+        :param analysis_limit: Number of rows of each index to examine or 0 to examine every row
+        """
+        super().__init__(self.optimise, user)
+        self._analysis_limit = analysis_limit
+        self.create_job_status()
+
+    def __repr__(self):
+        return f"{type(self).__name__}(analysis_limit={self._analysis_limit!r})"
+
+    def optimise(self):
+        """
+        Refresh the query planner's statistics
+        """
+        optimise_database(self._analysis_limit)
@@ -0,0 +1,31 @@
+"""
+This module implements a helper that returns free pages in the database to the file system on a background thread
+"""
+
+from .data_exchange_helper_base import DataExchangeHelperBase
+from ..model import incremental_vacuum
+
+
+class DatabaseVacuumHelper(DataExchangeHelperBase):
+    JOB_NAME = "Database vacuum"
+
+    def __init__(self, user, pages=None):
+        """
+        Initialiser
+
+        :param user: Current user
+        :param pages: Maximum number of pages to free or None to free them all
+        """
+        super().__init__(self.vacuum, user)
+        self._pages = pages
+        self.pages_freed = None
+        self.create_job_status()
+
+    def __repr__(self):
+        return f"{type(self).__name__}(pages={self._pages!r})"
+
+    def vacuum(self):
+        """
+        Free pages, recording the number freed
+        """
+        self.pages_freed = incremental_vacuum(self._pages)
@@ -0,0 +1,78 @@
+"""
+This module implements a helper that will write a report of candidate duplicate locations to a CSV format file on a
+background thread. The CSV file has the following columns:
+
++-----------------+--------------------------------------------------------------------------+
+| Column          | Contents                                                                 |
++-----------------+--------------------------------------------------------------------------+
+| Score           | Overall score between 0 and 1, the highest scoring candidates first      |
++-----------------+--------------------------------------------------------------------------+
+| Location Id     | ID of the first location in the candidate pair                           |
++-----------------+--------------------------------------------------------------------------+
+| Location        | Name of the first location in the candidate pair                         |
++-----------------+--------------------------------------------------------------------------+
+| Duplicate Id    | ID of the second location in the candidate pair                          |
++-----------------+--------------------------------------------------------------------------+
+| Duplicate       | Name of the second location in the candidate pair                        |
++-----------------+--------------------------------------------------------------------------+
+| Name Similarity | Similarity of the normalised names, between 0 and 1                      |
++-----------------+--------------------------------------------------------------------------+
+| Distance        | Distance between the locations in km, blank if either has no coordinates |
++-----------------+--------------------------------------------------------------------------+
+"""
+
+import csv
+import os
+from .data_exchange_helper_base import DataExchangeHelperBase
+from ..model import get_data_path
+from ..logic.location_duplicates import find_duplicate_locations, DEFAULT_MAX_DISTANCE_KM, DEFAULT_MIN_SCORE
+
+
+class DuplicateLocationsReportHelper(DataExchangeHelperBase):
+    JOB_NAME = "Duplicate locations report"
+
+    COLUMN_NAMES = ['Score', 'Location Id', 'Location', 'Duplicate Id', 'Duplicate', 'Name Similarity', 'Distance']
+
+    def __init__(self, filename, user, max_distance_km=DEFAULT_MAX_DISTANCE_KM, min_score=DEFAULT_MIN_SCORE):
+        super().__init__(self.report, user)
+        self._filename = filename
+        self._max_distance_km = max_distance_km
+        self._min_score = min_score
+        self.create_job_status()
+
+    def __repr__(self):
+        return f"{type(self).__name__}(" \
+               f"filename={self._filename!r}, " \
+               f"max_distance_km={self._max_distance_km!r}, " \
+               f"min_score={self._min_score!r})"
+
+    def report(self):
+        """
+        Find candidate duplicate locations and write them to file in CSV format, highest scoring first
+        """
+        candidates = find_duplicate_locations(self._max_distance_km, self._min_score)
+        with open(self.get_file_export_path(), mode='wt', newline='', encoding="UTF-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(self.COLUMN_NAMES)
+            for candidate in candidates:
+                writer.writerow([
+                    candidate.score,
+                    candidate.location_id,
+                    candidate.location_name,
+                    candidate.duplicate_id,
+                    candidate.duplicate_name,
+                    candidate.name_similarity,
+                    candidate.distance
+                ])
+
+    def get_file_export_path(self):
+        """
+        Construct and return the full path to the report file
+
+        :return: Full path to the report file
+        """
+        export_folder = os.path.join(get_data_path(), "exports")
+        if not os.path.exists(export_folder):
+            os.makedirs(export_folder)
+
+        return os.path.join(export_folder, self._filename)
@@ -0,0 +1,162 @@
+"""
+This module implements a scheduler that runs the database maintenance jobs periodically on a background thread:
+
++--------------+--------------------------+-------------------------------------------------------------------+
+| **Job**      | **Helper**               | **Comments**                                                      |
++--------------+--------------------------+-------------------------------------------------------------------+
+| Backup       | DatabaseBackupHelper     | Takes a timestamped backup, optionally keeping only the latest    |
++--------------+--------------------------+-------------------------------------------------------------------+
+| Optimisation | DatabaseOptimiseHelper   | Refreshes the query planner's statistics                          |
++--------------+--------------------------+-------------------------------------------------------------------+
+| Vacuum       | DatabaseVacuumHelper     | Returns free pages to the file system                             |
++--------------+--------------------------+-------------------------------------------------------------------+
+| Prune        | ReferenceDataPruneHelper | Deletes unused locations, species and conservation status ratings |
++--------------+--------------------------+-------------------------------------------------------------------+
+
+Each job is recorded in the job status table, as for jobs started from the UI. Jobs are run one at a time so they
+don't compete with each other for the database.
+
+The scheduler should run once per database, so it's run as its own process rather than in the web application,
+which may run several worker processes:
+
+    python -m naturerec_model.data_exchange.maintenance_scheduler --username <user>
+
+A job that fails is logged and the scheduler carries on, running it again when it's next due.
+
+The scheduler isn't imported by the data_exchange package, so the module can be run with "python -m".
+"""
+
+import argparse
+import logging
+import threading
+import time
+from .database_backup_helper import DatabaseBackupHelper
+from .database_optimise_helper import DatabaseOptimiseHelper
+from .database_vacuum_helper import DatabaseVacuumHelper
+from .reference_data_prune_helper import ReferenceDataPruneHelper
+from ..logic import get_user
+
+_logger = logging.getLogger(__name__)
+
+#: Default intervals, in hours, between jobs
+DEFAULT_BACKUP_HOURS = 24.0
+DEFAULT_OPTIMISE_HOURS = 24.0
+DEFAULT_VACUUM_HOURS = 168.0
+
+#: Unused reference data isn't deleted unless an interval's given, as deleting it can't be undone
+DEFAULT_PRUNE_HOURS = 0.0
+
+
+class MaintenanceScheduler(threading.Thread):
+    def __init__(self, user, backup_interval=None, optimise_interval=None, vacuum_interval=None, keep_backups=None,
+                 prune_interval=None):
+        """
+        Initialiser
+
+        :param user: User the jobs are run as
+        :param backup_interval: Interval, in seconds, between backups or None to disable them
+        :param optimise_interval: Interval, in seconds, between optimisations or None to disable them
+        :param vacuum_interval: Interval, in seconds, between vacuums or None to disable them
+        :param keep_backups: Number of timestamped backups to keep or None to keep them all
+        :param prune_interval: Interval, in seconds, between deletions of unused reference data or None to disable
+                               them
+        :raises ValueError: If any of the intervals isn't positive
+        """
+        intervals = [interval for interval in [backup_interval, optimise_interval, vacuum_interval, prune_interval]
+                     if interval is not None]
+        if intervals and min(intervals) <= 0:
+            raise ValueError("Maintenance intervals must be positive")
+
+        threading.Thread.__init__(self, daemon=True)
+        self._user = user
+        self._keep_backups = keep_backups
+        self._jobs = [(interval, factory) for interval, factory in [
+            (backup_interval, lambda: DatabaseBackupHelper(self._user, keep=self._keep_backups)),
+            (optimise_interval, lambda: DatabaseOptimiseHelper(self._user)),
+            (vacuum_interval, lambda: DatabaseVacuumHelper(self._user)),
+            (prune_interval, lambda: ReferenceDataPruneHelper(self._user))
+        ] if interval is not None]
+        self._stop_event = threading.Event()
+        self.jobs_run = 0
+
+    def run(self):
+        """
+        Run each job when it's due until the scheduler is stopped. Each job's first due as soon as the scheduler
+        starts
+        """
+        due = [time.monotonic()] * len(self._jobs)
+        while self._jobs and not self._stop_event.is_set():
+            for i, (interval, factory) in enumerate(self._jobs):
+                if time.monotonic() >= due[i] and not self._stop_event.is_set():
+                    self._run_job(factory)
+                    due[i] = time.monotonic() + interval
+
+            self._stop_event.wait(max(0.0, min(due) - time.monotonic()))
+
+    def stop(self, timeout=None):
+        """
+        Stop the scheduler, waiting for the job that's running, if any, to finish
+
+        :param timeout: Maximum time, in seconds, to wait or None to wait indefinitely
+        """
+        self._stop_event.set()
+        if self.is_alive():
+            self.join(timeout)
+
+    def _run_job(self, factory):
+        """
+        Run a job to completion, logging rather than raising any error
+
+        :param factory: Callable that creates the job's helper
+        """
+        try:
+            helper = factory()
+            helper.start()
+            helper.join()
+        except Exception:
+            _logger.exception("Database maintenance job failed")
+
+        self.jobs_run += 1
+
+
+def _hours_to_seconds(hours):
+    """
+    Convert an interval in hours to seconds, where zero disables the job
+
+    :param hours: Interval, in hours
+    :return: Interval, in seconds, or None
+    """
+    return hours * 3600 if hours else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the database maintenance jobs periodically.")
+    parser.add_argument("-u", "--username", required=True, help="User the jobs are run as")
+    parser.add_argument("--backup-hours", type=float, default=DEFAULT_BACKUP_HOURS,
+                        help="Hours between backups, 0 to disable them")
+    parser.add_argument("--optimise-hours", type=float, default=DEFAULT_OPTIMISE_HOURS,
+                        help="Hours between optimisations, 0 to disable them")
+    parser.add_argument("--vacuum-hours", type=float, default=DEFAULT_VACUUM_HOURS,
+                        help="Hours between vacuums, 0 to disable them")
+    parser.add_argument("--prune-hours", type=float, default=DEFAULT_PRUNE_HOURS,
+                        help="Hours between deletions of unused reference data, 0 to disable them")
+    parser.add_argument("--keep-backups", type=int, default=None, help="Number of backups to keep")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    scheduler = MaintenanceScheduler(get_user(args.username),
+                                     backup_interval=_hours_to_seconds(args.backup_hours),
+                                     optimise_interval=_hours_to_seconds(args.optimise_hours),
+                                     vacuum_interval=_hours_to_seconds(args.vacuum_hours),
+                                     keep_backups=args.keep_backups,
+                                     prune_interval=_hours_to_seconds(args.prune_hours))
+    scheduler.start()
+    try:
+        while scheduler.is_alive():
+            scheduler.join(1)
+    except KeyboardInterrupt:
+        scheduler.stop()
+
+
+if __name__ == "__main__":
+    main()
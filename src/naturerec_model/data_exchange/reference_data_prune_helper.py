@@ -0,0 +1,30 @@
+"""
+This module implements a helper that deletes unused locations, species and conservation status ratings on a
+background thread
+"""
+
+from .data_exchange_helper_base import DataExchangeHelperBase
+from ..logic import delete_unused_reference_data
+
+
+class ReferenceDataPruneHelper(DataExchangeHelperBase):
+    JOB_NAME = "Unused reference data deletion"
+
+    def __init__(self, user):
+        """
+        Initialiser
+
+        :param user: Current user
+        """
+        super().__init__(self.prune, user)
+        self.deleted = None
+        self.create_job_status()
+
+    def __repr__(self):
+        return f"{type(self).__name__}()"
+
+    def prune(self):
+        """
+        Delete the unused reference data, recording the numbers of records deleted
+        """
+        self.deleted = delete_unused_reference_data()
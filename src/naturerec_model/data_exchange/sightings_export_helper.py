@@ -6,7 +6,7 @@ import csv
 import os
 from .sightings_data_exchange_helper_base import SightingsDataExchangeHelperBase
 from ..model import get_data_path
-from ..logic.sightings import list_sightings
+from ..logic.records import list_sighting_records
 
 
 class SightingsExportHelper(SightingsDataExchangeHelperBase):
@@ -38,7 +38,7 @@ class SightingsExportHelper(SightingsDataExchangeHelperBase):
             writer = csv.writer(f)
             writer.writerow(self.COLUMN_NAMES)
 
-            sightings = list_sightings(self._from_date, self._to_date, self._location_id, self._species_id)
+            sightings = list_sighting_records(self._from_date, self._to_date, self._location_id, self._species_id)
             for sighting in sightings:
                 writer.writerow(sighting.csv_columns)
 
@@ -5,43 +5,123 @@ This module implements a helper that will import sightings from a CSV format fil
 import csv
 import datetime
 from io import StringIO
+import sqlalchemy as db
 from .sightings_data_exchange_helper_base import SightingsDataExchangeHelperBase
-from ..model import Gender, Sighting
-from ..logic import create_location, get_location
-from ..logic import create_sighting
+from ..model import Session, Gender, Sighting, Species, Category, Location, call_in_unit_of_work, optimise_database
+from ..logic import create_location
+from ..logic import create_sightings, NewSighting, WriteOutcome
+from ..logic import ConflictPolicy
 
 
 class SightingsImportHelper(SightingsDataExchangeHelperBase):
     JOB_NAME = "Sightings import"
 
-    def __init__(self, f, user):
+    def __init__(self, f, user, policy=ConflictPolicy.ERROR):
         """
         Initialiser
 
         :param f: IO stream (result of open() or a FileStorage object)
         :param user: Current user
+        :param policy: ConflictPolicy determining what happens to sightings that duplicate existing sightings
         """
         super().__init__(self.import_sightings, user)
         self._file = f
+        self._policy = policy
         self.create_job_status()
 
     def __repr__(self):
-        return f"{type(self).__name__}(f={self._file!r})"
+        return f"{type(self).__name__}(f={self._file!r}, policy={self._policy.value!r})"
 
     def import_sightings(self):
         """
-        Import the sightings, row by row
+        Import the sightings. The species and locations the sightings refer to are resolved first, looking up all
+        the names in the file in one query for species and another for locations, and creating any that don't
+        exist. The sightings are then written in a single batch. The import's applied as a single unit of work, so
+        if any row's invalid or duplicates an existing sighting, under the ERROR conflict policy, an error giving
+        the first failing row is raised and nothing is written
         """
         self._read_csv_rows()
+        call_in_unit_of_work(self._write_sightings)
+
+        # Refresh the query planner's statistics, which may no longer reflect the data after a large import
+        optimise_database()
+
+    def _write_sightings(self):
+        """
+        Resolve the species and locations and write the sightings read from the import file
+
+        :raises ValueError: If any of the sightings can't be written
+        """
+        species_ids = self._resolve_species()
+        location_ids = self._resolve_locations()
+
+        records = []
         for row in self._rows:
-            species_id = self.create_species(row[2], row[0], row[1])
-            location_id = self._create_location(row)
             date = datetime.datetime.strptime(row[6], Sighting.DATE_IMPORT_FORMAT).date()
             number = int(row[3]) if row[3].strip() else None
             gender = [key for key, value in Gender.gender_map().items() if value == row[4].strip().title()][0]
             with_young = 1 if row[5].strip().title() == "Yes" else 0
             notes = row[14] if row[15] else None
-            _ = create_sighting(location_id, species_id, date, number, gender, with_young, notes, self._user)
+            records.append(NewSighting(location_ids[self._tidy_name(row[7])],
+                                       species_ids[(self._tidy_name(row[2]), self._tidy_name(row[0]))],
+                                       date, number, gender, with_young, notes))
+
+        results = create_sightings(records, self._user, self._policy)
+        failures = [result for result in results if result.outcome == WriteOutcome.FAILED]
+        if failures:
+            raise ValueError(f"{failures[0].error} on row {failures[0].index + 1}")
+
+    @staticmethod
+    def _tidy_name(name):
+        """
+        Tidy a category, species or location name in the same way as when the record is created
+
+        :param name: Name to tidy
+        :return: Tidied name
+        """
+        return " ".join(name.split()).title()
+
+    def _resolve_species(self):
+        """
+        Return the IDs of the species named in the import file, creating any that don't exist
+
+        :return: Dictionary of species IDs keyed by (category name, species name)
+        """
+        names = list({self._tidy_name(row[0]) for row in self._rows})
+        with Session.begin() as session:
+            rows = session.execute(db.select(Category.name, Species.name, Species.id)
+                                   .join(Category, Species.categoryId == Category.id)
+                                   .where(Species.name.in_(names))).all()
+        species_ids = {(category_name, species_name): species_id for category_name, species_name, species_id in rows}
+
+        for row in self._rows:
+            key = (self._tidy_name(row[2]), self._tidy_name(row[0]))
+            if key not in species_ids:
+                species_ids[key] = self.create_species(row[2], row[0], row[1])
+
+        return species_ids
+
+    def _resolve_locations(self):
+        """
+        Return the IDs of the locations named in the import file, creating any that don't exist. Existing locations
+        are used as they are, so the location's details in the import file are only used if it's new
+
+        :return: Dictionary of location IDs keyed by location name
+        """
+        names = list({self._tidy_name(row[7]) for row in self._rows})
+        with Session.begin() as session:
+            rows = session.execute(db.select(Location.name, Location.id).where(Location.name.in_(names))).all()
+        location_ids = {name: location_id for name, location_id in rows}
+
+        for row in self._rows:
+            name = self._tidy_name(row[7])
+            if name not in location_ids:
+                latitude = float(row[13]) if row[13].strip() else None
+                longitude = float(row[14]) if row[14].strip() else None
+                location_ids[name] = create_location(row[7], row[10], row[12], self._user, row[8], row[9], row[11],
+                                                     latitude, longitude).id
+
+        return location_ids
 
     def _read_csv_rows(self):
         """
@@ -177,13 +257,3 @@ class SightingsImportHelper(SightingsDataExchangeHelperBase):
             _ = datetime.datetime.strptime(row[index], Sighting.DATE_IMPORT_FORMAT)
         except ValueError:
             raise ValueError(f"Invalid value for {cls.get_field_name(index)} on row {row_number}")
-
-    def _create_location(self, row):
-        tidied_name = " ".join(row[7].split()).title()
-        try:
-            location = get_location(tidied_name)
-        except ValueError:
-            latitude = float(row[13]) if row[13].strip() else None
-            longitude = float(row[14]) if row[14].strip() else None
-            location = create_location(tidied_name, row[10], row[12], self._user, row[8], row[9], row[11], latitude, longitude)
-        return location.id
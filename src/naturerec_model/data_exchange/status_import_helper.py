@@ -21,15 +21,16 @@ background thread. The source for the import is a CSV file with the following co
 +----------+-----------------------------------------------------------------------------+
 
 The header row must be present but is ignored. Categories, species, schemes and ratings are created as required.
+The rows are imported in bulk, using import_species_status_ratings(), with the same outcome as importing them in
+order one at a time.
 """
 
 import csv
 import datetime
 from io import StringIO
 from .data_exchange_helper_base import DataExchangeHelperBase
-from ..model import SpeciesStatusRating
-from ..logic import get_status_scheme, create_status_scheme, create_status_rating
-from ..logic import create_species_status_rating
+from ..model import SpeciesStatusRating, optimise_database
+from ..logic import import_species_status_ratings, StatusRatingImport
 
 
 class StatusImportHelper(DataExchangeHelperBase):
@@ -52,16 +53,23 @@ class StatusImportHelper(DataExchangeHelperBase):
 
     def import_ratings(self):
         """
-        Import the conservation status rating file, row by row
+        Import the conservation status rating file
         """
         self._read_csv_rows()
-        for row in self._rows:
-            species_id = self.create_species(row[1], row[0], None)
-            rating_id = self._create_rating(row[2], row[3])
-            start = datetime.datetime.strptime(row[5], SpeciesStatusRating.IMPORT_DATE_FORMAT).date()
-            end = datetime.datetime.strptime(row[6], SpeciesStatusRating.IMPORT_DATE_FORMAT).date() \
-                if row[6].strip() else None
-            _ = create_species_status_rating(species_id, rating_id, row[4].strip(), start, self._user, end)
+        ratings = [StatusRatingImport(category=row[1],
+                                      species=row[0],
+                                      scheme=row[2],
+                                      rating=row[3],
+                                      region=row[4].strip(),
+                                      start=datetime.datetime.strptime(row[5], SpeciesStatusRating.IMPORT_DATE_FORMAT)
+                                      .date(),
+                                      end=datetime.datetime.strptime(row[6], SpeciesStatusRating.IMPORT_DATE_FORMAT)
+                                      .date() if row[6].strip() else None)
+                   for row in self._rows]
+        _ = import_species_status_ratings(ratings, self._user)
+
+        # Refresh the query planner's statistics, which may no longer reflect the data after a large import
+        optimise_database()
 
     def _read_csv_rows(self):
         """
@@ -108,28 +116,3 @@ class StatusImportHelper(DataExchangeHelperBase):
                     raise ValueError(f"Invalid end date format at row {len(self._rows) + 1}") from e
 
             self._rows.append(row)
-
-    def _create_rating(self, scheme_name, rating_name):
-        """
-        Ensure the rating with the specified name exists in the specified scheme
-
-        :param scheme_name: Name of the conservation status scheme to which the rating belongs
-        :param rating_name: Name of the rating
-        """
-        tidied_scheme_name = " ".join(scheme_name.split())
-        tidied_rating_name = " ".join(rating_name.split()).title()
-
-        # See if the category exists and, if not, create it and the species
-        try:
-            scheme = get_status_scheme(tidied_scheme_name)
-        except ValueError:
-            scheme = create_status_scheme(tidied_scheme_name, self._user)
-            return create_status_rating(scheme.id, tidied_rating_name, self._user).id
-
-        # See if the rating exists against the existing scheme. If so, just return its ID
-        rating_ids = [rating.id for rating in scheme.ratings if rating.name == tidied_rating_name]
-        if len(rating_ids):
-            return rating_ids[0]
-
-        # Doesn't exist so create it and return its ID
-        return create_status_rating(scheme.id, tidied_rating_name, self._user).id
@@ -0,0 +1,503 @@
+"""
+This module implements a generator that populates a database with synthetic data, so the application can be tried
+out and measured with realistic volumes of records. The generator creates:
+
++----------------+-------------------------------------------------------------------------------------------+
+| **Records**    | **Distribution**                                                                          |
++----------------+-------------------------------------------------------------------------------------------+
+| Categories     | Named after common groups of wildlife                                                     |
++----------------+-------------------------------------------------------------------------------------------+
+| Species        | Shared between the categories. Species abundance follows a Zipf distribution, so a few    |
+|                | species account for most sightings, and each species is resident, a summer or winter      |
+|                | visitor or a passage migrant, which determines the time of year it's seen                 |
++----------------+-------------------------------------------------------------------------------------------+
+| Locations      | Clustered around the centres of a set of counties, with coordinates. Some locations are   |
+|                | visited far more often than others and most species are only seen in some of the counties |
++----------------+-------------------------------------------------------------------------------------------+
+| Sightings      | Spread over a number of years, with recording effort increasing over time                 |
++----------------+-------------------------------------------------------------------------------------------+
+| Status ratings | Ratings on each scheme for a proportion of the species, some with a history of earlier    |
+|                | ratings                                                                                   |
++----------------+-------------------------------------------------------------------------------------------+
+| Users          | Named user001, user002 and so on, with the username as the password                       |
++----------------+-------------------------------------------------------------------------------------------+
+| Job statuses   | Completed background jobs, a few of which failed                                          |
++----------------+-------------------------------------------------------------------------------------------+
+
+The data's generated from a seeded random number generator, so the same seed, volumes and end year always produce
+the same data. Records are written using the bulk creation functions in the business logic and records that
+already exist are skipped, so the generator can be re-run against a database it's already populated. Job statuses
+have no natural key, so they're added on every run.
+
+The generator can also write the sightings to a CSV file in the layout read by the sightings import, rather than
+to the database:
+
+    python -m naturerec_model.data_exchange.synthetic_data_generator --sightings 100000 --csv sightings.csv
+
+The generator isn't imported by the data_exchange package, so the module can be run with "python -m".
+"""
+
+import argparse
+import csv
+import datetime
+import math
+import random
+from collections import namedtuple
+from itertools import accumulate
+import sqlalchemy as db
+from .sightings_data_exchange_helper_base import SightingsDataExchangeHelperBase
+from .sightings_import_helper import SightingsImportHelper
+from .sightings_export_helper import SightingsExportHelper
+from .status_import_helper import StatusImportHelper
+from .database_backup_helper import DatabaseBackupHelper
+from .database_optimise_helper import DatabaseOptimiseHelper
+from ..model import Session, Category, Species, Location, Sighting, StatusScheme, JobStatus, Gender, User, \
+    create_database, optimise_database, retry_on_busy
+from ..logic import ConflictPolicy, NewSighting, StatusRatingImport, create_sightings, create_user, \
+    import_species_status_ratings, rebuild_location_index
+from ..logic.conflict_policies import write_records
+
+#: Numbers of records of each type to generate
+DatasetVolumes = namedtuple("DatasetVolumes", "categories species locations sightings schemes users job_statuses",
+                            defaults=(10, 500, 200, 100000, 3, 5, 100))
+
+#: Default number of years the sightings are spread over
+DEFAULT_YEARS = 10
+
+#: Default seed for the random number generator
+DEFAULT_SEED = 1
+
+#: Number of sightings written in each transaction
+SIGHTING_BATCH_SIZE = 5000
+
+#: Country for the generated locations and region for the generated status ratings
+COUNTRY = "United Kingdom"
+
+_CATEGORY_NAMES = ["Birds", "Mammals", "Butterflies", "Moths", "Dragonflies", "Amphibians", "Reptiles", "Beetles",
+                   "Bees", "Fish"]
+
+_SPECIES_PREFIXES = ["Common", "Lesser", "Greater", "Little", "Northern", "Southern", "Eastern", "Western",
+                     "Spotted", "Striped", "Crested", "Marsh", "Wood", "Heath", "Mountain", "Coastal"]
+_SPECIES_COLOURS = ["Black", "White", "Grey", "Brown", "Red", "Orange", "Yellow", "Green", "Blue", "Purple",
+                    "Silver", "Golden"]
+_SPECIES_NOUNS = ["Warbler", "Finch", "Vole", "Shrew", "Skipper", "Hawker", "Darter", "Newt", "Beetle", "Bee",
+                  "Moth", "Admiral", "Fritillary", "Chaser", "Toad", "Lizard", "Minnow", "Bunting"]
+_GENUS_SYLLABLES = ["ac", "an", "cal", "cor", "den", "el", "fal", "lus", "mil", "par", "pha", "phyl", "rus", "sco",
+                    "syl", "ter", "tur", "vi"]
+
+_PLACE_STARTS = ["Ash", "Brad", "Brock", "Chal", "Cran", "Dun", "Elm", "Far", "Gold", "Hart", "Hol", "Kings",
+                 "Lang", "Mar", "New", "Oak", "Pen", "Red", "Ship", "Stan", "Thorn", "Wal", "West", "Wood"]
+_PLACE_ENDS = ["by", "combe", "den", "field", "ford", "ham", "hill", "ley", "mere", "ton", "well", "worth"]
+_HABITATS = ["Lakes", "Marsh", "Wood", "Heath", "Fen", "Reservoir", "Nature Reserve", "Common", "Down", "Meadows"]
+
+#: Counties the locations are clustered in, with the coordinates of their centres
+_COUNTIES = [("Oxfordshire", 51.76, -1.26), ("Hampshire", 51.06, -1.31), ("Norfolk", 52.61, 0.89),
+             ("Cumbria", 54.58, -2.90), ("Highland", 57.48, -4.22), ("Devon", 50.72, -3.53), ("Kent", 51.28, 0.52),
+             ("North Yorkshire", 54.17, -1.38), ("Gwynedd", 52.93, -4.07), ("Suffolk", 52.19, 1.00),
+             ("Northumberland", 55.21, -2.08), ("Cornwall", 50.27, -5.05), ("Lincolnshire", 53.23, -0.54),
+             ("Dorset", 50.75, -2.33), ("Argyll And Bute", 56.40, -5.47)]
+
+#: Standard deviation, in degrees, of the distance of locations from their county's centre
+_LOCATION_SPREAD = 0.15
+
+#: Seasonal patterns, each giving the days of the year sightings peak on and how tightly they're concentrated
+#: around the peaks, as the concentration of a von Mises distribution. Residents are seen all year round
+_SEASONS = [([0], 0.0), ([170], 3.0), ([15], 3.0), ([120, 260], 8.0)]
+
+_NOTES = ["Seen feeding", "Heard calling", "Flying over", "Singing from cover", "Seen at dusk", "Resting on water",
+          "Carrying nesting material", "Seen in flight", "Basking in sunshine", "Disturbed by walkers"]
+
+_SCHEMES = [("BOCC5", ["Red", "Amber", "Green"]),
+            ("IUCN Red List", ["Least Concern", "Near Threatened", "Vulnerable", "Endangered"]),
+            ("Local Priority", ["Priority", "Not Priority"])]
+
+_JOB_NAMES = [SightingsImportHelper.JOB_NAME, SightingsExportHelper.JOB_NAME, StatusImportHelper.JOB_NAME,
+              DatabaseBackupHelper.JOB_NAME, DatabaseOptimiseHelper.JOB_NAME]
+
+#: Proportion of the species given a rating on each status scheme
+_RATED_PROPORTION = 0.6
+
+#: Number of attempts to generate a sighting that doesn't duplicate an earlier one
+_MAX_ATTEMPTS = 100
+
+
+def _unique_names(rng, count, parts):
+    """
+    Generate unique names by combining words from lists of parts, numbering them once the combinations run out
+
+    :param rng: Random number generator
+    :param count: Number of names
+    :param parts: List of lists of words, one for each part of a name
+    :return: List of names
+    """
+    combinations = [[]]
+    for words in parts:
+        combinations = [combination + [word] for combination in combinations for word in words]
+    rng.shuffle(combinations)
+    names = ["".join(combination) if combination[-1].islower() else " ".join(combination)
+             for combination in combinations]
+    return [names[i % len(names)] + (f" {i // len(names) + 1}" if i >= len(names) else "") for i in range(count)]
+
+
+def _zipf_weights(rng, count, exponent=1.1):
+    """
+    Return weights following a Zipf distribution, in random order
+
+    :param rng: Random number generator
+    :param count: Number of weights
+    :param exponent: Exponent of the distribution, with higher values giving more skewed weights
+    :return: List of weights
+    """
+    weights = [1 / (rank + 1) ** exponent for rank in range(count)]
+    rng.shuffle(weights)
+    return weights
+
+
+class SyntheticDataGenerator:
+    def __init__(self, volumes=None, seed=DEFAULT_SEED, years=DEFAULT_YEARS, end_year=None):
+        """
+        Initialiser. The reference data's generated up front, so the sightings written to the database and to CSV
+        files refer to the same species and locations
+
+        :param volumes: DatasetVolumes giving the number of records of each type or None for the defaults
+        :param seed: Seed for the random number generator
+        :param years: Number of years the sightings are spread over
+        :param end_year: Year of the latest sightings or None for the last complete year. Status ratings and job
+                         statuses are generated over the same range of dates, so this must be before the current
+                         year
+        :raises ValueError: If the volumes or date range aren't valid
+        """
+        self.volumes = volumes or DatasetVolumes()
+        self.end_year = end_year or datetime.date.today().year - 1
+        self.start_year = self.end_year - years + 1
+
+        if min(self.volumes.categories, self.volumes.species, self.volumes.locations) < 1:
+            raise ValueError("At least one category, species and location must be generated")
+        if min(self.volumes) < 0:
+            raise ValueError("Volumes cannot be negative")
+        if years < 1 or self.end_year >= datetime.date.today().year:
+            raise ValueError("Sightings must be spread over at least one year, ending before the current year")
+
+        self._seed = seed
+        rng = random.Random(seed)
+        self._create_categories()
+        self._create_species(rng)
+        self._create_locations(rng)
+
+    def __repr__(self):
+        return f"{type(self).__name__}(volumes={self.volumes!r}, seed={self._seed!r}, " \
+               f"years={self.end_year - self.start_year + 1!r}, end_year={self.end_year!r})"
+
+    def _create_categories(self):
+        """
+        Generate the categories, as (name, supports gender) tuples
+        """
+        self.categories = [(_CATEGORY_NAMES[i % len(_CATEGORY_NAMES)] +
+                            (f" {i // len(_CATEGORY_NAMES) + 1}" if i >= len(_CATEGORY_NAMES) else ""),
+                            _CATEGORY_NAMES[i % len(_CATEGORY_NAMES)] != "Fish")
+                           for i in range(self.volumes.categories)]
+
+    def _create_species(self, rng):
+        """
+        Generate the species, with the category, abundance, seasonal pattern and counties in which each is found
+
+        :param rng: Random number generator
+        """
+        names = _unique_names(rng, self.volumes.species, [_SPECIES_PREFIXES, _SPECIES_COLOURS, _SPECIES_NOUNS])
+        self.species = [dict(name=name,
+                             scientific_name=" ".join("".join(rng.choices(_GENUS_SYLLABLES, k=2)) for _ in range(2))
+                             .capitalize() + "us",
+                             category=rng.randrange(len(self.categories)),
+                             season=rng.choice(_SEASONS),
+                             counties=rng.sample(range(len(_COUNTIES)), rng.randint(1, len(_COUNTIES))))
+                        for name in names]
+        self._species_weights = list(accumulate(_zipf_weights(rng, len(self.species))))
+
+    def _create_locations(self, rng):
+        """
+        Generate the locations, clustered in the counties, and the popularity of the locations in each county
+
+        :param rng: Random number generator
+        """
+        places = _unique_names(rng, self.volumes.locations, [_PLACE_STARTS, _PLACE_ENDS])
+        habitats = [rng.choice(_HABITATS) for _ in places]
+        self.locations = []
+        for i, (place, habitat) in enumerate(zip(places, habitats)):
+            county, latitude, longitude = _COUNTIES[i % len(_COUNTIES)]
+            self.locations.append(dict(name=f"{place} {habitat}",
+                                       city=place.split(" ")[0],
+                                       county=county,
+                                       country=COUNTRY,
+                                       latitude=round(rng.gauss(latitude, _LOCATION_SPREAD), 6),
+                                       longitude=round(rng.gauss(longitude, _LOCATION_SPREAD), 6)))
+
+        # Locations are assigned to counties in turn, so every county with any locations has a similar number of
+        # them, but some locations in each county are visited much more often than others
+        self._county_locations = {}
+        for i, location in enumerate(self.locations):
+            self._county_locations.setdefault(i % len(_COUNTIES), []).append(i)
+        self._county_location_weights = {county: list(accumulate(_zipf_weights(rng, len(locations))))
+                                         for county, locations in self._county_locations.items()}
+
+    def _sighting_date(self, rng, species, year_weights):
+        """
+        Generate the date of a sighting of a species
+
+        :param rng: Random number generator
+        :param species: Species details
+        :param year_weights: Cumulative weights for the years in the date range
+        :return: Date of the sighting
+        """
+        peaks, concentration = species["season"]
+        angle = rng.vonmisesvariate(2 * math.pi * rng.choice(peaks) / 365, concentration)
+        year = self.start_year + rng.choices(range(len(year_weights)), cum_weights=year_weights)[0]
+        return datetime.date(year, 1, 1) + datetime.timedelta(days=int(365 * angle / (2 * math.pi)) % 365)
+
+    def sightings(self):
+        """
+        Generate the sightings
+
+        :return: Generator yielding NewSighting instances, with the location and species given as indexes into
+                 the generated locations and species
+        """
+        rng = random.Random(f"{self._seed}-sightings")
+        year_weights = list(accumulate(1 + 0.2 * i for i in range(self.end_year - self.start_year + 1)))
+        generated = set()
+        for _ in range(self.volumes.sightings):
+            for _ in range(_MAX_ATTEMPTS):
+                species_index = rng.choices(range(len(self.species)), cum_weights=self._species_weights)[0]
+                species = self.species[species_index]
+                counties = [county for county in species["counties"] if county in self._county_locations]
+                if not counties:
+                    continue
+
+                county = rng.choice(counties)
+                location_index = rng.choices(self._county_locations[county],
+                                             cum_weights=self._county_location_weights[county])[0]
+                date = self._sighting_date(rng, species, year_weights)
+                if (location_index, species_index, date) not in generated:
+                    break
+            else:
+                raise ValueError("Cannot generate the requested number of distinct sightings")
+
+            generated.add((location_index, species_index, date))
+            gender = Gender.UNKNOWN
+            if self.categories[species["category"]][1] and rng.random() < 0.2:
+                gender = rng.choice([Gender.MALE, Gender.FEMALE, Gender.BOTH])
+            yield NewSighting(location_id=location_index,
+                              species_id=species_index,
+                              date=date,
+                              number=max(1, int(rng.lognormvariate(0.7, 1.0))) if rng.random() < 0.8 else None,
+                              gender=gender,
+                              with_young=1 if 4 <= date.month <= 7 and rng.random() < 0.1 else 0,
+                              notes=rng.choice(_NOTES) if rng.random() < 0.1 else None)
+
+    def status_ratings(self):
+        """
+        Generate the conservation status ratings, with any earlier ratings for a species on a scheme ending when
+        the next one starts
+
+        :return: List of StatusRatingImport instances
+        """
+        rng = random.Random(f"{self._seed}-ratings")
+        schemes = [_SCHEMES[i] if i < len(_SCHEMES) else (f"Scheme {i + 1}", ["Category A", "Category B"])
+                   for i in range(self.volumes.schemes)]
+        first_start = datetime.date(self.start_year, 1, 1)
+        ratings = []
+        for scheme, values in schemes:
+            for species in rng.sample(self.species, int(len(self.species) * _RATED_PROPORTION)):
+                starts = sorted(first_start + datetime.timedelta(days=rng.randrange(365 * (self.end_year -
+                                                                                           self.start_year + 1)))
+                                for _ in range(rng.randint(1, 3)))
+                for start, end in zip(starts, starts[1:] + [None]):
+                    ratings.append(StatusRatingImport(category=self.categories[species["category"]][0],
+                                                      species=species["name"],
+                                                      scheme=scheme,
+                                                      rating=rng.choice(values),
+                                                      region=COUNTRY,
+                                                      start=start,
+                                                      end=end))
+        return ratings
+
+    def job_statuses(self, user):
+        """
+        Generate the job status records
+
+        :param user: User the records are created by
+        :return: List of dictionaries of column values
+        """
+        rng = random.Random(f"{self._seed}-jobs")
+        first_start = datetime.datetime(self.start_year, 1, 1)
+        seconds = int((datetime.datetime(self.end_year + 1, 1, 1) - first_start).total_seconds())
+        now = datetime.datetime.now(datetime.UTC)
+        job_statuses = []
+        for start in sorted(first_start + datetime.timedelta(seconds=rng.randrange(seconds))
+                            for _ in range(self.volumes.job_statuses)):
+            job_statuses.append(dict(name=rng.choice(_JOB_NAMES),
+                                     parameters=None,
+                                     start=start.strftime(JobStatus.DATE_FORMAT),
+                                     end=(start + datetime.timedelta(seconds=rng.randint(1, 600)))
+                                     .strftime(JobStatus.DATE_FORMAT),
+                                     error="Simulated failure" if rng.random() < 0.05 else None,
+                                     created_by=user.id,
+                                     updated_by=user.id,
+                                     date_created=now,
+                                     date_updated=now))
+        return job_statuses
+
+    @retry_on_busy
+    def _write_reference_data(self, user):
+        """
+        Write the categories, species and locations, skipping those that already exist
+
+        :param user: Current user
+        :return: Tuple of lists of the IDs of the species and locations, in the order they were generated
+        """
+        now = datetime.datetime.now(datetime.UTC)
+        audit = dict(created_by=user.id, updated_by=user.id, date_created=now, date_updated=now)
+        with Session.begin() as session:
+            write_records(session, Category, [dict(name=name, supports_gender=supports_gender, **audit)
+                                              for name, supports_gender in self.categories],
+                          ["name"], ConflictPolicy.SKIP)
+            category_ids = dict(session.execute(db.select(Category.name, Category.id)).all())
+
+            write_records(session, Species, [dict(name=species["name"],
+                                                  scientific_name=species["scientific_name"],
+                                                  categoryId=category_ids[self.categories[species["category"]][0]],
+                                                  **audit)
+                                             for species in self.species],
+                          ["name"], ConflictPolicy.SKIP)
+            species_ids = dict(session.execute(db.select(Species.name, Species.id)).all())
+
+            write_records(session, Location, [dict(location, **audit) for location in self.locations],
+                          ["name"], ConflictPolicy.SKIP)
+            location_ids = dict(session.execute(db.select(Location.name, Location.id)).all())
+
+        return [species_ids[species["name"]] for species in self.species], \
+            [location_ids[location["name"]] for location in self.locations]
+
+    @retry_on_busy
+    def _write_job_statuses(self, user):
+        """
+        Write the job status records
+
+        :param user: Current user
+        """
+        job_statuses = self.job_statuses(user)
+        if job_statuses:
+            with Session.begin() as session:
+                session.execute(JobStatus.__table__.insert(), job_statuses)
+
+    def populate(self, user):
+        """
+        Write the generated data to the database
+
+        :param user: User the records are created by
+        :return: DatasetVolumes giving the number of records of each type added to the database. Records that
+                 already existed aren't included in the counts
+        """
+        initial_counts = self._count_records()
+        species_ids, location_ids = self._write_reference_data(user)
+        rebuild_location_index()
+
+        batch = []
+        for sighting in self.sightings():
+            batch.append(sighting._replace(location_id=location_ids[sighting.location_id],
+                                           species_id=species_ids[sighting.species_id]))
+            if len(batch) == SIGHTING_BATCH_SIZE:
+                _ = create_sightings(batch, user, ConflictPolicy.SKIP)
+                batch = []
+        if batch:
+            _ = create_sightings(batch, user, ConflictPolicy.SKIP)
+
+        _ = import_species_status_ratings(self.status_ratings(), user)
+
+        for i in range(self.volumes.users):
+            username = f"user{i + 1:03d}"
+            try:
+                create_user(username, username, user)
+            except ValueError:
+                # The user was created by an earlier run
+                pass
+
+        self._write_job_statuses(user)
+
+        # Refresh the query planner's statistics, which won't reflect the data after a bulk load
+        optimise_database()
+
+        return DatasetVolumes(*[count - initial for count, initial in zip(self._count_records(), initial_counts)])
+
+    @staticmethod
+    def _count_records():
+        """
+        Count the records of each of the generated types in the database
+
+        :return: List of counts, in the same order as the fields of DatasetVolumes
+        """
+        with Session.begin() as session:
+            return [session.query(entity).count()
+                    for entity in [Category, Species, Location, Sighting, StatusScheme, User, JobStatus]]
+
+    def write_sightings_csv(self, filename):
+        """
+        Write the generated sightings to a CSV file in the layout read by the sightings import
+
+        :param filename: Path to the CSV file
+        :return: Number of sightings written
+        """
+        count = 0
+        with open(filename, mode="wt", newline="", encoding="UTF-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(SightingsDataExchangeHelperBase.COLUMN_NAMES)
+            for sighting in self.sightings():
+                species = self.species[sighting.species_id]
+                location = self.locations[sighting.location_id]
+                writer.writerow([species["name"],
+                                 species["scientific_name"],
+                                 self.categories[species["category"]][0],
+                                 sighting.number if sighting.number else "",
+                                 Gender.gender_name(sighting.gender),
+                                 "Yes" if sighting.with_young else "No",
+                                 sighting.date.strftime(Sighting.DATE_IMPORT_FORMAT),
+                                 location["name"],
+                                 "",
+                                 location["city"],
+                                 location["county"],
+                                 "",
+                                 location["country"],
+                                 location["latitude"],
+                                 location["longitude"],
+                                 sighting.notes or ""])
+                count += 1
+        return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Populate the database with synthetic data.")
+    defaults = DatasetVolumes()
+    for field in DatasetVolumes._fields:
+        parser.add_argument(f"--{field.replace('_', '-')}", type=int, default=getattr(defaults, field),
+                            help=f"Number of {field.replace('_', ' ')} to generate")
+    parser.add_argument("--years", type=int, default=DEFAULT_YEARS, help="Number of years the sightings span")
+    parser.add_argument("--end-year", type=int, default=None, help="Year of the latest sightings")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="Seed for the random number generator")
+    parser.add_argument("--user-id", type=int, default=1, help="ID of the user the records are created by")
+    parser.add_argument("--create", action="store_true", help="Create a new database, replacing any existing one")
+    parser.add_argument("--csv", default=None, help="Write the sightings to this CSV file instead of the database")
+    args = parser.parse_args()
+
+    generator = SyntheticDataGenerator(DatasetVolumes(*[getattr(args, field) for field in DatasetVolumes._fields]),
+                                       seed=args.seed, years=args.years, end_year=args.end_year)
+    if args.csv:
+        count = generator.write_sightings_csv(args.csv)
+        print(f"Wrote {count} sightings to {args.csv}")
+    else:
+        if args.create:
+            create_database()
+        written = generator.populate(User(id=args.user_id))
+        for field, count in written._asdict().items():
+            print(f"{field.replace('_', ' ').capitalize()}: {count}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,32 @@
+from .loader_views import LoaderView
+from .conflict_policies import ConflictPolicy
 from .categories import create_category, get_category, list_categories, update_category, delete_category
 from .species import create_species, get_species, list_species, update_species, delete_species
-from .locations import create_location, get_location, list_locations, update_location, geocode_postcode, delete_location
-from .sightings import create_sighting, get_sighting, list_sightings, update_sighting, delete_sighting
+from .locations import create_location, get_location, list_locations, update_location, geocode_postcode, delete_location, \
+    find_locations_in_bbox, nearest_locations, nearest_locations_to_postcode, rebuild_location_index
+from .sightings import create_sighting, get_sighting, list_sightings, update_sighting, delete_sighting, \
+    create_sightings, update_sightings, reassign_sightings, delete_sightings, create_checklist, SightingFilter, \
+    NewSighting, SightingChange, ChecklistEntry, SightingWriteResult, WriteOutcome
+from .sighting_sync import sync_sightings, SyncSighting, SyncResult
+from .sighting_maps import aggregate_sightings, grid_cell_size
+from .records import list_location_records, list_species_records, list_sighting_records
+from .search import search_sightings, search_species, rebuild_search_indexes
+from .sighting_merge import merge_duplicate_sightings
+from .location_duplicates import find_duplicate_locations
+from .reference_data import delete_unused_reference_data, DeletedReferenceData
 from .status_schemes import create_status_scheme, get_status_scheme, list_status_schemes, update_status_scheme, \
     delete_status_scheme
 from .status_ratings import create_status_rating, update_status_rating, delete_status_rating
 from .species_status_ratings import create_species_status_rating, get_species_status_rating, \
-    list_species_status_ratings, close_species_status_rating, delete_species_status_rating
+    list_species_status_ratings, close_species_status_rating, delete_species_status_rating, get_current_statuses
+from .status_import import import_species_status_ratings, StatusRatingImport, StatusImportResult
 from .job_statuses import create_job_status, complete_job_status, list_job_status
 from .users import create_user, authenticate, get_user
 
 
 __all__ = [
+    "LoaderView",
+    "ConflictPolicy",
     "create_category",
     "update_category",
     "get_category",
@@ -28,11 +43,41 @@ __all__ = [
     "list_locations",
     "geocode_postcode",
     "delete_location",
+    "find_locations_in_bbox",
+    "nearest_locations",
+    "nearest_locations_to_postcode",
+    "rebuild_location_index",
     "create_sighting",
     "get_sighting",
     "list_sightings",
     "delete_sighting",
     "update_sighting",
+    "create_sightings",
+    "update_sightings",
+    "reassign_sightings",
+    "delete_sightings",
+    "create_checklist",
+    "SightingFilter",
+    "NewSighting",
+    "SightingChange",
+    "ChecklistEntry",
+    "SightingWriteResult",
+    "WriteOutcome",
+    "sync_sightings",
+    "SyncSighting",
+    "SyncResult",
+    "aggregate_sightings",
+    "grid_cell_size",
+    "list_location_records",
+    "list_species_records",
+    "list_sighting_records",
+    "search_sightings",
+    "search_species",
+    "rebuild_search_indexes",
+    "merge_duplicate_sightings",
+    "find_duplicate_locations",
+    "delete_unused_reference_data",
+    "DeletedReferenceData",
     "create_status_scheme",
     "update_status_scheme",
     "get_status_scheme",
@@ -45,7 +90,11 @@ __all__ = [
     "close_species_status_rating",
     "get_species_status_rating",
     "list_species_status_ratings",
+    "get_current_statuses",
     "delete_species_status_rating",
+    "import_species_status_ratings",
+    "StatusRatingImport",
+    "StatusImportResult",
     "create_job_status",
     "complete_job_status",
     "list_job_status",
@@ -6,8 +6,10 @@ from functools import singledispatch
 import sqlalchemy as db
 from datetime import datetime as dt, UTC
 from sqlalchemy.exc import IntegrityError, NoResultFound
-from ..model import Session, Category, Species
+from ..model import Session, Category, Species, retry_on_busy
 from .naming import tidy_string, Casing
+from .loader_views import LoaderView, query_view
+from .conflict_policies import ConflictPolicy, write_record
 
 def _check_for_existing_records(session, name):
     """
@@ -21,39 +23,40 @@ def _check_for_existing_records(session, name):
     return [category.id for category in categories]
 
 
-def create_category(name, supports_gender, user):
+@retry_on_busy
+def create_category(name, supports_gender, user, policy=ConflictPolicy.ERROR):
     """
     Create a new species category
 
     :param name: Category name
     :param supports_gender: True if the category supports entry of gender against sightings
     :param user: Current user
-    :returns: An instance of the Category class for the created record
+    :param policy: ConflictPolicy determining what happens if there's already a category with the same name
+    :returns: An instance of the Category class for the created, merged or existing record
     :raises ValueError: If the specified name is None, an empty string or consists solely of whitespace
-    :raises ValueError: If the category is a duplicate
+    :raises ValueError: If the category is a duplicate and the policy is ERROR
     """
 
     try:
         with Session.begin() as session:
-            # There is a check constraint to prevent duplicates in the Python model but the pre-existing database
-            # does not have that constraint so explicitly check for duplicates before adding a new record
-            tidied = tidy_string(name, Casing.TITLE_CASE)
-            if len(_check_for_existing_records(session, tidied)):
-                raise ValueError("Duplicate category found")
-
-            category = Category(name=tidied,
-                                supports_gender=supports_gender,
-                                created_by=user.id,
-                                updated_by=user.id,
-                                date_created=dt.now(UTC),
-                                date_updated=dt.now(UTC))
-            session.add(category)
+            category = write_record(session,
+                                    Category,
+                                    dict(name=tidy_string(name, Casing.TITLE_CASE),
+                                         supports_gender=supports_gender,
+                                         created_by=user.id,
+                                         updated_by=user.id,
+                                         date_created=dt.now(UTC),
+                                         date_updated=dt.now(UTC)),
+                                    ["name"],
+                                    policy,
+                                    duplicate_message="Duplicate category found")
     except IntegrityError as e:
         raise ValueError("Invalid or duplicate category name") from e
 
     return category
 
 
+@retry_on_busy
 def update_category(category_id, name, supports_gender, user):
     """
     Update an existing species category
@@ -98,11 +101,12 @@ def update_category(category_id, name, supports_gender, user):
 
 
 @singledispatch
-def get_category(_):
+def get_category(_, view=LoaderView.FULL):
     """
     Return the Category instance for the category with the specified identifier
 
     :param _: Category name or ID
+    :param view: LoaderView determining how much of the category is loaded
     :return: Instance of the category
     :raises ValueError: If the category doesn't exist
     """
@@ -110,10 +114,12 @@ def get_category(_):
 
 
 @get_category.register(str)
-def _(name):
+def _(name, view=LoaderView.FULL):
     try:
         with Session.begin() as session:
-            category = session.query(Category).filter(Category.name == name).one()
+            category = query_view(session, Category, view)\
+                .filter(Category.name == name)\
+                .one()
     except NoResultFound as e:
         raise ValueError("Category not found") from e
 
@@ -121,9 +127,9 @@ def _(name):
 
 
 @get_category.register(int)
-def _(category_id):
+def _(category_id, view=LoaderView.FULL):
     with Session.begin() as session:
-        category = session.query(Category).get(category_id)
+        category = query_view(session, Category, view).get(category_id)
 
     if category is None:
         raise ValueError("Category not found")
@@ -131,17 +137,21 @@ def _(category_id):
     return category
 
 
-def list_categories():
+def list_categories(view=LoaderView.FULL):
     """
     List all the categories in the database
 
+    :param view: LoaderView determining how much of each category is loaded
     :return: A list of Category instances
     """
     with Session.begin() as session:
-        categories = session.query(Category).order_by(db.asc(Category.name)).all()
+        categories = query_view(session, Category, view)\
+            .order_by(db.asc(Category.name))\
+            .all()
     return categories
 
 
+@retry_on_busy
 def delete_category(category_id):
     """
     Delete a category
@@ -0,0 +1,254 @@
+"""
+Conflict policies determine what happens when a new record would duplicate an existing record, according to one of
+the model's unique constraints. Where the database has the constraint, the record is written using a single
+INSERT ... ON CONFLICT statement, so the outcome is decided by the database and is consistent even when several
+processes are writing at the same time. The pre-existing database may not have the constraints, in which case
+SQLite rejects the statement and the existing record is looked up, then inserted or updated, in the same
+transaction. The policies are:
+
++---------+----------------------------------------------------------------------------------------------+
+| Policy  | Outcome if the record is a duplicate                                                         |
++---------+----------------------------------------------------------------------------------------------+
+| ERROR   | A ValueError is raised. This is the default                                                  |
++---------+----------------------------------------------------------------------------------------------+
+| SKIP    | The existing record is left unchanged and returned                                           |
++---------+----------------------------------------------------------------------------------------------+
+| MERGE   | The new values are merged into the existing record. By default, empty optional values in the |
+|         | existing record are filled in from the new one. Sightings combine counts, genders, whether   |
+|         | young were seen and notes, in the same way as duplicate sightings are merged                 |
++---------+----------------------------------------------------------------------------------------------+
+| REPLACE | The existing record is updated with the new values. Its ID, and so the records that refer to |
+|         | it, are preserved, as are the details of who created it and when                             |
++---------+----------------------------------------------------------------------------------------------+
+"""
+
+from enum import Enum
+import sqlalchemy as db
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import make_transient_to_detached
+
+#: Columns recording who created a record, and when, which are never overwritten
+_CREATION_COLUMNS = ["created_by", "date_created"]
+
+#: Columns recording who last updated a record, and when, which are always overwritten when a record is updated
+_MODIFICATION_COLUMNS = ["updated_by", "date_updated"]
+
+#: Text of the error SQLite raises if the conflict target doesn't match a unique constraint
+_NO_MATCHING_CONSTRAINT = "does not match any PRIMARY KEY or UNIQUE constraint"
+
+
+class ConflictPolicy(Enum):
+    """
+    Enumeration of the policies for handling records that duplicate existing records
+    """
+    #: Raise an error
+    ERROR = "error"
+    #: Keep the existing record
+    SKIP = "skip"
+    #: Merge the new values into the existing record
+    MERGE = "merge"
+    #: Replace the values in the existing record with the new values
+    REPLACE = "replace"
+
+
+def _use_new_value(_, new):
+    """
+    Column update rule that takes the new value
+    """
+    return new
+
+
+def _coalesce(existing, new):
+    """
+    Column update rule that keeps the existing value, unless it's NULL
+    """
+    return db.func.coalesce(existing, new)
+
+
+def _update_rules(table, values, key, policy, merge_rules):
+    """
+    Return the rules used to update the columns of an existing record when a new record conflicts with it
+
+    :param table: Table being written
+    :param values: Dictionary of column values for the new record
+    :param key: Names of the columns in the unique constraint
+    :param policy: MERGE or REPLACE
+    :param merge_rules: Dictionary of rules, keyed by column name, used by the MERGE policy or None
+    :return: Dictionary of functions, keyed by column name, that return the updated column value given the
+             existing and new values
+    """
+    rules = {}
+    for name in values:
+        if name in key or name in _CREATION_COLUMNS:
+            continue
+
+        if policy == ConflictPolicy.REPLACE or name in _MODIFICATION_COLUMNS:
+            rules[name] = _use_new_value
+        elif merge_rules and name in merge_rules:
+            rules[name] = merge_rules[name]
+        elif table.c[name].nullable:
+            rules[name] = _coalesce
+
+    return rules
+
+
+def _attach(session, entity, values, record_id):
+    """
+    Return an instance of an entity for a record that's just been inserted, without reloading it from the database
+
+    :param session: SQLAlchemy session to which the instance is added
+    :param entity: Model class
+    :param values: Dictionary of column values for the record
+    :param record_id: ID of the inserted record
+    :return: Instance of the entity
+    """
+    instance = entity(id=record_id, **values)
+    make_transient_to_detached(instance)
+    session.add(instance)
+    return instance
+
+
+def _query_existing(session, entity, values, key):
+    """
+    Return the query that loads the existing record with the same key as the new one
+    """
+    table = entity.__table__
+    return session.query(entity)\
+        .populate_existing()\
+        .filter(*[table.c[name] == values[name] for name in key])
+
+
+def _write_with_upsert(session, entity, values, key, policy, merge_rules, duplicate_message):
+    """
+    Write a record using INSERT ... ON CONFLICT
+
+    :return: Instance of the entity for the written record
+    :raises OperationalError: If the database doesn't have a unique constraint on the key
+    """
+    table = entity.__table__
+    statement = insert(table).values(**values)
+    if policy in [ConflictPolicy.ERROR, ConflictPolicy.SKIP]:
+        statement = statement.on_conflict_do_nothing(index_elements=key)
+    else:
+        rules = _update_rules(table, values, key, policy, merge_rules)
+        statement = statement.on_conflict_do_update(
+            index_elements=key,
+            set_={name: rule(table.c[name], statement.excluded[name]) for name, rule in rules.items()})
+
+    result = session.execute(statement)
+
+    # SQLite only reports the ID of inserted rows, so an existing record that's been kept or updated is loaded
+    # using its key
+    if policy in [ConflictPolicy.ERROR, ConflictPolicy.SKIP] and result.rowcount:
+        return _attach(session, entity, values, result.lastrowid)
+
+    if policy == ConflictPolicy.ERROR:
+        raise ValueError(duplicate_message)
+
+    return _query_existing(session, entity, values, key).one()
+
+
+def _write_with_lookup(session, entity, values, key, policy, merge_rules, duplicate_message):
+    """
+    Write a record by looking for an existing record with the same key then inserting or updating, for use
+    with databases that don't have a unique constraint on the key
+
+    :return: Instance of the entity for the written record
+    """
+    existing = _query_existing(session, entity, values, key).first()
+    if existing is None:
+        result = session.execute(db.insert(entity.__table__).values(**values))
+        return _attach(session, entity, values, result.inserted_primary_key[0])
+
+    if policy == ConflictPolicy.ERROR:
+        raise ValueError(duplicate_message)
+
+    if policy != ConflictPolicy.SKIP:
+        table = entity.__table__
+        rules = _update_rules(table, values, key, policy, merge_rules)
+        session.execute(db.update(table)
+                        .where(table.c.id == existing.id)
+                        .values({name: rule(table.c[name], db.literal(values[name], table.c[name].type))
+                                 for name, rule in rules.items()}))
+        existing = _query_existing(session, entity, values, key).one()
+
+    return existing
+
+
+def write_record(session, entity, values, key, policy, merge_rules=None, duplicate_message="Duplicate record found"):
+    """
+    Insert a record or, if it duplicates an existing record, resolve the conflict using a conflict policy
+
+    :param session: SQLAlchemy session on which to perform the write
+    :param entity: Model class for the record
+    :param values: Dictionary of column values for the new record, keyed by column name
+    :param key: List of the names of the columns in the unique constraint used to identify duplicates
+    :param policy: ConflictPolicy member
+    :param merge_rules: Dictionary of functions, keyed by column name, that combine the existing and new values of
+                        a column into the merged value, used by the MERGE policy, or None for the default rules
+    :param duplicate_message: Error message used if the record's a duplicate and the policy is ERROR
+    :return: Instance of the entity for the inserted, updated or existing record
+    :raises ValueError: If the policy isn't valid or the record's a duplicate and the policy is ERROR
+    """
+    if not isinstance(policy, ConflictPolicy):
+        raise ValueError("Invalid conflict policy")
+
+    try:
+        return _write_with_upsert(session, entity, values, key, policy, merge_rules, duplicate_message)
+    except OperationalError as e:
+        # SQLite rejects the statement when it's prepared, before anything's been written, so the transaction is
+        # unaffected
+        if _NO_MATCHING_CONSTRAINT not in str(e.orig):
+            raise
+
+    return _write_with_lookup(session, entity, values, key, policy, merge_rules, duplicate_message)
+
+
+def write_records(session, entity, rows, key, policy, merge_rules=None, duplicate_message="Duplicate record found"):
+    """
+    Insert a batch of records, resolving conflicts with existing records, and between records in the batch, using
+    a conflict policy. Where the database has the unique constraint, the batch is written with a single
+    INSERT ... ON CONFLICT statement executed for all the rows. Otherwise, each record's written as by
+    write_record(). Unlike write_record(), instances aren't returned, so the caller looks up the written records
+    by their keys if it needs them
+
+    :param session: SQLAlchemy session on which to perform the write
+    :param entity: Model class for the records
+    :param rows: List of dictionaries of column values, keyed by column name, each with the same columns
+    :param key: List of the names of the columns in the unique constraint used to identify duplicates
+    :param policy: ConflictPolicy member
+    :param merge_rules: Dictionary of functions, keyed by column name, that combine the existing and new values of
+                        a column into the merged value, used by the MERGE policy, or None for the default rules
+    :param duplicate_message: Error message used if a record's a duplicate and the policy is ERROR
+    :raises ValueError: If the policy isn't valid or a record's a duplicate and the policy is ERROR
+    """
+    if not isinstance(policy, ConflictPolicy):
+        raise ValueError("Invalid conflict policy")
+
+    if not rows:
+        return
+
+    table = entity.__table__
+    statement = insert(table)
+    if policy in [ConflictPolicy.ERROR, ConflictPolicy.SKIP]:
+        statement = statement.on_conflict_do_nothing(index_elements=key)
+    else:
+        rules = _update_rules(table, rows[0], key, policy, merge_rules)
+        statement = statement.on_conflict_do_update(
+            index_elements=key,
+            set_={name: rule(table.c[name], statement.excluded[name]) for name, rule in rules.items()})
+
+    try:
+        result = session.execute(statement, rows)
+    except OperationalError as e:
+        if _NO_MATCHING_CONSTRAINT not in str(e.orig):
+            raise
+
+        for values in rows:
+            _ = _write_with_lookup(session, entity, values, key, policy, merge_rules, duplicate_message)
+        return
+
+    # Under the ERROR policy, a row that wasn't inserted duplicates an existing record or an earlier row
+    if policy == ConflictPolicy.ERROR and result.rowcount != len(rows):
+        raise ValueError(duplicate_message)
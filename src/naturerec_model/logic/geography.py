@@ -0,0 +1,56 @@
+"""
+Geographical calculations on latitude and longitude
+"""
+
+import math
+
+#: Mean radius of the Earth, in km
+EARTH_RADIUS_KM = 6371.0088
+
+#: Length of one degree of latitude, in km
+KM_PER_DEGREE_LATITUDE = 111.32
+
+
+def haversine_distance(latitude_1, longitude_1, latitude_2, longitude_2):
+    """
+    Return the great-circle distance between two points
+
+    :param latitude_1: Latitude of the first point, in decimal degrees
+    :param longitude_1: Longitude of the first point, in decimal degrees
+    :param latitude_2: Latitude of the second point, in decimal degrees
+    :param longitude_2: Longitude of the second point, in decimal degrees
+    :return: Distance between the points, in km
+    """
+    phi_1 = math.radians(latitude_1)
+    phi_2 = math.radians(latitude_2)
+    delta_phi = phi_2 - phi_1
+    delta_lambda = math.radians(longitude_2 - longitude_1)
+    a = math.sin(delta_phi / 2) ** 2 + math.cos(phi_1) * math.cos(phi_2) * math.sin(delta_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def bounding_box(latitude, longitude, radius_km):
+    """
+    Return a latitude/longitude box that contains all points within the specified distance of a point. The box
+    is clamped to the valid latitude range and covers all longitudes if it would otherwise wrap round the globe
+    or if it includes a pole
+
+    :param latitude: Latitude of the centre point, in decimal degrees
+    :param longitude: Longitude of the centre point, in decimal degrees
+    :param radius_km: Radius, in km
+    :return: Tuple of (min latitude, min longitude, max latitude, max longitude)
+    """
+    delta_latitude = radius_km / KM_PER_DEGREE_LATITUDE
+    min_latitude = max(-90.0, latitude - delta_latitude)
+    max_latitude = min(90.0, latitude + delta_latitude)
+
+    # Degrees of longitude shrink towards the poles, so widen the box accordingly
+    cos_latitude = math.cos(math.radians(max(abs(min_latitude), abs(max_latitude))))
+    if cos_latitude < 1e-6:
+        return min_latitude, -180.0, max_latitude, 180.0
+
+    delta_longitude = radius_km / (KM_PER_DEGREE_LATITUDE * cos_latitude)
+    if delta_longitude >= 180.0:
+        return min_latitude, -180.0, max_latitude, 180.0
+
+    return min_latitude, longitude - delta_longitude, max_latitude, longitude + delta_longitude
@@ -5,9 +5,10 @@ Background job status business logic
 import sqlalchemy as db
 from datetime import datetime as dt, UTC
 from sqlalchemy.exc import IntegrityError
-from ..model import Session, JobStatus
+from ..model import Session, JobStatus, retry_on_busy, to_timestamp
 
 
+@retry_on_busy
 def create_job_status(name, parameters, start, user):
     """
     Create a new background job status record
@@ -34,6 +35,7 @@ def create_job_status(name, parameters, start, user):
     return job_status
 
 
+@retry_on_busy
 def complete_job_status(job_status_id, end, error, user):
     """
     Mark the specified background job as completed
@@ -76,12 +78,10 @@ def list_job_status(name=None, from_date=None, to_date=None):
             query = query.filter(JobStatus.name == name)
 
         if from_date:
-            from_date_string = from_date.strftime(JobStatus.DATE_FORMAT)
-            query = query.filter(JobStatus.start >= from_date_string)
+            query = query.filter(JobStatus.__table__.c.startTimestamp >= to_timestamp(from_date))
 
         if to_date:
-            to_date_string = to_date.strftime(JobStatus.DATE_FORMAT)
-            query = query.filter(JobStatus.start <= to_date_string)
+            query = query.filter(JobStatus.__table__.c.startTimestamp <= to_timestamp(to_date))
 
         job_statuses = query.order_by(db.asc(JobStatus.start)).all()
 
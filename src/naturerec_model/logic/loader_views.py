@@ -0,0 +1,114 @@
+"""
+Loader views control how much of an entity, and of its related entities, is loaded by the get and list functions.
+Outside a unit of work, instances are returned detached from the session, so attributes and relationships excluded
+from the view can't be loaded later. Related entities excluded from a view are configured to raise an error if
+they're accessed, rather than silently appearing to be empty. The views are:
+
++---------+----------------------------------------------------------------------------------------------+
+| View    | Contents                                                                                     |
++---------+----------------------------------------------------------------------------------------------+
+| MINIMAL | Identifying columns, such as names, needed to populate selectors. No related entities        |
++---------+----------------------------------------------------------------------------------------------+
+| DISPLAY | Columns shown on list and editing pages, with the names of related entities, but not audit   |
+|         | columns                                                                                      |
++---------+----------------------------------------------------------------------------------------------+
+| FULL    | All columns and related entities, loaded as configured on the model. This is the default     |
++---------+----------------------------------------------------------------------------------------------+
+"""
+
+from enum import Enum
+from sqlalchemy.orm import load_only, joinedload, raiseload, defaultload
+from ..model import Category, Species, Location, Sighting
+
+
+class LoaderView(Enum):
+    """
+    Enumeration of the loader views
+    """
+    #: Identifying columns only, with no related entities
+    MINIMAL = "minimal"
+    #: Displayed columns, with the names of related entities
+    DISPLAY = "display"
+    #: All columns and related entities
+    FULL = "full"
+
+
+_SIGHTING_COLUMNS = [Sighting.locationId, Sighting.speciesId, Sighting.date, Sighting.number, Sighting.withYoung,
+                     Sighting.gender, Sighting.notes]
+
+_LOCATION_COLUMNS = [Location.name, Location.address, Location.city, Location.county, Location.postcode,
+                     Location.country, Location.latitude, Location.longitude]
+
+_LOADER_OPTIONS = {
+    Category: {
+        LoaderView.MINIMAL: [
+            load_only(Category.name, Category.supports_gender),
+            raiseload(Category.species)
+        ],
+        LoaderView.DISPLAY: [
+            load_only(Category.name, Category.supports_gender),
+            raiseload(Category.species)
+        ]
+    },
+    Species: {
+        LoaderView.MINIMAL: [
+            load_only(Species.categoryId, Species.name, Species.scientific_name),
+            raiseload(Species.category)
+        ],
+        LoaderView.DISPLAY: [
+            load_only(Species.categoryId, Species.name, Species.scientific_name),
+            joinedload(Species.category).load_only(Category.name, Category.supports_gender),
+            defaultload(Species.category).raiseload(Category.species)
+        ]
+    },
+    Location: {
+        LoaderView.MINIMAL: [
+            load_only(Location.name)
+        ],
+        LoaderView.DISPLAY: [
+            load_only(*_LOCATION_COLUMNS)
+        ]
+    },
+    Sighting: {
+        LoaderView.MINIMAL: [
+            load_only(*_SIGHTING_COLUMNS),
+            raiseload(Sighting.location),
+            raiseload(Sighting.species)
+        ],
+        LoaderView.DISPLAY: [
+            load_only(*_SIGHTING_COLUMNS),
+            joinedload(Sighting.location).load_only(Location.name),
+            joinedload(Sighting.species).load_only(Species.categoryId, Species.name, Species.scientific_name),
+            joinedload(Sighting.species, Species.category).load_only(Category.name, Category.supports_gender),
+            defaultload(Sighting.species).defaultload(Species.category).raiseload(Category.species)
+        ]
+    }
+}
+
+
+def loader_options(entity, view):
+    """
+    Return the query options that load an entity using a loader view
+
+    :param entity: Model class being queried
+    :param view: LoaderView member
+    :return: List of query options, empty for the FULL view
+    :raises ValueError: If the view isn't valid
+    """
+    if not isinstance(view, LoaderView):
+        raise ValueError("Invalid loader view")
+
+    return _LOADER_OPTIONS[entity].get(view, [])
+
+
+def query_view(session, entity, view):
+    """
+    Return a query for an entity that loads it using a loader view. Instances already in the session's identity
+    map, for example when the session's shared by a unit of work, are reloaded so they're consistent with the view
+
+    :param session: Session on which to create the query
+    :param entity: Model class to query
+    :param view: LoaderView member
+    :return: Query instance
+    """
+    return session.query(entity).options(*loader_options(entity, view)).populate_existing()
@@ -0,0 +1,193 @@
+"""
+Duplicate location detection business logic. Candidate pairs are generated using blocking keys, so only locations
+that share a significant name token or are close to each other are compared, rather than every pair. Each
+candidate pair is then scored on the similarity of the normalised names and, where both locations have
+coordinates, their distance apart
+"""
+
+import itertools
+import re
+import unicodedata
+import numpy as np
+from collections import defaultdict, namedtuple
+from difflib import SequenceMatcher
+from ..model import Session, Location
+from .geography import EARTH_RADIUS_KM, KM_PER_DEGREE_LATITUDE
+
+#: Candidate pair of duplicate locations, with similarity measures and an overall score between 0 and 1
+DuplicateLocationCandidate = namedtuple("DuplicateLocationCandidate", "location_id location_name duplicate_id "
+                                                                      "duplicate_name name_similarity distance score")
+
+#: Words ignored when normalising location names
+NAME_STOP_WORDS = {"the", "and", "of", "at", "on", "in", "nr", "near"}
+
+#: Minimum token length for a token to be used as a blocking key
+MIN_BLOCKING_TOKEN_LENGTH = 3
+
+#: Blocks with more locations than this, such as those for very common name tokens, are ignored as they'd
+#: reintroduce quadratic comparison costs without identifying useful candidates
+MAX_BLOCK_SIZE = 250
+
+#: Default distance, in km, within which two locations are considered to be in the same place
+DEFAULT_MAX_DISTANCE_KM = 1.0
+
+#: Default minimum score for a pair of locations to be reported as a candidate duplicate
+DEFAULT_MIN_SCORE = 0.6
+
+#: Weight given to name similarity when combining it with proximity to give the score
+NAME_SIMILARITY_WEIGHT = 0.6
+
+
+def normalise_location_name(name):
+    """
+    Normalise a location name for comparison, removing case, accents, punctuation and common stop words
+
+    :param name: Location name
+    :return: Normalised name
+    """
+    decomposed = unicodedata.normalize("NFKD", name or "")
+    unaccented = "".join(c for c in decomposed if not unicodedata.combining(c)).lower()
+    tokens = re.sub(r"[^a-z0-9]+", " ", unaccented.replace("'", "")).split()
+    return " ".join(token for token in tokens if token not in NAME_STOP_WORDS)
+
+
+def _blocking_keys(normalised_name):
+    """
+    Return the name blocking keys for a location. These are its significant name tokens and the name with its
+    tokens sorted, to catch names whose words have been reordered
+
+    :param normalised_name: Normalised location name
+    :return: Set of blocking keys
+    """
+    tokens = normalised_name.split()
+    keys = {f"t:{token}" for token in tokens if len(token) >= MIN_BLOCKING_TOKEN_LENGTH}
+    if tokens:
+        keys.add(f"s:{' '.join(sorted(tokens))}")
+    return keys
+
+
+def _spatial_blocking_keys(latitudes, longitudes, cell_size_km):
+    """
+    Return a grid cell blocking key for each location with coordinates, so locations within the same or adjacent
+    cells become candidates. Each location is placed in its own cell and the three neighbouring cells closest to
+    it, so any pair closer than the cell size share at least one key
+
+    :param latitudes: Array of latitudes, with NaN for locations without coordinates
+    :param longitudes: Array of longitudes, with NaN for locations without coordinates
+    :param cell_size_km: Grid cell size, in km
+    :return: Dictionary of location index to list of grid cell keys
+    """
+    keys = {}
+    cell_size_degrees = cell_size_km / KM_PER_DEGREE_LATITUDE
+    has_coordinates = ~(np.isnan(latitudes) | np.isnan(longitudes))
+    indices = np.flatnonzero(has_coordinates)
+    scaled_latitudes = latitudes[indices] / cell_size_degrees
+    # Longitude cells are scaled by latitude so they're roughly square
+    scaled_longitudes = longitudes[indices] * np.maximum(np.cos(np.radians(latitudes[indices])), 1e-6) / cell_size_degrees
+    rows = np.floor(scaled_latitudes)
+    columns = np.floor(scaled_longitudes)
+    row_offsets = np.where(scaled_latitudes - rows < 0.5, -1, 1)
+    column_offsets = np.where(scaled_longitudes - columns < 0.5, -1, 1)
+
+    for index, row, column, row_offset, column_offset in zip(indices, rows, columns, row_offsets, column_offsets):
+        keys[index] = [f"g:{int(row + dr)}:{int(column + dc)}" for dr in (0, row_offset) for dc in (0, column_offset)]
+
+    return keys
+
+
+def _haversine_distances(latitudes_1, longitudes_1, latitudes_2, longitudes_2):
+    """
+    Vectorised great-circle distance calculation
+
+    :return: Array of distances, in km, with NaN where either point has no coordinates
+    """
+    phi_1 = np.radians(latitudes_1)
+    phi_2 = np.radians(latitudes_2)
+    delta_phi = phi_2 - phi_1
+    delta_lambda = np.radians(longitudes_2 - longitudes_1)
+    a = np.sin(delta_phi / 2) ** 2 + np.cos(phi_1) * np.cos(phi_2) * np.sin(delta_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.minimum(1.0, np.sqrt(a)))
+
+
+def _candidate_pairs(normalised_names, latitudes, longitudes, max_distance_km):
+    """
+    Generate the candidate pairs of locations to compare, using name and spatial blocking keys
+
+    :return: Tuple of two arrays containing the indices of the first and second location in each pair
+    """
+    blocks = defaultdict(list)
+    for index, name in enumerate(normalised_names):
+        for key in _blocking_keys(name):
+            blocks[key].append(index)
+
+    for index, keys in _spatial_blocking_keys(latitudes, longitudes, max_distance_km).items():
+        for key in keys:
+            blocks[key].append(index)
+
+    pairs = set()
+    for members in blocks.values():
+        if 1 < len(members) <= MAX_BLOCK_SIZE:
+            pairs.update(itertools.combinations(sorted(members), 2))
+
+    if not pairs:
+        return np.empty(0, dtype=int), np.empty(0, dtype=int)
+
+    pair_array = np.array(sorted(pairs), dtype=int)
+    return pair_array[:, 0], pair_array[:, 1]
+
+
+def find_duplicate_locations(max_distance_km=DEFAULT_MAX_DISTANCE_KM, min_score=DEFAULT_MIN_SCORE):
+    """
+    Find pairs of locations that may be duplicates of each other
+
+    :param max_distance_km: Distance, in km, within which two locations are considered to be in the same place
+    :param min_score: Minimum score for a pair to be reported
+    :return: List of DuplicateLocationCandidate instances, highest scoring first
+    """
+    if max_distance_km <= 0:
+        raise ValueError("Invalid maximum distance")
+
+    with Session.begin() as session:
+        rows = session.query(Location.id, Location.name, Location.latitude, Location.longitude)\
+            .order_by(Location.id)\
+            .all()
+
+    ids = [row.id for row in rows]
+    names = [row.name for row in rows]
+    normalised_names = [normalise_location_name(name) for name in names]
+    latitudes = np.array([np.nan if row.latitude is None else row.latitude for row in rows], dtype=float)
+    longitudes = np.array([np.nan if row.longitude is None else row.longitude for row in rows], dtype=float)
+
+    first, second = _candidate_pairs(normalised_names, latitudes, longitudes, max_distance_km)
+    distances = _haversine_distances(latitudes[first], longitudes[first], latitudes[second], longitudes[second])
+    proximities = np.clip(1.0 - distances / max_distance_km, 0.0, 1.0)
+
+    # The name similarity needed for each pair to reach the minimum score, given its proximity. Pairs lacking
+    # coordinates are scored on name similarity alone
+    required_similarities = np.where(np.isnan(distances),
+                                     min_score,
+                                     (min_score - (1.0 - NAME_SIMILARITY_WEIGHT) * proximities) / NAME_SIMILARITY_WEIGHT)
+
+    candidates = []
+    for i, j, distance, proximity, required in zip(first, second, distances, proximities, required_similarities):
+        # Use the cheap upper bounds on similarity to discard pairs before calculating it in full
+        matcher = SequenceMatcher(None, normalised_names[i], normalised_names[j], autojunk=False)
+        if matcher.real_quick_ratio() < required or matcher.quick_ratio() < required:
+            continue
+
+        similarity = matcher.ratio()
+        if similarity < required:
+            continue
+
+        has_distance = not np.isnan(distance)
+        score = NAME_SIMILARITY_WEIGHT * similarity + (1.0 - NAME_SIMILARITY_WEIGHT) * proximity \
+            if has_distance else similarity
+        candidates.append(DuplicateLocationCandidate(location_id=ids[i],
+                                                     location_name=names[i],
+                                                     duplicate_id=ids[j],
+                                                     duplicate_name=names[j],
+                                                     name_similarity=round(similarity, 4),
+                                                     distance=round(float(distance), 4) if has_distance else None,
+                                                     score=round(float(score), 4)))
+
+    return sorted(candidates, key=lambda c: (-c.score, c.location_id, c.duplicate_id))
@@ -2,14 +2,28 @@
 Locations business logic
 """
 
+import math
 import sqlalchemy as db
 import pandas as pd
 import pgeocode
 import pycountry
+from collections import namedtuple
 from datetime import datetime as dt, UTC
 from functools import singledispatch
 from sqlalchemy.exc import IntegrityError, NoResultFound
-from ..model import Session, Location, Sighting
+from ..model import Session, Location, LocationIndex, Sighting, retry_on_busy
+from .geography import haversine_distance, bounding_box, EARTH_RADIUS_KM
+from .loader_views import LoaderView, query_view
+from .conflict_policies import ConflictPolicy, write_record
+
+#: Location returned from a nearest location search, with its distance from the search point in km
+LocationDistance = namedtuple("LocationDistance", "location distance")
+
+#: Initial search radius, in km, used when finding the nearest locations to a point
+NEAREST_LOCATION_INITIAL_RADIUS_KM = 5.0
+
+#: Search radius, in km, at which every point on the globe is covered
+MAX_SEARCH_RADIUS_KM = math.pi * EARTH_RADIUS_KM
 
 
 def _check_for_existing_records(session, name):
@@ -24,7 +38,57 @@ def _check_for_existing_records(session, name):
     return [location.id for location in locations]
 
 
-def create_location(name, county, country, user, address=None, city=None, postcode=None, latitude=None, longitude=None):
+def _update_location_index(session, location):
+    """
+    Add, update or remove the spatial index entry for a location, depending on whether or not it has coordinates
+
+    :param session: SQLAlchemy session on which to perform the update
+    :param location: Location instance, which must have been flushed so it has an ID
+    """
+    if location.latitude is None or location.longitude is None:
+        session.execute(db.delete(LocationIndex).where(LocationIndex.c.id == location.id))
+    else:
+        session.execute(db.insert(LocationIndex)
+                        .prefix_with("OR REPLACE")
+                        .values(id=location.id,
+                                minLatitude=location.latitude,
+                                maxLatitude=location.latitude,
+                                minLongitude=location.longitude,
+                                maxLongitude=location.longitude))
+
+
+def _normalise_longitude(longitude):
+    """
+    Wrap a longitude into the range -180 to 180
+
+    :param longitude: Longitude in decimal degrees
+    :return: Equivalent longitude in the range -180 to 180
+    """
+    return longitude if -180.0 <= longitude <= 180.0 else ((longitude + 180.0) % 360.0) - 180.0
+
+
+def _bbox_criteria(table, latitude_min_column, latitude_max_column, longitude_min_column, longitude_max_column,
+                   min_latitude, min_longitude, max_latitude, max_longitude):
+    """
+    Build the filtering criteria for a bounding box query. If the minimum longitude is greater than the maximum,
+    the box is taken to cross the antimeridian
+
+    :return: SQLAlchemy filter expression
+    """
+    latitude_criteria = db.and_(table.c[latitude_max_column] >= min_latitude,
+                                table.c[latitude_min_column] <= max_latitude)
+    if min_longitude <= max_longitude:
+        longitude_criteria = db.and_(table.c[longitude_max_column] >= min_longitude,
+                                     table.c[longitude_min_column] <= max_longitude)
+    else:
+        longitude_criteria = db.or_(table.c[longitude_max_column] >= min_longitude,
+                                    table.c[longitude_min_column] <= max_longitude)
+    return db.and_(latitude_criteria, longitude_criteria)
+
+
+@retry_on_busy
+def create_location(name, county, country, user, address=None, city=None, postcode=None, latitude=None, longitude=None,
+                    policy=ConflictPolicy.ERROR):
     """
     Create a new location
 
@@ -37,35 +101,37 @@ def create_location(name, county, country, user, address=None, city=None, postco
     :param postcode: Postcode or None
     :param latitude: Latitude or None
     :param longitude: Longitude or None
-    :return: An instance of the Location class for the created record
+    :param policy: ConflictPolicy determining what happens if there's already a location with the same name
+    :return: An instance of the Location class for the created, merged or existing record
+    :raises ValueError: If the location is a duplicate and the policy is ERROR or has invalid properties
     """
     try:
         with Session.begin() as session:
-            # There is a check constraint to prevent duplicates in the Python model but the pre-existing database
-            # does not have that constraint so explicitly check for duplicates before adding a new record
-            tidied = " ".join(name.split()).title() if name else None
-            if len(_check_for_existing_records(session, tidied)):
-                raise ValueError("Duplicate location found")
-
-            location = Location(name=tidied,
-                                address=" ".join(address.split()) if address else None,
-                                city=" ".join(city.split()) if city else None,
-                                county=" ".join(county.split()) if county else None,
-                                postcode=" ".join(postcode.split()).upper() if postcode else None,
-                                country=" ".join(country.split()) if country else None,
-                                latitude=latitude,
-                                longitude=longitude,
-                                created_by=user.id,
-                                updated_by=user.id,
-                                date_created=dt.now(UTC),
-                                date_updated=dt.now(UTC))
-            session.add(location)
+            location = write_record(session,
+                                    Location,
+                                    dict(name=" ".join(name.split()).title() if name else None,
+                                         address=" ".join(address.split()) if address else None,
+                                         city=" ".join(city.split()) if city else None,
+                                         county=" ".join(county.split()) if county else None,
+                                         postcode=" ".join(postcode.split()).upper() if postcode else None,
+                                         country=" ".join(country.split()) if country else None,
+                                         latitude=latitude,
+                                         longitude=longitude,
+                                         created_by=user.id,
+                                         updated_by=user.id,
+                                         date_created=dt.now(UTC),
+                                         date_updated=dt.now(UTC)),
+                                    ["name"],
+                                    policy,
+                                    duplicate_message="Duplicate location found")
+            _update_location_index(session, location)
     except IntegrityError as e:
         raise ValueError("Invalid location properties or duplicate name") from e
 
     return location
 
 
+@retry_on_busy
 def update_location(location_id, name, county, country, user, address=None, city=None, postcode=None, latitude=None,
                     longitude=None):
     """
@@ -112,6 +178,8 @@ def update_location(location_id, name, county, country, user, address=None, city
             location.longitude = longitude
             location.updated_by = user.id
             location.date_updated = dt.now(UTC)
+            session.flush()
+            _update_location_index(session, location)
     except IntegrityError as e:
         raise ValueError("Invalid location properties or duplicate name") from e
 
@@ -119,11 +187,12 @@ def update_location(location_id, name, county, country, user, address=None, city
 
 
 @singledispatch
-def get_location(_):
+def get_location(_, view=LoaderView.FULL):
     """
     Return the Location instance for the location with the specified identifier
 
     :param _: Location name or ID
+    :param view: LoaderView determining how much of the location is loaded
     :return: Instance of the location
     :raises ValueError: If the location doesn't exist
     """
@@ -131,10 +200,12 @@ def get_location(_):
 
 
 @get_location.register(str)
-def _(name):
+def _(name, view=LoaderView.FULL):
     try:
         with Session.begin() as session:
-            location = session.query(Location).filter(Location.name == name).one()
+            location = query_view(session, Location, view)\
+                .filter(Location.name == name)\
+                .one()
     except NoResultFound as e:
         raise ValueError("Location not found") from e
 
@@ -142,9 +213,9 @@ def _(name):
 
 
 @get_location.register(int)
-def _(category_id):
+def _(category_id, view=LoaderView.FULL):
     with Session.begin() as session:
-        location = session.query(Location).get(category_id)
+        location = query_view(session, Location, view).get(category_id)
 
     if location is None:
         raise ValueError("Location not found")
@@ -152,16 +223,17 @@ def _(category_id):
     return location
 
 
-def list_locations(city=None, county=None, country=None):
+def list_locations(city=None, county=None, country=None, view=LoaderView.FULL):
     """
 
     :param city: City to filter by or None
     :param county: County to filter by or None
     :param country: Country to filter by or None
+    :param view: LoaderView determining how much of each location is loaded
     :return: List of matching locations
     """
     with Session.begin() as session:
-        query = session.query(Location)
+        query = query_view(session, Location, view)
 
         if city and city.strip():
             query = query.filter(Location.city == city)
@@ -177,6 +249,107 @@ def list_locations(city=None, county=None, country=None):
     return locations
 
 
+def find_locations_in_bbox(min_latitude, min_longitude, max_latitude, max_longitude):
+    """
+    Return the locations whose coordinates lie within a bounding box, using the spatial index to find candidates.
+    The index stores coordinates at reduced precision so candidates are then checked against the exact coordinates
+
+    :param min_latitude: Southern edge of the box, in decimal degrees
+    :param min_longitude: Western edge of the box, in decimal degrees. If greater than the maximum longitude, the
+                          box is taken to cross the antimeridian
+    :param max_latitude: Northern edge of the box, in decimal degrees
+    :param max_longitude: Eastern edge of the box, in decimal degrees
+    :return: List of matching locations, ordered by name
+    """
+    if min_latitude > max_latitude:
+        raise ValueError("Invalid bounding box")
+
+    candidates = db.select(LocationIndex.c.id)\
+        .where(_bbox_criteria(LocationIndex, "minLatitude", "maxLatitude", "minLongitude", "maxLongitude",
+                              min_latitude, min_longitude, max_latitude, max_longitude))
+
+    location_table = Location.__table__
+    with Session.begin() as session:
+        locations = session.query(Location)\
+            .filter(Location.id.in_(candidates),
+                    _bbox_criteria(location_table, "latitude", "latitude", "longitude", "longitude",
+                                   min_latitude, min_longitude, max_latitude, max_longitude))\
+            .order_by(db.asc(Location.name))\
+            .all()
+
+    return locations
+
+
+def nearest_locations(latitude, longitude, k=10, max_distance=None):
+    """
+    Return the nearest locations to a point. Candidates are found using the spatial index, expanding the search
+    area until enough have been found, and are then ranked by their exact great-circle distance from the point
+
+    :param latitude: Latitude of the point, in decimal degrees
+    :param longitude: Longitude of the point, in decimal degrees
+    :param k: Maximum number of locations to return
+    :param max_distance: Maximum distance from the point, in km, or None for no limit
+    :return: List of LocationDistance tuples, nearest first
+    """
+    if k < 1:
+        return []
+
+    limit = MAX_SEARCH_RADIUS_KM if max_distance is None else min(max_distance, MAX_SEARCH_RADIUS_KM)
+    with Session.begin() as session:
+        radius = NEAREST_LOCATION_INITIAL_RADIUS_KM
+        while True:
+            search_radius = min(radius, limit)
+            min_latitude, min_longitude, max_latitude, max_longitude = bounding_box(latitude, longitude, search_radius)
+            candidates = db.select(LocationIndex.c.id)\
+                .where(_bbox_criteria(LocationIndex, "minLatitude", "maxLatitude", "minLongitude", "maxLongitude",
+                                      min_latitude, _normalise_longitude(min_longitude),
+                                      max_latitude, _normalise_longitude(max_longitude)))
+            locations = session.query(Location).filter(Location.id.in_(candidates)).all()
+
+            # Rank by exact distance, discarding anything outside the search radius. Points inside the box but
+            # beyond the radius aren't guaranteed to be nearer than points outside the box
+            ranked = sorted([LocationDistance(location, haversine_distance(latitude, longitude,
+                                                                           location.latitude, location.longitude))
+                             for location in locations],
+                            key=lambda ld: ld.distance)
+            within = [ld for ld in ranked if ld.distance <= search_radius]
+
+            # Stop when there are enough locations within the radius or the radius can't usefully grow any further
+            if len(within) >= k or search_radius >= limit:
+                return within[:k]
+
+            radius *= 4
+
+
+def nearest_locations_to_postcode(postcode, country, k=10, max_distance=None):
+    """
+    Return the nearest locations to a postcode, geocoding the postcode to find the search point
+
+    :param postcode: Postcode
+    :param country: Country where the postcode is located
+    :param k: Maximum number of locations to return
+    :param max_distance: Maximum distance from the postcode, in km, or None for no limit
+    :return: List of LocationDistance tuples, nearest first
+    :raises ValueError: If the postcode can't be geocoded
+    """
+    coordinates = geocode_postcode(postcode, country)
+    return nearest_locations(coordinates["latitude"], coordinates["longitude"], k, max_distance)
+
+
+@retry_on_busy
+def rebuild_location_index():
+    """
+    Rebuild the spatial index from the coordinates held against each location. This is needed if locations have
+    been written by anything other than the location business logic e.g. the .NET application sharing the database
+    """
+    with Session.begin() as session:
+        session.execute(db.delete(LocationIndex))
+        session.execute(db.insert(LocationIndex).from_select(
+            ["id", "minLatitude", "maxLatitude", "minLongitude", "maxLongitude"],
+            db.select(Location.id, Location.latitude, Location.latitude, Location.longitude, Location.longitude)
+            .where(Location.latitude.isnot(None), Location.longitude.isnot(None))))
+
+
 def geocode_postcode(postcode, country):
     """
     Given a postcode and country, return the latitude and longitude for the postcode
@@ -215,6 +388,7 @@ def geocode_postcode(postcode, country):
             "longitude": round(geocode_sr.longitude, 6)}
 
 
+@retry_on_busy
 def delete_location(location_id):
     """
     Delete a location
@@ -238,5 +412,6 @@ def delete_location(location_id):
         if len(sightings) > 0:
             raise ValueError("Cannot delete a location that has sightings recorded against it")
 
-        # Delete the location
+        # Delete the location and its spatial index entry
+        session.execute(db.delete(LocationIndex).where(LocationIndex.c.id == location_id))
         session.delete(location)
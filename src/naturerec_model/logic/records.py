@@ -0,0 +1,174 @@
+"""
+Read-only record business logic. The functions in this module return immutable, compact records built directly from
+Core SELECT statements, rather than ORM instances, for use when listing and exporting data that won't be modified.
+Display values, such as formatted dates and gender names, are calculated once when the records are built. Each
+related location and species is represented by a single record, shared by all the sightings that refer to it
+"""
+
+import sqlalchemy as db
+from collections import namedtuple
+from ..model import Session, Category, Species, Location, Sighting, Gender, to_day_number, parse_date
+
+#: Read-only location record
+LocationRecord = namedtuple("LocationRecord", "id name address city county postcode country latitude longitude")
+
+#: Read-only species record, including the name of the species category
+SpeciesRecord = namedtuple("SpeciesRecord", "id name scientific_name category_id category_name supports_gender")
+
+
+class SightingRecord(namedtuple("SightingRecord", "id location species date display_date number gender gender_name "
+                                                  "with_young with_young_name notes")):
+    """
+    Read-only sighting record. The location and species are LocationRecord and SpeciesRecord instances and the
+    date is a datetime.date
+    """
+    __slots__ = ()
+
+    @property
+    def csv_columns(self):
+        """
+        Return the values written to a CSV export file for the sighting, in the same order as Sighting.csv_columns
+        """
+        return [
+            self.species.name,
+            self.species.scientific_name,
+            self.species.category_name,
+            self.number,
+            self.gender_name,
+            self.with_young_name,
+            self.display_date,
+            self.location.name,
+            self.location.address,
+            self.location.city,
+            self.location.county,
+            self.location.postcode,
+            self.location.country,
+            self.location.latitude,
+            self.location.longitude,
+            self.notes
+        ]
+
+
+_LOCATION_COLUMNS = [Location.id, Location.name, Location.address, Location.city, Location.county, Location.postcode,
+                     Location.country, Location.latitude, Location.longitude]
+
+_SPECIES_COLUMNS = [Species.id, Species.name, Species.scientific_name, Species.categoryId, Category.name,
+                    Category.supports_gender]
+
+_GENDER_NAMES = {gender: Gender.gender_name(gender) for gender in Gender}
+
+_WITH_YOUNG_NAMES = {0: "No", 1: "Yes"}
+
+
+def _location_filter_criteria(city, county, country):
+    """
+    Return the criteria used to filter locations by city, county and country, ignoring blank values
+
+    :return: List of filter criteria
+    """
+    criteria = []
+    for column, value in [(Location.city, city), (Location.county, county), (Location.country, country)]:
+        if value and value.strip():
+            criteria.append(column == value)
+    return criteria
+
+
+def list_location_records(city=None, county=None, country=None):
+    """
+    List locations as read-only records
+
+    :param city: City to filter by or None
+    :param county: County to filter by or None
+    :param country: Country to filter by or None
+    :return: List of LocationRecord instances, ordered by name
+    """
+    query = db.select(*_LOCATION_COLUMNS)\
+        .where(*_location_filter_criteria(city, county, country))\
+        .order_by(db.asc(Location.name))
+
+    with Session.begin() as session:
+        rows = session.execute(query).all()
+
+    return [LocationRecord._make(row) for row in rows]
+
+
+def list_species_records(category_id):
+    """
+    List the species in a category as read-only records
+
+    :param category_id: ID of the category for which to list species
+    :return: List of SpeciesRecord instances, ordered by name
+    """
+    query = db.select(*_SPECIES_COLUMNS)\
+        .join(Category, Category.id == Species.categoryId)\
+        .where(Species.categoryId == category_id)\
+        .order_by(db.asc(Species.name))
+
+    with Session.begin() as session:
+        rows = session.execute(query).all()
+
+    return [SpeciesRecord(*row[:5], bool(row[5])) for row in rows]
+
+
+def list_sighting_records(from_date=None, to_date=None, location_id=None, species_id=None):
+    """
+    List sightings matching the specified criteria as read-only records
+
+    :param from_date: Minimum sighting date or None for all sightings
+    :param to_date: Maximum sighting date or None for all sightings
+    :param location_id: Location at which sightings were made or None for all sightings
+    :param species_id: Sighted species or None for all sightings
+    :return: List of SightingRecord instances, ordered by date
+    """
+    query = db.select(Sighting.id, Sighting.date, Sighting.number, Sighting.gender, Sighting.withYoung,
+                      Sighting.notes, *_LOCATION_COLUMNS, *_SPECIES_COLUMNS)\
+        .join(Location, Location.id == Sighting.locationId)\
+        .join(Species, Species.id == Sighting.speciesId)\
+        .join(Category, Category.id == Species.categoryId)
+
+    if from_date:
+        query = query.where(Sighting.__table__.c.dayNumber >= to_day_number(from_date))
+
+    if to_date:
+        query = query.where(Sighting.__table__.c.dayNumber <= to_day_number(to_date))
+
+    if location_id:
+        query = query.where(Sighting.locationId == location_id)
+
+    if species_id:
+        query = query.where(Sighting.speciesId == species_id)
+
+    with Session.begin() as session:
+        rows = session.execute(query.order_by(db.asc(Sighting.date))).all()
+
+    locations = {}
+    species = {}
+    records = []
+    location_columns = slice(6, 6 + len(_LOCATION_COLUMNS))
+    species_columns = slice(location_columns.stop, location_columns.stop + len(_SPECIES_COLUMNS))
+    for row in rows:
+        sighting_id, date_text, number, gender, with_young, notes = row[:location_columns.start]
+        location = locations.get(row[location_columns.start])
+        if location is None:
+            location = locations[row[location_columns.start]] = LocationRecord._make(row[location_columns])
+
+        a_species = species.get(row[species_columns.start])
+        if a_species is None:
+            values = row[species_columns]
+            a_species = species[values[0]] = SpeciesRecord(*values[:5], bool(values[5]))
+
+        # Dates are stored as YYYY-MM-DD HH:MM:SS text, so the date and its display form can be sliced out of
+        # the stored value, which is considerably faster than parsing and formatting it
+        records.append(SightingRecord(id=sighting_id,
+                                      location=location,
+                                      species=a_species,
+                                      date=parse_date(date_text),
+                                      display_date=f"{date_text[8:10]}/{date_text[5:7]}/{date_text[0:4]}",
+                                      number=number,
+                                      gender=gender,
+                                      gender_name=_GENDER_NAMES[gender],
+                                      with_young=with_young,
+                                      with_young_name=_WITH_YOUNG_NAMES[with_young],
+                                      notes=notes))
+
+    return records
@@ -0,0 +1,53 @@
+"""
+Bulk maintenance of reference data. Records are removed with one set-based statement per table, in a single
+transaction, rather than by checking and deleting each one in turn:
+
++-----------+------------------------------------------------------------------------------------------------+
+| **Table** | **Records deleted**                                                                            |
++-----------+------------------------------------------------------------------------------------------------+
+| Locations | Locations with no sightings, along with their spatial index entries                            |
++-----------+------------------------------------------------------------------------------------------------+
+| Species   | Species with no sightings and no conservation status ratings                                   |
++-----------+------------------------------------------------------------------------------------------------+
+| Ratings   | Conservation status ratings, within their schemes, that no species rating refers to            |
++-----------+------------------------------------------------------------------------------------------------+
+
+Species with conservation status ratings are kept, as they're typically created by a status import in advance of
+being sighted. Categories and schemes are kept, even when they're left empty.
+"""
+
+import sqlalchemy as db
+from collections import namedtuple
+from ..model import Session, Location, LocationIndex, Species, Sighting, StatusRating, SpeciesStatusRating, \
+    retry_on_busy
+
+#: Numbers of records deleted by delete_unused_reference_data()
+DeletedReferenceData = namedtuple("DeletedReferenceData", "species locations ratings")
+
+
+@retry_on_busy
+def delete_unused_reference_data():
+    """
+    Delete the locations, species and conservation status ratings that aren't used
+
+    :return: DeletedReferenceData giving the number of records of each type deleted
+    """
+    locations = Location.__table__
+    species = Species.__table__
+    ratings = StatusRating.__table__
+    sightings = Sighting.__table__
+    species_ratings = SpeciesStatusRating.__table__
+
+    unused_locations = ~db.exists().where(sightings.c.locationId == locations.c.id)
+    unused_species = db.and_(~db.exists().where(sightings.c.speciesId == species.c.id),
+                             ~db.exists().where(species_ratings.c.speciesId == species.c.id))
+    unused_ratings = ~db.exists().where(species_ratings.c.statusRatingId == ratings.c.id)
+
+    with Session.begin() as session:
+        session.execute(db.delete(LocationIndex)
+                        .where(LocationIndex.c.id.in_(db.select(locations.c.id).where(unused_locations))))
+        deleted_locations = session.execute(db.delete(locations).where(unused_locations)).rowcount
+        deleted_species = session.execute(db.delete(species).where(unused_species)).rowcount
+        deleted_ratings = session.execute(db.delete(ratings).where(unused_ratings)).rowcount
+
+    return DeletedReferenceData(species=deleted_species, locations=deleted_locations, ratings=deleted_ratings)
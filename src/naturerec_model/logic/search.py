@@ -0,0 +1,110 @@
+"""
+Full-text search business logic
+"""
+
+import sqlalchemy as db
+from ..model import Session, Sighting, Species, SightingSearch, SpeciesSearch, retry_on_busy, \
+    to_day_number
+from .loader_views import LoaderView, query_view
+
+#: Default maximum number of species returned by an autocomplete search
+DEFAULT_SPECIES_SEARCH_LIMIT = 10
+
+
+def _build_match_expression(text, prefix=False):
+    """
+    Convert free text entered by a user into an FTS5 match expression. Each word is quoted, so characters that have
+    a special meaning in the FTS5 query syntax are treated as literals, and all words must match
+
+    :param text: Text to search for
+    :param prefix: True if each word is to be treated as a prefix
+    :return: FTS5 match expression or None if the text contains no words
+    """
+    words = text.split() if text else []
+    if not words:
+        return None
+
+    suffix = "*" if prefix else ""
+    return " ".join(['"' + word.replace('"', '""') + '"' + suffix for word in words])
+
+
+def search_sightings(text, from_date=None, to_date=None, location_id=None, species_id=None, category_id=None,
+                     view=LoaderView.FULL):
+    """
+    Return the sightings whose notes contain all the words in the specified text, optionally filtered by the same
+    criteria used when listing sightings
+
+    :param text: Text to search for
+    :param from_date: Minimum sighting date or None for all sightings
+    :param to_date: Maximum sighting date or None for all sightings
+    :param location_id: Location at which sightings were made or None for all sightings
+    :param species_id: Sighted species or None for all sightings
+    :param category_id: Category of the sighted species or None for all sightings
+    :param view: LoaderView determining how much of each sighting is loaded
+    :return: A list of matching sightings, best match first
+    """
+    match_expression = _build_match_expression(text)
+    if not match_expression:
+        return []
+
+    with Session.begin() as session:
+        query = query_view(session, Sighting, view)\
+            .join(SightingSearch, SightingSearch.c.rowid == Sighting.id)\
+            .filter(db.literal_column("SightingSearch").op("MATCH")(match_expression))
+
+        if from_date:
+            query = query.filter(Sighting.__table__.c.dayNumber >= to_day_number(from_date))
+
+        if to_date:
+            query = query.filter(Sighting.__table__.c.dayNumber <= to_day_number(to_date))
+
+        if location_id:
+            query = query.filter(Sighting.locationId == location_id)
+
+        if species_id:
+            query = query.filter(Sighting.speciesId == species_id)
+
+        if category_id:
+            query = query.filter(Sighting.speciesId.in_(db.select(Species.id).where(Species.categoryId == category_id)))
+
+        sightings = query.order_by(SightingSearch.c.rank, db.desc(Sighting.date)).all()
+
+    return sightings
+
+
+def search_species(prefix, category_id=None, limit=DEFAULT_SPECIES_SEARCH_LIMIT, view=LoaderView.FULL):
+    """
+    Return the species whose common or scientific name contains words starting with each of the words in the
+    specified text, for use in autocompletion
+
+    :param prefix: Text entered so far
+    :param category_id: Category to which the species must belong or None for all categories
+    :param limit: Maximum number of species to return
+    :param view: LoaderView determining how much of each species is loaded
+    :return: A list of matching species, best match first
+    """
+    match_expression = _build_match_expression(prefix, prefix=True)
+    if not match_expression:
+        return []
+
+    with Session.begin() as session:
+        query = query_view(session, Species, view)\
+            .join(SpeciesSearch, SpeciesSearch.c.rowid == Species.id)\
+            .filter(db.literal_column("SpeciesSearch").op("MATCH")(match_expression))
+
+        if category_id:
+            query = query.filter(Species.categoryId == category_id)
+
+        species = query.order_by(SpeciesSearch.c.rank, db.asc(Species.name)).limit(limit).all()
+
+    return species
+
+
+@retry_on_busy
+def rebuild_search_indexes():
+    """
+    Rebuild the full-text indexes from the contents of the Sightings and Species tables
+    """
+    with Session.begin() as session:
+        session.execute(db.text("INSERT INTO SightingSearch (SightingSearch) VALUES ('rebuild')"))
+        session.execute(db.text("INSERT INTO SpeciesSearch (SpeciesSearch) VALUES ('rebuild')"))
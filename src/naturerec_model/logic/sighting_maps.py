@@ -0,0 +1,142 @@
+"""
+Sighting map aggregation business logic
+"""
+
+import sqlalchemy as db
+from collections import namedtuple
+from ..model import Session, Location, LocationIndex, Sighting, Species, to_day_number
+from .locations import _bbox_criteria, _normalise_longitude
+
+#: Aggregated sightings for one cell of a map grid
+SightingGridCell = namedtuple("SightingGridCell", "min_latitude min_longitude max_latitude max_longitude "
+                                                  "latitude longitude sightings individuals species locations")
+
+#: Width, in degrees of longitude, of a single map tile at zoom level 0
+TILE_WIDTH_DEGREES = 360.0
+
+#: Number of grid cells across each map tile
+GRID_CELLS_PER_TILE = 4
+
+#: Maximum number of grid cells along each side of the viewport, which caps the size of the map payload
+MAX_GRID_CELLS_PER_SIDE = 64
+
+#: Maximum supported zoom level
+MAX_ZOOM = 22
+
+
+def grid_cell_size(min_latitude, min_longitude, max_latitude, max_longitude, zoom):
+    """
+    Return the size of the grid cells used to aggregate sightings within a viewport. The size is based on the
+    zoom level but is increased, if necessary, so the viewport is never divided into more than
+    MAX_GRID_CELLS_PER_SIDE cells in either direction
+
+    :param min_latitude: Southern edge of the viewport, in decimal degrees
+    :param min_longitude: Western edge of the viewport, in decimal degrees
+    :param max_latitude: Northern edge of the viewport, in decimal degrees
+    :param max_longitude: Eastern edge of the viewport, in decimal degrees
+    :param zoom: Map zoom level
+    :return: Size of each (square) grid cell, in decimal degrees
+    """
+    if zoom < 0 or zoom > MAX_ZOOM:
+        raise ValueError("Invalid zoom level")
+
+    latitude_span = max_latitude - min_latitude
+    longitude_span = _longitude_span(min_longitude, max_longitude)
+    zoom_cell_size = TILE_WIDTH_DEGREES / (2 ** zoom) / GRID_CELLS_PER_TILE
+    return max(zoom_cell_size, latitude_span / MAX_GRID_CELLS_PER_SIDE, longitude_span / MAX_GRID_CELLS_PER_SIDE)
+
+
+def _longitude_span(min_longitude, max_longitude):
+    """
+    Return the width of a viewport in degrees of longitude, allowing for viewports that cross the antimeridian
+
+    :param min_longitude: Western edge of the viewport, in decimal degrees
+    :param max_longitude: Eastern edge of the viewport, in decimal degrees
+    :return: Width of the viewport, in decimal degrees
+    """
+    return max_longitude - min_longitude if min_longitude <= max_longitude else max_longitude - min_longitude + 360.0
+
+
+def aggregate_sightings(min_latitude, min_longitude, max_latitude, max_longitude, zoom, from_date=None, to_date=None,
+                        category_id=None, species_id=None):
+    """
+    Aggregate the sightings made at locations within a map viewport into a grid of cells. Aggregation is performed
+    in the database and the number of cells is bounded, so the result size doesn't depend on the number of sightings
+
+    :param min_latitude: Southern edge of the viewport, in decimal degrees
+    :param min_longitude: Western edge of the viewport, in decimal degrees. If greater than the maximum longitude,
+                          the viewport is taken to cross the antimeridian
+    :param max_latitude: Northern edge of the viewport, in decimal degrees
+    :param max_longitude: Eastern edge of the viewport, in decimal degrees
+    :param zoom: Map zoom level, used to determine the grid cell size
+    :param from_date: Minimum sighting date or None for all sightings
+    :param to_date: Maximum sighting date or None for all sightings
+    :param category_id: Species category or None for all categories
+    :param species_id: Sighted species or None for all species
+    :return: A list of SightingGridCell instances for the cells containing at least one sighting
+    """
+    if min_latitude > max_latitude:
+        raise ValueError("Invalid bounding box")
+
+    cell_size = grid_cell_size(min_latitude, min_longitude, max_latitude, max_longitude, zoom)
+
+    # Longitudes west of the western edge of a viewport crossing the antimeridian are shifted by 360 degrees so
+    # cell columns increase continuously from west to east
+    if min_longitude <= max_longitude:
+        longitude = Location.longitude
+    else:
+        longitude = db.case((Location.longitude < min_longitude, Location.longitude + 360.0),
+                            else_=Location.longitude)
+
+    row = db.cast((Location.latitude - min_latitude) / cell_size, db.Integer).label("row")
+    column = db.cast((longitude - min_longitude) / cell_size, db.Integer).label("column")
+
+    candidates = db.select(LocationIndex.c.id)\
+        .where(_bbox_criteria(LocationIndex, "minLatitude", "maxLatitude", "minLongitude", "maxLongitude",
+                              min_latitude, min_longitude, max_latitude, max_longitude))
+
+    with Session.begin() as session:
+        query = session.query(row,
+                              column,
+                              db.func.avg(Location.latitude),
+                              db.func.avg(longitude),
+                              db.func.count(Sighting.id),
+                              db.func.sum(db.func.ifnull(Sighting.number, 1)),
+                              db.func.count(db.distinct(Sighting.speciesId)),
+                              db.func.count(db.distinct(Sighting.locationId)))\
+            .select_from(Sighting)\
+            .join(Location, Location.id == Sighting.locationId)\
+            .filter(Location.id.in_(candidates),
+                    _bbox_criteria(Location.__table__, "latitude", "latitude", "longitude", "longitude",
+                                   min_latitude, min_longitude, max_latitude, max_longitude))
+
+        if from_date:
+            query = query.filter(Sighting.__table__.c.dayNumber >= to_day_number(from_date))
+
+        if to_date:
+            query = query.filter(Sighting.__table__.c.dayNumber <= to_day_number(to_date))
+
+        if category_id:
+            query = query.join(Species, Species.id == Sighting.speciesId).filter(Species.categoryId == category_id)
+
+        if species_id:
+            query = query.filter(Sighting.speciesId == species_id)
+
+        rows = query.group_by("row", "column").order_by("row", "column").all()
+
+    cells = []
+    for cell_row, cell_column, latitude, mean_longitude, sightings, individuals, species, locations in rows:
+        cell_min_latitude = min_latitude + cell_row * cell_size
+        cell_min_longitude = min_longitude + cell_column * cell_size
+        cells.append(SightingGridCell(min_latitude=cell_min_latitude,
+                                      min_longitude=_normalise_longitude(cell_min_longitude),
+                                      max_latitude=min(max_latitude, cell_min_latitude + cell_size),
+                                      max_longitude=_normalise_longitude(cell_min_longitude + cell_size),
+                                      latitude=latitude,
+                                      longitude=_normalise_longitude(mean_longitude),
+                                      sightings=sightings,
+                                      individuals=individuals,
+                                      species=species,
+                                      locations=locations))
+
+    return cells
@@ -0,0 +1,215 @@
+"""
+Duplicate sighting merge business logic. Sightings are duplicates if they share a date, location and species, which
+can happen when locations are consolidated in a database without the sighting uniqueness constraint. Each group of
+duplicates is merged into the row with the lowest ID and the remaining rows are deleted
+"""
+
+import itertools
+import sqlalchemy as db
+from collections import namedtuple
+from datetime import datetime as dt, UTC
+from ..model import Session, Sighting, Gender, retry_on_busy
+
+#: Result of merging one group of duplicate sightings
+SightingMergeGroup = namedtuple("SightingMergeGroup", "keeper_id other_ids date location_id species_id number "
+                                                      "with_young gender notes record_count")
+
+#: Separator used between the notes of merged sightings
+MERGED_NOTES_SEPARATOR = "\n\n"
+
+
+def _merge_number(numbers):
+    """
+    Return the merged number of individuals for a group of sightings, where a missing or zero number counts as one
+
+    :param numbers: Numbers of individuals for each sighting in the group
+    :return: Merged number of individuals
+    """
+    return sum(number if number else 1 for number in numbers)
+
+
+def _merge_gender(genders):
+    """
+    Return the merged gender for a group of sightings. Males and females seen in different sightings are merged
+    to give both
+
+    :param genders: Genders for each sighting in the group
+    :return: Merged gender
+    """
+    unique_genders = set(genders)
+    if Gender.BOTH in unique_genders or {Gender.MALE, Gender.FEMALE} <= unique_genders:
+        return Gender.BOTH
+    if Gender.MALE in unique_genders:
+        return Gender.MALE
+    if Gender.FEMALE in unique_genders:
+        return Gender.FEMALE
+    return Gender.UNKNOWN
+
+
+def _merge_notes(notes):
+    """
+    Return the merged notes for a group of sightings, concatenating the non-empty notes in order
+
+    :param notes: Notes for each sighting in the group
+    :return: Merged notes or None if none of the sightings has notes
+    """
+    non_empty_notes = [n.strip() for n in notes if n and n.strip()]
+    return MERGED_NOTES_SEPARATOR.join(non_empty_notes) if non_empty_notes else None
+
+
+def _counted_number(number):
+    """
+    SQL expression for a number of individuals, where a missing or zero number counts as one
+    """
+    return db.case((db.func.coalesce(number, 0) == 0, 1), else_=number)
+
+
+def _merge_number_expression(existing, new):
+    """
+    SQL expression that merges the numbers of individuals for an existing and a new sighting, as _merge_number
+    """
+    return _counted_number(existing) + _counted_number(new)
+
+
+def _merge_gender_expression(existing, new):
+    """
+    SQL expression that merges the genders for an existing and a new sighting, as _merge_gender
+    """
+    return db.case((existing == new, existing),
+                   (existing == int(Gender.UNKNOWN), new),
+                   (new == int(Gender.UNKNOWN), existing),
+                   else_=int(Gender.BOTH))
+
+
+def _merge_with_young_expression(existing, new):
+    """
+    SQL expression that merges the "with young" flags for an existing and a new sighting
+    """
+    return db.func.max(existing, new)
+
+
+def _merge_notes_expression(existing, new):
+    """
+    SQL expression that merges the notes for an existing and a new sighting, as _merge_notes
+    """
+    existing_notes = db.func.nullif(db.func.trim(existing), "")
+    new_notes = db.func.nullif(db.func.trim(new), "")
+    return db.func.coalesce(existing_notes + MERGED_NOTES_SEPARATOR + new_notes, existing_notes, new_notes)
+
+
+#: Rules used to merge a new sighting into an existing duplicate sighting when it's created with the MERGE conflict
+#: policy, keyed by column name
+SIGHTING_MERGE_RULES = {
+    "number": _merge_number_expression,
+    "gender": _merge_gender_expression,
+    "withYoung": _merge_with_young_expression,
+    "notes": _merge_notes_expression
+}
+
+
+def _merge_group(rows):
+    """
+    Merge the rows for one group of duplicate sightings
+
+    :param rows: List of rows for the group, ordered by ID
+    :return: SightingMergeGroup instance describing the merged sighting
+    """
+    keeper = rows[0]
+    return SightingMergeGroup(keeper_id=keeper.id,
+                              other_ids=[row.id for row in rows[1:]],
+                              date=keeper.date,
+                              location_id=keeper.locationId,
+                              species_id=keeper.speciesId,
+                              number=_merge_number([row.number for row in rows]),
+                              with_young=1 if any(row.withYoung for row in rows) else 0,
+                              gender=_merge_gender([row.gender for row in rows]),
+                              notes=_merge_notes([row.notes for row in rows]),
+                              record_count=len(rows))
+
+
+def _duplicate_rows_query(limit=None, sighting_id=None):
+    """
+    Build a query returning every row belonging to a group of duplicate sightings, ordered so that rows in the same
+    group are adjacent, groups with the most rows come first and the first row in each group is the one to keep
+
+    :param limit: Maximum number of groups to return or None for all groups
+    :param sighting_id: ID of a sighting to restrict the query to its group or None for all groups
+    :return: SQLAlchemy select statement
+    """
+    sightings = Sighting.__table__
+    record_count = db.func.count().label("record_count")
+    groups = db.select(sightings.c.date, sightings.c.locationId, sightings.c.speciesId, record_count)\
+        .group_by(sightings.c.date, sightings.c.locationId, sightings.c.speciesId)\
+        .having(db.func.count() > 1)
+
+    if sighting_id is not None:
+        target = db.select(sightings.c.date, sightings.c.locationId, sightings.c.speciesId)\
+            .where(sightings.c.id == sighting_id)\
+            .subquery()
+        groups = groups.where(sightings.c.date == target.c.date,
+                              sightings.c.locationId == target.c.locationId,
+                              sightings.c.speciesId == target.c.speciesId)
+
+    groups = groups.order_by(db.desc(record_count), sightings.c.date, sightings.c.locationId, sightings.c.speciesId)
+    if limit is not None:
+        groups = groups.limit(limit)
+
+    groups = groups.subquery()
+    return db.select(sightings.c.id,
+                     sightings.c.date,
+                     sightings.c.locationId,
+                     sightings.c.speciesId,
+                     sightings.c.number,
+                     sightings.c.withYoung,
+                     sightings.c.gender,
+                     sightings.c.notes)\
+        .join(groups, db.and_(sightings.c.date == groups.c.date,
+                              sightings.c.locationId == groups.c.locationId,
+                              sightings.c.speciesId == groups.c.speciesId))\
+        .order_by(db.desc(groups.c.record_count),
+                  sightings.c.date,
+                  sightings.c.locationId,
+                  sightings.c.speciesId,
+                  sightings.c.id)
+
+
+@retry_on_busy
+def merge_duplicate_sightings(apply_changes=False, limit=None, sighting_id=None):
+    """
+    Find groups of duplicate sightings and merge each group into a single sighting. All duplicate rows are read in
+    one query and, if changes are being applied, the updates and deletions are each made in a single batch in one
+    transaction
+
+    :param apply_changes: True to update and delete rows, False for a dry run that only reports what would change
+    :param limit: Maximum number of groups to merge or None for all groups
+    :param sighting_id: ID of a sighting to merge only its group or None for all groups
+    :return: List of SightingMergeGroup instances, one per group
+    """
+    with Session.begin() as session:
+        rows = session.execute(_duplicate_rows_query(limit, sighting_id)).all()
+        groups = [_merge_group(list(group_rows))
+                  for _, group_rows in itertools.groupby(rows, key=lambda r: (r.date, r.locationId, r.speciesId))]
+
+        if apply_changes and groups:
+            sightings = Sighting.__table__
+            date_updated = dt.now(UTC)
+            update_statement = sightings.update()\
+                .where(sightings.c.id == db.bindparam("keeper_id"))\
+                .values(number=db.bindparam("merged_number"),
+                        withYoung=db.bindparam("merged_with_young"),
+                        gender=db.bindparam("merged_gender"),
+                        notes=db.bindparam("merged_notes"),
+                        date_updated=date_updated)
+            session.execute(update_statement, [{
+                "keeper_id": group.keeper_id,
+                "merged_number": group.number,
+                "merged_with_young": group.with_young,
+                "merged_gender": int(group.gender),
+                "merged_notes": group.notes
+            } for group in groups])
+
+            delete_statement = sightings.delete().where(sightings.c.id == db.bindparam("other_id"))
+            session.execute(delete_statement, [{"other_id": other_id}
+                                               for group in groups for other_id in group.other_ids])
+
+    return groups
@@ -0,0 +1,154 @@
+"""
+Idempotent synchronisation of sightings recorded offline, for example on field devices, and uploaded in batches.
+Each sighting carries an idempotency key generated by the client, which is recorded in the same transaction as the
+sighting is written. Sightings whose keys have already been recorded are not written again, so resending a batch,
+for example because the response to the original upload was lost, has no further effect.
+
+Species and locations are identified by name, as they would be on the device. Each distinct name in a batch is
+resolved once, using a single query for all the species and another for all the locations, and the results are
+used for every sighting in the batch. The sightings are then written using create_sightings().
+
+Sightings that can't be resolved or are invalid are reported and not written, but don't prevent the rest of the
+batch being applied. Their keys aren't recorded, so they can be corrected and resent.
+"""
+
+import sqlalchemy as db
+from collections import namedtuple
+from datetime import datetime as dt, UTC
+from ..model import Session, Species, Location, Gender, SightingSyncKey, unit_of_work, retry_on_busy
+from .conflict_policies import ConflictPolicy
+from .naming import tidy_string, Casing
+from .sightings import NewSighting, WriteOutcome, create_sightings
+
+#: A sighting uploaded by a client, identified by its idempotency key, with the species and location given by name
+SyncSighting = namedtuple("SyncSighting", "key species location date number gender with_young notes",
+                          defaults=(None, Gender.UNKNOWN, 0, None))
+
+#: Outcome for one sighting in an uploaded batch
+SyncResult = namedtuple("SyncResult", "key sighting_id outcome error")
+
+#: Number of names or keys looked up per query, keeping the number of parameters well within SQLite's limit
+_LOOKUP_CHUNK_SIZE = 500
+
+
+def _find_by_value(session, key_column, value_column, values):
+    """
+    Return a dictionary mapping each of a set of values, found in one column, to the value of another column in the
+    same row
+
+    :param session: SQLAlchemy session on which to perform the queries
+    :param key_column: Column containing the values to look up
+    :param value_column: Column containing the values to return
+    :param values: Collection of values to look up
+    :return: Dictionary of values from the value column, keyed by the value in the key column
+    """
+    values = list(set(values))
+    found = {}
+    for i in range(0, len(values), _LOOKUP_CHUNK_SIZE):
+        rows = session.execute(db.select(key_column, value_column)
+                               .where(key_column.in_(values[i:i + _LOOKUP_CHUNK_SIZE])))
+        found.update({row[0]: row[1] for row in rows})
+    return found
+
+
+def _tidy_location_name(name):
+    """
+    Tidy a location name in the same way as when the location is created
+
+    :param name: Location name
+    :return: Tidied location name
+    """
+    return " ".join(name.split()).title() if name else None
+
+
+@retry_on_busy
+def sync_sightings(records, user, policy=ConflictPolicy.ERROR):
+    """
+    Apply a batch of sightings uploaded by a client, in a single transaction. Sightings whose idempotency keys
+    have already been applied are left unchanged
+
+    :param records: Iterable of SyncSighting instances
+    :param user: Current user
+    :param policy: ConflictPolicy determining what happens if a sighting duplicates an existing sighting that
+                   was recorded without the same idempotency key
+    :return: List of SyncResult instances, one per record in the order supplied
+    :raises ValueError: If the policy isn't valid
+    """
+    if not isinstance(policy, ConflictPolicy):
+        raise ValueError("Invalid conflict policy")
+
+    records = [SyncSighting(*record) for record in records]
+    results = [None] * len(records)
+
+    with unit_of_work():
+        with Session.begin() as session:
+            applied = _find_by_value(session,
+                                     SightingSyncKey.__table__.c.idempotencyKey,
+                                     SightingSyncKey.__table__.c.sightingId,
+                                     [record.key for record in records if record.key])
+            species_ids = _find_by_value(session,
+                                         Species.__table__.c.name,
+                                         Species.__table__.c.id,
+                                         [tidy_string(record.species, Casing.TITLE_CASE) for record in records])
+            location_ids = _find_by_value(session,
+                                          Location.__table__.c.name,
+                                          Location.__table__.c.id,
+                                          [_tidy_location_name(record.location) for record in records])
+
+        # Resolve the names for the sightings that haven't already been applied
+        pending = {}
+        keys_in_batch = set()
+        for i, record in enumerate(records):
+            error = None
+            if not record.key or not record.key.strip():
+                error = "Idempotency key must be specified"
+            elif record.key in applied:
+                results[i] = SyncResult(record.key, applied[record.key], WriteOutcome.ALREADY_APPLIED, None)
+                continue
+            elif record.key in keys_in_batch:
+                error = "Duplicate idempotency key in batch"
+            elif tidy_string(record.species, Casing.TITLE_CASE) not in species_ids:
+                error = "Species not found"
+            elif _tidy_location_name(record.location) not in location_ids:
+                error = "Location not found"
+
+            if record.key:
+                keys_in_batch.add(record.key)
+
+            if error:
+                results[i] = SyncResult(record.key, None, WriteOutcome.FAILED, error)
+            else:
+                pending[i] = NewSighting(location_ids[_tidy_location_name(record.location)],
+                                         species_ids[tidy_string(record.species, Casing.TITLE_CASE)],
+                                         record.date,
+                                         record.number,
+                                         record.gender,
+                                         record.with_young,
+                                         record.notes)
+
+        # create_sightings() writes nothing if any sighting in the batch is invalid, so those that aren't valid are
+        # reported and the remainder are written. Each attempt removes at least one sighting, so this terminates
+        while pending:
+            indexes = list(pending.keys())
+            written = create_sightings(pending.values(), user, policy)
+            failures = [result for result in written if result.outcome == WriteOutcome.FAILED]
+            for result in failures:
+                index = indexes[result.index]
+                results[index] = SyncResult(records[index].key, None, WriteOutcome.FAILED, result.error)
+                del pending[index]
+
+            if not failures:
+                for index, result in zip(indexes, written):
+                    results[index] = SyncResult(records[index].key, result.sighting_id, result.outcome, None)
+                break
+
+        # Record the keys for the sightings that have been written, in the same transaction as the sightings
+        now = dt.now(UTC)
+        keys = [dict(idempotencyKey=records[i].key, sightingId=results[i].sighting_id, created_by=user.id,
+                     date_created=now)
+                for i in pending]
+        if keys:
+            with Session.begin() as session:
+                session.execute(SightingSyncKey.__table__.insert(), keys)
+
+    return results
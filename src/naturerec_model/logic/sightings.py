@@ -1,11 +1,92 @@
 """
-Sightings business logic
+Sightings business logic. As well as functions that write one sighting at a time, there are bulk operations that
+write many sightings in a single transaction:
+
++--------------------+-----------------------------------------------------------------------------------------+
+| **Function**       | **Purpose**                                                                             |
++--------------------+-----------------------------------------------------------------------------------------+
+| create_sightings   | Create a batch of sightings, resolving duplicates using a conflict policy               |
++--------------------+-----------------------------------------------------------------------------------------+
+| create_checklist   | Create the sightings for many species seen at one location on one date                  |
++--------------------+-----------------------------------------------------------------------------------------+
+| update_sightings   | Update a batch of sightings                                                             |
++--------------------+-----------------------------------------------------------------------------------------+
+| reassign_sightings | Move the sightings matching a filter to another location and/or species                 |
++--------------------+-----------------------------------------------------------------------------------------+
+| delete_sightings   | Delete the sightings matching a filter                                                  |
++--------------------+-----------------------------------------------------------------------------------------+
+
+Batches are validated as a whole before anything's written, using one query per check rather than one per record,
+and are then written using a single statement executed for all the records. If any record in a batch is invalid,
+none are written. Each returns a SightingWriteResult per record giving its outcome. Reassignments and deletions are
+made with a single UPDATE or DELETE statement.
 """
 
 import sqlalchemy as db
+from collections import namedtuple
 from datetime import datetime as dt, UTC
+from enum import Enum
 from sqlalchemy.exc import IntegrityError
-from ..model import Session, Sighting, Species
+from ..model import Session, Sighting, Species, Location, Gender, retry_on_busy, to_day_number
+from .loader_views import LoaderView, query_view
+from .conflict_policies import ConflictPolicy, write_record, write_records
+from .sighting_merge import SIGHTING_MERGE_RULES
+
+#: Criteria selecting the sightings affected by a bulk operation. Each criterion that isn't None restricts the
+#: sightings selected
+SightingFilter = namedtuple("SightingFilter", "from_date to_date location_id species_id sighting_ids",
+                            defaults=(None, None, None, None, None))
+
+#: Properties of a sighting to be created by create_sightings()
+NewSighting = namedtuple("NewSighting", "location_id species_id date number gender with_young notes",
+                         defaults=(None, Gender.UNKNOWN, 0, None))
+
+#: New properties of a sighting to be updated by update_sightings()
+SightingChange = namedtuple("SightingChange", "sighting_id location_id species_id date number gender with_young notes",
+                            defaults=(None, Gender.UNKNOWN, 0, None))
+
+#: A species recorded on a checklist, for create_checklist()
+ChecklistEntry = namedtuple("ChecklistEntry", "species_id number gender with_young notes",
+                            defaults=(None, Gender.UNKNOWN, 0, None))
+
+#: Outcome for one record in a batch, identified by its position in the batch
+SightingWriteResult = namedtuple("SightingWriteResult", "index sighting_id outcome error")
+
+#: Columns in the unique constraint that identifies duplicate sightings
+_SIGHTING_KEY = ["locationId", "speciesId", "date"]
+
+#: Number of sighting keys looked up per query, keeping the number of parameters well within SQLite's limit
+_KEY_CHUNK_SIZE = 500
+
+
+class WriteOutcome(Enum):
+    """
+    Enumeration of the outcomes for a record written by a bulk operation
+    """
+    #: A new sighting was created
+    CREATED = "created"
+    #: An existing sighting was updated
+    UPDATED = "updated"
+    #: The record duplicated an existing sighting, which was left unchanged
+    SKIPPED = "skipped"
+    #: The record was merged into an existing sighting
+    MERGED = "merged"
+    #: The record replaced the values of an existing sighting
+    REPLACED = "replaced"
+    #: The record was invalid, so nothing in the batch was written
+    FAILED = "failed"
+    #: The record was valid but another in the batch wasn't, so nothing in the batch was written
+    NOT_WRITTEN = "not written"
+    #: The record had already been applied by an earlier upload, identified by its idempotency key
+    ALREADY_APPLIED = "already applied"
+
+
+#: Outcomes for records that duplicate an existing sighting, by conflict policy
+_DUPLICATE_OUTCOMES = {
+    ConflictPolicy.SKIP: WriteOutcome.SKIPPED,
+    ConflictPolicy.MERGE: WriteOutcome.MERGED,
+    ConflictPolicy.REPLACE: WriteOutcome.REPLACED
+}
 
 
 def _check_for_existing_records(session, location_id, species_id, date):
@@ -28,7 +109,9 @@ def _check_for_existing_records(session, location_id, species_id, date):
     return [sighting.id for sighting in sightings]
 
 
-def create_sighting(location_id, species_id, date, number, gender, with_young, notes, user):
+@retry_on_busy
+def create_sighting(location_id, species_id, date, number, gender, with_young, notes, user,
+                    policy=ConflictPolicy.ERROR):
     """
     Create a new sighting
 
@@ -40,33 +123,37 @@ def create_sighting(location_id, species_id, date, number, gender, with_young, n
     :param with_young: Whether or not young were seen
     :param notes: Sighting notes
     :param user: Current user
-    :return: An instance of the Sighting class for the created record
+    :param policy: ConflictPolicy determining what happens if there's already a sighting of the species at the
+                   location on the date
+    :return: An instance of the Sighting class for the created, merged or existing record
+    :raises ValueError: If the sighting is a duplicate and the policy is ERROR or has invalid properties
     """
     try:
         with Session.begin() as session:
-            # There is a check constraint to prevent duplicates in the Python model but the pre-existing database
-            # does not have that constraint so explicitly check for duplicates before adding a new record
-            if len(_check_for_existing_records(session, location_id, species_id, date)):
-                raise ValueError("Duplicate sighting found")
-
-            sighting = Sighting(locationId=location_id,
-                                speciesId=species_id,
-                                sighting_date=date,
-                                number=number,
-                                gender=gender,
-                                withYoung=with_young,
-                                notes=notes,
-                                created_by=user.id,
-                                updated_by=user.id,
-                                date_created=dt.now(UTC),
-                                date_updated=dt.now(UTC))
-            session.add(sighting)
+            sighting = write_record(session,
+                                    Sighting,
+                                    dict(locationId=location_id,
+                                         speciesId=species_id,
+                                         date=date.strftime(Sighting.DATE_FORMAT) if date else None,
+                                         number=number,
+                                         gender=gender,
+                                         withYoung=with_young,
+                                         notes=notes,
+                                         created_by=user.id,
+                                         updated_by=user.id,
+                                         date_created=dt.now(UTC),
+                                         date_updated=dt.now(UTC)),
+                                    ["locationId", "speciesId", "date"],
+                                    policy,
+                                    merge_rules=SIGHTING_MERGE_RULES,
+                                    duplicate_message="Duplicate sighting found")
     except IntegrityError as e:
         raise ValueError("Invalid sighting properties") from e
 
     return sighting
 
 
+@retry_on_busy
 def update_sighting(sighting_id, location_id, species_id, date, number, gender, with_young, notes, user):
     """
     Update an existing sighting
@@ -117,15 +204,16 @@ def update_sighting(sighting_id, location_id, species_id, date, number, gender,
     return sighting
 
 
-def get_sighting(sighting_id):
+def get_sighting(sighting_id, view=LoaderView.FULL):
     """
     Return the sighting with the specified ID
 
     :param sighting_id: ID for the sighting to return
+    :param view: LoaderView determining how much of the sighting is loaded
     :returns: Instance of Sighting for the record with the specified ID
     """
     with Session.begin() as session:
-        sighting = session.query(Sighting).get(sighting_id)
+        sighting = query_view(session, Sighting, view).get(sighting_id)
 
         if sighting is None:
             raise ValueError("Sighting not found")
@@ -133,7 +221,7 @@ def get_sighting(sighting_id):
     return sighting
 
 
-def list_sightings(from_date=None, to_date=None, location_id=None, species_id=None):
+def list_sightings(from_date=None, to_date=None, location_id=None, species_id=None, view=LoaderView.FULL):
     """
     Return a list of sightings matching the specified criteria
 
@@ -141,18 +229,17 @@ def list_sightings(from_date=None, to_date=None, location_id=None, species_id=No
     :param to_date: Maximum sighting date or None for all sightings
     :param location_id: Location at which sightings were made or None for all sightings
     :param species_id: Sighted species or None for all sightings
+    :param view: LoaderView determining how much of each sighting is loaded
     :return: A list of sightings matching the specified criteria
     """
     with Session.begin() as session:
-        query = session.query(Sighting)
+        query = query_view(session, Sighting, view)
 
         if from_date:
-            from_date_string = from_date.strftime(Sighting.DATE_FORMAT)
-            query = query.filter(Sighting.date >= from_date_string)
+            query = query.filter(Sighting.__table__.c.dayNumber >= to_day_number(from_date))
 
         if to_date:
-            to_date_string = to_date.strftime(Sighting.DATE_FORMAT)
-            query = query.filter(Sighting.date <= to_date_string)
+            query = query.filter(Sighting.__table__.c.dayNumber <= to_day_number(to_date))
 
         if location_id:
             query = query.filter(Sighting.locationId == location_id)
@@ -165,6 +252,7 @@ def list_sightings(from_date=None, to_date=None, location_id=None, species_id=No
     return sightings
 
 
+@retry_on_busy
 def delete_sighting(sighting_id):
     """
     Delete a sighting
@@ -177,3 +265,358 @@ def delete_sighting(sighting_id):
         if not sighting:
             raise ValueError("Sighting not found")
         session.delete(sighting)
+
+
+def _filter_criteria(sighting_filter):
+    """
+    Build the criteria selecting the sightings that match a filter
+
+    :param sighting_filter: SightingFilter instance
+    :return: List of SQLAlchemy criteria
+    :raises ValueError: If the filter has no criteria, as bulk operations shouldn't affect every sighting by accident
+    """
+    table = Sighting.__table__
+    criteria = []
+    if sighting_filter.from_date:
+        criteria.append(table.c.dayNumber >= to_day_number(sighting_filter.from_date))
+
+    if sighting_filter.to_date:
+        criteria.append(table.c.dayNumber <= to_day_number(sighting_filter.to_date))
+
+    if sighting_filter.location_id:
+        criteria.append(table.c.locationId == sighting_filter.location_id)
+
+    if sighting_filter.species_id:
+        criteria.append(table.c.speciesId == sighting_filter.species_id)
+
+    if sighting_filter.sighting_ids is not None:
+        criteria.append(table.c.id.in_(sighting_filter.sighting_ids))
+
+    if not criteria:
+        raise ValueError("No sighting filter criteria specified")
+
+    return criteria
+
+
+def _find_ids(session, column, ids):
+    """
+    Return those of a set of IDs that exist
+
+    :param session: SQLAlchemy session on which to perform the query
+    :param column: ID column to query
+    :param ids: Collection of IDs
+    :return: Set of the IDs that exist
+    """
+    unique_ids = list({i for i in ids if i is not None})
+    return set(session.execute(db.select(column).where(column.in_(unique_ids))).scalars()) if unique_ids else set()
+
+
+def _find_sightings_by_key(session, keys):
+    """
+    Return the IDs of the sightings with a collection of keys
+
+    :param session: SQLAlchemy session on which to perform the query
+    :param keys: Collection of (location ID, species ID, date string) tuples
+    :return: Dictionary of sighting IDs keyed by key
+    """
+    table = Sighting.__table__
+    key_columns = db.tuple_(*[table.c[name] for name in _SIGHTING_KEY])
+    unique_keys = list(set(keys))
+    found = {}
+    for i in range(0, len(unique_keys), _KEY_CHUNK_SIZE):
+        rows = session.execute(db.select(table.c.id, *[table.c[name] for name in _SIGHTING_KEY])
+                               .where(key_columns.in_(unique_keys[i:i + _KEY_CHUNK_SIZE])))
+        found.update({(row.locationId, row.speciesId, row.date): row.id for row in rows})
+    return found
+
+
+def _validate_sighting_values(session, records):
+    """
+    Validate the properties of a batch of sightings, using one query per check rather than one per record
+
+    :param session: SQLAlchemy session on which to perform the queries
+    :param records: List of NewSighting or SightingChange instances
+    :return: List of error messages, one per record, None for those that are valid
+    """
+    location_ids = _find_ids(session, Location.__table__.c.id, [r.location_id for r in records])
+    species_ids = _find_ids(session, Species.__table__.c.id, [r.species_id for r in records])
+
+    errors = []
+    for record in records:
+        if record.location_id is None or record.species_id is None or record.date is None:
+            errors.append("Location, species and date must be specified")
+        elif record.location_id not in location_ids:
+            errors.append("Location not found")
+        elif record.species_id not in species_ids:
+            errors.append("Species not found")
+        elif record.gender not in list(Gender):
+            errors.append("Invalid gender")
+        elif record.with_young not in [0, 1]:
+            errors.append("Invalid with young flag")
+        elif record.number is not None and record.number < 1:
+            errors.append("Number of individuals must be positive")
+        else:
+            errors.append(None)
+
+    return errors
+
+
+def _failed_results(errors):
+    """
+    Return the results for a batch that wasn't written because some of its records are invalid
+
+    :param errors: List of error messages, one per record, None for those that are valid
+    :return: List of SightingWriteResult instances
+    """
+    return [SightingWriteResult(index=i,
+                                sighting_id=None,
+                                outcome=WriteOutcome.FAILED if error else WriteOutcome.NOT_WRITTEN,
+                                error=error)
+            for i, error in enumerate(errors)]
+
+
+def _sighting_key(record):
+    """
+    Return the key identifying duplicates of a sighting, as stored in the database
+
+    :param record: NewSighting or SightingChange instance
+    :return: Tuple of the location ID, species ID and date string
+    """
+    return record.location_id, record.species_id, record.date.strftime(Sighting.DATE_FORMAT)
+
+
+@retry_on_busy
+def create_sightings(records, user, policy=ConflictPolicy.ERROR):
+    """
+    Create a batch of sightings in a single transaction. Records that duplicate existing sightings, or earlier
+    records in the batch, are handled according to the conflict policy
+
+    :param records: Iterable of NewSighting instances
+    :param user: Current user
+    :param policy: ConflictPolicy determining what happens if a record duplicates an existing sighting
+    :return: List of SightingWriteResult instances, one per record in the order supplied
+    :raises ValueError: If the policy isn't valid
+    """
+    if not isinstance(policy, ConflictPolicy):
+        raise ValueError("Invalid conflict policy")
+
+    records = [NewSighting(*record) for record in records]
+    try:
+        with Session.begin() as session:
+            errors = _validate_sighting_values(session, records)
+            keys = [_sighting_key(record) if not error else None for record, error in zip(records, errors)]
+            existing = _find_sightings_by_key(session, [key for key in keys if key])
+
+            # Work out each record's outcome, treating repeats of a key in the batch in the same way as existing
+            # sightings with that key
+            outcomes = []
+            seen = set(existing)
+            for i, key in enumerate(keys):
+                if key is None:
+                    outcomes.append(None)
+                elif key not in seen:
+                    outcomes.append(WriteOutcome.CREATED)
+                elif policy == ConflictPolicy.ERROR:
+                    errors[i] = "Duplicate sighting found"
+                    outcomes.append(None)
+                else:
+                    outcomes.append(_DUPLICATE_OUTCOMES[policy])
+                seen.add(key)
+
+            if any(errors):
+                return _failed_results(errors)
+
+            now = dt.now(UTC)
+            write_records(session,
+                          Sighting,
+                          [dict(locationId=record.location_id,
+                                speciesId=record.species_id,
+                                date=key[2],
+                                number=record.number,
+                                gender=record.gender,
+                                withYoung=record.with_young,
+                                notes=record.notes,
+                                created_by=user.id,
+                                updated_by=user.id,
+                                date_created=now,
+                                date_updated=now) for record, key in zip(records, keys)],
+                          _SIGHTING_KEY,
+                          policy,
+                          merge_rules=SIGHTING_MERGE_RULES,
+                          duplicate_message="Duplicate sighting found")
+
+            ids = _find_sightings_by_key(session, keys)
+    except IntegrityError as e:
+        raise ValueError("Invalid sighting properties") from e
+
+    return [SightingWriteResult(index=i, sighting_id=ids[key], outcome=outcome, error=None)
+            for i, (key, outcome) in enumerate(zip(keys, outcomes))]
+
+
+def create_checklist(location_id, date, entries, user, policy=ConflictPolicy.ERROR):
+    """
+    Create the sightings for a checklist, recording many species seen at one location on one date, in a single
+    transaction
+
+    :param location_id: ID for the location where the species were seen
+    :param date: Date the species were seen
+    :param entries: Iterable of ChecklistEntry instances
+    :param user: Current user
+    :param policy: ConflictPolicy determining what happens if an entry duplicates an existing sighting
+    :return: List of SightingWriteResult instances, one per entry in the order supplied
+    :raises ValueError: If the policy isn't valid
+    """
+    records = [NewSighting(location_id, entry.species_id, date, entry.number, entry.gender, entry.with_young,
+                           entry.notes)
+               for entry in [ChecklistEntry(*entry) for entry in entries]]
+    return create_sightings(records, user, policy)
+
+
+@retry_on_busy
+def update_sightings(changes, user):
+    """
+    Update a batch of sightings in a single transaction
+
+    :param changes: Iterable of SightingChange instances
+    :param user: Current user
+    :return: List of SightingWriteResult instances, one per change in the order supplied
+    """
+    changes = [SightingChange(*change) for change in changes]
+    try:
+        with Session.begin() as session:
+            errors = _validate_sighting_values(session, changes)
+            sighting_ids = _find_ids(session, Sighting.__table__.c.id, [change.sighting_id for change in changes])
+            keys = [_sighting_key(change) if not error else None for change, error in zip(changes, errors)]
+            existing = _find_sightings_by_key(session, [key for key in keys if key])
+
+            # Once the batch has been applied, a changed sighting mustn't have the same key as another changed
+            # sighting or one that's not being changed. It can take the current key of another changed sighting,
+            # for example when two sightings' dates are swapped
+            changed_ids = {change.sighting_id for change in changes}
+            seen_ids = set()
+            seen_keys = set()
+            for i, (change, key) in enumerate(zip(changes, keys)):
+                if errors[i]:
+                    continue
+                elif change.sighting_id not in sighting_ids:
+                    errors[i] = "Sighting not found"
+                elif change.sighting_id in seen_ids:
+                    errors[i] = "Sighting changed more than once"
+                elif key in seen_keys or existing.get(key, change.sighting_id) not in changed_ids:
+                    errors[i] = "Duplicate sighting found"
+                seen_ids.add(change.sighting_id)
+                seen_keys.add(key)
+
+            if any(errors):
+                return _failed_results(errors)
+
+            if changes:
+                # The unique key is checked as each row's updated, so the sightings whose current keys are taken by
+                # other changes are first moved to a placeholder date that's unique to each sighting
+                table = Sighting.__table__
+                vacated_ids = [existing[key] for change, key in zip(changes, keys)
+                               if existing.get(key, change.sighting_id) != change.sighting_id]
+                if vacated_ids:
+                    session.execute(table.update()
+                                    .where(table.c.id.in_(vacated_ids))
+                                    .values(date=db.literal("#") + db.cast(table.c.id, db.String)))
+
+                statement = table.update()\
+                    .where(table.c.id == db.bindparam("sighting_id"))\
+                    .values(locationId=db.bindparam("new_location_id"),
+                            speciesId=db.bindparam("new_species_id"),
+                            date=db.bindparam("new_date"),
+                            number=db.bindparam("new_number"),
+                            gender=db.bindparam("new_gender"),
+                            withYoung=db.bindparam("new_with_young"),
+                            notes=db.bindparam("new_notes"),
+                            updated_by=user.id,
+                            date_updated=dt.now(UTC))
+                session.execute(statement, [{
+                    "sighting_id": change.sighting_id,
+                    "new_location_id": change.location_id,
+                    "new_species_id": change.species_id,
+                    "new_date": key[2],
+                    "new_number": change.number,
+                    "new_gender": change.gender,
+                    "new_with_young": change.with_young,
+                    "new_notes": change.notes
+                } for change, key in zip(changes, keys)])
+    except IntegrityError as e:
+        raise ValueError("Invalid sighting properties") from e
+
+    return [SightingWriteResult(index=i, sighting_id=change.sighting_id, outcome=WriteOutcome.UPDATED, error=None)
+            for i, change in enumerate(changes)]
+
+
+@retry_on_busy
+def reassign_sightings(sighting_filter, user, location_id=None, species_id=None):
+    """
+    Move the sightings matching a filter to another location and/or species, using a single UPDATE statement
+
+    :param sighting_filter: SightingFilter selecting the sightings to reassign
+    :param user: Current user
+    :param location_id: ID of the location to move the sightings to or None to leave their locations unchanged
+    :param species_id: ID of the species to assign to the sightings or None to leave their species unchanged
+    :return: Number of sightings reassigned
+    :raises ValueError: If neither a location nor a species is specified, either doesn't exist, the filter has no
+                        criteria or the reassignment would result in duplicate sightings
+    """
+    if location_id is None and species_id is None:
+        raise ValueError("No location or species to reassign the sightings to")
+
+    table = Sighting.__table__
+    criteria = _filter_criteria(sighting_filter)
+    with Session.begin() as session:
+        if location_id is not None and not _find_ids(session, Location.__table__.c.id, [location_id]):
+            raise ValueError("Location not found")
+
+        if species_id is not None and not _find_ids(session, Species.__table__.c.id, [species_id]):
+            raise ValueError("Species not found")
+
+        # Check the sightings won't duplicate each other or existing sightings once they've been moved. Any
+        # existing sighting they could duplicate must already be at the new location and of the new species
+        new_location_id = db.literal(location_id) if location_id is not None else table.c.locationId
+        new_species_id = db.literal(species_id) if species_id is not None else table.c.speciesId
+        moved = db.select(new_location_id.label("locationId"), new_species_id.label("speciesId"), table.c.date)\
+            .where(*criteria)
+        unmoved = db.select(table.c.locationId, table.c.speciesId, table.c.date).where(db.not_(db.and_(*criteria)))
+        if location_id is not None:
+            unmoved = unmoved.where(table.c.locationId == location_id)
+        if species_id is not None:
+            unmoved = unmoved.where(table.c.speciesId == species_id)
+
+        combined = db.union_all(moved, unmoved).subquery()
+        duplicates = db.select(combined.c.date)\
+            .group_by(combined.c.locationId, combined.c.speciesId, combined.c.date)\
+            .having(db.func.count() > 1)\
+            .subquery()
+        duplicate_count = session.execute(db.select(db.func.count()).select_from(duplicates)).scalar()
+        if duplicate_count:
+            raise ValueError(f"Reassigning the sightings would result in {duplicate_count} duplicate sightings")
+
+        values = dict(updated_by=user.id, date_updated=dt.now(UTC))
+        if location_id is not None:
+            values["locationId"] = location_id
+        if species_id is not None:
+            values["speciesId"] = species_id
+
+        result = session.execute(table.update().where(*criteria).values(**values))
+
+    return result.rowcount
+
+
+@retry_on_busy
+def delete_sightings(sighting_filter):
+    """
+    Delete the sightings matching a filter, using a single DELETE statement
+
+    :param sighting_filter: SightingFilter selecting the sightings to delete
+    :return: Number of sightings deleted
+    :raises ValueError: If the filter has no criteria
+    """
+    criteria = _filter_criteria(sighting_filter)
+    with Session.begin() as session:
+        result = session.execute(Sighting.__table__.delete().where(*criteria))
+
+    return result.rowcount
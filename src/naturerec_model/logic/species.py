@@ -6,8 +6,10 @@ from functools import singledispatch
 import sqlalchemy as db
 from datetime import datetime as dt, UTC
 from sqlalchemy.exc import IntegrityError, NoResultFound
-from ..model import Session, Species, Sighting, SpeciesStatusRating
+from ..model import Session, Species, Sighting, SpeciesStatusRating, retry_on_busy
 from .naming import tidy_string, Casing
+from .loader_views import LoaderView, query_view
+from .conflict_policies import ConflictPolicy, write_record
 
 
 def _check_for_existing_records(session, category_id, name):
@@ -26,7 +28,8 @@ def _check_for_existing_records(session, category_id, name):
     return [s.id for s in species]
 
 
-def create_species(category_id, name, scientific_name, user):
+@retry_on_busy
+def create_species(category_id, name, scientific_name, user, policy=ConflictPolicy.ERROR):
     """
     Create a new species for a specified category
 
@@ -34,27 +37,37 @@ def create_species(category_id, name, scientific_name, user):
     :param name: Species name
     :param name: Species scientific name
     :param user: Current user
-    :returns: An instance of the Species class for the created record
-    :raises ValueError: If the species is a duplicate or has an invalid name
+    :param policy: ConflictPolicy determining what happens if there's already a species with the same name in the
+                   same category
+    :returns: An instance of the Species class for the created, merged or existing record
+    :raises ValueError: If the species is a duplicate and the policy is ERROR, has an invalid name or already
+                        exists in a different category
     """
 
     try:
         with Session.begin() as session:
-            # There is a check constraint to prevent duplicates in the Python model but the pre-existing database
-            # does not have that constraint so explicitly check for duplicates before adding a new record
+            # Species names are unique across all categories, so a species with the same name in another category
+            # isn't a duplicate the conflict policy can resolve
             tidied_name = tidy_string(name, Casing.TITLE_CASE)
-            tidied_scientific_name = tidy_string(scientific_name, Casing.CAPITALISED)
-            if len(_check_for_existing_records(session, category_id, tidied_name)):
-                raise ValueError("Duplicate category found")
-
-            species = Species(categoryId=category_id,
-                              name=tidied_name,
-                              scientific_name=tidied_scientific_name,
-                              created_by=user.id,
-                              updated_by=user.id,
-                              date_created=dt.now(UTC),
-                              date_updated=dt.now(UTC))
-            session.add(species)
+            other_category_ids = session.query(Species.categoryId)\
+                .filter(Species.name == tidied_name,
+                        Species.categoryId != category_id)\
+                .all()
+            if len(other_category_ids):
+                raise ValueError(f"Species {tidied_name} belongs to a different category")
+
+            species = write_record(session,
+                                   Species,
+                                   dict(categoryId=category_id,
+                                        name=tidied_name,
+                                        scientific_name=tidy_string(scientific_name, Casing.CAPITALISED),
+                                        created_by=user.id,
+                                        updated_by=user.id,
+                                        date_created=dt.now(UTC),
+                                        date_updated=dt.now(UTC)),
+                                   ["name"],
+                                   policy,
+                                   duplicate_message="Duplicate species found")
     except IntegrityError as e:
         raise ValueError("Missing category or invalid or duplicate species name") \
             from e
@@ -62,6 +75,7 @@ def create_species(category_id, name, scientific_name, user):
     return species
 
 
+@retry_on_busy
 def update_species(species_id, category_id, name, scientific_name, user):
     """
     Update an existing species
@@ -107,11 +121,12 @@ def update_species(species_id, category_id, name, scientific_name, user):
 
 
 @singledispatch
-def get_species(_):
+def get_species(_, view=LoaderView.FULL):
     """
     Return the Species instance for the species with the specified identifier
 
     :param _: Species name or ID
+    :param view: LoaderView determining how much of the species is loaded
     :return: Instance of the species
     :raises ValueError: If the species doesn't exist
     """
@@ -119,10 +134,12 @@ def get_species(_):
 
 
 @get_species.register(str)
-def _(name):
+def _(name, view=LoaderView.FULL):
     try:
         with Session.begin() as session:
-            species = session.query(Species).filter(Species.name == name).one()
+            species = query_view(session, Species, view)\
+                .filter(Species.name == name)\
+                .one()
     except NoResultFound as e:
         raise ValueError("Category not found") from e
 
@@ -130,9 +147,9 @@ def _(name):
 
 
 @get_species.register(int)
-def _(species_id):
+def _(species_id, view=LoaderView.FULL):
     with Session.begin() as session:
-        species = session.query(Species).get(species_id)
+        species = query_view(session, Species, view).get(species_id)
 
     if species is None:
         raise ValueError("Category not found")
@@ -140,20 +157,23 @@ def _(species_id):
     return species
 
 
-def list_species(category_id):
+def list_species(category_id, view=LoaderView.FULL):
     """
     List all the species for the specified category
 
+    :param category_id: ID of the category for which to list species
+    :param view: LoaderView determining how much of each species is loaded
     :return: A list of Species instances
     """
     with Session.begin() as session:
-        species = session.query(Species)\
+        species = query_view(session, Species, view)\
             .filter(Species.categoryId == category_id)\
             .order_by(db.asc(Species.name))\
             .all()
     return species
 
 
+@retry_on_busy
 def delete_species(species_id):
     """
     Delete a species
@@ -163,26 +183,13 @@ def delete_species(species_id):
     :raises ValueError: If the species has sightings
     """
     with Session.begin() as session:
-        # Get the species instance
-        species = session.query(Species).get(species_id)
-        if not species:
-            raise ValueError("Species not found")
-
         # Check there are no sightings against it
-        sightings = session.query(Sighting)\
-            .filter(Sighting.speciesId == species_id)\
-            .limit(1)\
-            .all()
-
-        if len(sightings) > 0:
+        if session.query(db.exists().where(Sighting.speciesId == species_id)).scalar():
             raise ValueError("Cannot delete a species that has sightings recorded against it")
 
-        # Delete any conservation status rating records
-        statuses = session.query(SpeciesStatusRating)\
-            .filter(SpeciesStatusRating.speciesId == species_id)\
-            .all()
-        for status in statuses:
-            session.delete(status)
-
-        # Delete the species
-        session.delete(species)
+        # Delete any conservation status rating records and the species. A species that doesn't exist has no
+        # sightings or ratings, so it's only detected when deleting the species, and the transaction's then
+        # rolled back
+        session.execute(db.delete(SpeciesStatusRating).where(SpeciesStatusRating.speciesId == species_id))
+        if session.execute(db.delete(Species).where(Species.id == species_id)).rowcount == 0:
+            raise ValueError("Species not found")
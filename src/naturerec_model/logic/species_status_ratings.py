@@ -1,13 +1,16 @@
 """
-Species conservation status rating business logic
+Species conservation status rating business logic. The rating currently in effect for each species, scheme and
+region is cached in the SpeciesCurrentStatuses table, which is maintained by triggers, so current statuses can be
+looked up without searching the rating history
 """
 
 import sqlalchemy as db
 import datetime
 from sqlalchemy.exc import IntegrityError
-from ..model import Session, StatusRating, SpeciesStatusRating
+from ..model import Session, StatusRating, SpeciesStatusRating, SpeciesCurrentStatus, retry_on_busy, to_day_number
 
 
+@retry_on_busy
 def create_species_status_rating(species_id, status_rating_id, region, start, user, end=None):
     """
     Create a species conservation status rating
@@ -32,14 +35,14 @@ def create_species_status_rating(species_id, status_rating_id, region, start, us
 
             # Find the overlapping ratings for this species and scheme
             today = datetime.datetime.today().date()
-            today_string = today.strftime(SpeciesStatusRating.DISPLAY_DATE_FORMAT)
             overlapping = session.query(SpeciesStatusRating)\
+                .join(StatusRating, StatusRating.id == SpeciesStatusRating.statusRatingId)\
                 .filter(SpeciesStatusRating.speciesId == species_id,
-                        SpeciesStatusRating.rating.has(StatusRating.statusSchemeId == status_rating.statusSchemeId),
+                        StatusRating.statusSchemeId == status_rating.statusSchemeId,
                         SpeciesStatusRating.region == region,
                         db.or_(
-                            SpeciesStatusRating.end == None,
-                            SpeciesStatusRating.end >= today_string
+                            SpeciesStatusRating.end.is_(None),
+                            SpeciesStatusRating.__table__.c.endDay >= to_day_number(today)
                         ))\
                 .all()
 
@@ -64,6 +67,7 @@ def create_species_status_rating(species_id, status_rating_id, region, start, us
     return species_rating
 
 
+@retry_on_busy
 def close_species_status_rating(species_status_rating_id, user):
     """
     Set the end date for a species conservation rating to today
@@ -104,15 +108,16 @@ def list_species_status_ratings(scheme_id=None, species_id=None, region=None, cu
     :param scheme_id: ID for the status scheme or None for all schemes
     :param species_id: ID for the species or None for all species
     :param region: Region name or None for all regions
-    :param current_only: If true, only current ratings are returned
+    :param current_only: If true, only open-ended ratings are returned. Unlike get_current_statuses(), this
+                         includes every open-ended rating for a species, scheme and region, if there's more than one
     :return: A list of SpeciesStatusRating instances for records matching the
     """
     with Session.begin() as session:
-        query = session.query(SpeciesStatusRating)\
-            .join(SpeciesStatusRating.rating, aliased=True)
+        query = session.query(SpeciesStatusRating)
 
         if scheme_id:
-            query = query.filter(SpeciesStatusRating.rating.has(StatusRating.statusSchemeId == scheme_id))
+            query = query.join(StatusRating, StatusRating.id == SpeciesStatusRating.statusRatingId)\
+                .filter(StatusRating.statusSchemeId == scheme_id)
 
         if species_id:
             query = query.filter(SpeciesStatusRating.speciesId == species_id)
@@ -121,13 +126,39 @@ def list_species_status_ratings(scheme_id=None, species_id=None, region=None, cu
             query = query.filter(SpeciesStatusRating.region == region)
 
         if current_only:
-            query = query.filter(SpeciesStatusRating.end == None)
+            query = query.filter(SpeciesStatusRating.end.is_(None))
 
         ratings = query.all()
 
     return ratings
 
 
+def get_current_statuses(species_ids=None):
+    """
+    Return the conservation statuses in effect today for a set of species, using a single query against the
+    current status cache, for example to show them alongside a list of sightings
+
+    :param species_ids: Collection of species IDs or None for all species
+    :return: Dictionary of lists of SpeciesCurrentStatus instances, keyed by species ID
+    """
+    today = to_day_number(datetime.date.today())
+    with Session.begin() as session:
+        query = session.query(SpeciesCurrentStatus)\
+            .filter(SpeciesCurrentStatus.startDay <= today,
+                    db.or_(SpeciesCurrentStatus.endDay.is_(None), SpeciesCurrentStatus.endDay >= today))
+
+        if species_ids is not None:
+            query = query.filter(SpeciesCurrentStatus.speciesId.in_(set(species_ids)))
+
+        current_statuses = query.all()
+
+    statuses = {}
+    for status in current_statuses:
+        statuses.setdefault(status.speciesId, []).append(status)
+    return statuses
+
+
+@retry_on_busy
 def delete_species_status_rating(species_status_rating_id):
     """
     Delete a sighting
@@ -0,0 +1,267 @@
+"""
+Bulk import of species conservation status ratings. Creating ratings one at a time looks up the species, scheme and
+rating and searches for overlapping ratings for every row, each in its own transaction, which is slow for national
+lists with tens of thousands of rows. The bulk import instead:
+
+1. Loads the categories, species, schemes and ratings named in the rows, using one query for each, and creates
+   those that don't exist
+2. Loads the ratings that haven't ended for the species in the rows, using a single query, and resolves overlaps in
+   memory for each species, scheme and region, taking the rows in the order supplied
+3. Writes the ratings that are closed and the new ratings in chunks, each in its own transaction, so other users
+   of the database aren't blocked for the duration of a large import. The ratings closed and created for each
+   species, scheme and region are written in the same chunk, so a chunk that fails never leaves a species with
+   its ratings closed but not replaced
+
+The outcome is the same as creating each rating in turn with create_species_status_rating(): each new rating closes
+the ratings for the same species, scheme and region that haven't ended by today, setting their end date to today.
+All the rows are validated before anything's written.
+"""
+
+import datetime
+import sqlalchemy as db
+from collections import namedtuple
+from ..model import Session, Category, Species, StatusScheme, StatusRating, SpeciesStatusRating, retry_on_busy, \
+    to_day_number
+from .conflict_policies import ConflictPolicy, write_records
+from .naming import tidy_string, Casing
+
+#: A species conservation status rating to import, with the species, scheme and rating given by name
+StatusRatingImport = namedtuple("StatusRatingImport", "category species scheme rating region start end",
+                                defaults=(None,))
+
+#: Numbers of ratings created and closed by an import
+StatusImportResult = namedtuple("StatusImportResult", "created closed")
+
+#: Default number of ratings written in each transaction
+DEFAULT_CHUNK_SIZE = 1000
+
+#: Number of values looked up per query, keeping the number of parameters well within SQLite's limit
+_LOOKUP_CHUNK_SIZE = 500
+
+
+def _find_records(session, entity, key, keys, *columns):
+    """
+    Find the records with the specified keys
+
+    :param session: SQLAlchemy session on which to perform the queries
+    :param entity: Model class for the records
+    :param key: List of the names of the columns that identify a record
+    :param keys: Collection of key tuples to look up
+    :param columns: Names of additional columns to return
+    :return: Dictionary of tuples of the ID and additional columns, keyed by key tuple
+    """
+    table = entity.__table__
+    key_columns = [table.c[name] for name in key]
+    keys = list(keys)
+    found = {}
+    for i in range(0, len(keys), _LOOKUP_CHUNK_SIZE):
+        chunk = keys[i:i + _LOOKUP_CHUNK_SIZE]
+        condition = key_columns[0].in_([k[0] for k in chunk]) if len(key) == 1 \
+            else db.tuple_(*key_columns).in_(chunk)
+        query = db.select(*key_columns, table.c.id, *[table.c[name] for name in columns]).where(condition)
+        found.update({tuple(row[:len(key)]): tuple(row[len(key):]) for row in session.execute(query)})
+    return found
+
+
+def _ensure_records(session, entity, key, records, *columns):
+    """
+    Create the records that don't already exist and return the details of all of them
+
+    :param session: SQLAlchemy session on which to perform the queries
+    :param entity: Model class for the records
+    :param key: List of the names of the columns that identify a record
+    :param records: Dictionary of column values for each record, keyed by key tuple
+    :param columns: Names of additional columns to return
+    :return: Dictionary of tuples of the ID and additional columns, keyed by key tuple
+    """
+    found = _find_records(session, entity, key, records.keys(), *columns)
+    missing = [values for k, values in records.items() if k not in found]
+    if missing:
+        write_records(session, entity, missing, key, ConflictPolicy.SKIP)
+        found = _find_records(session, entity, key, records.keys(), *columns)
+    return found
+
+
+def _tidy_rows(rows):
+    """
+    Tidy the names in the rows to be imported, in the same way as when the records they name are created, and
+    validate the dates
+
+    :param rows: List of StatusRatingImport instances
+    :return: List of tidied StatusRatingImport instances
+    :raises ValueError: If a row's incomplete or its dates aren't valid
+    """
+    today = datetime.date.today()
+    tidied = []
+    for i, row in enumerate(rows):
+        if not all([row.category, row.species, row.scheme, row.rating, row.region, row.start]):
+            raise ValueError(f"Missing data at row {i + 1}")
+        if row.start > today:
+            raise ValueError(f"Cannot create a conservation status rating starting in the future at row {i + 1}")
+        if row.end and row.end < row.start:
+            raise ValueError(f"End date is before the start date at row {i + 1}")
+
+        tidied.append(StatusRatingImport(category=tidy_string(row.category, Casing.TITLE_CASE),
+                                         species=tidy_string(row.species, Casing.TITLE_CASE),
+                                         scheme=" ".join(row.scheme.split()),
+                                         rating=" ".join(row.rating.split()).title(),
+                                         region=row.region.strip(),
+                                         start=row.start,
+                                         end=row.end))
+    return tidied
+
+
+@retry_on_busy
+def _resolve_names(rows, user):
+    """
+    Return the IDs of the species and ratings named in the rows, creating the categories, species, schemes and
+    ratings that don't exist
+
+    :param rows: List of tidied StatusRatingImport instances
+    :param user: Current user
+    :return: Tuple of a dictionary of species IDs keyed by name and one of (scheme ID, rating ID) tuples keyed by
+             the scheme and rating names
+    :raises ValueError: If a species exists in a different category to the one given
+    """
+    now = datetime.datetime.now(datetime.UTC)
+    audit = dict(created_by=user.id, updated_by=user.id, date_created=now, date_updated=now)
+    with Session.begin() as session:
+        categories = _ensure_records(session, Category, ["name"],
+                                     {(row.category,): dict(name=row.category, supports_gender=True, **audit)
+                                      for row in rows})
+
+        species = _ensure_records(session, Species, ["name"],
+                                  {(row.species,): dict(name=row.species, categoryId=categories[(row.category,)][0],
+                                                        scientific_name=None, **audit)
+                                   for row in rows},
+                                  "categoryId")
+        for row in rows:
+            if species[(row.species,)][1] != categories[(row.category,)][0]:
+                raise ValueError(f"Species {row.species} belongs to a different category")
+
+        schemes = _ensure_records(session, StatusScheme, ["name"],
+                                  {(row.scheme,): dict(name=row.scheme, **audit) for row in rows})
+
+        ratings = _ensure_records(session, StatusRating, ["statusSchemeId", "name"],
+                                  {(schemes[(row.scheme,)][0], row.rating): dict(statusSchemeId=schemes[(row.scheme,)][0],
+                                                                                 name=row.rating, **audit)
+                                   for row in rows})
+
+    return {name: details[0] for (name,), details in species.items()}, \
+        {(scheme, rating): (schemes[(scheme,)][0], ratings[(schemes[(scheme,)][0], rating)][0])
+         for scheme, rating in {(row.scheme, row.rating) for row in rows}}
+
+
+def _find_open_ratings(species_ids, today):
+    """
+    Find the ratings for a set of species that haven't ended by today
+
+    :param species_ids: Collection of species IDs
+    :param today: Today's date
+    :return: Dictionary of lists of rating IDs, keyed by (species ID, scheme ID, region) tuple
+    """
+    table = SpeciesStatusRating.__table__
+    species_ids = list(species_ids)
+    open_ratings = {}
+    with Session.begin() as session:
+        for i in range(0, len(species_ids), _LOOKUP_CHUNK_SIZE):
+            rows = session.execute(db.select(table.c.id, table.c.speciesId, StatusRating.statusSchemeId, table.c.region)
+                                   .join(StatusRating, StatusRating.id == table.c.statusRatingId)
+                                   .where(table.c.speciesId.in_(species_ids[i:i + _LOOKUP_CHUNK_SIZE]),
+                                          db.or_(table.c.end.is_(None), table.c.endDay >= to_day_number(today))))
+            for rating_id, species_id, scheme_id, region in rows:
+                open_ratings.setdefault((species_id, scheme_id, region), []).append(rating_id)
+    return open_ratings
+
+
+@retry_on_busy
+def _write_chunk(close_statement, closed, insert_statement, created):
+    """
+    Close existing ratings and insert new ones for a chunk of rows, in a single transaction
+
+    :param close_statement: SQLAlchemy statement used to close existing ratings
+    :param closed: List of dictionaries of parameter values for the ratings to close
+    :param insert_statement: SQLAlchemy statement used to insert new ratings
+    :param created: List of dictionaries of column values for the new ratings
+    """
+    with Session.begin() as session:
+        if closed:
+            session.execute(close_statement, closed)
+        if created:
+            session.execute(insert_statement, created)
+
+
+def import_species_status_ratings(rows, user, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Import a batch of species conservation status ratings, creating the categories, species, schemes and ratings
+    they name if necessary
+
+    :param rows: Iterable of StatusRatingImport instances
+    :param user: Current user
+    :param chunk_size: Number of ratings written in each transaction. A chunk's extended if necessary, so the
+                       ratings closed and created for a species, scheme and region are written together
+    :return: StatusImportResult giving the numbers of ratings created and closed
+    :raises ValueError: If any row isn't valid, in which case nothing's written
+    """
+    rows = _tidy_rows(list(rows))
+    if not rows:
+        return StatusImportResult(created=0, closed=0)
+
+    species_ids, rating_ids = _resolve_names(rows, user)
+
+    # Resolve the overlaps, tracking the ratings in each group that are still open as each row's applied. The
+    # open ratings are either existing ratings, identified by ID, or new ones, identified by their position in
+    # the list of new ratings
+    today = datetime.date.today()
+    today_text = today.strftime(SpeciesStatusRating.DATE_FORMAT)
+    now = datetime.datetime.now(datetime.UTC)
+    open_ratings = {group: [("existing", rating_id) for rating_id in ids]
+                    for group, ids in _find_open_ratings(species_ids.values(), today).items()}
+    closed = []
+    created = []
+    changes = {}
+    for row in rows:
+        scheme_id, rating_id = rating_ids[(row.scheme, row.rating)]
+        group = (species_ids[row.species], scheme_id, row.region)
+        group_closed, group_created = changes.setdefault(group, ([], []))
+        for source, reference in open_ratings.pop(group, []):
+            if source == "existing":
+                closed.append(dict(closed_id=reference, closed_end=today_text, closed_by=user.id, closed_at=now))
+                group_closed.append(closed[-1])
+            else:
+                created[reference]["end"] = today_text
+
+        created.append(dict(speciesId=species_ids[row.species],
+                            statusRatingId=rating_id,
+                            region=row.region,
+                            start=row.start.strftime(SpeciesStatusRating.DATE_FORMAT),
+                            end=row.end.strftime(SpeciesStatusRating.DATE_FORMAT) if row.end else None,
+                            created_by=user.id,
+                            updated_by=user.id,
+                            date_created=now,
+                            date_updated=now))
+        group_created.append(created[-1])
+        if row.end is None or row.end >= today:
+            open_ratings.setdefault(group, []).append(("new", len(created) - 1))
+
+    # Write the changes in chunks, keeping all the changes for each group in the same chunk
+    table = SpeciesStatusRating.__table__
+    close_statement = db.update(table)\
+        .where(table.c.id == db.bindparam("closed_id"))\
+        .values(end=db.bindparam("closed_end"),
+                updated_by=db.bindparam("closed_by"),
+                date_updated=db.bindparam("closed_at"))
+    chunk_closed = []
+    chunk_created = []
+    for group_closed, group_created in changes.values():
+        chunk_closed.extend(group_closed)
+        chunk_created.extend(group_created)
+        if len(chunk_closed) + len(chunk_created) >= chunk_size:
+            _write_chunk(close_statement, chunk_closed, table.insert(), chunk_created)
+            chunk_closed = []
+            chunk_created = []
+
+    if chunk_closed or chunk_created:
+        _write_chunk(close_statement, chunk_closed, table.insert(), chunk_created)
+
+    return StatusImportResult(created=len(created), closed=len(closed))
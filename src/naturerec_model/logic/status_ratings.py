@@ -4,7 +4,7 @@ Conservation status scheme rating business logic
 
 from datetime import datetime as dt, UTC
 from sqlalchemy.exc import IntegrityError
-from ..model import Session, StatusRating, SpeciesStatusRating
+from ..model import Session, StatusRating, SpeciesStatusRating, retry_on_busy
 
 
 def _check_for_existing_records(session, status_scheme_id, name):
@@ -23,6 +23,7 @@ def _check_for_existing_records(session, status_scheme_id, name):
     return [rating.id for rating in ratings]
 
 
+@retry_on_busy
 def create_status_rating(status_scheme_id, name, user):
     """
     Create a new species conservation status scheme rating
@@ -56,6 +57,7 @@ def create_status_rating(status_scheme_id, name, user):
     return scheme
 
 
+@retry_on_busy
 def update_status_rating(status_rating_id, name, user):
     """
     Update an existing species conservation status scheme rating
@@ -96,6 +98,7 @@ def update_status_rating(status_rating_id, name, user):
     return rating
 
 
+@retry_on_busy
 def delete_status_rating(status_rating_id):
     """
     Delete a conservation status rating
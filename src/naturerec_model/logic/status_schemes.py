@@ -6,7 +6,7 @@ from functools import singledispatch
 import sqlalchemy as db
 from datetime import datetime as dt, UTC
 from sqlalchemy.exc import IntegrityError, NoResultFound
-from ..model import Session, StatusScheme, SpeciesStatusRating
+from ..model import Session, StatusScheme, StatusRating, SpeciesStatusRating, retry_on_busy
 
 
 def _check_for_existing_records(session, name):
@@ -21,6 +21,7 @@ def _check_for_existing_records(session, name):
     return [scheme.id for scheme in schemes]
 
 
+@retry_on_busy
 def create_status_scheme(name, user):
     """
     Create a new species conservation status scheme
@@ -52,6 +53,7 @@ def create_status_scheme(name, user):
     return scheme
 
 
+@retry_on_busy
 def update_status_scheme(status_scheme_id, name, user):
     """
     Update an existing conservation status scheme
@@ -137,6 +139,7 @@ def list_status_schemes():
     return schemes
 
 
+@retry_on_busy
 def delete_status_scheme(scheme_id):
     """
     Delete a conservation status scheme
@@ -146,25 +149,15 @@ def delete_status_scheme(scheme_id):
     :raises ValueError: If there are any species ratings using the scheme
     """
     with Session.begin() as session:
-        # Get the status rating instance
-        scheme = session.query(StatusScheme).get(scheme_id)
-        if not scheme:
+        # Check there are no species ratings using this scheme, with a single query across all its ratings
+        in_use = session.query(db.exists()
+                               .where(db.and_(SpeciesStatusRating.statusRatingId == StatusRating.id,
+                                              StatusRating.statusSchemeId == scheme_id))).scalar()
+        if in_use:
+            raise ValueError("Cannot delete a conservation status scheme that has species ratings recorded against it")
+
+        # Delete the ratings and the scheme. A scheme that doesn't exist has no ratings, so it's only detected when
+        # deleting the scheme, and the transaction's then rolled back
+        session.execute(db.delete(StatusRating).where(StatusRating.statusSchemeId == scheme_id))
+        if session.execute(db.delete(StatusScheme).where(StatusScheme.id == scheme_id)).rowcount == 0:
             raise ValueError("Conservation status scheme not found")
-
-        # Check there are no species ratings using this scheme
-        for rating in scheme.ratings:
-            species_status_ratings = session.query(SpeciesStatusRating) \
-                .filter(SpeciesStatusRating.statusRatingId == rating.id) \
-                .limit(1) \
-                .all()
-
-            if len(species_status_ratings) > 0:
-                raise ValueError("Cannot delete a conservation status scheme that has species ratings recorded "
-                                 "against it")
-
-        # Delete the ratings
-        for rating in scheme.ratings:
-            session.delete(rating)
-
-        # Delete the scheme
-        session.delete(scheme)
@@ -8,7 +8,7 @@ import base64
 from datetime import datetime as dt, UTC
 from functools import singledispatch
 from sqlalchemy.exc import IntegrityError, NoResultFound
-from ..model import Session, User
+from ..model import Session, User, retry_on_busy
 
 def _check_for_existing_records(session, username):
     """
@@ -22,6 +22,7 @@ def _check_for_existing_records(session, username):
     return [user.id for user in users]
 
 
+@retry_on_busy
 def create_user(username, password, user):
     """
     Create a new user
@@ -1,14 +1,25 @@
-from .database import create_database, Engine, Session
+from .database import create_database, dispose_engine, Engine, Session, unit_of_work, begin_unit_of_work, \
+    end_unit_of_work, current_unit_of_work, suspend_unit_of_work
 from .category import Category
 from .species import Species
 from .location import Location
+from .location_index import LocationIndex
 from .gender import Gender
 from .sighting import Sighting
+from .search_index import SightingSearch, SpeciesSearch
 from .status_scheme import StatusScheme
 from .status_rating import StatusRating
 from .species_status_rating import SpeciesStatusRating
+from .species_current_status import SpeciesCurrentStatus, rebuild_species_current_statuses
 from .job_status import JobStatus
-from .utils import get_data_path
+from .sighting_sync_key import SightingSyncKey
+from .utils import get_data_path, parse_date, parse_date_time, format_date
+from .query_auditor import QueryAuditor, QueryBudgetExceeded, query_budget
+from .write_queue import WriteQueue, get_write_queue, submit_write
+from .busy_retry import retry_on_busy, call_with_busy_retry, call_in_unit_of_work, is_busy_error, \
+    configure_busy_retry, get_busy_retry_policy, busy_retry_counters, reset_busy_retry_counters
+from .maintenance import backup_database, optimise_database, incremental_vacuum
+from .date_columns import to_day_number, to_timestamp, add_shadow_columns
 from .user import User
 from .role import Role
 from .user_role import UserRole
@@ -18,16 +29,51 @@ __all__ = [
     "Engine",
     "Session",
     "create_database",
+    "dispose_engine",
+    "unit_of_work",
+    "begin_unit_of_work",
+    "end_unit_of_work",
+    "current_unit_of_work",
+    "suspend_unit_of_work",
     "Category",
     "Species",
     "Location",
+    "LocationIndex",
     "Gender",
     "Sighting",
+    "SightingSearch",
+    "SpeciesSearch",
     "StatusScheme",
     "StatusRating",
     "SpeciesStatusRating",
+    "SpeciesCurrentStatus",
+    "rebuild_species_current_statuses",
     "get_data_path",
+    "parse_date",
+    "parse_date_time",
+    "format_date",
+    "QueryAuditor",
+    "QueryBudgetExceeded",
+    "query_budget",
+    "WriteQueue",
+    "get_write_queue",
+    "submit_write",
+    "retry_on_busy",
+    "call_with_busy_retry",
+    "call_in_unit_of_work",
+    "is_busy_error",
+    "configure_busy_retry",
+    "get_busy_retry_policy",
+    "busy_retry_counters",
+    "reset_busy_retry_counters",
+    "backup_database",
+    "optimise_database",
+    "incremental_vacuum",
+    "to_day_number",
+    "to_timestamp",
+    "add_shadow_columns",
     "JobStatus",
+    "SightingSyncKey",
     "User",
     "Role",
     "UserRole"
@@ -0,0 +1,186 @@
+"""
+Retry of database operations that fail because the database is locked. The database is shared with the .NET
+application and SQLite allows one writer at a time, so a write can fail with "database is locked" when another
+connection, in this process or another, holds the lock for longer than the driver's busy timeout. It can also fail
+straight away if a transaction that's read from the database tries to write after another connection has.
+
+Functions decorated with retry_on_busy are retried when this happens, after a delay drawn at random from a range
+that doubles with each attempt, up to a maximum, so competing writers don't retry in lock step. Once a deadline's
+passed, the error's raised to the caller. The number of retries, recoveries and failures is counted.
+
+Within a unit of work, the decorated function's changes are part of a larger transaction that can't be partially
+repeated, so it isn't retried and the error's raised to the unit of work's owner. Units of work started using
+call_in_unit_of_work are rolled back and retried as a whole instead. A unit of work that's read from the database
+fails straight away if it writes after another connection has, so this is needed for any unit of work that writes,
+unless it takes the write lock when it starts.
+"""
+
+import functools
+import random
+import threading
+import time
+from collections import namedtuple
+from sqlalchemy.exc import OperationalError
+from .database import current_unit_of_work, unit_of_work
+
+#: Default delay, in seconds, before the first retry
+DEFAULT_INITIAL_DELAY = 0.02
+
+#: Default maximum delay, in seconds, between retries
+DEFAULT_MAX_DELAY = 1.0
+
+#: Default time, in seconds, after which an operation that's still failing isn't retried
+DEFAULT_DEADLINE = 30.0
+
+#: Retry policy settings
+BusyRetryPolicy = namedtuple("BusyRetryPolicy", "initial_delay max_delay deadline")
+
+#: Snapshot of the retry counters
+BusyRetryCounters = namedtuple("BusyRetryCounters", "retries recoveries failures")
+
+#: Text of the SQLite errors raised when the database is locked
+_BUSY_MESSAGES = ("database is locked", "database is busy", "database table is locked")
+
+_policy = BusyRetryPolicy(DEFAULT_INITIAL_DELAY, DEFAULT_MAX_DELAY, DEFAULT_DEADLINE)
+_counters = {"retries": 0, "recoveries": 0, "failures": 0}
+_counters_lock = threading.Lock()
+
+
+def configure_busy_retry(initial_delay=DEFAULT_INITIAL_DELAY, max_delay=DEFAULT_MAX_DELAY, deadline=DEFAULT_DEADLINE):
+    """
+    Set the retry policy used by retry_on_busy
+
+    :param initial_delay: Delay, in seconds, before the first retry
+    :param max_delay: Maximum delay, in seconds, between retries
+    :param deadline: Time, in seconds, after which an operation that's still failing isn't retried
+    :raises ValueError: If any of the settings isn't positive or the initial delay exceeds the maximum
+    """
+    global _policy
+    if min(initial_delay, max_delay, deadline) <= 0:
+        raise ValueError("Retry delays and deadline must be positive")
+
+    if initial_delay > max_delay:
+        raise ValueError("Initial retry delay cannot exceed the maximum delay")
+
+    _policy = BusyRetryPolicy(initial_delay, max_delay, deadline)
+
+
+def get_busy_retry_policy():
+    """
+    Return the retry policy used by retry_on_busy
+
+    :return: BusyRetryPolicy instance
+    """
+    return _policy
+
+
+def busy_retry_counters():
+    """
+    Return the number of retries, operations that succeeded after being retried and operations that failed once
+    their deadline had passed, since the process started or the counters were reset
+
+    :return: BusyRetryCounters instance
+    """
+    with _counters_lock:
+        return BusyRetryCounters(**_counters)
+
+
+def reset_busy_retry_counters():
+    """
+    Reset the retry counters to zero
+    """
+    with _counters_lock:
+        for name in _counters:
+            _counters[name] = 0
+
+
+def _count(name):
+    with _counters_lock:
+        _counters[name] += 1
+
+
+def is_busy_error(e):
+    """
+    Return True if an exception was raised because the database is locked
+
+    :param e: Exception
+    :return: True if the exception is a "database is locked" error
+    """
+    return isinstance(e, OperationalError) and any(message in str(e.orig) for message in _BUSY_MESSAGES)
+
+
+def call_with_busy_retry(fn, *args, **kwargs):
+    """
+    Call a function, retrying it if it fails because the database is locked
+
+    :param fn: Callable to call
+    :param args: Positional arguments for the callable
+    :param kwargs: Keyword arguments for the callable
+    :return: The callable's return value
+    :raises OperationalError: If the database is still locked once the retry deadline has passed
+    """
+    policy = _policy
+    deadline = time.monotonic() + policy.deadline
+    attempt = 0
+    while True:
+        try:
+            result = fn(*args, **kwargs)
+        except OperationalError as e:
+            if not is_busy_error(e):
+                raise
+
+            delay = random.uniform(0, min(policy.max_delay, policy.initial_delay * 2 ** attempt))
+            if time.monotonic() + delay > deadline:
+                _count("failures")
+                raise
+
+            _count("retries")
+            attempt += 1
+            time.sleep(delay)
+            continue
+
+        if attempt:
+            _count("recoveries")
+
+        return result
+
+
+def retry_on_busy(fn):
+    """
+    Decorator that retries a function if it fails because the database is locked, unless it's called within a
+    unit of work
+
+    :param fn: Function to decorate
+    :return: Decorated function
+    """
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        if current_unit_of_work() is not None:
+            return fn(*args, **kwargs)
+        return call_with_busy_retry(fn, *args, **kwargs)
+
+    return wrapper
+
+
+def _call_in_new_unit_of_work(fn, args, kwargs):
+    """
+    Call a function in a new unit of work, committed if the function succeeds
+    """
+    with unit_of_work():
+        return fn(*args, **kwargs)
+
+
+def call_in_unit_of_work(fn, *args, **kwargs):
+    """
+    Call a function in a unit of work, rolling back and retrying the whole unit of work if it fails because the
+    database is locked. If a unit of work's already in progress, the function joins it and isn't retried
+
+    :param fn: Callable to call
+    :param args: Positional arguments for the callable
+    :param kwargs: Keyword arguments for the callable
+    :return: The callable's return value
+    :raises OperationalError: If the database is still locked once the retry deadline has passed
+    """
+    if current_unit_of_work() is not None:
+        return fn(*args, **kwargs)
+    return call_with_busy_retry(_call_in_new_unit_of_work, fn, args, kwargs)
@@ -9,14 +9,33 @@ module-level variables are defined:
 +----------+-----------------------------------------------------------------------------+
 | Session  | Definition of the Session class returned by the sessionmaker for the Engine |
 +----------+-----------------------------------------------------------------------------+
+
+Logic functions each open their own transaction using Session.begin(). Within a unit of work, started using the
+unit_of_work() context manager, Session.begin() instead joins the unit of work's session in the current thread,
+using a savepoint so a failed logic call is rolled back without affecting the rest of the unit of work. The unit of
+work's changes are committed together when it ends:
+
+.. code-block:: python
+
+    with unit_of_work():
+        sighting = create_sighting(...)
+        sightings = list_sightings(...)
 """
 
 import os
+import threading
+from contextlib import contextmanager
 import sqlalchemy as db
 from sqlalchemy.orm import sessionmaker
 from .utils import get_data_path
 from .base import Base
 
+#: Default time, in seconds, that a connection waits for the database to be unlocked
+DEFAULT_BUSY_TIMEOUT = 5.0
+
+#: SQLite journal modes that can be selected using the NATURE_RECORDER_JOURNAL_MODE environment variable
+JOURNAL_MODES = ("DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF")
+
 
 def _get_db_path():
     """
@@ -34,13 +53,43 @@ def _get_db_path():
 
 def _delete_db():
     """
-    Remove the database file at the default path
+    Remove the database file at the default path, along with its write-ahead log and shared memory files
     """
     db_path = _get_db_path()
-    try:
-        os.unlink(db_path)
-    except FileNotFoundError:
-        pass
+    for path in [db_path, f"{db_path}-wal", f"{db_path}-shm"]:
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+
+
+def _get_busy_timeout():
+    """
+    Return the time, in seconds, that a connection waits for the database to be unlocked before an operation fails
+    with a "database is locked" error. If the environment variable NATURE_RECORDER_BUSY_TIMEOUT is set, this will be
+    used. If not, the driver's default of 5 seconds is used
+
+    :return: Busy timeout in seconds
+    """
+    return float(os.environ.get("NATURE_RECORDER_BUSY_TIMEOUT") or DEFAULT_BUSY_TIMEOUT)
+
+
+def _get_journal_mode():
+    """
+    Return the journal mode to put the database in when a connection is opened. If the environment variable
+    NATURE_RECORDER_JOURNAL_MODE is set, this will be used. If not, the database's journal mode is left unchanged,
+    as the database may be shared with other applications that expect a particular mode
+
+    :return: Journal mode name or None to leave the mode unchanged
+    """
+    journal_mode = (os.environ.get("NATURE_RECORDER_JOURNAL_MODE") or "").strip().upper()
+    if not journal_mode:
+        return None
+
+    if journal_mode not in JOURNAL_MODES:
+        raise ValueError(f"Invalid journal mode: {journal_mode}")
+
+    return journal_mode
 
 
 def _create_engine():
@@ -49,7 +98,7 @@ def _create_engine():
 
     :return: Instance of the SQLAlchemy Engine class
     """
-    return db.create_engine(f"sqlite:///{_get_db_path()}", echo=False)
+    return db.create_engine(f"sqlite:///{_get_db_path()}", echo=False, connect_args={"timeout": _get_busy_timeout()})
 
 
 def create_database():
@@ -58,14 +107,141 @@ def create_database():
     """
     _delete_db()
     engine = _create_engine()
+
+    # Incremental auto-vacuum can only be enabled before any tables are created. It allows free pages to be
+    # returned to the file system without rewriting the whole database
+    with engine.connect() as connection:
+        connection.exec_driver_sql("PRAGMA auto_vacuum=INCREMENTAL")
+
     Base.metadata.create_all(engine)
 
 
+_unit_of_work = threading.local()
+
+
+class UnitOfWorkSessionMaker(sessionmaker):
+    """
+    Session factory whose begin() method joins the current thread's unit of work, if there is one
+    """
+
+    def begin(self):
+        """
+        Return a context manager that provides a session and transaction. Outside a unit of work, this is a new
+        session that's committed when the context manager exits. Within one, it's the unit of work's session, with
+        a savepoint that's released when the context manager exits
+
+        :return: Context manager providing the session
+        """
+        session = current_unit_of_work()
+        return super().begin() if session is None else _join_unit_of_work(session)
+
+
+@contextmanager
+def _join_unit_of_work(session):
+    """
+    Context manager used to join a unit of work's session, within a savepoint
+    """
+    with session.begin_nested():
+        yield session
+
+
+def current_unit_of_work():
+    """
+    Return the session for the current thread's unit of work
+
+    :return: Session instance or None if there's no unit of work in progress
+    """
+    return getattr(_unit_of_work, "session", None)
+
+
+def begin_unit_of_work(immediate=False):
+    """
+    Start a unit of work in the current thread, if there isn't one in progress. Every unit of work that's begun
+    must be ended by calling end_unit_of_work()
+
+    :param immediate: True to take the database's write lock when the unit of work starts, rather than when it
+                      first writes. A unit of work that's taken the lock can't fail part way through because
+                      another connection is writing, but it blocks all other writers until it ends
+    :return: True if a unit of work was started, False if one was already in progress
+    """
+    if current_unit_of_work() is not None:
+        return False
+
+    session = Session()
+
+    # The pysqlite driver only begins a transaction before data is modified, whereas the unit of work's
+    # savepoints and reads must all be in the same transaction, so it's begun explicitly
+    try:
+        session.connection().exec_driver_sql("BEGIN IMMEDIATE" if immediate else "BEGIN")
+    except BaseException:
+        session.close()
+        raise
+
+    _unit_of_work.session = session
+    return True
+
+
+def end_unit_of_work(commit=True):
+    """
+    End the current thread's unit of work, committing or rolling back its changes
+
+    :param commit: True to commit the changes made in the unit of work, False to roll them back
+    """
+    session = current_unit_of_work()
+    if session is None:
+        return
+
+    _unit_of_work.session = None
+    try:
+        if commit:
+            session.commit()
+        else:
+            session.rollback()
+    finally:
+        session.close()
+
+
+@contextmanager
+def unit_of_work():
+    """
+    Context manager that runs the logic calls made within it in a single session and transaction, committed when
+    the context manager exits or rolled back if it exits with an exception. If a unit of work is already in progress
+    in the current thread, it's joined instead
+
+    :return: Session for the unit of work
+    """
+    started = begin_unit_of_work()
+    try:
+        yield current_unit_of_work()
+    except BaseException:
+        if started:
+            end_unit_of_work(commit=False)
+        raise
+
+    if started:
+        end_unit_of_work()
+
+
+@contextmanager
+def suspend_unit_of_work():
+    """
+    Context manager that suspends the current thread's unit of work, so logic calls made within it are committed
+    immediately. This is needed when the records created must be visible to other threads straight away. It must
+    be used before the unit of work writes to the database, as SQLite allows only one writer at a time
+    """
+    session = current_unit_of_work()
+    _unit_of_work.session = None
+    try:
+        yield
+    finally:
+        _unit_of_work.session = session
+
+
 #: Instance of the SQLAlchemy database engine
 Engine = _create_engine()
 
 #: Session class for the engine, used  to create session instances
-Session = sessionmaker(Engine, expire_on_commit=False)
+Session = UnitOfWorkSessionMaker(Engine, expire_on_commit=False)
 
 
 @db.event.listens_for(Engine, "connect")
@@ -85,3 +261,63 @@ def set_sqlite_pragma(dbapi_connection, _):
     cursor = dbapi_connection.cursor()
     cursor.execute("PRAGMA foreign_keys=ON")
     cursor.close()
+
+
+@db.event.listens_for(Engine, "connect")
+def set_journal_mode(dbapi_connection, _):
+    """
+    Intercept connection events for the database engine and, if a journal mode has been selected using the
+    NATURE_RECORDER_JOURNAL_MODE environment variable, put the database in that mode. This is an explicit opt-in
+    because the WAL and rollback journal modes are persistent, so setting the mode changes it for every application
+    using the database file.
+
+    In the default rollback journal mode, a transaction that's read from the database prevents any other connection
+    committing until it ends, so a long-running unit of work blocks all writers. In WAL mode, readers don't block
+    the writer but a checkpoint is run when the last connection closes
+
+    :param dbapi_connection:
+    :param _:
+    """
+    journal_mode = _get_journal_mode()
+    if journal_mode:
+        cursor = dbapi_connection.cursor()
+        cursor.execute(f"PRAGMA journal_mode={journal_mode}")
+        cursor.close()
+
+
+@db.event.listens_for(Engine, "connect")
+def record_connection_pid(_, connection_record):
+    """
+    Record the ID of the process that opened each connection, so connections inherited by a forked worker process
+    can be detected
+
+    :param _:
+    :param connection_record: Pool connection record for the new connection
+    """
+    connection_record.info["pid"] = os.getpid()
+
+
+@db.event.listens_for(Engine, "checkout")
+def check_connection_pid(_, connection_record, connection_proxy):
+    """
+    Intercept connection checkout and prevent a connection opened by a parent process being used in a forked child.
+    SQLite connections must not be shared across a fork so, rather than use it, the pool is told the connection is
+    invalid and a new one is opened in the child
+
+    :param _:
+    :param connection_record: Pool connection record for the connection being checked out
+    :param connection_proxy: Proxy for the connection being checked out
+    """
+    pid = os.getpid()
+    if connection_record.info["pid"] != pid:
+        connection_record.dbapi_connection = connection_proxy.dbapi_connection = None
+        raise db.exc.DisconnectionError(f"Connection belongs to process {connection_record.info['pid']}, "
+                                        f"attempting to check out in process {pid}")
+
+
+def dispose_engine():
+    """
+    Discard the engine's pooled connections. This should be called in each worker process after forking so the
+    worker doesn't use connections opened by the parent
+    """
+    Engine.dispose()
@@ -0,0 +1,117 @@
+"""
+Typed shadows of the date columns. The database is shared with the .NET application, whose schema stores dates as
+TEXT in the form YYYY-MM-DD HH:MM:SS, so range filters on those columns compare strings and every read parses them.
+Each date column that's filtered on is shadowed by an indexed, virtual generated column that SQLite computes from
+the TEXT column:
+
++----------------------+----------------+--------------------------------------------------------------+
+| **Table**            | **Column**     | **Contents**                                                 |
++----------------------+----------------+--------------------------------------------------------------+
+| Sightings            | dayNumber      | Day number of the sighting date                              |
++----------------------+----------------+--------------------------------------------------------------+
+| SpeciesStatusRatings | startDay       | Day number of the start date                                 |
++----------------------+----------------+--------------------------------------------------------------+
+| SpeciesStatusRatings | endDay         | Day number of the end date, NULL if the rating's current     |
++----------------------+----------------+--------------------------------------------------------------+
+| JobStatuses          | startTimestamp | Start time, in seconds since 1970-01-01, as job filters need |
+|                      |                | the time as well as the date                                 |
++----------------------+----------------+--------------------------------------------------------------+
+
+Day numbers are Python date ordinals, so a date's day number is date.toordinal(). The TEXT columns are unchanged and
+the shadow columns are maintained by SQLite, so the .NET application needn't know about them. They're excluded from
+the ORM mappings, as they're never written and reading them from detached instances would fail, and are used in
+queries via the table's columns, for example Sighting.__table__.c.dayNumber.
+
+Databases that pre-date the shadow columns are upgraded by the "add date shadow columns" Alembic migration.
+Databases created by the .NET application can be upgraded using add_shadow_columns().
+"""
+
+import calendar
+from sqlalchemy import Column, Integer, Computed
+
+#: Difference between the SQLite Julian day number at midnight and the Python date ordinal for the same date
+_JULIAN_DAY_OFFSET = 1721424.5
+
+
+def _day_number_sql(column_name):
+    """
+    SQL expression that computes the day number for a TEXT date column
+
+    :param column_name: Name of the TEXT date column
+    :return: SQL expression
+    """
+    return f"CAST(julianday(substr(\"{column_name}\", 1, 10)) - {_JULIAN_DAY_OFFSET} AS INTEGER)"
+
+
+def _timestamp_sql(column_name):
+    """
+    SQL expression that computes the seconds since 1970-01-01 for a TEXT date/time column
+
+    :param column_name: Name of the TEXT date/time column
+    :return: SQL expression
+    """
+    return f"CAST(strftime('%s', \"{column_name}\") AS INTEGER)"
+
+
+def day_number_column(name, date_column_name):
+    """
+    Create a virtual generated column holding the day number for a TEXT date column
+
+    :param name: Name of the generated column
+    :param date_column_name: Name of the TEXT date column
+    :return: SQLAlchemy Column
+    """
+    return Column(name, Integer, Computed(_day_number_sql(date_column_name), persisted=False), nullable=True)
+
+
+def timestamp_column(name, date_column_name):
+    """
+    Create a virtual generated column holding the seconds since 1970-01-01 for a TEXT date/time column
+
+    :param name: Name of the generated column
+    :param date_column_name: Name of the TEXT date/time column
+    :return: SQLAlchemy Column
+    """
+    return Column(name, Integer, Computed(_timestamp_sql(date_column_name), persisted=False), nullable=True)
+
+
+def to_day_number(value):
+    """
+    Return the day number for a date or the date part of a date/time
+
+    :param value: Date or date/time
+    :return: Day number
+    """
+    return value.toordinal()
+
+
+def to_timestamp(value):
+    """
+    Return the seconds since 1970-01-01 for a date/time, or for midnight on a date, consistent with the values SQLite
+    computes for the timestamp columns
+
+    :param value: Date or date/time
+    :return: Seconds since 1970-01-01
+    """
+    return calendar.timegm(value.timetuple())
+
+
+def add_shadow_columns(connection, tables):
+    """
+    Add the shadow columns, and their indexes, to the tables in a database created before they were introduced, or
+    by the .NET application. Virtual generated columns can be added without rewriting the tables, so this is quick
+
+    :param connection: SQLAlchemy connection to the database
+    :param tables: SQLAlchemy Table instances for the tables to update
+    """
+    for table in tables:
+        existing = {row[1] for row in connection.exec_driver_sql(f"PRAGMA table_xinfo(\"{table.name}\")").all()}
+        shadow_columns = [column for column in table.columns if column.computed is not None]
+        for column in shadow_columns:
+            if column.name not in existing:
+                connection.exec_driver_sql(f"ALTER TABLE \"{table.name}\" ADD COLUMN \"{column.name}\" INTEGER "
+                                           f"GENERATED ALWAYS AS ({column.computed.sqltext}) VIRTUAL")
+
+        for index in table.indexes:
+            if any(column in shadow_columns for column in index.columns):
+                index.create(connection, checkfirst=True)
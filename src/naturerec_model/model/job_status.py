@@ -1,6 +1,7 @@
-from datetime import datetime
-from sqlalchemy import Column, Integer, String, CheckConstraint, DateTime
+from sqlalchemy import Column, Integer, String, CheckConstraint, DateTime, Index
 from .base import Base
+from .date_columns import timestamp_column
+from .utils import parse_date_time, format_date, cached_conversion
 
 
 class JobStatus(Base):
@@ -25,6 +26,8 @@ class JobStatus(Base):
     start = Column(String, nullable=False)
     #: End date for the rating - see comments about the start date
     end = Column(String, nullable=True)
+    #: Start time, in seconds since 1970-01-01, generated from the start date. See the date_columns module
+    startTimestamp = timestamp_column("startTimestamp", "start")
     #: Exit error, if any
     error = Column(String, nullable=True)
     #: Audit columns
@@ -34,7 +37,9 @@ class JobStatus(Base):
     date_updated = Column(DateTime, nullable=False)
 
     __table_args__ = (CheckConstraint("LENGTH(TRIM(name)) > 0"),
-                      CheckConstraint("LENGTH(TRIM(start)) > 0"))
+                      CheckConstraint("LENGTH(TRIM(start)) > 0"),
+                      Index("IX_JobStatuses_startTimestamp", "startTimestamp"))
+    __mapper_args__ = {"exclude_properties": ["startTimestamp"]}
 
     def __repr__(self):
         return f"{type(self).__name__}(id={self.id!r}, " \
@@ -46,7 +51,7 @@ class JobStatus(Base):
 
     @property
     def start_date(self):
-        return datetime.strptime(self.start, self.DATE_FORMAT)
+        return cached_conversion(self, "start_date", self.start, parse_date_time)
 
     @start_date.setter
     def start_date(self, value):
@@ -54,7 +59,7 @@ class JobStatus(Base):
 
     @property
     def end_date(self):
-        return datetime.strptime(self.end, self.DATE_FORMAT) if self.end is not None else None
+        return cached_conversion(self, "end_date", self.end, parse_date_time) if self.end is not None else None
 
     @end_date.setter
     def end_date(self, value):
@@ -72,9 +77,9 @@ class JobStatus(Base):
 
     @property
     def display_start_date(self):
-        return self.start_date.strftime(self.DISPLAY_DATE_FORMAT)
+        return format_date(self.start_date, self.DISPLAY_DATE_FORMAT)
 
     @property
     def display_end_date(self):
         date = self.end_date
-        return date.strftime(self.DISPLAY_DATE_FORMAT) if date else None
+        return format_date(date, self.DISPLAY_DATE_FORMAT) if date else None
@@ -0,0 +1,35 @@
+"""
+Declare the SQLite R*Tree spatial index over location coordinates. The following module-level variables are defined:
+
++---------------+------------------------------------------------------------------------+
+| **Name**      | **Comments**                                                           |
++---------------+------------------------------------------------------------------------+
+| LocationIndex | SQLAlchemy Table describing the R*Tree virtual table, used for queries |
++---------------+------------------------------------------------------------------------+
+
+The virtual table is created alongside the Locations table and holds a degenerate bounding box (a point) for each
+location that has a latitude and longitude. It's maintained by the location business logic rather than by the
+ORM, so the table definition is held in its own metadata collection to prevent create_all() attempting to create
+it as a regular table.
+"""
+
+from sqlalchemy import MetaData, Table, Column, Integer, Float, DDL, event
+from .location import Location
+
+_index_metadata = MetaData()
+
+#: Table definition for the R*Tree virtual table, used to build queries against it
+LocationIndex = Table(
+    "LocationIndex",
+    _index_metadata,
+    Column("id", Integer, primary_key=True),
+    Column("minLatitude", Float),
+    Column("maxLatitude", Float),
+    Column("minLongitude", Float),
+    Column("maxLongitude", Float))
+
+#: DDL to create the R*Tree virtual table
+CREATE_LOCATION_INDEX_DDL = "CREATE VIRTUAL TABLE IF NOT EXISTS LocationIndex " \
+                            "USING rtree(id, minLatitude, maxLatitude, minLongitude, maxLongitude)"
+
+event.listen(Location.__table__, "after_create", DDL(CREATE_LOCATION_INDEX_DDL))
@@ -0,0 +1,107 @@
+"""
+Database maintenance operations:
+
++--------------------+-------------------------------------------------------------------------------------------+
+| **Operation**      | **Comments**                                                                              |
++--------------------+-------------------------------------------------------------------------------------------+
+| backup_database    | Take a consistent copy of the database, while it's in use, using the SQLite backup API    |
++--------------------+-------------------------------------------------------------------------------------------+
+| optimise_database  | Refresh the statistics used by the query planner, for example after a bulk load           |
++--------------------+-------------------------------------------------------------------------------------------+
+| incremental_vacuum | Return free pages, left by deleted records, to the file system                            |
++--------------------+-------------------------------------------------------------------------------------------+
+
+Each operation uses its own connection, outside any unit of work.
+"""
+
+import os
+import sqlite3
+from contextlib import closing
+from .database import Engine
+
+#: Default number of pages copied in each step of a backup
+DEFAULT_BACKUP_PAGES = 256
+
+#: Default pause, in seconds, between the steps of a backup
+DEFAULT_BACKUP_STEP_DELAY = 0.01
+
+#: Default number of rows of each index examined when the database is analysed. This gives approximate statistics
+#: that are good enough for the query planner, without the cost of reading every index in full
+DEFAULT_ANALYSIS_LIMIT = 1000
+
+#: Value of PRAGMA auto_vacuum for incremental vacuuming
+_AUTO_VACUUM_INCREMENTAL = 2
+
+
+def backup_database(path, pages=DEFAULT_BACKUP_PAGES, step_delay=DEFAULT_BACKUP_STEP_DELAY):
+    """
+    Take a consistent copy of the database while it's in use. Pages are copied in steps, each in its own short read
+    transaction, with a pause between them, so writers aren't blocked for the duration of the backup. If another
+    connection writes to the database during the backup, SQLite restarts it so the copy remains consistent. The
+    copy's written to a temporary file that's renamed once it's complete, so an incomplete backup is never left at
+    the specified path
+
+    :param path: Path to the backup file, which is replaced if it exists
+    :param pages: Number of pages copied in each step
+    :param step_delay: Pause, in seconds, between steps
+    :return: Number of pages in the backup
+    :raises ValueError: If the number of pages per step isn't positive
+    """
+    if pages < 1:
+        raise ValueError("Number of pages per backup step must be positive")
+
+    folder = os.path.dirname(os.path.abspath(path))
+    if not os.path.exists(folder):
+        os.makedirs(folder)
+
+    temporary_path = f"{path}.partial"
+    source = Engine.raw_connection()
+    try:
+        with closing(sqlite3.connect(temporary_path)) as target:
+            source.driver_connection.backup(target, pages=pages, sleep=step_delay)
+            page_count = target.execute("PRAGMA page_count").fetchone()[0]
+    except BaseException:
+        if os.path.exists(temporary_path):
+            os.unlink(temporary_path)
+        raise
+    finally:
+        source.close()
+
+    os.replace(temporary_path, path)
+    return page_count
+
+
+def optimise_database(analysis_limit=DEFAULT_ANALYSIS_LIMIT):
+    """
+    Refresh the statistics the query planner uses to choose indexes. This should be run after a bulk load, as the
+    planner's choices are based on the statistics gathered when the database was last analysed
+
+    :param analysis_limit: Number of rows of each index to examine or 0 to examine every row
+    """
+    with Engine.connect() as connection:
+        connection.exec_driver_sql(f"PRAGMA analysis_limit={int(analysis_limit)}")
+        connection.exec_driver_sql("ANALYZE")
+        connection.exec_driver_sql("PRAGMA optimize")
+
+
+def incremental_vacuum(pages=None):
+    """
+    Return free pages to the file system. This needs the database to be in incremental auto-vacuum mode, which is
+    the case for databases created by create_database(). Existing databases are converted the first time this is
+    called, which needs a full VACUUM that rewrites the database file and blocks other connections while it runs
+
+    :param pages: Maximum number of pages to free or None to free them all
+    :return: Number of pages freed
+    """
+    with Engine.connect() as connection:
+        if connection.exec_driver_sql("PRAGMA auto_vacuum").scalar() != _AUTO_VACUUM_INCREMENTAL:
+            connection.exec_driver_sql(f"PRAGMA auto_vacuum={_AUTO_VACUUM_INCREMENTAL}")
+            connection.exec_driver_sql("VACUUM")
+
+        free_pages = connection.exec_driver_sql("PRAGMA freelist_count").scalar()
+
+        # The pragma frees one page each time its statement is stepped but the driver's execute() only steps once
+        # for statements that return no rows, so it's run as a script, which steps each statement to completion
+        argument = f"({int(pages)})" if pages else ""
+        connection.connection.driver_connection.executescript(f"PRAGMA incremental_vacuum{argument};")
+        return free_pages - connection.exec_driver_sql("PRAGMA freelist_count").scalar()
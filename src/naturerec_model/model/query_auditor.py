@@ -0,0 +1,209 @@
+"""
+Query auditing for development and testing. A QueryAuditor records the statements executed on the model's engine
+while it's active, so the number of statements issued by a logical operation can be checked and repeated
+statements with the same shape, typically the result of an N+1 loading pattern, can be identified. Statements that
+exceed a time threshold are logged at WARNING level with their query plan.
+
+For example:
+
+.. code-block:: python
+
+    with QueryAuditor("list_sightings") as audit:
+        sightings = list_sightings()
+    audit.assert_budget(1)
+
+or, equivalently:
+
+.. code-block:: python
+
+    with query_budget(1, name="list_sightings"):
+        sightings = list_sightings()
+
+Auditors may be nested, in which case statements are recorded by all active auditors in the current thread.
+"""
+
+import logging
+import re
+import threading
+import time
+from collections import Counter, namedtuple
+from contextlib import contextmanager
+import sqlalchemy as db
+from .database import Engine
+
+#: Default duration, in seconds, above which a statement is logged as slow
+DEFAULT_SLOW_QUERY_THRESHOLD = 0.1
+
+#: Statement executed while an auditor was active
+AuditedStatement = namedtuple("AuditedStatement", "statement shape duration")
+
+_logger = logging.getLogger(__name__)
+_active_auditors = threading.local()
+
+_WHITESPACE = re.compile(r"\s+")
+_PARAMETER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMERIC_LITERAL = re.compile(r"(?<![\w.])\d+(?:\.\d+)?(?![\w.])")
+
+
+class QueryBudgetExceeded(AssertionError):
+    """
+    Raised when an audited operation exceeds its query budget
+    """
+
+
+def statement_shape(statement):
+    """
+    Reduce a statement to its shape, so statements that differ only in the values they use compare equal
+
+    :param statement: SQL statement
+    :return: Normalised statement
+    """
+    shape = _WHITESPACE.sub(" ", statement).strip()
+    shape = _STRING_LITERAL.sub("?", shape)
+    shape = _NUMERIC_LITERAL.sub("?", shape)
+    return _PARAMETER_LIST.sub("(?)", shape)
+
+
+def _get_active_auditors():
+    """
+    Return the stack of auditors that are active in the current thread
+    """
+    if not hasattr(_active_auditors, "stack"):
+        _active_auditors.stack = []
+    return _active_auditors.stack
+
+
+class QueryAuditor:
+    """
+    Context manager that records the statements executed while it's active
+    """
+
+    def __init__(self, name="operation", slow_query_threshold=DEFAULT_SLOW_QUERY_THRESHOLD):
+        """
+        Initialiser
+
+        :param name: Name of the logical operation being audited, used in reports
+        :param slow_query_threshold: Duration, in seconds, above which statements are logged as slow
+        """
+        self.name = name
+        self.slow_query_threshold = slow_query_threshold
+        self.statements = []
+
+    def __enter__(self):
+        _get_active_auditors().append(self)
+        return self
+
+    def __exit__(self, *_):
+        _get_active_auditors().remove(self)
+        return False
+
+    @property
+    def statement_count(self):
+        """
+        Number of statements executed while the auditor was active
+        """
+        return len(self.statements)
+
+    def repeated_statements(self, min_count=2):
+        """
+        Return the statement shapes that were executed repeatedly
+
+        :param min_count: Minimum number of executions for a shape to be reported
+        :return: List of (shape, count) tuples, most frequent first
+        """
+        counts = Counter(statement.shape for statement in self.statements)
+        return [(shape, count) for shape, count in counts.most_common() if count >= min_count]
+
+    def report(self):
+        """
+        Return a summary of the audited statements, for logging and assertion messages
+
+        :return: Report text
+        """
+        total_duration = sum(statement.duration for statement in self.statements)
+        lines = [f"{self.name}: {self.statement_count} statement(s) in {total_duration * 1000:.1f} ms"]
+        for shape, count in self.repeated_statements():
+            lines.append(f"  Repeated {count} times: {shape}")
+        return "\n".join(lines)
+
+    def assert_budget(self, max_statements, max_repeats=1):
+        """
+        Confirm the audited operation stayed within its query budget
+
+        :param max_statements: Maximum number of statements the operation may execute
+        :param max_repeats: Maximum number of times any one statement shape may be executed
+        :raises QueryBudgetExceeded: If the operation exceeded its budget
+        """
+        repeated = self.repeated_statements(max_repeats + 1)
+        if self.statement_count > max_statements or repeated:
+            raise QueryBudgetExceeded(f"Query budget of {max_statements} statement(s), with at most {max_repeats} "
+                                      f"execution(s) of each, exceeded\n{self.report()}")
+
+    def _record(self, statement, duration):
+        self.statements.append(AuditedStatement(statement, statement_shape(statement), duration))
+
+
+@contextmanager
+def query_budget(max_statements, max_repeats=1, name="operation"):
+    """
+    Context manager that audits the statements executed within it and confirms they stay within a query budget
+
+    :param max_statements: Maximum number of statements that may be executed
+    :param max_repeats: Maximum number of times any one statement shape may be executed
+    :param name: Name of the logical operation being audited, used in reports
+    :raises QueryBudgetExceeded: If the budget is exceeded
+    """
+    with QueryAuditor(name) as auditor:
+        yield auditor
+    auditor.assert_budget(max_statements, max_repeats)
+
+
+def _explain(cursor, statement, parameters):
+    """
+    Return the query plan for a statement, using a new cursor on the same DBAPI connection so the engine's event
+    handlers aren't invoked
+
+    :return: Query plan text, one line per plan step
+    """
+    explain_cursor = cursor.connection.cursor()
+    try:
+        explain_cursor.execute(f"EXPLAIN QUERY PLAN {statement}", parameters)
+        return "\n".join(f"    {row[-1]}" for row in explain_cursor.fetchall())
+    finally:
+        explain_cursor.close()
+
+
+@db.event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(connection, *_):
+    """
+    Record the start time of statements executed while an auditor is active
+    """
+    if _get_active_auditors():
+        connection.info["audit_start_time"] = time.perf_counter()
+
+
+@db.event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(connection, cursor, statement, parameters, _, executemany):
+    """
+    Record statements executed while an auditor is active with each active auditor, logging slow statements
+    """
+    auditors = _get_active_auditors()
+    start_time = connection.info.pop("audit_start_time", None)
+    if not auditors or start_time is None:
+        return
+
+    duration = time.perf_counter() - start_time
+    for auditor in auditors:
+        auditor._record(statement, duration)
+
+    threshold = min(auditor.slow_query_threshold for auditor in auditors)
+    if duration > threshold:
+        plan = None
+        if not executemany and statement.lstrip().upper().startswith(("SELECT", "WITH")):
+            try:
+                plan = _explain(cursor, statement, parameters)
+            except Exception as e:
+                plan = f"    Unable to explain query: {e}"
+        _logger.warning("Slow query (%.1f ms) in %s: %s%s", duration * 1000, auditors[-1].name, statement,
+                        f"\n  Query plan:\n{plan}" if plan else "")
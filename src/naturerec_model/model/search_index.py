@@ -0,0 +1,82 @@
+"""
+Declare the SQLite FTS5 full-text indexes over sighting notes and species names. The following module-level
+variables are defined:
+
++----------------+-----------------------------------------------------------------------------+
+| **Name**       | **Comments**                                                                |
++----------------+-----------------------------------------------------------------------------+
+| SightingSearch | SQLAlchemy Table describing the FTS5 index over sighting notes              |
++----------------+-----------------------------------------------------------------------------+
+| SpeciesSearch  | SQLAlchemy Table describing the FTS5 index over species and scientific name |
++----------------+-----------------------------------------------------------------------------+
+
+Both indexes are "external content" tables, so the indexed text isn't duplicated. The database is shared with
+other applications, so the indexes are kept in sync with their content tables using triggers rather than by the
+business logic. As with the spatial index, the table definitions are held in their own metadata collection to
+prevent create_all() attempting to create them as regular tables.
+"""
+
+from sqlalchemy import MetaData, Table, Column, Integer, Float, String, DDL, event
+from .sighting import Sighting
+from .species import Species
+
+_search_metadata = MetaData()
+
+#: Table definition for the sighting notes full-text index, used to build queries against it
+SightingSearch = Table(
+    "SightingSearch",
+    _search_metadata,
+    Column("rowid", Integer, primary_key=True),
+    Column("notes", String),
+    Column("rank", Float))
+
+#: Table definition for the species name full-text index, used to build queries against it
+SpeciesSearch = Table(
+    "SpeciesSearch",
+    _search_metadata,
+    Column("rowid", Integer, primary_key=True),
+    Column("name", String),
+    Column("scientific_name", String),
+    Column("rank", Float))
+
+#: DDL to create the sighting notes index and the triggers that keep it in sync with the Sightings table
+CREATE_SIGHTING_SEARCH_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS SightingSearch "
+    "USING fts5(notes, content='Sightings', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS SightingSearch_AI AFTER INSERT ON Sightings BEGIN "
+    "INSERT INTO SightingSearch (rowid, notes) VALUES (new.id, new.notes); "
+    "END",
+    "CREATE TRIGGER IF NOT EXISTS SightingSearch_AD AFTER DELETE ON Sightings BEGIN "
+    "INSERT INTO SightingSearch (SightingSearch, rowid, notes) VALUES ('delete', old.id, old.notes); "
+    "END",
+    "CREATE TRIGGER IF NOT EXISTS SightingSearch_AU AFTER UPDATE OF notes ON Sightings BEGIN "
+    "INSERT INTO SightingSearch (SightingSearch, rowid, notes) VALUES ('delete', old.id, old.notes); "
+    "INSERT INTO SightingSearch (rowid, notes) VALUES (new.id, new.notes); "
+    "END"
+]
+
+#: DDL to create the species name index and the triggers that keep it in sync with the Species table. Prefix
+#: indexes are created to support autocompletion
+CREATE_SPECIES_SEARCH_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS SpeciesSearch "
+    "USING fts5(name, scientific_name, content='Species', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2', prefix='2 3 4')",
+    "CREATE TRIGGER IF NOT EXISTS SpeciesSearch_AI AFTER INSERT ON Species BEGIN "
+    "INSERT INTO SpeciesSearch (rowid, name, scientific_name) VALUES (new.id, new.name, new.scientific_name); "
+    "END",
+    "CREATE TRIGGER IF NOT EXISTS SpeciesSearch_AD AFTER DELETE ON Species BEGIN "
+    "INSERT INTO SpeciesSearch (SpeciesSearch, rowid, name, scientific_name) "
+    "VALUES ('delete', old.id, old.name, old.scientific_name); "
+    "END",
+    "CREATE TRIGGER IF NOT EXISTS SpeciesSearch_AU AFTER UPDATE OF name, scientific_name ON Species BEGIN "
+    "INSERT INTO SpeciesSearch (SpeciesSearch, rowid, name, scientific_name) "
+    "VALUES ('delete', old.id, old.name, old.scientific_name); "
+    "INSERT INTO SpeciesSearch (rowid, name, scientific_name) VALUES (new.id, new.name, new.scientific_name); "
+    "END"
+]
+
+for _statement in CREATE_SIGHTING_SEARCH_DDL:
+    event.listen(Sighting.__table__, "after_create", DDL(_statement))
+
+for _statement in CREATE_SPECIES_SEARCH_DDL:
+    event.listen(Species.__table__, "after_create", DDL(_statement))
@@ -1,8 +1,9 @@
-from datetime import datetime
-from sqlalchemy import Column, Integer, String, UniqueConstraint, ForeignKey, CheckConstraint, DateTime
+from sqlalchemy import Column, Integer, String, UniqueConstraint, ForeignKey, CheckConstraint, DateTime, Index
 from sqlalchemy.orm import relationship
 from .base import Base
 from .gender import Gender
+from .date_columns import day_number_column
+from .utils import parse_date, format_date, cached_conversion
 
 
 class Sighting(Base):
@@ -26,6 +27,8 @@ class Sighting(Base):
     #: this field is the one that's persisted to the DB the intention is that it should be accessed via
     #: the sighting_date property
     date = Column(String, nullable=False)
+    #: Day number of the sighting, generated from the date. See the date_columns module
+    dayNumber = day_number_column("dayNumber", "date")
     #: Number of distinct individuals seen
     number = Column(Integer, default=None, nullable=True)
     #: Whether or not young were seen
@@ -48,7 +51,9 @@ class Sighting(Base):
     __table_args__ = (UniqueConstraint('locationId', 'speciesId', 'date', name='SIGHTING_LOCATION_SPECIES_DATE_UX'),
                       CheckConstraint(gender.in_([Gender.UNKNOWN, Gender.MALE, Gender.FEMALE, Gender.BOTH])),
                       CheckConstraint(withYoung.in_([0, 1])),
-                      CheckConstraint("ifnull(number, 1) > 0"))
+                      CheckConstraint("ifnull(number, 1) > 0"),
+                      Index("IX_Sightings_dayNumber", "dayNumber"))
+    __mapper_args__ = {"exclude_properties": ["dayNumber"]}
 
     def __repr__(self):
         return f"{type(self).__name__}(Id={self.id!r}, " \
@@ -62,7 +67,7 @@ class Sighting(Base):
 
     @property
     def sighting_date(self):
-        return datetime.strptime(self.date, self.DATE_FORMAT).date()
+        return cached_conversion(self, "sighting_date", self.date, parse_date)
 
     @sighting_date.setter
     def sighting_date(self, value):
@@ -70,7 +75,8 @@ class Sighting(Base):
 
     @property
     def display_date(self):
-        return self.sighting_date.strftime(Sighting.DATE_DISPLAY_FORMAT)
+        return cached_conversion(self, "display_date", self.date,
+                                 lambda text: format_date(parse_date(text), Sighting.DATE_DISPLAY_FORMAT))
 
     @property
     def gender_name(self):
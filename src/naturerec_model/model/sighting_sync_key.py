@@ -0,0 +1,29 @@
+from sqlalchemy import Column, Integer, String, UniqueConstraint, ForeignKey, CheckConstraint, DateTime
+from .base import Base
+
+
+class SightingSyncKey(Base):
+    """
+    Class representing an idempotency key supplied with a sighting uploaded by a client, such as a field device
+    that records sightings offline. The key is recorded when the sighting's written, so the same upload can be
+    recognised, and ignored, if it's sent again
+    """
+    __tablename__ = "SightingSyncKeys"
+
+    #: Primary key
+    id = Column(Integer, primary_key=True)
+    #: Idempotency key generated by the client
+    idempotencyKey = Column(String, nullable=False)
+    #: Related sighting id. The key's kept if the sighting is deleted, so a repeated upload isn't applied again
+    sightingId = Column(Integer, ForeignKey("Sightings.id", ondelete="SET NULL"), nullable=True)
+    #: Audit columns
+    created_by = Column(Integer, nullable=False)
+    date_created = Column(DateTime, nullable=False)
+
+    __table_args__ = (UniqueConstraint("idempotencyKey", name="SIGHTING_SYNC_KEY_UX"),
+                      CheckConstraint("LENGTH(TRIM(idempotencyKey)) > 0"))
+
+    def __repr__(self):
+        return f"{type(self).__name__}(id={self.id!r}, " \
+               f"idempotencyKey={self.idempotencyKey!r}, " \
+               f"sightingId={self.sightingId!r})"
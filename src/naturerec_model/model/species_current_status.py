@@ -0,0 +1,127 @@
+"""
+Declare the cache of current species conservation statuses. Each row holds the rating that applies to a species
+in a region under one status scheme:
+
++-----------------------+--------------------------------------------------------------------------------+
+| **Column**            | **Contents**                                                                   |
++-----------------------+--------------------------------------------------------------------------------+
+| speciesId             | Species the status applies to                                                  |
++-----------------------+--------------------------------------------------------------------------------+
+| statusSchemeId        | Status scheme the rating belongs to                                            |
++-----------------------+--------------------------------------------------------------------------------+
+| region                | Region the rating applies to                                                   |
++-----------------------+--------------------------------------------------------------------------------+
+| speciesStatusRatingId | The species status rating in effect. Open-ended ratings take precedence, then  |
+|                       | the one that started most recently                                             |
++-----------------------+--------------------------------------------------------------------------------+
+| statusRatingId        | The rating's value on the scheme                                               |
++-----------------------+--------------------------------------------------------------------------------+
+| startDay, endDay      | Day numbers of the rating's start and end dates. See the date_columns module   |
++-----------------------+--------------------------------------------------------------------------------+
+
+The database is shared with other applications, so, as with the full-text indexes, the cache is kept in sync with
+the SpeciesStatusRatings table using triggers rather than by the business logic. Each insert, update or delete
+recomputes the row for the species, scheme and region affected. Databases that pre-date the cache are upgraded by
+the "add species current statuses" Alembic migration, which creates and populates it. If the cache's been bypassed,
+for example by restoring the ratings from a backup without the triggers, it can be repopulated using
+rebuild_species_current_statuses().
+"""
+
+from sqlalchemy import Column, Integer, String, ForeignKey, Index, DDL, event
+from sqlalchemy.orm import relationship
+from .base import Base
+
+
+class SpeciesCurrentStatus(Base):
+    """
+    Class representing the current conservation status of a species in a region under one status scheme. Rows
+    are maintained by triggers and must not be written by the application
+    """
+    __tablename__ = "SpeciesCurrentStatuses"
+
+    #: Related species Id
+    speciesId = Column(Integer, ForeignKey("Species.id"), primary_key=True)
+    #: Related scheme Id
+    statusSchemeId = Column(Integer, ForeignKey("StatusSchemes.id"), primary_key=True)
+    #: Region where the rating applies
+    region = Column(String, primary_key=True)
+    #: Related species status rating Id
+    speciesStatusRatingId = Column(Integer, ForeignKey("SpeciesStatusRatings.id"), nullable=False)
+    #: Related rating Id
+    statusRatingId = Column(Integer, ForeignKey("StatusRatings.id"), nullable=False)
+    #: Day numbers of the start and end dates of the rating
+    startDay = Column(Integer, nullable=False)
+    endDay = Column(Integer, nullable=True)
+
+    #: Related status rating
+    rating = relationship("StatusRating", lazy="joined")
+
+    __table_args__ = (Index("IX_SpeciesCurrentStatuses_startDay_endDay", "startDay", "endDay"),
+                      Index("IX_SpeciesCurrentStatuses_speciesStatusRatingId", "speciesStatusRatingId"))
+
+    def __repr__(self):
+        return f"{type(self).__name__}(speciesId={self.speciesId!r}, " \
+               f"statusSchemeId={self.statusSchemeId!r}, " \
+               f"region={self.region!r}, " \
+               f"speciesStatusRatingId={self.speciesStatusRatingId!r}, " \
+               f"statusRatingId={self.statusRatingId!r})"
+
+
+def _refresh_sql(row):
+    """
+    SQL that recomputes the current status for the species, scheme and region of a species status rating
+
+    :param row: Trigger row containing the species status rating, either "new" or "old"
+    :return: SQL statements, for use in a trigger body
+    """
+    scheme = f"(SELECT statusSchemeId FROM StatusRatings WHERE id = {row}.statusRatingId)"
+    return f"DELETE FROM SpeciesCurrentStatuses " \
+           f"WHERE speciesId = {row}.speciesId AND statusSchemeId = {scheme} AND region = {row}.region; " \
+           f"INSERT INTO SpeciesCurrentStatuses " \
+           f"(speciesId, statusSchemeId, region, speciesStatusRatingId, statusRatingId, startDay, endDay) " \
+           f"SELECT r.speciesId, s.statusSchemeId, r.region, r.id, r.statusRatingId, r.startDay, r.endDay " \
+           f"FROM SpeciesStatusRatings r JOIN StatusRatings s ON s.id = r.statusRatingId " \
+           f"WHERE r.speciesId = {row}.speciesId AND s.statusSchemeId = {scheme} AND r.region = {row}.region " \
+           f"ORDER BY r.\"end\" IS NULL DESC, r.startDay DESC, r.id DESC LIMIT 1; "
+
+
+#: DDL to create the triggers that keep the cache in sync with the SpeciesStatusRatings table
+CREATE_CURRENT_STATUS_TRIGGERS_DDL = [
+    "CREATE TRIGGER IF NOT EXISTS SpeciesCurrentStatuses_AI AFTER INSERT ON SpeciesStatusRatings BEGIN "
+    f"{_refresh_sql('new')}"
+    "END",
+    "CREATE TRIGGER IF NOT EXISTS SpeciesCurrentStatuses_AD AFTER DELETE ON SpeciesStatusRatings BEGIN "
+    f"{_refresh_sql('old')}"
+    "END",
+    "CREATE TRIGGER IF NOT EXISTS SpeciesCurrentStatuses_AU AFTER UPDATE ON SpeciesStatusRatings BEGIN "
+    f"{_refresh_sql('old')}"
+    f"{_refresh_sql('new')}"
+    "END"
+]
+
+#: SQL to populate the cache from the SpeciesStatusRatings table
+REBUILD_CURRENT_STATUSES_SQL = [
+    "DELETE FROM SpeciesCurrentStatuses",
+    "INSERT INTO SpeciesCurrentStatuses "
+    "(speciesId, statusSchemeId, region, speciesStatusRatingId, statusRatingId, startDay, endDay) "
+    "SELECT speciesId, statusSchemeId, region, id, statusRatingId, startDay, endDay FROM ("
+    "SELECT r.*, s.statusSchemeId, ROW_NUMBER() OVER ("
+    "PARTITION BY r.speciesId, s.statusSchemeId, r.region "
+    "ORDER BY r.\"end\" IS NULL DESC, r.startDay DESC, r.id DESC) AS position "
+    "FROM SpeciesStatusRatings r JOIN StatusRatings s ON s.id = r.statusRatingId) "
+    "WHERE position = 1"
+]
+
+for _statement in CREATE_CURRENT_STATUS_TRIGGERS_DDL:
+    event.listen(SpeciesCurrentStatus.__table__, "after_create", DDL(_statement))
+
+
+def rebuild_species_current_statuses(connection):
+    """
+    Populate the current status cache from the species status ratings, for example in a database created before
+    the cache was introduced
+
+    :param connection: SQLAlchemy connection to the database
+    """
+    for statement in REBUILD_CURRENT_STATUSES_SQL:
+        connection.exec_driver_sql(statement)
@@ -1,7 +1,8 @@
-from datetime import datetime
-from sqlalchemy import Column, Integer, String, ForeignKey, CheckConstraint, DateTime
+from sqlalchemy import Column, Integer, String, ForeignKey, CheckConstraint, DateTime, Index
 from sqlalchemy.orm import relationship
 from .base import Base
+from .date_columns import day_number_column
+from .utils import parse_date, format_date, cached_conversion
 
 
 class SpeciesStatusRating(Base):
@@ -14,7 +15,9 @@ class SpeciesStatusRating(Base):
 
     __tablename__ = "SpeciesStatusRatings"
     __table_args__ = (CheckConstraint("LENGTH(TRIM(region)) > 0"),
-                      CheckConstraint("(end IS NULL) or (end >= start)"))
+                      CheckConstraint("(end IS NULL) or (end >= start)"),
+                      Index("IX_SpeciesStatusRatings_speciesId_endDay", "speciesId", "endDay"))
+    __mapper_args__ = {"exclude_properties": ["startDay", "endDay"]}
 
     #: Primary key
     id = Column(Integer, primary_key=True)
@@ -31,6 +34,9 @@ class SpeciesStatusRating(Base):
     start = Column(String, nullable=False)
     #: End date for the rating - see comments about the start date
     end = Column(String, nullable=True)
+    #: Day numbers of the start and end dates, generated from them. See the date_columns module
+    startDay = day_number_column("startDay", "start")
+    endDay = day_number_column("endDay", "end")
     #: Audit columns
     created_by = Column(Integer, nullable=False)
     updated_by = Column(Integer, nullable=False)
@@ -52,7 +58,7 @@ class SpeciesStatusRating(Base):
 
     @property
     def start_date(self):
-        return datetime.strptime(self.start, self.DATE_FORMAT).date()
+        return cached_conversion(self, "start_date", self.start, parse_date)
 
     @start_date.setter
     def start_date(self, value):
@@ -60,7 +66,7 @@ class SpeciesStatusRating(Base):
 
     @property
     def end_date(self):
-        return datetime.strptime(self.end, self.DATE_FORMAT).date() if self.end is not None else None
+        return cached_conversion(self, "end_date", self.end, parse_date) if self.end is not None else None
 
     @end_date.setter
     def end_date(self, value):
@@ -68,9 +74,9 @@ class SpeciesStatusRating(Base):
 
     @property
     def display_start_date(self):
-        return self.start_date.strftime(self.DISPLAY_DATE_FORMAT)
+        return format_date(self.start_date, self.DISPLAY_DATE_FORMAT)
 
     @property
     def display_end_date(self):
         date = self.end_date
-        return date.strftime(self.DISPLAY_DATE_FORMAT) if date else None
+        return format_date(date, self.DISPLAY_DATE_FORMAT) if date else None
@@ -1,8 +1,22 @@
 """
-Data file management utilities
+Data file management utilities and the date codec used by the model classes.
+
+The database is shared with the .NET application, whose schema stores dates as TEXT in the fixed form
+YYYY-MM-DD HH:MM:SS. The date properties of the model classes are read for every row when lists are rendered and
+exported, so the codec parses that form by slicing rather than with strptime() and memoises parsed and formatted
+values in bounded LRU caches, as a database holds relatively few distinct dates. The model classes also cache
+converted values on each instance, via cached_conversion(), until the underlying text changes.
 """
 
+import datetime
 import os
+from functools import lru_cache
+
+#: Number of distinct parsed and formatted dates held in each of the codec's caches
+DATE_CACHE_SIZE = 16384
+
+#: Positions of the separators in the stored date layout, YYYY-MM-DD HH:MM:SS
+_DATE_SEPARATORS = ((4, "-"), (7, "-"), (10, " "), (13, ":"), (16, ":"))
 
 
 def get_project_path():
@@ -26,3 +40,66 @@ def get_data_path():
         if not os.path.exists(data_folder):
             os.makedirs(data_folder)
     return data_folder
+
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def parse_date_time(text):
+    """
+    Parse a stored date, in the form YYYY-MM-DD HH:MM:SS, to a date/time
+
+    :param text: Text to parse
+    :return: Date/time
+    :raises ValueError: If the text isn't in the expected form or isn't a valid date/time
+    """
+    if len(text) != 19 or any(text[i] != separator for i, separator in _DATE_SEPARATORS):
+        raise ValueError(f"Invalid date '{text}'")
+
+    return datetime.datetime(int(text[0:4]), int(text[5:7]), int(text[8:10]),
+                             int(text[11:13]), int(text[14:16]), int(text[17:19]))
+
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def parse_date(text):
+    """
+    Parse a stored date, in the form YYYY-MM-DD HH:MM:SS, to a date
+
+    :param text: Text to parse
+    :return: Date
+    :raises ValueError: If the text isn't in the expected form or isn't a valid date
+    """
+    return parse_date_time(text).date()
+
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def format_date(value, date_format):
+    """
+    Format a date or date/time
+
+    :param value: Date or date/time to format
+    :param date_format: strftime() format string
+    :return: Formatted date
+    """
+    return value.strftime(date_format)
+
+
+def cached_conversion(instance, name, text, convert):
+    """
+    Convert a stored value using a conversion function, caching the result on the instance until the stored value
+    changes
+
+    :param instance: Model instance holding the stored value
+    :param name: Name identifying the conversion, unique for the instance's class
+    :param text: Stored value
+    :param convert: Callable that converts the stored value
+    :return: Converted value
+    """
+    cache = instance.__dict__.get("_converted_values")
+    if cache is None:
+        # The cache isn't a mapped attribute, so it's set directly rather than through the ORM's instrumentation
+        cache = instance.__dict__["_converted_values"] = {}
+
+    entry = cache.get(name)
+    if entry is None or entry[0] != text:
+        entry = cache[name] = (text, convert(text))
+
+    return entry[1]
@@ -0,0 +1,259 @@
+"""
+Group commit write queue. SQLite allows one writer at a time, so threads that write in their own transactions wait
+for the database lock in turn and each pays for its own commit. The write queue runs write operations submitted by
+any thread on a single writer thread, which groups them into shared transactions. It takes the first waiting
+operation, collects any others submitted within a latency budget, up to a maximum batch size, then runs them all in
+one unit of work and commits once. Each operation runs in its own savepoint, so an operation that fails is rolled
+back without affecting the rest of its batch. If the database is locked, the whole batch is retried.
+
+Callers receive a Future that's resolved once the operation's batch has been committed:
+
+.. code-block:: python
+
+    future = submit_write(create_sighting, location_id, species_id, date, 1, Gender.UNKNOWN, False, None, user)
+    sighting = future.result()
+
+A caller mustn't wait for a queued operation while its own unit of work holds uncommitted changes, as the writer
+thread can't write until that unit of work ends. Operations submitted from the writer thread, for example by an
+operation that's already queued, are run immediately as part of the current batch and their futures are resolved
+straight away.
+"""
+
+import atexit
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from .database import begin_unit_of_work, end_unit_of_work, current_unit_of_work
+from .busy_retry import call_with_busy_retry, is_busy_error
+
+#: Default maximum number of operations committed in one transaction
+DEFAULT_MAX_BATCH_SIZE = 100
+
+#: Default time, in seconds, the writer waits for more operations to join a batch before committing it
+DEFAULT_MAX_LATENCY = 0.005
+
+_default_queue = None
+_default_queue_lock = threading.Lock()
+
+
+class WriteQueue:
+    """
+    Queue of write operations that are run, in the order submitted, on a dedicated writer thread
+    """
+
+    def __init__(self, max_batch_size=DEFAULT_MAX_BATCH_SIZE, max_latency=DEFAULT_MAX_LATENCY):
+        """
+        Initialiser
+
+        :param max_batch_size: Maximum number of operations committed in one transaction
+        :param max_latency: Time, in seconds, to wait for more operations to join a batch before committing it
+        :raises ValueError: If the batch size is less than 1 or the latency is negative
+        """
+        if max_batch_size < 1:
+            raise ValueError("Maximum batch size must be at least 1")
+
+        if max_latency < 0:
+            raise ValueError("Maximum latency cannot be negative")
+
+        self.max_batch_size = max_batch_size
+        self.max_latency = max_latency
+        self.operation_count = 0
+        self.batch_count = 0
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        """
+        Reset the queue and writer thread. This is also needed in a process forked from one that's used the queue,
+        as the writer thread isn't copied to the child
+        """
+        self._pid = os.getpid()
+        self._queue = queue.Queue()
+        self._thread = None
+
+    @property
+    def mean_batch_size(self):
+        """
+        Mean number of operations committed in each transaction
+        """
+        return self.operation_count / self.batch_count if self.batch_count else 0.0
+
+    def start(self):
+        """
+        Start the writer thread, if it isn't already running. This is called automatically when an operation's
+        submitted
+        """
+        with self._lock:
+            if self._pid != os.getpid():
+                self._reset()
+
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="WriteQueue", daemon=True)
+                self._thread.start()
+
+    def stop(self, timeout=None):
+        """
+        Stop the writer thread once the operations that have already been submitted have been written. Operations
+        submitted while the queue's stopping are written when it's next started
+
+        :param timeout: Maximum time, in seconds, to wait for the writer thread to stop or None to wait indefinitely
+        """
+        with self._lock:
+            thread = self._thread if self._pid == os.getpid() else None
+
+        if thread is not None and thread.is_alive():
+            self._queue.put(None)
+            thread.join(timeout)
+
+    def submit(self, fn, *args, **kwargs):
+        """
+        Submit a write operation
+
+        :param fn: Callable that performs the write, typically a logic function
+        :param args: Positional arguments for the callable
+        :param kwargs: Keyword arguments for the callable
+        :return: Future resolved with the callable's return value once the write has been committed
+        """
+        future = Future()
+        if threading.current_thread() is self._thread:
+            future.set_running_or_notify_cancel()
+            self._resolve(future, *self._run_operation(fn, args, kwargs))
+            return future
+
+        self.start()
+        self._queue.put((future, fn, args, kwargs))
+        return future
+
+    def _run(self):
+        """
+        Writer thread loop, which writes batches of operations until the queue's stopped
+        """
+        stopping = False
+        while not stopping:
+            operation = self._queue.get()
+            if operation is None:
+                break
+
+            batch = [operation]
+            stopping = self._collect_batch(batch)
+            self._write_batch(batch)
+
+    def _collect_batch(self, batch):
+        """
+        Add operations submitted within the latency budget to a batch, until it's full
+
+        :param batch: List of operations in the batch, which is extended in place
+        :return: True if the queue was stopped while collecting the batch
+        """
+        deadline = time.monotonic() + self.max_latency
+        while len(batch) < self.max_batch_size:
+            try:
+                remaining = deadline - time.monotonic()
+                operation = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+
+            if operation is None:
+                return True
+
+            batch.append(operation)
+
+        return False
+
+    @staticmethod
+    def _run_operation(fn, args, kwargs):
+        """
+        Run one operation within a savepoint in the current unit of work. If the database is locked, the error's
+        raised so the whole batch can be retried
+
+        :return: Tuple of the operation's result, or None if it failed, and the exception it raised or None
+        """
+        try:
+            with current_unit_of_work().begin_nested():
+                result = fn(*args, **kwargs)
+        except Exception as e:
+            if is_busy_error(e):
+                raise
+            return None, e
+
+        return result, None
+
+    @staticmethod
+    def _resolve(future, result, exception):
+        """
+        Resolve an operation's future with its result or the exception it raised
+        """
+        if exception is None:
+            future.set_result(result)
+        else:
+            future.set_exception(exception)
+
+    def _run_batch(self, batch):
+        """
+        Run a batch of operations in a single unit of work and commit them
+
+        :param batch: List of (future, callable, args, kwargs) tuples
+        :return: List of (future, result, exception) tuples
+        """
+        try:
+            begin_unit_of_work()
+            outcomes = [(future, *self._run_operation(fn, args, kwargs)) for future, fn, args, kwargs in batch]
+            end_unit_of_work()
+        except BaseException:
+            end_unit_of_work(commit=False)
+            raise
+
+        return outcomes
+
+    def _write_batch(self, batch):
+        """
+        Write a batch of operations, retrying the whole batch if the database is locked, then resolve their futures
+
+        :param batch: List of (future, callable, args, kwargs) tuples
+        """
+        # Operations whose futures have been cancelled are skipped
+        batch = [operation for operation in batch if operation[0].set_running_or_notify_cancel()]
+        if not batch:
+            return
+
+        try:
+            outcomes = call_with_busy_retry(self._run_batch, batch)
+        except BaseException as e:
+            # If the batch can't be committed, none of its operations have been written
+            for future, _, __, ___ in batch:
+                future.set_exception(e)
+            return
+
+        self.operation_count += len(outcomes)
+        self.batch_count += 1
+        for outcome in outcomes:
+            self._resolve(*outcome)
+
+
+def get_write_queue():
+    """
+    Return the application's shared write queue, creating it if necessary. Operations still in the queue when the
+    application exits are written before it does
+
+    :return: WriteQueue instance
+    """
+    global _default_queue
+    with _default_queue_lock:
+        if _default_queue is None:
+            _default_queue = WriteQueue()
+            atexit.register(_default_queue.stop)
+    return _default_queue
+
+
+def submit_write(fn, *args, **kwargs):
+    """
+    Submit a write operation to the application's shared write queue
+
+    :param fn: Callable that performs the write, typically a logic function
+    :param args: Positional arguments for the callable
+    :param kwargs: Keyword arguments for the callable
+    :return: Future resolved with the callable's return value once the write has been committed
+    """
+    return get_write_queue().submit(fn, *args, **kwargs)
@@ -4,6 +4,7 @@ from flask_login import LoginManager
 from flask_wtf.csrf import CSRFProtect
 from .home import home_bp
 from .sightings import sightings_bp
+from .sightings.sightings_blueprint import sync
 from .export import export_bp
 from .locations import locations_bp
 from .categories import categories_bp
@@ -11,7 +12,9 @@ from .species import species_bp
 from .status import status_bp
 from .species_ratings import species_ratings_bp
 from .jobs import jobs_bp
+from .metrics import metrics_bp, init_request_timing, init_query_audit
 from .auth import auth_bp, unauthorised, has_roles
+from .unit_of_work import init_unit_of_work
 from naturerec_model.logic import get_user
 
 
@@ -36,6 +39,17 @@ def create_app(environment="production"):
         PERMANENT_SESSION_LIFETIME=600
     )
 
+    # Register the request timing instrumentation first, so it times all the other request handling
+    init_request_timing(app)
+
+    # Outside production, audit the queries executed by each request to identify N+1 loading patterns
+    if environment != "production":
+        init_query_audit(app)
+
+    # Handle each request that can modify data in a single unit of work, so its logic calls share a session and
+    # transaction that holds the database's write lock until the response is ready
+    init_unit_of_work(app)
+
     # Register the blueprints
     app.secret_key = os.environ["SECRET_KEY"]
     app.register_blueprint(home_bp, url_prefix="")
@@ -48,6 +62,7 @@ def create_app(environment="production"):
     app.register_blueprint(species_ratings_bp, url_prefix='/species_ratings')
     app.register_blueprint(jobs_bp, url_prefix='/jobs')
     app.register_blueprint(auth_bp, url_prefix='/auth')
+    app.register_blueprint(metrics_bp, url_prefix='/metrics')
 
     # Register the 401 Unathorised error handler
     app.register_error_handler(401, unauthorised)
@@ -57,8 +72,10 @@ def create_app(environment="production"):
     login_manager.login_view = 'auth.login'
     login_manager.init_app(app)
 
-    # Enable CSRF protection
+    # Enable CSRF protection. The sightings sync API is exempt as it only accepts JSON request bodies, which
+    # browsers won't send cross-site, and is called by clients that authenticate using HTTP basic authentication
     csrf.init_app(app)
+    csrf.exempt(sync)
 
     @login_manager.user_loader
     def load_user(user_id):
@@ -5,4 +5,5 @@ environment = sys.argv[1] if len(sys.argv) > 1 else "development"
 if environment == "development":
     create_app(environment).run(debug=True, use_reloader=True)
 else:
-    create_app(environment).run(host="0.0.0.0")
+    from naturerec_web.server import serve
+    serve(create_app(environment))
@@ -1,7 +1,9 @@
 from naturerec_web.auth.auth_blueprint import auth_bp, unauthorised
 from naturerec_web.auth.requires_roles import has_roles, requires_roles
+from naturerec_web.auth.basic_auth import allows_basic_auth
 
 __all__ = [
+    "allows_basic_auth",
     "auth_bp",
     "has_roles",
     "requires_roles",
@@ -2,11 +2,13 @@ from flask import Blueprint, render_template, request, redirect
 from flask_login import login_user, logout_user, current_user
 from naturerec_model.logic import authenticate
 from naturerec_web.auth.requires_roles import has_roles
+from naturerec_web.unit_of_work import without_unit_of_work
 
 auth_bp = Blueprint("auth", __name__, template_folder='templates')
 
 
 @auth_bp.route('/login', methods=["GET", "POST"])
+@without_unit_of_work
 def login():
     """
     Show the login form and authenticate when the user attempts to login
@@ -0,0 +1,30 @@
+from functools import wraps
+from flask import abort, request, current_app
+from flask_login import current_user
+from naturerec_model.logic import authenticate
+
+
+def allows_basic_auth(f):
+    """
+    Decorator allowing clients that haven't logged in to call a view using HTTP basic authentication. The user is
+    authenticated for the current request only and no session is created, so the credentials can't be used to
+    access any other view. It should be applied before login_required and any role checks
+
+    :param f: View function
+    :return: Decorated view function
+    """
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        credentials = request.authorization
+        if not current_user.is_authenticated and credentials is not None and credentials.type == "basic":
+            try:
+                user = authenticate(credentials.username, credentials.password)
+            except ValueError:
+                return abort(401)
+
+            # Make the user the current user for this request, as login_user does, without storing them in the session
+            current_app.login_manager._update_request_context_with_user(user)
+
+        return f(*args, **kwargs)
+
+    return decorated_function
@@ -5,6 +5,7 @@ The categories blueprint supplies view functions and templates for species categ
 from flask import Blueprint, render_template, request, redirect, abort
 from flask_login import login_required, current_user
 from naturerec_model.logic import list_categories, get_category, create_category, update_category, delete_category
+from naturerec_model.logic import LoaderView
 from naturerec_web.auth import requires_roles
 from naturerec_web.auth.requires_roles import has_roles
 from naturerec_web.request_utils import get_posted_int
@@ -20,7 +21,7 @@ def _render_category_editing_page(category_id, error):
     :param error: Error message to display on the page or None
     :return: The rendered category editing template
     """
-    category = get_category(category_id) if category_id else None
+    category = get_category(category_id, LoaderView.MINIMAL) if category_id else None
     return render_template("categories/edit.html",
                            category=category,
                            error=error)
@@ -49,7 +50,7 @@ def list_all():
             error = e
 
     return render_template("categories/list.html",
-                           categories=list_categories(),
+                           categories=list_categories(LoaderView.MINIMAL),
                            edit_enabled=is_admin,
                            error=error)
 
@@ -1,15 +1,17 @@
 """
-The export blueprint supplies view functions and templates for exporting sightings
+The export blueprint supplies view functions and templates for exporting sightings and data quality reports
 """
 
 from flask import Blueprint, render_template, request
 from flask_login import login_required, current_user
 from naturerec_model.logic import list_locations
 from naturerec_model.logic import list_categories
-from naturerec_model.data_exchange import SightingsExportHelper
+from naturerec_model.logic import LoaderView
+from naturerec_model.data_exchange import SightingsExportHelper, DuplicateLocationsReportHelper
 from naturerec_model.model import Sighting
 from naturerec_web.request_utils import get_posted_date, get_posted_int
 from naturerec_web.auth import requires_roles
+from naturerec_web.unit_of_work import without_unit_of_work
 
 export_bp = Blueprint("export", __name__, template_folder='templates')
 
@@ -39,13 +41,14 @@ def _render_export_filters_page(from_date=None,
                            location_id=location_id,
                            category_id=category_id,
                            species_id=species_id,
-                           locations=list_locations(),
-                           categories=list_categories(),
+                           locations=list_locations(view=LoaderView.MINIMAL),
+                           categories=list_categories(LoaderView.MINIMAL),
                            action_button_label="Export Sightings",
                            edit_enabled=True)
 
 
 @export_bp.route("/filters", methods=["GET", "POST"])
+@without_unit_of_work
 @login_required
 @requires_roles(["Administrator"])
 def export():
@@ -72,3 +75,22 @@ def export():
         return _render_export_filters_page(from_date, to_date, location_id, category_id, species_id, message)
     else:
         return _render_export_filters_page()
+
+
+@export_bp.route("/duplicate_locations", methods=["GET", "POST"])
+@without_unit_of_work
+@login_required
+@requires_roles(["Administrator"])
+def export_duplicate_locations():
+    """
+    Show the page that starts the candidate duplicate locations report
+
+    :return: The HTML for the duplicate locations report page
+    """
+    message = None
+    if request.method == "POST":
+        reporter = DuplicateLocationsReportHelper(request.form["filename"], current_user)
+        reporter.start()
+        message = "Candidate duplicate locations are being reported in the background"
+
+    return render_template("export/duplicate_locations.html", message=message)
@@ -4,8 +4,9 @@ The locations blueprint supplies view functions and templates for location manag
 
 from flask import Blueprint, render_template, request, redirect, abort
 from flask_login import login_required, current_user
-from naturerec_model.logic import list_locations, get_location, create_location, update_location, geocode_postcode, \
+from naturerec_model.logic import list_location_records, get_location, create_location, update_location, geocode_postcode, \
     delete_location
+from naturerec_model.logic import LoaderView
 from naturerec_web.auth import requires_roles, has_roles
 from naturerec_web.request_utils import get_posted_float, get_posted_int
 
@@ -20,7 +21,7 @@ def _render_location_editing_page(location_id, error):
     :param error: Error message to display on the page or None
     :return: The rendered location editing template
     """
-    location = get_location(location_id) if location_id else None
+    location = get_location(location_id, LoaderView.DISPLAY) if location_id else None
     return render_template("locations/edit.html",
                            location=location,
                            error=error)
@@ -49,7 +50,7 @@ def list_all():
             error = e
 
     return render_template("locations/list.html",
-                           locations=list_locations(),
+                           locations=list_location_records(),
                            edit_enabled=is_admin,
                            error=error)
 
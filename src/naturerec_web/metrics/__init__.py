@@ -0,0 +1,9 @@
+from naturerec_web.metrics.metrics_blueprint import metrics_bp
+from naturerec_web.metrics.request_timing import init_request_timing
+from naturerec_web.metrics.query_audit import init_query_audit
+
+__all__ = [
+    "metrics_bp",
+    "init_request_timing",
+    "init_query_audit"
+]
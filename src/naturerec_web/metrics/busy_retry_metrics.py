@@ -0,0 +1,31 @@
+"""
+This module exposes the counts of database operations retried because the database was locked, in Prometheus text
+format. The counts are held in memory by each process. When the application is served by multiple worker
+processes, they're combined using the shared_metrics module.
+"""
+
+from naturerec_model.model import busy_retry_counters
+
+#: Metric names and help text for each of the retry counters
+BUSY_RETRY_METRICS = [
+    ("retries", "naturerec_db_busy_retries_total",
+     "Database operations retried because the database was locked"),
+    ("recoveries", "naturerec_db_busy_recoveries_total",
+     "Database operations that succeeded after being retried"),
+    ("failures", "naturerec_db_busy_failures_total",
+     "Database operations that failed because the database was still locked at the retry deadline")
+]
+
+
+def busy_retry_exposition(counters=None):
+    """
+    Render the retry counters in Prometheus text exposition format
+
+    :param counters: Dictionary of counter values, keyed by counter name, or None to render this process's counters
+    :return: List of lines in the exposition
+    """
+    counters = busy_retry_counters()._asdict() if counters is None else counters
+    lines = []
+    for counter, name, description in BUSY_RETRY_METRICS:
+        lines.extend([f"# HELP {name} {description}", f"# TYPE {name} counter", f"{name} {counters[counter]}"])
+    return lines
@@ -0,0 +1,114 @@
+"""
+This module implements thread-safe latency histograms with Prometheus text format exposition
+"""
+
+import bisect
+import threading
+
+#: Default histogram bucket upper bounds, in seconds, matching the Prometheus client library defaults
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0)
+
+
+def _format_labels(labels):
+    """
+    Format a set of labels for a Prometheus sample
+
+    :param labels: Sequence of (name, value) tuples
+    :return: Formatted label set, including the enclosing braces
+    """
+    escaped = [(name, str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+               for name, value in labels]
+    return "{" + ",".join(f'{name}="{value}"' for name, value in escaped) + "}"
+
+
+def merge_snapshots(snapshots):
+    """
+    Merge snapshots of the same histogram, for example taken in different processes
+
+    :param snapshots: Iterable of snapshots, as returned by LatencyHistogram.snapshot()
+    :return: Snapshot holding the combined bucket counts and sums for each set of label values
+    """
+    merged = {}
+    for snapshot in snapshots:
+        for labels, (counts, total) in snapshot.items():
+            if labels in merged:
+                merged_counts, merged_total = merged[labels]
+                merged[labels] = ([a + b for a, b in zip(merged_counts, counts)], merged_total + total)
+            else:
+                merged[labels] = (list(counts), total)
+    return merged
+
+
+class LatencyHistogram:
+    """
+    Histogram of observed values, partitioned by a set of labels
+    """
+
+    def __init__(self, name, description, label_names, buckets=DEFAULT_BUCKETS):
+        """
+        Initialiser
+
+        :param name: Metric name
+        :param description: Help text for the metric
+        :param label_names: Names of the labels used to partition observations
+        :param buckets: Ascending sequence of bucket upper bounds
+        """
+        self.name = name
+        self.description = description
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        """
+        Record an observation
+
+        :param value: Observed value
+        :param label_values: Values for each of the histogram's labels, in order
+        """
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def snapshot(self):
+        """
+        Return a copy of the current state of the histogram
+
+        :return: Dictionary of label values to a tuple of (bucket counts, sum), where the final bucket count is for
+                 values above the largest bucket bound
+        """
+        with self._lock:
+            return {labels: (list(counts), total) for labels, (counts, total) in self._series.items()}
+
+    def reset(self):
+        """
+        Discard all observations
+        """
+        with self._lock:
+            self._series.clear()
+
+    def exposition(self, snapshot=None):
+        """
+        Render the histogram in Prometheus text exposition format
+
+        :param snapshot: Snapshot of the histogram to render or None to render its current state
+        :return: List of lines in the exposition
+        """
+        snapshot = self.snapshot() if snapshot is None else snapshot
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} histogram"]
+        for label_values, (counts, total) in sorted(snapshot.items()):
+            labels = list(zip(self.label_names, label_values))
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_format_labels(labels + [('le', repr(float(bound)))])} {cumulative}")
+            cumulative += counts[-1]
+            lines.append(f"{self.name}_bucket{_format_labels(labels + [('le', '+Inf')])} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(labels)} {total!r}")
+            lines.append(f"{self.name}_count{_format_labels(labels)} {cumulative}")
+        return lines
@@ -0,0 +1,26 @@
+"""
+The metrics blueprint exposes request timing metrics and database retry counters in Prometheus text format
+"""
+
+from flask import Blueprint, Response
+from flask_login import login_required
+from naturerec_web.auth import requires_roles
+from naturerec_web.metrics.request_timing import metrics_exposition
+
+metrics_bp = Blueprint("metrics", __name__)
+
+#: Content type for the Prometheus text exposition format
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@metrics_bp.route("/")
+@login_required
+@requires_roles(["Administrator"])
+def metrics():
+    """
+    Return the per-endpoint request timing histograms. When the application's served by multiple worker processes,
+    the metrics for all the workers are merged, provided they share a metrics folder. See the shared_metrics module
+
+    :return: Response containing the metrics in Prometheus text format
+    """
+    return Response(metrics_exposition(), content_type=PROMETHEUS_CONTENT_TYPE)
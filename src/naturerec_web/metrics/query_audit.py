@@ -0,0 +1,40 @@
+"""
+This module implements per-request query auditing for development. Each request is audited using a QueryAuditor
+and, if the request executes the same statement shape repeatedly, which usually indicates an N+1 loading pattern,
+a report is logged at WARNING level. Slow statements are logged with their query plan by the auditor itself.
+"""
+
+import logging
+from flask import g, request
+from naturerec_model.model import QueryAuditor
+
+_logger = logging.getLogger(__name__)
+
+
+def _start_query_audit():
+    """
+    Start auditing the queries executed by a request
+    """
+    g.query_auditor = QueryAuditor(request.endpoint or "unmatched").__enter__()
+
+
+def _finish_query_audit(_):
+    """
+    Stop auditing the queries executed by a request, reporting repeated statements
+    """
+    auditor = g.pop("query_auditor", None)
+    if auditor is not None:
+        auditor.__exit__(None, None, None)
+        if auditor.repeated_statements():
+            _logger.warning("Repeated statements in %s %s\n%s", request.method, request.path, auditor.report())
+
+
+def init_query_audit(app):
+    """
+    Register per-request query auditing with a Flask application. This adds overhead to every request so isn't
+    intended for production use
+
+    :param app: Flask application
+    """
+    app.before_request(_start_query_audit)
+    app.teardown_request(_finish_query_audit)
@@ -0,0 +1,173 @@
+"""
+This module implements request timing instrumentation. For each request, it records the wall time, the time spent
+executing database queries, the number of queries and the time spent rendering templates. These are returned to
+the client in a Server-Timing header and aggregated into per-endpoint histograms.
+
+Metrics are held in memory by each process. When the application is served by multiple worker processes, they're
+shared between the workers using the shared_metrics module, so the metrics endpoint reports on the requests handled
+by all of them.
+"""
+
+import time
+import sqlalchemy as db
+from flask import g, request, has_request_context, before_render_template, template_rendered
+from naturerec_model.model import Engine
+from .latency_histogram import LatencyHistogram
+from .busy_retry_metrics import busy_retry_exposition
+from .shared_metrics import metrics_directory, save_metrics, load_metrics
+
+#: Wall time for each request, by endpoint, method and status code
+REQUEST_DURATION = LatencyHistogram("naturerec_request_duration_seconds",
+                                    "Request wall time in seconds",
+                                    ["endpoint", "method", "status"])
+
+#: Time spent executing database queries for each request, by endpoint
+REQUEST_DB_DURATION = LatencyHistogram("naturerec_request_db_duration_seconds",
+                                       "Database query time per request in seconds",
+                                       ["endpoint"])
+
+#: Time spent rendering templates for each request, by endpoint
+REQUEST_RENDER_DURATION = LatencyHistogram("naturerec_request_render_duration_seconds",
+                                           "Template rendering time per request in seconds",
+                                           ["endpoint"])
+
+#: Number of database queries executed for each request, by endpoint
+REQUEST_QUERY_COUNT = LatencyHistogram("naturerec_request_queries",
+                                       "Database queries executed per request",
+                                       ["endpoint"],
+                                       buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500))
+
+#: All the histograms maintained by the request timing instrumentation
+HISTOGRAMS = [REQUEST_DURATION, REQUEST_DB_DURATION, REQUEST_RENDER_DURATION, REQUEST_QUERY_COUNT]
+
+
+class RequestTimings:
+    """
+    Timings accumulated over the course of a single request
+    """
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.db_time = 0.0
+        self.query_count = 0
+        self.render_time = 0.0
+        self._render_start = None
+
+    def start_render(self):
+        self._render_start = time.perf_counter()
+
+    def end_render(self):
+        if self._render_start is not None:
+            self.render_time += time.perf_counter() - self._render_start
+            self._render_start = None
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self.start
+
+
+def current_timings():
+    """
+    Return the timings for the current request
+
+    :return: RequestTimings instance or None if there's no request context or timing hasn't started
+    """
+    return g.get("request_timings") if has_request_context() else None
+
+
+@db.event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(connection, *_):
+    """
+    Record the start time of a query executed on behalf of a request
+    """
+    if current_timings() is not None:
+        connection.info["query_start_time"] = time.perf_counter()
+
+
+@db.event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(connection, *_):
+    """
+    Add the duration of a query executed on behalf of a request to that request's timings
+    """
+    timings = current_timings()
+    start_time = connection.info.pop("query_start_time", None)
+    if timings is not None and start_time is not None:
+        timings.db_time += time.perf_counter() - start_time
+        timings.query_count += 1
+
+
+def _start_request_timing():
+    """
+    Start timing a request
+    """
+    g.request_timings = RequestTimings()
+
+
+def _before_render_template(*_, **__):
+    """
+    Signal handler called before a template is rendered
+    """
+    timings = current_timings()
+    if timings is not None:
+        timings.start_render()
+
+
+def _template_rendered(*_, **__):
+    """
+    Signal handler called after a template has been rendered
+    """
+    timings = current_timings()
+    if timings is not None:
+        timings.end_render()
+
+
+def _finish_request_timing(response):
+    """
+    Add the Server-Timing header to the response and record the request's timings in the histograms
+
+    :param response: Response object
+    :return: Response object with the Server-Timing header set
+    """
+    timings = current_timings()
+    if timings is None:
+        return response
+
+    elapsed = timings.elapsed
+    response.headers["Server-Timing"] = f"app;dur={elapsed * 1000:.1f}, " \
+                                        f"db;dur={timings.db_time * 1000:.1f};desc=\"{timings.query_count} queries\", " \
+                                        f"render;dur={timings.render_time * 1000:.1f}"
+
+    endpoint = request.endpoint or "unmatched"
+    REQUEST_DURATION.observe(elapsed, endpoint, request.method, str(response.status_code))
+    REQUEST_DB_DURATION.observe(timings.db_time, endpoint)
+    REQUEST_RENDER_DURATION.observe(timings.render_time, endpoint)
+    REQUEST_QUERY_COUNT.observe(timings.query_count, endpoint)
+    save_metrics(HISTOGRAMS)
+    return response
+
+
+def init_request_timing(app):
+    """
+    Register the request timing instrumentation with a Flask application
+
+    :param app: Flask application
+    """
+    app.before_request(_start_request_timing)
+    app.after_request(_finish_request_timing)
+    before_render_template.connect(_before_render_template, app)
+    template_rendered.connect(_template_rendered, app)
+
+
+def metrics_exposition():
+    """
+    Render all the request timing histograms, and the database retry counters, in Prometheus text exposition format.
+    If metrics are shared between worker processes, those for all the workers are merged
+
+    :return: Exposition text
+    """
+    snapshots, counters = load_metrics(HISTOGRAMS) if metrics_directory() else ({}, None)
+    lines = []
+    for histogram in HISTOGRAMS:
+        lines.extend(histogram.exposition(snapshots.get(histogram.name)))
+    lines.extend(busy_retry_exposition(counters))
+    return "\n".join(lines) + "\n"
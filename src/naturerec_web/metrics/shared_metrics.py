@@ -0,0 +1,147 @@
+"""
+This module shares metrics between the worker processes serving the application. Each worker holds its own metrics
+in memory and a scrape of the metrics endpoint is handled by just one worker, so without sharing a scrape would only
+report on the requests that worker had handled.
+
+If the environment variable NATURE_RECORDER_METRICS_DIR is set, each worker saves its histograms and database retry
+counters to a file in that folder, named after its process ID, and the metrics endpoint merges the files for all
+the workers. The files for workers that have exited are kept, so the totals don't go backwards when a worker is
+restarted. The folder should be emptied before the server starts.
+
+A worker saves its metrics after a request if they haven't been saved for SAVE_INTERVAL seconds. Otherwise, a timer
+saves them once the interval's passed, so the merged metrics lag the workers' own by no more than the interval.
+The worker handling a scrape saves its own metrics first.
+"""
+
+import glob
+import json
+import os
+import tempfile
+import threading
+import time
+from naturerec_model.model import busy_retry_counters
+from .latency_histogram import merge_snapshots
+
+#: Minimum time, in seconds, between saves of a worker's metrics
+SAVE_INTERVAL = 1.0
+
+_state = {"pid": None, "last_save": 0.0, "timer": None}
+_lock = threading.Lock()
+
+
+def metrics_directory():
+    """
+    Return the folder in which worker processes save their metrics
+
+    :return: Path to the folder or None if metrics aren't shared
+    """
+    return os.environ.get("NATURE_RECORDER_METRICS_DIR") or None
+
+
+def prepare_metrics_directory():
+    """
+    Prepare the folder in which worker processes save their metrics before the server starts. If the
+    NATURE_RECORDER_METRICS_DIR environment variable is set, the metrics files left by a previous run are removed.
+    If not, a temporary folder is created and the environment variable is set, so the worker processes inherit it
+
+    :return: Path to the folder
+    """
+    directory = metrics_directory()
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+        for path in glob.glob(os.path.join(directory, "*.json")):
+            os.unlink(path)
+    else:
+        directory = tempfile.mkdtemp(prefix="naturerec-metrics-")
+        os.environ["NATURE_RECORDER_METRICS_DIR"] = directory
+    return directory
+
+
+def _write_metrics(directory, histograms):
+    """
+    Write this process's metrics to its file in the metrics folder, replacing the file atomically so a scrape
+    never reads a partially written file
+
+    :param directory: Path to the metrics folder
+    :param histograms: List of LatencyHistogram instances
+    """
+    data = {
+        "histograms": {histogram.name: [[list(labels), counts, total]
+                                        for labels, (counts, total) in histogram.snapshot().items()]
+                       for histogram in histograms},
+        "busy_retry": busy_retry_counters()._asdict()
+    }
+    path = os.path.join(directory, f"{os.getpid()}.json")
+    temporary_path = f"{path}.tmp"
+    with open(temporary_path, mode="wt", encoding="UTF-8") as f:
+        json.dump(data, f)
+    os.replace(temporary_path, path)
+
+
+def _save_when_due(histograms):
+    """
+    Timer callback that saves this process's metrics
+    """
+    with _lock:
+        _state["timer"] = None
+    save_metrics(histograms, force=True)
+
+
+def save_metrics(histograms, force=False):
+    """
+    Save this process's metrics to the metrics folder, if metrics are shared. Unless forced, the metrics are only
+    saved if they haven't been saved in the last SAVE_INTERVAL seconds. Otherwise, a save's scheduled for when the
+    interval has passed
+
+    :param histograms: List of LatencyHistogram instances
+    :param force: True to save the metrics immediately
+    """
+    directory = metrics_directory()
+    if not directory:
+        return
+
+    with _lock:
+        # Timers and save times aren't inherited by forked worker processes
+        if _state["pid"] != os.getpid():
+            _state.update(pid=os.getpid(), last_save=0.0, timer=None)
+
+        now = time.monotonic()
+        due = _state["last_save"] + SAVE_INTERVAL
+        if not force and now < due:
+            if _state["timer"] is None:
+                _state["timer"] = threading.Timer(due - now, _save_when_due, (histograms,))
+                _state["timer"].daemon = True
+                _state["timer"].start()
+            return
+
+        _state["last_save"] = now
+        _write_metrics(directory, histograms)
+
+
+def load_metrics(histograms):
+    """
+    Load and merge the metrics saved by all the worker processes. The current process's metrics are saved first,
+    so they're up to date
+
+    :param histograms: List of LatencyHistogram instances
+    :return: Tuple of a dictionary of merged histogram snapshots, keyed by histogram name, and a dictionary of the
+             merged database retry counters, keyed by counter name
+    """
+    save_metrics(histograms, force=True)
+
+    snapshots = {histogram.name: [] for histogram in histograms}
+    counters = {name: 0 for name in busy_retry_counters()._fields}
+    for path in glob.glob(os.path.join(metrics_directory(), "*.json")):
+        try:
+            with open(path, mode="rt", encoding="UTF-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            continue
+
+        for name, series in data["histograms"].items():
+            if name in snapshots:
+                snapshots[name].append({tuple(labels): (counts, total) for labels, counts, total in series})
+        for name, value in data["busy_retry"].items():
+            counters[name] = counters.get(name, 0) + value
+
+    return {name: merge_snapshots(name_snapshots) for name, name_snapshots in snapshots.items()}, counters
@@ -0,0 +1,114 @@
+"""
+Production serving for the Nature Recorder web application, using Gunicorn with multiple worker processes, each
+handling requests on multiple threads. The application is loaded once, in the parent process, before the workers
+are forked. The server is configured using the following environment variables:
+
++-----------------------------+---------------------------------------------------------+--------------------------+
+| **Variable**                | **Comments**                                            | **Default**              |
++-----------------------------+---------------------------------------------------------+--------------------------+
+| NATURE_RECORDER_BIND        | Address and port on which to listen                     | 0.0.0.0:5000             |
++-----------------------------+---------------------------------------------------------+--------------------------+
+| NATURE_RECORDER_WORKERS     | Number of worker processes                              | 2 x CPU count + 1        |
++-----------------------------+---------------------------------------------------------+--------------------------+
+| NATURE_RECORDER_THREADS     | Number of request handling threads per worker           | 4                        |
++-----------------------------+---------------------------------------------------------+--------------------------+
+| NATURE_RECORDER_TIMEOUT     | Seconds before an unresponsive worker is restarted      | 30                       |
++-----------------------------+---------------------------------------------------------+--------------------------+
+| NATURE_RECORDER_METRICS_DIR | Folder in which the workers share their metrics         | New temporary folder     |
++-----------------------------+---------------------------------------------------------+--------------------------+
+
+The workers share their request timing metrics and database retry counters through files in the metrics folder, so
+the metrics endpoint reports on the requests handled by all of them. Any metrics files in the folder are removed
+when the server starts.
+"""
+
+import multiprocessing
+import os
+from gunicorn.app.base import BaseApplication
+from naturerec_model.model import dispose_engine
+from naturerec_web.metrics.shared_metrics import prepare_metrics_directory
+
+#: Default address and port on which to listen
+DEFAULT_BIND = "0.0.0.0:5000"
+
+#: Default number of request handling threads per worker
+DEFAULT_THREADS = 4
+
+#: Default number of seconds before an unresponsive worker is restarted
+DEFAULT_TIMEOUT = 30
+
+
+def default_workers():
+    """
+    Return the default number of worker processes, following the Gunicorn recommendation of 2 x CPU count + 1
+
+    :return: Default number of worker processes
+    """
+    return 2 * multiprocessing.cpu_count() + 1
+
+
+def post_fork(_, __):
+    """
+    Gunicorn server hook called in each worker process after it's been forked. Connections opened while loading
+    the application in the parent process mustn't be used by the worker, so they're discarded
+
+    :param _: Gunicorn arbiter
+    :param __: Gunicorn worker
+    """
+    dispose_engine()
+
+
+def server_options():
+    """
+    Build the Gunicorn configuration from the environment
+
+    :return: Dictionary of Gunicorn settings
+    """
+    return {
+        "bind": os.environ.get("NATURE_RECORDER_BIND", DEFAULT_BIND),
+        "workers": int(os.environ.get("NATURE_RECORDER_WORKERS", default_workers())),
+        "threads": int(os.environ.get("NATURE_RECORDER_THREADS", DEFAULT_THREADS)),
+        "timeout": int(os.environ.get("NATURE_RECORDER_TIMEOUT", DEFAULT_TIMEOUT)),
+        "worker_class": "gthread",
+        "preload_app": True,
+        "post_fork": post_fork,
+        "accesslog": "-"
+    }
+
+
+class NatureRecorderServer(BaseApplication):
+    """
+    Gunicorn application that serves a pre-loaded Flask application
+    """
+
+    def __init__(self, application, options=None):
+        self._application = application
+        self._options = options or {}
+        super().__init__()
+
+    def load_config(self):
+        """
+        Apply the server options to the Gunicorn configuration
+        """
+        for key, value in self._options.items():
+            if key in self.cfg.settings and value is not None:
+                self.cfg.set(key.lower(), value)
+
+    def load(self):
+        """
+        Return the WSGI application to serve
+
+        :return: The Flask application
+        """
+        return self._application
+
+
+def serve(application, options=None):
+    """
+    Serve a Flask application using Gunicorn, blocking until the server is shut down
+
+    :param application: Flask application to serve
+    :param options: Dictionary of Gunicorn settings or None to build them from the environment
+    """
+    prepare_metrics_directory()
+    NatureRecorderServer(application, options if options is not None else server_options()).run()
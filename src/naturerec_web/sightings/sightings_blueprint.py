@@ -6,17 +6,28 @@ import datetime
 import html
 from flask import Blueprint, render_template, request, session, redirect, abort, jsonify
 from flask_login import login_required, current_user
-from naturerec_model.logic import list_sightings, get_sighting, create_sighting, update_sighting, delete_sighting
+from naturerec_model.logic import list_sighting_records, get_sighting, create_sighting, update_sighting, delete_sighting
+from naturerec_model.logic import delete_sightings, reassign_sightings, SightingFilter
+from naturerec_model.logic import create_checklist, ChecklistEntry, WriteOutcome
+from naturerec_model.logic import sync_sightings, SyncSighting
+from naturerec_model.logic import aggregate_sightings, grid_cell_size, search_species
 from naturerec_model.logic import list_locations
 from naturerec_model.logic import list_categories, get_category
-from naturerec_model.logic import list_species
+from naturerec_model.logic import list_species, get_species
+from naturerec_model.logic import get_current_statuses
+from naturerec_model.logic import LoaderView, ConflictPolicy
 from naturerec_model.model import Gender, Sighting
 from naturerec_model.data_exchange import SightingsImportHelper
 from naturerec_web.auth.requires_roles import requires_roles, has_roles
+from naturerec_web.auth.basic_auth import allows_basic_auth
 from naturerec_web.request_utils import get_posted_date, get_posted_int, get_posted_bool
+from naturerec_web.unit_of_work import without_unit_of_work
 
 sightings_bp = Blueprint("sightings", __name__, template_folder='templates')
 
+#: Maximum number of sightings accepted in one upload to the sync endpoint
+MAX_SYNC_BATCH_SIZE = 5000
+
 
 def _render_sighting_editing_page(sighting_id, message, error):
     """
@@ -27,9 +38,9 @@ def _render_sighting_editing_page(sighting_id, message, error):
     :param error: Error to display on the page or None
     :return: The rendered sighting editing template
     """
-    locations = list_locations()
-    categories = list_categories()
-    sighting = get_sighting(sighting_id) if sighting_id else None
+    locations = list_locations(view=LoaderView.MINIMAL)
+    categories = list_categories(LoaderView.MINIMAL)
+    sighting = get_sighting(sighting_id, LoaderView.DISPLAY) if sighting_id else None
 
     # If we have a sighting, it's used to set the default date and location. Otherwise, we look for those
     # properties in session
@@ -38,8 +49,8 @@ def _render_sighting_editing_page(sighting_id, message, error):
         category_id = sighting.species.categoryId
         sighting_date = sighting.sighting_date.strftime(Sighting.DATE_DISPLAY_FORMAT)
     else:
-        location_id = int(session["location_id"]) if "location_id" in session else 0
-        category_id = int(session["category_id"]) if "category_id" in session else 0
+        location_id = int(session["location_id"]) if session.get("location_id") else 0
+        category_id = int(session["category_id"]) if session.get("category_id") else 0
         sighting_date = session["sighting_date"] \
             if "sighting_date" in session \
             else datetime.datetime.now().strftime(Sighting.DATE_DISPLAY_FORMAT)
@@ -57,6 +68,121 @@ def _render_sighting_editing_page(sighting_id, message, error):
                            error=error)
 
 
+def _render_checklist_page(location_id, sighting_date, category_id, entries, message, error, species=None):
+    """
+    Helper to render the checklist entry page
+
+    :param location_id: ID for the selected location
+    :param sighting_date: Selected date, formatted for display
+    :param category_id: ID for the selected category, whose species are listed on the checklist
+    :param entries: Dictionary of ChecklistEntry instances, keyed by species ID, to show on the checklist
+    :param message: Message to display on the page or None
+    :param error: Error to display on the page or None
+    :param species: Species in the selected category, if they've already been loaded
+    :return: The rendered checklist entry template
+    """
+    return render_template("sightings/checklist.html",
+                           locations=list_locations(view=LoaderView.MINIMAL),
+                           categories=list_categories(LoaderView.MINIMAL),
+                           location_id=location_id,
+                           category_id=category_id,
+                           sighting_date=sighting_date,
+                           policy=request.form.get("conflict_policy", ConflictPolicy.ERROR.value),
+                           message=message,
+                           error=error,
+                           **_checklist_species_context(category_id, entries, species))
+
+
+def _checklist_species_context(category_id, entries, species=None):
+    """
+    Helper to build the context for the species rows on the checklist entry page
+
+    :param category_id: ID for the category whose species are listed or None
+    :param entries: Dictionary of ChecklistEntry instances, keyed by species ID, to show on the checklist
+    :param species: Species in the category, if they've already been loaded
+    :return: Dictionary of template context values
+    """
+    try:
+        supports_gender = get_category(category_id, LoaderView.MINIMAL).supports_gender if category_id else False
+    except ValueError:
+        supports_gender = False
+
+    if species is None:
+        species = list_species(category_id, LoaderView.MINIMAL) if category_id else []
+
+    return {
+        "species": species,
+        "entries": entries,
+        "supports_gender": supports_gender,
+        "genders": Gender.gender_map()
+    }
+
+
+def _get_checklist_entries():
+    """
+    Retrieve the species recorded on the POSTed checklist form. A species is recorded if it's ticked as seen or
+    has a number entered against it
+
+    :return: Dictionary of ChecklistEntry instances keyed by species ID, in the order they appear on the form
+    """
+    entries = {}
+    for species_id in request.form.getlist("checklist_species", type=int):
+        number = get_posted_int(f"number_{species_id}")
+        if number or get_posted_bool(f"seen_{species_id}"):
+            entries[species_id] = ChecklistEntry(species_id=species_id,
+                                                 number=number,
+                                                 gender=get_posted_int(f"gender_{species_id}") or Gender.UNKNOWN,
+                                                 with_young=1 if get_posted_bool(f"with_young_{species_id}") else 0)
+    return entries
+
+
+def _checklist_message(results):
+    """
+    Summarise the outcomes of writing a checklist
+
+    :param results: List of SightingWriteResult instances, one per checklist entry
+    :return: Message giving the number of checklist entries with each outcome
+    """
+    counts = {}
+    for result in results:
+        counts[result.outcome] = counts.get(result.outcome, 0) + 1
+    return ", ".join(f"{count} {outcome.value}" for outcome, count in counts.items())
+
+
+def _get_sync_sightings(data):
+    """
+    Convert the sightings in the JSON body of a request to the sync endpoint to SyncSighting instances
+
+    :param data: Decoded JSON request body
+    :return: List of SyncSighting instances
+    :raises ValueError: If the body or any of the sightings is malformed
+    """
+    sightings = data.get("sightings") if isinstance(data, dict) else None
+    if not isinstance(sightings, list):
+        raise ValueError("Request body must contain a list of sightings")
+    if len(sightings) > MAX_SYNC_BATCH_SIZE:
+        raise ValueError(f"No more than {MAX_SYNC_BATCH_SIZE} sightings can be uploaded at once")
+
+    genders = {name.lower(): gender for gender, name in Gender.gender_map().items()}
+    records = []
+    for i, sighting in enumerate(sightings):
+        try:
+            gender = sighting.get("gender") or "Unknown"
+            number = sighting.get("number")
+            records.append(SyncSighting(key=str(sighting["key"]),
+                                        species=str(sighting["species"]),
+                                        location=str(sighting["location"]),
+                                        date=datetime.date.fromisoformat(sighting["date"]),
+                                        number=int(number) if number is not None else None,
+                                        gender=genders[gender.lower()],
+                                        with_young=1 if sighting.get("with_young") else 0,
+                                        notes=html.escape(sighting["notes"]) if sighting.get("notes") else None))
+        except (KeyError, TypeError, ValueError, AttributeError) as e:
+            raise ValueError(f"Malformed sighting at index {i}") from e
+
+    return records
+
+
 def _render_sightings_list_page(from_date=None, to_date=None, location_id=None, category_id=None, species_id=None,
                                 error=None):
     """
@@ -76,10 +202,14 @@ def _render_sightings_list_page(from_date=None, to_date=None, location_id=None,
         from_date = datetime.datetime.today().date()
 
     # Find matching sightings
-    sightings = list_sightings(from_date=from_date,
-                               to_date=to_date,
-                               location_id=location_id,
-                               species_id=species_id)
+    sightings = list_sighting_records(from_date=from_date,
+                                      to_date=to_date,
+                                      location_id=location_id,
+                                      species_id=species_id)
+
+    # The bulk actions can reassign sightings to a species in the selected category
+    bulk_enabled = has_roles(["Administrator", "Reporter"])
+    reassign_species = list_species(category_id, LoaderView.MINIMAL) if bulk_enabled and category_id else []
 
     # Serve the page
     message = session.pop("message") if "message" in session else None
@@ -89,13 +219,40 @@ def _render_sightings_list_page(from_date=None, to_date=None, location_id=None,
                            location_id=location_id,
                            category_id=category_id,
                            species_id=species_id,
-                           locations=list_locations(),
-                           categories=list_categories(),
+                           locations=list_locations(view=LoaderView.MINIMAL),
+                           categories=list_categories(LoaderView.MINIMAL),
                            action_button_label="Filter Sightings",
                            sightings=sightings,
+                           statuses=get_current_statuses({sighting.species.id for sighting in sightings}),
                            message=message,
                            error=error,
-                           edit_enabled=True)
+                           edit_enabled=True,
+                           bulk_enabled=bulk_enabled,
+                           reassign_species=reassign_species)
+
+
+def _apply_bulk_action(bulk_action, from_date, to_date, location_id, species_id):
+    """
+    Apply a bulk action to all the sightings matching the filtering criteria, recording the outcome in session
+
+    :param bulk_action: Name of the action, either "delete" or "reassign"
+    :param from_date: Include sightings on or after this date
+    :param to_date: Include sightings up to this date
+    :param location_id: Include sightings at this location
+    :param species_id: Include sightings for this species
+    :raises ValueError: If the action isn't valid or fails
+    """
+    sighting_filter = SightingFilter(from_date=from_date, to_date=to_date, location_id=location_id,
+                                     species_id=species_id)
+    if bulk_action == "delete":
+        count = delete_sightings(sighting_filter)
+        session["message"] = f"Deleted {count} sighting{'s' if count != 1 else ''}"
+    elif bulk_action == "reassign":
+        count = reassign_sightings(sighting_filter, current_user, get_posted_int("new_location"),
+                                   get_posted_int("new_species"))
+        session["message"] = f"Reassigned {count} sighting{'s' if count != 1 else ''}"
+    else:
+        raise ValueError("Invalid bulk action")
 
 
 def _render_sightings_import_page(error):
@@ -131,6 +288,17 @@ def _get_filter_date(key):
     return datetime.datetime.strptime(date_string, Sighting.DATE_DISPLAY_FORMAT).date() if date_string else None
 
 
+def _get_query_date(key):
+    """
+    Retrieve a named date value from the query string
+
+    :param key: Value key
+    :return: Value or None if not specified
+    """
+    date_string = request.args.get(key)
+    return datetime.datetime.strptime(date_string, Sighting.DATE_DISPLAY_FORMAT).date() if date_string else None
+
+
 @sightings_bp.route("/list", methods=["GET", "POST"])
 @login_required
 @requires_roles(["Administrator", "Reporter", "Reader"])
@@ -150,6 +318,17 @@ def list_filtered_sightings():
                         delete_sighting(delete_record_id)
                 else:
                     abort(401)
+
+            bulk_action = request.form.get("bulk_action")
+            if bulk_action:
+                if has_roles(["Administrator", "Reporter"]):
+                    _apply_bulk_action(bulk_action,
+                                       get_posted_date("from_date"),
+                                       get_posted_date("to_date"),
+                                       get_posted_int("location"),
+                                       get_posted_int("species"))
+                else:
+                    abort(401)
         except ValueError as e:
             error = e
 
@@ -173,12 +352,31 @@ def list_species_for_category(category_id, selected_species_id):
     :param selected_species_id: ID for the species to select by default
     :return: Rendered species selection template
     """
-    species = list_species(category_id)
+    species = list_species(category_id, LoaderView.MINIMAL)
     return render_template("sightings/species.html",
                            species=species,
                            species_id=selected_species_id)
 
 
+@sightings_bp.route("/search_species")
+@login_required
+def search_species_by_prefix():
+    """
+    Return a JSON object listing the species whose common or scientific name matches the prefix supplied in the
+    query string, for autocompletion on the sighting entry page
+
+    :return: JSON object containing a list of matching species
+    """
+    species = search_species(request.args.get("prefix", ""), view=LoaderView.DISPLAY)
+    return jsonify(species=[{
+        "id": s.id,
+        "name": s.name,
+        "scientific_name": s.scientific_name,
+        "category_id": s.categoryId,
+        "supports_gender": bool(s.category.supports_gender)
+    } for s in species])
+
+
 @sightings_bp.route("/supports_gender/<int:category_id>")
 @login_required
 def get_supports_gender_flag_for_category(category_id):
@@ -189,7 +387,7 @@ def get_supports_gender_flag_for_category(category_id):
     :return: JSON object containing the value of the 'supports gender' flag
     """
     try:
-        category = get_category(category_id)
+        category = get_category(category_id, LoaderView.MINIMAL)
         supports_gender = category.supports_gender
     except ValueError:
         supports_gender = False
@@ -197,6 +395,37 @@ def get_supports_gender_flag_for_category(category_id):
     return jsonify(supports_gender=supports_gender)
 
 
+@sightings_bp.route("/map_cells")
+@login_required
+@requires_roles(["Administrator", "Reporter", "Reader"])
+def get_sighting_map_cells():
+    """
+    Return a JSON object containing the sightings within a map viewport, aggregated into grid cells. The viewport
+    and zoom level are supplied as query string parameters, along with optional date, category and species filters
+
+    :return: JSON object containing the grid cell size and a list of cells
+    """
+    try:
+        min_latitude = request.args.get("min_latitude", type=float)
+        min_longitude = request.args.get("min_longitude", type=float)
+        max_latitude = request.args.get("max_latitude", type=float)
+        max_longitude = request.args.get("max_longitude", type=float)
+        zoom = request.args.get("zoom", type=int)
+        if None in [min_latitude, min_longitude, max_latitude, max_longitude, zoom]:
+            raise ValueError("Viewport and zoom level must be specified")
+
+        cell_size = grid_cell_size(min_latitude, min_longitude, max_latitude, max_longitude, zoom)
+        cells = aggregate_sightings(min_latitude, min_longitude, max_latitude, max_longitude, zoom,
+                                    from_date=_get_query_date("from_date"),
+                                    to_date=_get_query_date("to_date"),
+                                    category_id=request.args.get("category", type=int),
+                                    species_id=request.args.get("species", type=int))
+    except ValueError as e:
+        return jsonify(error=str(e)), 400
+
+    return jsonify(cell_size=cell_size, cells=[cell._asdict() for cell in cells])
+
+
 @sightings_bp.route("/edit", defaults={"sighting_id": None}, methods=["GET", "POST"])
 @sightings_bp.route("/edit/<int:sighting_id>", methods=["GET", "POST"])
 @login_required
@@ -220,9 +449,12 @@ def edit(sighting_id):
             location_id = get_posted_int("location")
             session["location_id"] = location_id
 
-            # Get the selected category and put it into session
-            category_id = get_posted_int("category")
-            session["category_id"] = category_id
+            # The species autocomplete clears the selected species if the text doesn't match a suggestion, so
+            # check one's been selected. The category's taken from the species and put into session
+            species_id = get_posted_int("species")
+            if not species_id:
+                raise ValueError("Please select a species from the list of suggestions")
+            session["category_id"] = get_species(species_id, LoaderView.MINIMAL).categoryId
 
             # Get the notes and escape them
             notes = html.escape(request.form["notes"])
@@ -230,24 +462,24 @@ def edit(sighting_id):
             if sighting_id:
                 _ = update_sighting(sighting_id,
                                     location_id,
-                                    get_posted_int("species"),
+                                    species_id,
                                     sighting_date,
                                     get_posted_int("number"),
                                     get_posted_int("gender"),
                                     get_posted_bool("with_young"),
                                     notes,
                                     current_user)
-                sighting = get_sighting(sighting_id)
+                sighting = get_sighting(sighting_id, LoaderView.DISPLAY)
             else:
                 created_id = create_sighting(location_id,
-                                             get_posted_int("species"),
+                                             species_id,
                                              sighting_date,
                                              get_posted_int("number"),
                                              get_posted_int("gender"),
                                              get_posted_bool("with_young"),
                                              notes,
                                              current_user).id
-                sighting = get_sighting(created_id)
+                sighting = get_sighting(created_id, LoaderView.DISPLAY)
 
             # Construct the confirmation message
             action = "Updated" if sighting_id else "Added"
@@ -267,7 +499,111 @@ def edit(sighting_id):
         return _render_sighting_editing_page(sighting_id, None, None)
 
 
+@sightings_bp.route("/checklist_species/<int:category_id>")
+@login_required
+@requires_roles(["Administrator", "Reporter"])
+def list_checklist_species(category_id):
+    """
+    Return the markup for the species rows on the checklist entry page for the specified category
+
+    :param category_id: ID for the category for which to list species
+    :return: Rendered checklist species template
+    """
+    return render_template("sightings/checklist_species.html",
+                           **_checklist_species_context(category_id, {}))
+
+
+@sightings_bp.route("/checklist", methods=["GET", "POST"])
+@login_required
+@requires_roles(["Administrator", "Reporter"])
+def checklist():
+    """
+    Serve the page to record sightings of many species at one location on one date and handle the submitted
+    checklist, which is written in a single transaction
+
+    :return: The HTML for the checklist entry page
+    """
+    if request.method == "POST":
+        date_string = request.form["date"]
+        location_id = get_posted_int("location")
+        category_id = get_posted_int("category")
+        entries = {}
+        species = None
+        try:
+            session["sighting_date"] = date_string
+            session["location_id"] = location_id
+            session["category_id"] = category_id
+            sighting_date = datetime.datetime.strptime(date_string, Sighting.DATE_DISPLAY_FORMAT).date()
+
+            entries = _get_checklist_entries()
+            if not entries:
+                raise ValueError("No species have been recorded on the checklist")
+
+            policy = ConflictPolicy(request.form.get("conflict_policy", ConflictPolicy.ERROR.value))
+            results = create_checklist(location_id, sighting_date, entries.values(), current_user, policy)
+
+            # If any entry's invalid, nothing's been written. Report the problems and keep the entries so they can
+            # be corrected and resubmitted
+            failures = [result for result in results if result.outcome == WriteOutcome.FAILED]
+            if failures:
+                species = list_species(category_id, LoaderView.MINIMAL)
+                names = {s.id: s.name for s in species}
+                species_ids = list(entries.keys())
+                raise ValueError("; ".join(f"{names.get(species_ids[result.index], 'Species')}: {result.error}"
+                                           for result in failures))
+
+            return _render_checklist_page(location_id, date_string, category_id, {},
+                                          f"Checklist saved: {_checklist_message(results)}", None)
+        except ValueError as e:
+            return _render_checklist_page(location_id, date_string, category_id, entries, None, e, species)
+    else:
+        location_id = int(session["location_id"]) if session.get("location_id") else 0
+        category_id = int(session["category_id"]) if session.get("category_id") else 0
+        sighting_date = session["sighting_date"] \
+            if "sighting_date" in session \
+            else datetime.datetime.now().strftime(Sighting.DATE_DISPLAY_FORMAT)
+        return _render_checklist_page(location_id, sighting_date, category_id, {}, None, None)
+
+
+@sightings_bp.route("/sync", methods=["POST"])
+@without_unit_of_work
+@allows_basic_auth
+@login_required
+@requires_roles(["Administrator", "Reporter"])
+def sync():
+    """
+    Apply a batch of sightings uploaded by a client that records sightings offline. The request body is a JSON
+    object containing a list of sightings, each with an idempotency key, the species and location names, the date
+    in YYYY-MM-DD format and, optionally, the number, gender name, with young flag and notes. The conflict policy
+    for sightings that duplicate existing ones may also be given. Sightings whose keys have already been applied
+    are ignored, so a batch can safely be resent
+
+    Clients can authenticate using HTTP basic authentication, rather than logging in. The endpoint is exempt from
+    CSRF protection, so only JSON request bodies are accepted
+
+    :return: JSON object giving the outcome for each sighting or, if the request's malformed, an error
+    """
+    if not request.is_json:
+        return jsonify(error="Request body must be JSON"), 415
+
+    try:
+        data = request.get_json(silent=True)
+        records = _get_sync_sightings(data)
+        policy = ConflictPolicy(data.get("conflict_policy", ConflictPolicy.ERROR.value))
+        results = sync_sightings(records, current_user, policy)
+    except ValueError as e:
+        return jsonify(error=str(e)), 400
+
+    return jsonify(results=[{
+        "key": result.key,
+        "sighting_id": result.sighting_id,
+        "outcome": result.outcome.value,
+        "error": result.error
+    } for result in results])
+
+
 @sightings_bp.route("/import", methods=["GET", "POST"])
+@without_unit_of_work
 @login_required
 @requires_roles(["Administrator"])
 def import_sightings():
@@ -278,7 +614,8 @@ def import_sightings():
     """
     if request.method == "POST":
         try:
-            importer = SightingsImportHelper(request.files["csv_file_name"], current_user)
+            policy = ConflictPolicy(request.form.get("conflict_policy", ConflictPolicy.ERROR.value))
+            importer = SightingsImportHelper(request.files["csv_file_name"], current_user, policy)
             importer.start()
             session["message"] = "Sightings are being imported in the background"
             return redirect("/sightings/list")
@@ -5,7 +5,8 @@ The species blueprint supplies view functions and templates for species manageme
 from flask import Blueprint, render_template, request, redirect, abort
 from flask_login import login_required, current_user
 from naturerec_model.logic import list_categories
-from naturerec_model.logic import list_species, get_species, create_species, update_species, delete_species
+from naturerec_model.logic import LoaderView
+from naturerec_model.logic import list_species_records, get_species, create_species, update_species, delete_species
 from naturerec_web.auth import requires_roles, has_roles
 from naturerec_web.request_utils import get_posted_int
 
@@ -20,9 +21,9 @@ def _render_species_editing_page(species_id, error):
     :param error: Error message to display on the page or None
     :return: The rendered species editing template
     """
-    species = get_species(species_id) if species_id else None
+    species = get_species(species_id, LoaderView.MINIMAL) if species_id else None
     return render_template("species/edit.html",
-                           categories=list_categories(),
+                           categories=list_categories(LoaderView.MINIMAL),
                            category_id=species.categoryId if species else None,
                            species=species,
                            error=error)
@@ -37,9 +38,9 @@ def _render_species_list_page(category_id=None, error=None):
     :return: Rendered species list template
     """
     is_admin = has_roles(["Administrator"])
-    species = list_species(category_id) if category_id else []
+    species = list_species_records(category_id) if category_id else []
     return render_template("species/list.html",
-                           categories=list_categories(),
+                           categories=list_categories(LoaderView.MINIMAL),
                            category_id=category_id,
                            species=species,
                            edit_enabled=is_admin,
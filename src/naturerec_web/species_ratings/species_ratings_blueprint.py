@@ -5,7 +5,7 @@ The species ratings blueprint supplies view functions and templates for species
 import datetime
 from flask import Blueprint, render_template, request, redirect, abort
 from flask_login import login_required, current_user
-from naturerec_model.logic import get_species
+from naturerec_model.logic import get_species, LoaderView
 from naturerec_model.logic import list_status_schemes, get_status_scheme
 from naturerec_model.logic import list_species_status_ratings, close_species_status_rating, \
     create_species_status_rating, delete_species_status_rating
@@ -25,7 +25,7 @@ def _render_rating_addition_page(species_id, error):
     """
     return render_template("species_ratings/add.html",
                            schemes=list_status_schemes(),
-                           species=get_species(species_id),
+                           species=get_species(species_id, LoaderView.MINIMAL),
                            error=error)
 
 
@@ -57,7 +57,7 @@ def list_status_ratings(species_id):
 
     return render_template("species_ratings/list.html",
                            species_status_ratings=list_species_status_ratings(species_id=species_id),
-                           species=get_species(species_id),
+                           species=get_species(species_id, LoaderView.MINIMAL),
                            error=error,
                            edit_enabled=True)
 
@@ -0,0 +1,66 @@
+var species_matches = {};
+var species_search_timer = null;
+
+function species_label(species) {
+    return (species.scientific_name) ? species.name + " ( " + species.scientific_name + " )" : species.name;
+}
+
+function show_defaulted_fields(supports_gender) {
+    if (supports_gender) {
+        $("#defaulted-fields").show();
+    } else {
+        $("#defaulted-fields").hide();
+    }
+}
+
+function select_matching_species() {
+    // If the text matches one of the suggestions, record the selected species and its category. Otherwise,
+    // clear the selection so an incomplete name can't be submitted
+    let species = species_matches[$("#species_search").val()];
+    if (species) {
+        $("#species").val(species.id);
+        $("#category").val(species.category_id);
+        show_defaulted_fields(species.supports_gender);
+    } else {
+        $("#species").val("");
+        $("#category").val("");
+    }
+}
+
+function update_species_suggestions(prefix) {
+    $.ajax({
+        url: "/sightings/search_species",
+        type: "GET",
+        cache: false,
+        data: { prefix: prefix },
+        dataType: "json",
+        success: function(data, _textStatus, _jqXHR)  {
+            let options = $("#species_options");
+            options.empty();
+            species_matches = {};
+            $.each(data.species, function(_index, species) {
+                let label = species_label(species);
+                species_matches[label] = species;
+                options.append($("<option>").attr("value", label));
+            });
+            select_matching_species();
+        },
+        error: function(_jqXHR, _textStatus, _errorThrown) {
+            // Sink the error, for now
+        }
+    });
+}
+
+function initialise_species_autocomplete() {
+    // Query for suggestions once the user pauses typing, rather than on every keystroke
+    $("#species_search").on("input", function () {
+        let prefix = $("#species_search").val();
+        clearTimeout(species_search_timer);
+        if (prefix.trim().length > 1) {
+            species_search_timer = setTimeout(function () {
+                update_species_suggestions(prefix);
+            }, 200);
+        }
+        select_matching_species();
+    });
+}
@@ -10,6 +10,7 @@ from naturerec_model.logic import create_status_rating, update_status_rating, de
 from naturerec_model.data_exchange import StatusImportHelper
 from naturerec_web.auth import requires_roles, has_roles
 from naturerec_web.request_utils import get_posted_int
+from naturerec_web.unit_of_work import without_unit_of_work
 
 status_bp = Blueprint("status", __name__, template_folder='templates')
 
@@ -145,6 +146,7 @@ def edit_rating(status_scheme_id, status_rating_id):
 
 
 @status_bp.route("/import", methods=["GET", "POST"])
+@without_unit_of_work
 @login_required
 @requires_roles(["Administrator"])
 def import_ratings():
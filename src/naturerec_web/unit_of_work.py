@@ -0,0 +1,79 @@
+"""
+Per-request unit of work. Each request that can modify data is handled in a single session and transaction, so the
+logic calls it makes share a connection and their changes are committed together before the response is returned.
+If the request fails, with an unhandled exception or an error response, its changes are rolled back.
+
+The unit of work takes the database's write lock when the request starts, waiting and retrying if another
+connection holds it. Once it has the lock, no other connection can write, so the logic calls it makes can't fail
+because the database is locked and the view never needs to be run again.
+
+Read-only requests, including those for static files, aren't handled in a unit of work. They don't hold a
+transaction open while the response is rendered and each logic call they make is retried if the database is locked.
+Views that start background jobs, whose threads must be able to write while the request is in progress, and views
+that manage their own transactions are excluded using the without_unit_of_work decorator. Their logic calls are
+also retried individually
+"""
+
+from flask import request, current_app
+from naturerec_model.model import begin_unit_of_work, end_unit_of_work, call_with_busy_retry
+
+#: HTTP methods for requests that don't modify data
+READ_ONLY_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+def without_unit_of_work(f):
+    """
+    Decorator to exclude a view from the per-request unit of work
+
+    :param f: View function
+    :return: The view function
+    """
+    f.without_unit_of_work = True
+    return f
+
+
+def _in_unit_of_work():
+    """
+    Return True if the current request should be handled in a unit of work
+
+    :return: True if the request can modify data and its view hasn't been excluded
+    """
+    if request.method in READ_ONLY_METHODS:
+        return False
+
+    view = current_app.view_functions.get(request.endpoint)
+    return view is not None and not getattr(view, "without_unit_of_work", False)
+
+
+def init_unit_of_work(app):
+    """
+    Register the per-request unit of work with a Flask application
+
+    :param app: Flask application
+    """
+    @app.before_request
+    def begin_request_unit_of_work():
+        """
+        Start a unit of work for a request that can modify data
+        """
+        if _in_unit_of_work():
+            call_with_busy_retry(begin_unit_of_work, immediate=True)
+
+    @app.after_request
+    def end_request_unit_of_work(response):
+        """
+        End the request's unit of work, committing its changes unless the response is an error
+
+        :param response: Response object
+        :return: Response object
+        """
+        end_unit_of_work(commit=response.status_code < 400)
+        return response
+
+    @app.teardown_request
+    def roll_back_request_unit_of_work(_):
+        """
+        Roll back the request's unit of work if it's still in progress because the request failed before a
+        response was produced
+        """
+        end_unit_of_work(commit=False)
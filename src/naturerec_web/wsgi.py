@@ -0,0 +1,14 @@
+"""
+WSGI entry point for serving the production web application from an external server e.g.
+
+gunicorn --preload --workers 4 --threads 4 --bind 0.0.0.0:5000 naturerec_web.wsgi:app
+
+Database connections inherited by forked worker processes are detected and replaced by the model layer, so the
+application can safely be preloaded. For the metrics endpoint to report on the requests handled by all the workers,
+set the NATURE_RECORDER_METRICS_DIR environment variable to an empty folder the workers can write to
+"""
+
+from naturerec_web import create_app
+
+#: Production instance of the Flask application
+app = create_app("production")
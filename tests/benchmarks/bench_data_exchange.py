@@ -0,0 +1,106 @@
+"""
+Benchmarks for the data exchange helpers. The import and export helpers run on a background thread, so each
+benchmark round starts the helper and waits for it to complete
+"""
+
+import csv
+import datetime
+import os
+import pytest
+import sqlalchemy as db
+from naturerec_model.model import get_data_path, Session, SpeciesStatusRating
+from naturerec_model.logic import list_job_status
+from naturerec_model.data_exchange import SightingsExportHelper, SightingsImportHelper, StatusImportHelper
+from naturerec_model.data_exchange.synthetic_data_generator import SyntheticDataGenerator
+from .conftest import BENCHMARK_SIGHTINGS_BEFORE, END_YEAR, delete_benchmark_sightings
+
+#: Number of sightings in the file imported by the sightings import benchmark, regardless of the dataset size
+IMPORT_SIGHTINGS = 1000
+
+#: Number of rounds for the slower, file-based benchmarks
+ROUNDS = 5
+
+_STATUS_COLUMNS = ["Species", "Category", "Scheme", "Rating", "Region", "Start", "End"]
+
+
+def _delete_species_status_ratings():
+    """
+    Delete all the species conservation status ratings, ahead of re-importing them
+    """
+    with Session.begin() as session:
+        session.execute(db.delete(SpeciesStatusRating))
+
+
+def _run_helper(helper):
+    """
+    Run a data exchange helper to completion, failing if it reports an error
+
+    :param helper: Data exchange helper instance
+    """
+    helper.start()
+    helper.join()
+    assert list_job_status()[0].error is None
+
+
+@pytest.fixture(scope="module")
+def sightings_import_file(dataset, tmp_path_factory):
+    """
+    Sightings import file for the benchmark dataset's locations and species. The sightings are dated before the
+    start of the dataset, so they can be removed between rounds
+    """
+    generator = SyntheticDataGenerator(dataset.volumes._replace(sightings=IMPORT_SIGHTINGS),
+                                       years=1,
+                                       end_year=BENCHMARK_SIGHTINGS_BEFORE.year - 1)
+    filename = tmp_path_factory.mktemp("import") / "sightings.csv"
+    _ = generator.write_sightings_csv(filename)
+    return filename
+
+
+@pytest.fixture(scope="module")
+def status_import_file(dataset, tmp_path_factory):
+    """
+    Conservation status import file containing the benchmark dataset's own ratings, so importing it into an empty
+    species ratings table restores the dataset
+    """
+    filename = tmp_path_factory.mktemp("import") / "status.csv"
+    with open(filename, mode="wt", newline="", encoding="UTF-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(_STATUS_COLUMNS)
+        for rating in dataset.status_ratings():
+            writer.writerow([rating.species,
+                             rating.category,
+                             rating.scheme,
+                             rating.rating,
+                             rating.region,
+                             rating.start.strftime(SpeciesStatusRating.IMPORT_DATE_FORMAT),
+                             rating.end.strftime(SpeciesStatusRating.IMPORT_DATE_FORMAT) if rating.end else ""])
+    return filename
+
+
+def test_export_year(benchmark, user, dataset):
+    filename = "benchmark_export.csv"
+
+    def export():
+        _run_helper(SightingsExportHelper(filename, user, datetime.date(END_YEAR, 1, 1),
+                                          datetime.date(END_YEAR, 12, 31)))
+
+    benchmark.pedantic(export, rounds=ROUNDS)
+    os.unlink(os.path.join(get_data_path(), "exports", filename))
+
+
+def test_import_sightings(benchmark, user, sightings_import_file):
+    def import_sightings():
+        with open(sightings_import_file, mode="rt", encoding="UTF-8") as f:
+            _run_helper(SightingsImportHelper(f, user))
+
+    # The imported sightings are removed before each round, so every round imports the whole file
+    benchmark.pedantic(import_sightings, setup=delete_benchmark_sightings, rounds=ROUNDS)
+    delete_benchmark_sightings()
+
+
+def test_import_status_ratings(benchmark, user, status_import_file):
+    def import_ratings():
+        with open(status_import_file, mode="rt", encoding="UTF-8") as f:
+            _run_helper(StatusImportHelper(f, user))
+
+    benchmark.pedantic(import_ratings, setup=_delete_species_status_ratings, rounds=ROUNDS)
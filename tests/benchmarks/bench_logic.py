@@ -0,0 +1,84 @@
+"""
+Benchmarks for the business logic layer
+"""
+
+import datetime
+import itertools
+import pytest
+from naturerec_model.model import Gender
+from naturerec_model.logic import LoaderView, list_sightings, list_locations, list_categories, list_species, \
+    create_sighting, nearest_locations, geocode_postcode
+from .conftest import BENCHMARK_SIGHTINGS_BEFORE, delete_benchmark_sightings
+
+#: Postcode geocoded by the geocoding benchmark
+POSTCODE = "OX1 1AA"
+COUNTRY = "United Kingdom"
+
+
+def test_list_sightings_for_month(benchmark, busiest_month):
+    sightings = benchmark(list_sightings, from_date=busiest_month[0], to_date=busiest_month[1])
+    assert sightings
+
+
+def test_list_sightings_for_month_display_view(benchmark, busiest_month):
+    sightings = benchmark(list_sightings, from_date=busiest_month[0], to_date=busiest_month[1],
+                          view=LoaderView.DISPLAY)
+    assert sightings
+
+
+def test_list_sightings_for_species(benchmark, common_species_id):
+    sightings = benchmark(list_sightings, species_id=common_species_id, view=LoaderView.DISPLAY)
+    assert sightings
+
+
+def test_list_sightings_for_location(benchmark, busiest_location_id):
+    sightings = benchmark(list_sightings, location_id=busiest_location_id, view=LoaderView.DISPLAY)
+    assert sightings
+
+
+def test_list_locations(benchmark, dataset):
+    locations = benchmark(list_locations)
+    assert len(locations) == dataset.volumes.locations
+
+
+def test_list_categories(benchmark, dataset):
+    categories = benchmark(list_categories)
+    assert len(categories) == dataset.volumes.categories
+
+
+def test_list_species(benchmark, dataset):
+    category_id = list_categories()[0].id
+    species = benchmark(list_species, category_id)
+    assert species
+
+
+def test_create_sighting(benchmark, user, common_species_id, busiest_location_id):
+    # Each round creates a sighting on a different day, before the start of the dataset, so none are duplicates
+    # and they're all removed when the benchmarks complete
+    days = itertools.count(1)
+
+    def create():
+        date = BENCHMARK_SIGHTINGS_BEFORE - datetime.timedelta(days=next(days))
+        return create_sighting(busiest_location_id, common_species_id, date, 1, Gender.UNKNOWN, 0, None, user)
+
+    sighting = benchmark(create)
+    delete_benchmark_sightings()
+    assert sighting.id
+
+
+def test_nearest_locations(benchmark, dataset):
+    location = dataset.locations[0]
+    nearest = benchmark(nearest_locations, location["latitude"], location["longitude"])
+    assert nearest
+
+
+def test_geocode_postcode(benchmark):
+    # The geocoder downloads its postcode data the first time it's used, so skip the benchmark if that's not
+    # possible rather than timing the download
+    try:
+        _ = geocode_postcode(POSTCODE, COUNTRY)
+    except (ValueError, OSError) as e:
+        pytest.skip(f"Geocoding is unavailable: {e}")
+
+    coordinates = benchmark(geocode_postcode, POSTCODE, COUNTRY)
+    assert coordinates["latitude"]
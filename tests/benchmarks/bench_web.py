@@ -0,0 +1,46 @@
+"""
+Benchmarks for the web application, making requests for the main pages using the Flask test client
+"""
+
+import os
+import pytest
+from naturerec_web import create_app
+from .conftest import USERNAME, PASSWORD
+
+#: Pages requested by the page benchmarks
+PAGES = [
+    "/sightings/edit",
+    "/sightings/list",
+    "/locations/list",
+    "/categories/list",
+    "/species/list",
+    "/status/list",
+    "/jobs/list",
+    "/export/filters"
+]
+
+
+@pytest.fixture(scope="module")
+def client(dataset):
+    """
+    Flask test client, logged in as the benchmark user
+    """
+    os.environ.setdefault("SECRET_KEY", "benchmark")
+    app = create_app("production")
+    app.config["WTF_CSRF_ENABLED"] = False
+    with app.test_client() as client:
+        response = client.post("/auth/login", data={"username": USERNAME, "password": PASSWORD})
+        assert response.status_code == 302
+        yield client
+
+
+@pytest.mark.parametrize("page", PAGES)
+def test_get_page(benchmark, client, page):
+    response = benchmark(client.get, page)
+    assert response.status_code == 200
+
+
+def test_post_sightings_list_for_month(benchmark, client, busiest_month):
+    data = {"from_date": busiest_month[0].strftime("%d/%m/%Y"), "to_date": busiest_month[1].strftime("%d/%m/%Y")}
+    response = benchmark(client.post, "/sightings/list", data=data)
+    assert response.status_code == 200
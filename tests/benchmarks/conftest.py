@@ -0,0 +1,150 @@
+"""
+Fixtures for the performance benchmarks. The benchmarks run against a synthetic dataset with the number of sightings
+given by the NATURE_RECORDER_BENCHMARK_SIGHTINGS environment variable, written to the database given by
+NATURE_RECORDER_DB. The dataset's generated the first time the benchmarks are run against a database and reused after
+that, as generating the larger datasets takes several minutes. The benchmarks are normally run using
+scripts/run_benchmarks.sh, which runs them at each scale and saves the results as JSON.
+"""
+
+import calendar
+import datetime
+import os
+import pytest
+import sqlalchemy as db
+from naturerec_model.model import create_database, Session, Sighting, Role, UserRole, User
+from naturerec_model.logic import create_user, delete_sightings, SightingFilter
+from naturerec_model.data_exchange.synthetic_data_generator import SyntheticDataGenerator, DatasetVolumes
+
+#: Default number of sightings in the benchmark dataset
+DEFAULT_SIGHTINGS = 10000
+
+#: The dataset always ends in the same year, so results from runs in different years are comparable
+END_YEAR = 2024
+
+#: Sightings created by the benchmarks are dated before the synthetic dataset, so they can be removed afterwards
+BENCHMARK_SIGHTINGS_BEFORE = datetime.date(2000, 1, 1)
+
+#: Credentials for the user the web application benchmarks log in as
+USERNAME = "benchmark"
+PASSWORD = "benchmark"
+
+_ROLES = ["Administrator", "Reporter", "Reader"]
+
+
+def delete_benchmark_sightings():
+    """
+    Delete the sightings created by the benchmarks, leaving the synthetic dataset intact
+    """
+    delete_sightings(SightingFilter(to_date=BENCHMARK_SIGHTINGS_BEFORE - datetime.timedelta(days=1)))
+
+
+def _create_admin_user(user):
+    """
+    Create the user the web application benchmarks log in as, with all the roles
+    """
+    admin = create_user(USERNAME, PASSWORD, user)
+    now = datetime.datetime.now(datetime.UTC)
+    with Session.begin() as session:
+        for name in _ROLES:
+            role = session.query(Role).filter(Role.name == name).one_or_none()
+            if role is None:
+                role = Role(name=name, created_by=user.id, updated_by=user.id, date_created=now, date_updated=now)
+                session.add(role)
+                session.flush()
+            session.execute(UserRole.insert().values(user_id=admin.id, role_id=role.id, created_by=user.id,
+                                                     date_created=now))
+
+
+@pytest.fixture(scope="session")
+def scale():
+    """
+    Number of sightings in the benchmark dataset
+    """
+    return int(os.environ.get("NATURE_RECORDER_BENCHMARK_SIGHTINGS", DEFAULT_SIGHTINGS))
+
+
+@pytest.fixture(scope="session")
+def user():
+    """
+    User the benchmarks create records as
+    """
+    return User(id=1)
+
+
+@pytest.fixture(scope="session")
+def generator(scale):
+    """
+    Generator for the synthetic benchmark dataset
+    """
+    return SyntheticDataGenerator(DatasetVolumes(sightings=scale), end_year=END_YEAR)
+
+
+@pytest.fixture(scope="session")
+def dataset(scale, user, generator):
+    """
+    Make sure the database holds the benchmark dataset, generating it if it doesn't. The database is replaced when
+    the dataset's generated, so the database must have "benchmark" in its name
+    """
+    db_path = os.environ.get("NATURE_RECORDER_DB", "")
+    if "benchmark" not in os.path.basename(db_path):
+        pytest.exit("NATURE_RECORDER_DB must be set to a database with \"benchmark\" in its name, as the database is "
+                    "replaced with the benchmark dataset")
+
+    # Remove any sightings left by an interrupted run before checking the dataset. Those created by this run are
+    # removed afterwards, so the dataset can be reused
+    try:
+        delete_benchmark_sightings()
+        with Session.begin() as session:
+            count = session.query(Sighting).count()
+    except db.exc.OperationalError:
+        count = None
+
+    if count != scale:
+        create_database()
+        generator.populate(user)
+        _create_admin_user(user)
+
+    yield generator
+    delete_benchmark_sightings()
+
+
+def _most_frequent(column):
+    """
+    Return the value of a column of the sightings table that occurs most often
+    """
+    with Session.begin() as session:
+        return session.query(column).group_by(column).order_by(db.func.count().desc()).first()[0]
+
+
+@pytest.fixture(scope="session")
+def busiest_month(dataset):
+    """
+    Date range of the month with the most sightings
+    """
+    month = datetime.datetime.strptime(_most_frequent(db.func.substr(Sighting.date, 1, 7)), "%Y-%m").date()
+    return month, month.replace(day=calendar.monthrange(month.year, month.month)[1])
+
+
+@pytest.fixture(scope="session")
+def common_species_id(dataset):
+    """
+    ID of the species with the most sightings
+    """
+    return _most_frequent(Sighting.speciesId)
+
+
+@pytest.fixture(scope="session")
+def busiest_location_id(dataset):
+    """
+    ID of the location with the most sightings
+    """
+    return _most_frequent(Sighting.locationId)
+
+
+@pytest.fixture(autouse=True)
+def record_scale(request, scale):
+    """
+    Record the dataset size against each benchmark, so the comparison script can check like is compared with like
+    """
+    if "benchmark" in request.fixturenames:
+        request.getfixturevalue("benchmark").extra_info["sightings"] = scale
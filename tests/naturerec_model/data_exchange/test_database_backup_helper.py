@@ -0,0 +1,50 @@
+import unittest
+import glob
+import os
+import sqlite3
+from naturerec_model.model import create_database, User
+from naturerec_model.logic import create_category
+from naturerec_model.logic import list_job_status
+from naturerec_model.data_exchange import DatabaseBackupHelper
+
+
+class TestDatabaseBackupHelper(unittest.TestCase):
+    def setUp(self) -> None:
+        create_database()
+        self._user = User(id=1)
+        _ = create_category("Birds", True, self._user)
+        for path in glob.glob(os.path.join(DatabaseBackupHelper.get_backup_folder(), "*")):
+            os.unlink(path)
+
+    def test_can_backup_database(self):
+        helper = DatabaseBackupHelper(self._user, filename="backup.db")
+        helper.start()
+        helper.join()
+
+        with sqlite3.connect(helper.get_backup_path()) as connection:
+            self.assertEqual([("Birds",)], connection.execute("SELECT Name FROM Categories").fetchall())
+
+        job_statuses = list_job_status()
+        self.assertEqual(1, len(job_statuses))
+        self.assertEqual(DatabaseBackupHelper.JOB_NAME, job_statuses[0].name)
+        self.assertIsNone(job_statuses[0].error)
+
+    def test_old_backups_are_removed(self):
+        # Create some older backups, with names that sort before the one about to be taken
+        folder = DatabaseBackupHelper.get_backup_folder()
+        for day in range(1, 4):
+            with open(os.path.join(folder, f"naturerecorder-2000010{day}-000000.db"), mode="wb"):
+                pass
+
+        helper = DatabaseBackupHelper(self._user, keep=2)
+        helper.start()
+        helper.join()
+
+        backups = sorted(os.path.basename(path) for path in glob.glob(os.path.join(folder, "*.db")))
+        self.assertEqual(2, len(backups))
+        self.assertEqual("naturerecorder-20000103-000000.db", backups[0])
+        self.assertEqual(os.path.basename(helper.get_backup_path()), backups[1])
+
+    def test_cannot_keep_no_backups(self):
+        with self.assertRaises(ValueError):
+            _ = DatabaseBackupHelper(self._user, keep=0)
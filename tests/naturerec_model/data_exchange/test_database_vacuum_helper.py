@@ -0,0 +1,40 @@
+import unittest
+import sqlalchemy as db
+from naturerec_model.model import create_database, Session, Location, User
+from naturerec_model.logic import create_location
+from naturerec_model.logic import list_job_status
+from naturerec_model.data_exchange import DatabaseVacuumHelper, DatabaseOptimiseHelper
+
+
+class TestDatabaseVacuumHelper(unittest.TestCase):
+    def setUp(self) -> None:
+        create_database()
+        self._user = User(id=1)
+
+    def test_can_vacuum_database(self):
+        for i in range(100):
+            _ = create_location(name=f"Location {i}", county="Oxfordshire " * 40, country="United Kingdom",
+                                user=self._user)
+
+        with Session.begin() as session:
+            session.execute(db.delete(Location))
+
+        helper = DatabaseVacuumHelper(self._user)
+        helper.start()
+        helper.join()
+        self.assertGreater(helper.pages_freed, 0)
+
+        job_statuses = list_job_status()
+        self.assertEqual(1, len(job_statuses))
+        self.assertEqual(DatabaseVacuumHelper.JOB_NAME, job_statuses[0].name)
+        self.assertIsNone(job_statuses[0].error)
+
+    def test_can_optimise_database(self):
+        helper = DatabaseOptimiseHelper(self._user)
+        helper.start()
+        helper.join()
+
+        job_statuses = list_job_status()
+        self.assertEqual(1, len(job_statuses))
+        self.assertEqual(DatabaseOptimiseHelper.JOB_NAME, job_statuses[0].name)
+        self.assertIsNone(job_statuses[0].error)
@@ -0,0 +1,37 @@
+import unittest
+import csv
+from naturerec_model.model import create_database, User
+from naturerec_model.logic import create_location
+from naturerec_model.logic import list_job_status
+from naturerec_model.data_exchange import DuplicateLocationsReportHelper
+
+
+class TestDuplicateLocationsReportHelper(unittest.TestCase):
+    def setUp(self) -> None:
+        create_database()
+        self._user = User(id=1)
+        _ = create_location(name="Radley Lakes", county="Oxfordshire", country="United Kingdom", user=self._user,
+                            latitude=51.6463, longitude=-1.2432)
+        _ = create_location(name="Radley Lake", county="Oxfordshire", country="United Kingdom", user=self._user,
+                            latitude=51.6466, longitude=-1.2430)
+
+    def test_can_report_duplicate_locations(self):
+        # Run the report
+        reporter = DuplicateLocationsReportHelper(filename="duplicates.csv", user=self._user)
+        reporter.start()
+        reporter.join()
+
+        # Read the file
+        with open(reporter.get_file_export_path(), mode="rt", encoding="UTF-8") as f:
+            rows = list(csv.reader(f))
+
+        self.assertEqual(2, len(rows))
+        self.assertEqual(DuplicateLocationsReportHelper.COLUMN_NAMES, rows[0])
+        self.assertEqual("Radley Lakes", rows[1][2])
+        self.assertEqual("Radley Lake", rows[1][4])
+
+        # Confirm the job status record was created
+        job_statuses = list_job_status()
+        self.assertEqual(1, len(job_statuses))
+        self.assertEqual(DuplicateLocationsReportHelper.JOB_NAME, job_statuses[0].name)
+        self.assertIsNone(job_statuses[0].error)
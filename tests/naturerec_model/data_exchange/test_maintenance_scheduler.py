@@ -0,0 +1,29 @@
+import unittest
+import time
+from naturerec_model.model import create_database, User
+from naturerec_model.logic import list_job_status
+from naturerec_model.data_exchange import DatabaseOptimiseHelper, DatabaseVacuumHelper
+from naturerec_model.data_exchange.maintenance_scheduler import MaintenanceScheduler
+
+
+class TestMaintenanceScheduler(unittest.TestCase):
+    def setUp(self) -> None:
+        create_database()
+        self._user = User(id=1)
+
+    def test_jobs_are_run_periodically(self):
+        scheduler = MaintenanceScheduler(self._user, optimise_interval=0.1, vacuum_interval=60)
+        scheduler.start()
+        deadline = time.monotonic() + 10
+        while scheduler.jobs_run < 4 and time.monotonic() < deadline:
+            time.sleep(0.05)
+        scheduler.stop()
+
+        self.assertFalse(scheduler.is_alive())
+        names = [job_status.name for job_status in list_job_status()]
+        self.assertGreaterEqual(names.count(DatabaseOptimiseHelper.JOB_NAME), 3)
+        self.assertEqual(1, names.count(DatabaseVacuumHelper.JOB_NAME))
+
+    def test_cannot_schedule_invalid_interval(self):
+        with self.assertRaises(ValueError):
+            _ = MaintenanceScheduler(self._user, backup_interval=0)
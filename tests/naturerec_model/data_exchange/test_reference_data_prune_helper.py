@@ -0,0 +1,26 @@
+import unittest
+from naturerec_model.model import create_database, User
+from naturerec_model.logic import create_category, create_species, list_species
+from naturerec_model.logic import list_job_status
+from naturerec_model.data_exchange import ReferenceDataPruneHelper
+
+
+class TestReferenceDataPruneHelper(unittest.TestCase):
+    def setUp(self) -> None:
+        create_database()
+        self._user = User(id=1)
+
+    def test_can_prune_reference_data(self):
+        category = create_category("Birds", True, self._user)
+        _ = create_species(category.id, "Red Kite", None, self._user)
+
+        helper = ReferenceDataPruneHelper(self._user)
+        helper.start()
+        helper.join()
+        self.assertEqual((1, 0, 0), helper.deleted)
+        self.assertEqual(0, len(list_species(category.id)))
+
+        job_statuses = list_job_status()
+        self.assertEqual(1, len(job_statuses))
+        self.assertEqual(ReferenceDataPruneHelper.JOB_NAME, job_statuses[0].name)
+        self.assertIsNone(job_statuses[0].error)
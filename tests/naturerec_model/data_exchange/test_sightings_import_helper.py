@@ -7,6 +7,7 @@ from naturerec_model.logic import create_species
 from naturerec_model.logic import create_location, get_location
 from naturerec_model.logic import list_sightings
 from naturerec_model.logic import list_job_status
+from naturerec_model.logic import ConflictPolicy
 
 
 class TestSightingsImportHelper(unittest.TestCase):
@@ -109,6 +110,30 @@ class TestSightingsImportHelper(unittest.TestCase):
     def test_can_import_sightings(self):
         self._perform_valid_import()
 
+    def test_can_merge_duplicate_sightings_on_import(self):
+        filename = os.path.join(get_data_path(), "duplicate_sightings_import.csv")
+        TestSightingsImportHelper._create_test_file(filename, [
+            "Species,Scientific Name,Category,Number,Gender,WithYoung,Date,Location,Address,City,County,Postcode,Country,"
+            "Latitude,Longitude,Notes\n",
+            "Robin,Erithacus rubecula,Birds,1,Male,No,01/02/2021,Abingdon,An Address,Abingdon,Oxfordshire,OX14,United Kingdom,"
+            "51.6708,-1.2880,\n",
+            "Robin,Erithacus rubecula,Birds,2,Female,Yes,01/02/2021,Abingdon,,,Oxfordshire,,United Kingdom,"
+            ",,\n"
+        ])
+
+        with open(filename, mode="rt", encoding="UTF-8") as f:
+            importer = SightingsImportHelper(f, self._user, ConflictPolicy.MERGE)
+            importer.start()
+            importer.join()
+        os.unlink(filename)
+
+        sightings = list_sightings()
+        self.assertEqual(1, len(sightings))
+        self.assertEqual(3, sightings[0].number)
+        self.assertEqual(Gender.BOTH, sightings[0].gender)
+        self.assertEqual(1, sightings[0].withYoung)
+        self.assertEqual("An Address", get_location("Abingdon").address)
+
     def test_can_import_sighting_for_existing_category(self):
         _ = create_category("Birds", True, self._user)
         self._perform_valid_import()
@@ -214,3 +239,55 @@ class TestSightingsImportHelper(unittest.TestCase):
             TestSightingsImportHelper.IMPORT_FILE_HEADER_ROW,
             "Robin,Erithacus rubecula,Birds,1,Unknown,No,01/02/2021,Abingdon\n"
         ])
+
+    def test_nothing_is_imported_if_a_row_duplicates_an_existing_sighting(self):
+        filename = os.path.join(get_data_path(), "existing_sightings_import.csv")
+        rows = [
+            "Species,Scientific Name,Category,Number,Gender,WithYoung,Date,Location,Address,City,County,Postcode,Country,"
+            "Latitude,Longitude,Notes\n",
+            "Robin,Erithacus rubecula,Birds,1,Unknown,No,01/02/2021,Abingdon,An Address,Abingdon,Oxfordshire,OX14,United Kingdom,"
+            "51.6708,-1.2880,\n",
+            "Robin,Erithacus rubecula,Birds,1,Unknown,No,02/02/2021,Abingdon,An Address,Abingdon,Oxfordshire,OX14,United Kingdom,"
+            "51.6708,-1.2880,\n",
+            "Blackbird,Turdus merula,Birds,1,Unknown,No,01/02/2021,Radley Lakes,,,Oxfordshire,,United Kingdom,,,\n"
+        ]
+        TestSightingsImportHelper._create_test_file(filename, rows[:2])
+        with open(filename, mode="rt", encoding="UTF-8") as f:
+            importer = SightingsImportHelper(f, self._user)
+            importer.start()
+            importer.join()
+
+        TestSightingsImportHelper._create_test_file(filename, [rows[0], rows[2], rows[1], rows[3]])
+        with open(filename, mode="rt", encoding="UTF-8") as f:
+            importer = SightingsImportHelper(f, self._user)
+            importer.start()
+            with self.assertRaises(ValueError) as context:
+                importer.join()
+        os.unlink(filename)
+
+        self.assertEqual("Duplicate sighting found on row 2", str(context.exception))
+        self.assertEqual(1, len(list_sightings()))
+        self.assertEqual(["Robin"], [species.name for species in get_category("Birds").species])
+        with self.assertRaises(ValueError):
+            get_location("Radley Lakes")
+
+    def test_can_import_many_sightings_of_the_same_species_and_location(self):
+        filename = os.path.join(get_data_path(), "many_sightings_import.csv")
+        TestSightingsImportHelper._create_test_file(filename, [
+            "Species,Scientific Name,Category,Number,Gender,WithYoung,Date,Location,Address,City,County,Postcode,Country,"
+            "Latitude,Longitude,Notes\n"
+        ] + [
+            f"Robin,Erithacus rubecula,Birds,1,Unknown,No,{day:02d}/02/2021,Abingdon,,,Oxfordshire,,United Kingdom,,,\n"
+            for day in range(1, 29)
+        ])
+
+        with open(filename, mode="rt", encoding="UTF-8") as f:
+            importer = SightingsImportHelper(f, self._user)
+            importer.start()
+            importer.join()
+        os.unlink(filename)
+
+        sightings = list_sightings()
+        self.assertEqual(28, len(sightings))
+        self.assertEqual(1, len({sighting.speciesId for sighting in sightings}))
+        self.assertEqual(1, len({sighting.locationId for sighting in sightings}))
@@ -0,0 +1,63 @@
+import unittest
+import os
+from naturerec_model.model import create_database, get_data_path, Session, Sighting, User
+from naturerec_model.logic import list_categories, list_locations, list_sightings, list_status_schemes, \
+    list_species_status_ratings, list_job_status
+from naturerec_model.data_exchange import SightingsImportHelper
+from naturerec_model.data_exchange.synthetic_data_generator import SyntheticDataGenerator, DatasetVolumes
+
+
+class TestSyntheticDataGenerator(unittest.TestCase):
+    VOLUMES = DatasetVolumes(categories=3, species=20, locations=10, sightings=200, schemes=2, users=1,
+                             job_statuses=5)
+
+    def setUp(self) -> None:
+        create_database()
+        self._user = User(id=1)
+
+    def _generator(self, seed=1):
+        return SyntheticDataGenerator(self.VOLUMES, seed=seed, years=3, end_year=2020)
+
+    def test_can_populate_database(self):
+        written = self._generator().populate(self._user)
+        self.assertEqual(self.VOLUMES, written)
+        self.assertEqual(3, len(list_categories()))
+        self.assertEqual(10, len(list_locations()))
+        self.assertEqual(200, len(list_sightings()))
+        self.assertEqual(2, len(list_status_schemes()))
+        self.assertLess(0, len(list_species_status_ratings()))
+        self.assertEqual(5, len(list_job_status()))
+        self.assertTrue(all(2018 <= sighting.sighting_date.year <= 2020 for sighting in list_sightings()))
+        self.assertTrue(all(location.latitude and location.longitude for location in list_locations()))
+
+    def test_populating_again_skips_existing_records(self):
+        _ = self._generator().populate(self._user)
+        written = self._generator().populate(self._user)
+        self.assertEqual(DatasetVolumes(0, 0, 0, 0, 0, 0, 5), written)
+
+    def test_data_is_reproducible(self):
+        self.assertEqual(list(self._generator().sightings()), list(self._generator().sightings()))
+        self.assertEqual(self._generator().status_ratings(), self._generator().status_ratings())
+        self.assertNotEqual(list(self._generator().sightings()), list(self._generator(2).sightings()))
+
+    def test_can_import_generated_csv(self):
+        filename = os.path.join(get_data_path(), "synthetic_sightings.csv")
+        self.assertEqual(200, self._generator().write_sightings_csv(filename))
+
+        with open(filename, mode="rt", encoding="UTF-8") as f:
+            importer = SightingsImportHelper(f, self._user)
+            importer.start()
+            importer.join()
+        os.unlink(filename)
+
+        self.assertIsNone(list_job_status()[0].error)
+        with Session.begin() as session:
+            self.assertEqual(200, session.query(Sighting).count())
+
+    def test_cannot_generate_sightings_in_current_year(self):
+        with self.assertRaises(ValueError):
+            _ = SyntheticDataGenerator(self.VOLUMES, end_year=2999)
+
+    def test_cannot_generate_without_species(self):
+        with self.assertRaises(ValueError):
+            _ = SyntheticDataGenerator(self.VOLUMES._replace(species=0))
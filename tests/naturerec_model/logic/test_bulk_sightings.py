@@ -0,0 +1,182 @@
+import unittest
+import datetime
+from naturerec_model.model import create_database, Gender, User, query_budget
+from naturerec_model.logic import create_category, create_species, create_location, create_sighting, list_sightings
+from naturerec_model.logic import create_sightings, update_sightings, reassign_sightings, delete_sightings, \
+    create_checklist, SightingFilter, NewSighting, SightingChange, ChecklistEntry, WriteOutcome, ConflictPolicy
+
+
+class TestBulkSightings(unittest.TestCase):
+    def setUp(self) -> None:
+        create_database()
+        self._user = User(id=1)
+        category = create_category("Birds", True, self._user)
+        self._gull = create_species(category.id, "Black-Headed Gull", None, self._user)
+        self._blackbird = create_species(category.id, "Blackbird", None, self._user)
+        self._radley = create_location(name="Radley Lakes", county="Oxfordshire", country="United Kingdom",
+                                       user=self._user)
+        self._brock_hill = create_location(name="Brock Hill", county="Hampshire", country="United Kingdom",
+                                           user=self._user)
+
+    def _create_gull_sightings(self, days, number=1):
+        return create_sightings([NewSighting(self._radley.id, self._gull.id, datetime.date(2021, 1, day), number)
+                                 for day in days], self._user)
+
+    def _summary(self):
+        return sorted((s.location.name, s.species.name, s.sighting_date.day, s.number) for s in list_sightings())
+
+    def test_can_create_sightings(self):
+        results = self._create_gull_sightings(range(1, 4), 2)
+        self.assertEqual([WriteOutcome.CREATED] * 3, [result.outcome for result in results])
+        self.assertEqual(3, len({result.sighting_id for result in results}))
+        self.assertEqual([("Radley Lakes", "Black-Headed Gull", day, 2) for day in range(1, 4)], self._summary())
+
+    def test_sightings_are_created_in_bounded_statements(self):
+        records = [NewSighting(self._radley.id, self._gull.id, datetime.date(2021, 1, 1) + datetime.timedelta(days=i))
+                   for i in range(200)]
+        with query_budget(6, max_repeats=2):
+            results = create_sightings(records, self._user)
+        self.assertEqual(200, len(results))
+
+    def test_invalid_record_prevents_writing_batch(self):
+        results = create_sightings([NewSighting(self._radley.id, self._gull.id, datetime.date(2021, 1, 1)),
+                                    NewSighting(self._radley.id, 999, datetime.date(2021, 1, 2)),
+                                    NewSighting(self._radley.id, self._gull.id, None),
+                                    NewSighting(self._radley.id, self._gull.id, datetime.date(2021, 1, 3), 0)],
+                                   self._user)
+        self.assertEqual([WriteOutcome.NOT_WRITTEN, WriteOutcome.FAILED, WriteOutcome.FAILED, WriteOutcome.FAILED],
+                         [result.outcome for result in results])
+        self.assertEqual([None, "Species not found", "Location, species and date must be specified",
+                          "Number of individuals must be positive"], [result.error for result in results])
+        self.assertEqual(0, len(list_sightings()))
+
+    def test_duplicates_fail_by_default(self):
+        _ = self._create_gull_sightings([1])
+        results = self._create_gull_sightings([1, 2, 2])
+        self.assertEqual([WriteOutcome.FAILED, WriteOutcome.NOT_WRITTEN, WriteOutcome.FAILED],
+                         [result.outcome for result in results])
+        self.assertEqual(1, len(list_sightings()))
+
+    def test_can_skip_duplicates(self):
+        existing_id = self._create_gull_sightings([1])[0].sighting_id
+        results = create_sightings([NewSighting(self._radley.id, self._gull.id, datetime.date(2021, 1, 1), 5),
+                                    NewSighting(self._radley.id, self._gull.id, datetime.date(2021, 1, 2), 5)],
+                                   self._user, ConflictPolicy.SKIP)
+        self.assertEqual([WriteOutcome.SKIPPED, WriteOutcome.CREATED], [result.outcome for result in results])
+        self.assertEqual(existing_id, results[0].sighting_id)
+        self.assertEqual([("Radley Lakes", "Black-Headed Gull", 1, 1), ("Radley Lakes", "Black-Headed Gull", 2, 5)],
+                         self._summary())
+
+    def test_can_merge_duplicates(self):
+        _ = self._create_gull_sightings([1], 2)
+        results = create_sightings([NewSighting(self._radley.id, self._gull.id, datetime.date(2021, 1, 1), 3),
+                                    NewSighting(self._radley.id, self._gull.id, datetime.date(2021, 1, 1), 4)],
+                                   self._user, ConflictPolicy.MERGE)
+        self.assertEqual([WriteOutcome.MERGED, WriteOutcome.MERGED], [result.outcome for result in results])
+        self.assertEqual([("Radley Lakes", "Black-Headed Gull", 1, 9)], self._summary())
+
+    def test_cannot_create_with_invalid_policy(self):
+        with self.assertRaises(ValueError):
+            _ = create_sightings([], self._user, "skip")
+
+    def test_can_update_sightings(self):
+        ids = [result.sighting_id for result in self._create_gull_sightings([1, 2])]
+        results = update_sightings([SightingChange(ids[0], self._brock_hill.id, self._blackbird.id,
+                                                   datetime.date(2021, 2, 1), 3, Gender.MALE, 1, "Notes"),
+                                    SightingChange(ids[1], self._radley.id, self._gull.id, datetime.date(2021, 1, 5))],
+                                   self._user)
+        self.assertEqual([WriteOutcome.UPDATED] * 2, [result.outcome for result in results])
+        self.assertEqual([("Brock Hill", "Blackbird", 1, 3), ("Radley Lakes", "Black-Headed Gull", 5, None)],
+                         self._summary())
+
+    def test_can_swap_sighting_dates(self):
+        ids = [result.sighting_id for result in self._create_gull_sightings([1, 2])]
+        results = update_sightings([SightingChange(ids[0], self._radley.id, self._blackbird.id,
+                                                   datetime.date(2021, 1, 2)),
+                                    SightingChange(ids[1], self._radley.id, self._blackbird.id,
+                                                   datetime.date(2021, 1, 1))],
+                                   self._user)
+        self.assertEqual([WriteOutcome.UPDATED] * 2, [result.outcome for result in results])
+
+    def test_can_swap_sighting_keys(self):
+        ids = [result.sighting_id for result in self._create_gull_sightings([1, 2, 3])]
+        changes = [SightingChange(sighting_id, self._radley.id, self._gull.id, datetime.date(2021, 1, day), number)
+                   for sighting_id, day, number in zip(ids, [2, 3, 1], [1, 2, 3])]
+        results = update_sightings(changes, self._user)
+        self.assertEqual([WriteOutcome.UPDATED] * 3, [result.outcome for result in results])
+        self.assertEqual([("Radley Lakes", "Black-Headed Gull", 1, 3),
+                          ("Radley Lakes", "Black-Headed Gull", 2, 1),
+                          ("Radley Lakes", "Black-Headed Gull", 3, 2)],
+                         self._summary())
+
+    def test_cannot_update_to_duplicate(self):
+        ids = [result.sighting_id for result in self._create_gull_sightings([1, 2])]
+        results = update_sightings([SightingChange(ids[0], self._radley.id, self._gull.id, datetime.date(2021, 1, 2))],
+                                   self._user)
+        self.assertEqual("Duplicate sighting found", results[0].error)
+
+    def test_cannot_update_missing_sighting(self):
+        results = update_sightings([SightingChange(999, self._radley.id, self._gull.id, datetime.date(2021, 1, 2))],
+                                   self._user)
+        self.assertEqual("Sighting not found", results[0].error)
+
+    def test_can_reassign_species(self):
+        _ = self._create_gull_sightings([1, 2, 3])
+        count = reassign_sightings(SightingFilter(species_id=self._gull.id, to_date=datetime.date(2021, 1, 2)),
+                                   self._user, species_id=self._blackbird.id)
+        self.assertEqual(2, count)
+        self.assertEqual(["Black-Headed Gull", "Blackbird", "Blackbird"],
+                         sorted(species for _, species, _, _ in self._summary()))
+
+    def test_can_reassign_location(self):
+        _ = self._create_gull_sightings([1, 2])
+        count = reassign_sightings(SightingFilter(location_id=self._radley.id), self._user,
+                                   location_id=self._brock_hill.id)
+        self.assertEqual(2, count)
+        self.assertEqual(["Brock Hill", "Brock Hill"], [location for location, _, _, _ in self._summary()])
+
+    def test_cannot_reassign_to_duplicate(self):
+        _ = self._create_gull_sightings([1, 2])
+        _ = create_sighting(self._radley.id, self._blackbird.id, datetime.date(2021, 1, 2), None, Gender.UNKNOWN,
+                            False, None, self._user)
+        with self.assertRaises(ValueError):
+            _ = reassign_sightings(SightingFilter(species_id=self._gull.id), self._user, species_id=self._blackbird.id)
+        self.assertEqual(2, len(list_sightings(species_id=self._gull.id)))
+
+    def test_cannot_reassign_without_target(self):
+        with self.assertRaises(ValueError):
+            _ = reassign_sightings(SightingFilter(species_id=self._gull.id), self._user)
+
+    def test_can_delete_sightings(self):
+        _ = self._create_gull_sightings(range(1, 6))
+        count = delete_sightings(SightingFilter(from_date=datetime.date(2021, 1, 2), to_date=datetime.date(2021, 1, 4)))
+        self.assertEqual(3, count)
+        self.assertEqual([1, 5], [day for _, _, day, _ in self._summary()])
+
+    def test_can_delete_sightings_by_id(self):
+        ids = [result.sighting_id for result in self._create_gull_sightings([1, 2])]
+        self.assertEqual(1, delete_sightings(SightingFilter(sighting_ids=ids[:1])))
+        self.assertEqual([2], [day for _, _, day, _ in self._summary()])
+
+    def test_cannot_delete_without_criteria(self):
+        _ = self._create_gull_sightings([1])
+        with self.assertRaises(ValueError):
+            _ = delete_sightings(SightingFilter())
+        self.assertEqual(1, len(list_sightings()))
+
+    def test_can_create_checklist(self):
+        results = create_checklist(self._radley.id, datetime.date(2021, 1, 1),
+                                   [ChecklistEntry(self._gull.id, 12, Gender.BOTH),
+                                    ChecklistEntry(self._blackbird.id, with_young=1)],
+                                   self._user)
+        self.assertEqual([WriteOutcome.CREATED] * 2, [result.outcome for result in results])
+        self.assertEqual([("Radley Lakes", "Black-Headed Gull", 1, 12), ("Radley Lakes", "Blackbird", 1, None)],
+                         self._summary())
+
+    def test_checklist_with_duplicate_is_not_written(self):
+        _ = self._create_gull_sightings([1])
+        results = create_checklist(self._radley.id, datetime.date(2021, 1, 1),
+                                   [ChecklistEntry(self._blackbird.id), ChecklistEntry(self._gull.id)],
+                                   self._user)
+        self.assertEqual([WriteOutcome.NOT_WRITTEN, WriteOutcome.FAILED], [result.outcome for result in results])
+        self.assertEqual(1, len(list_sightings()))
@@ -0,0 +1,189 @@
+import unittest
+import datetime
+import sqlalchemy as db
+from naturerec_model.model import create_database, query_budget, Engine, Session, Sighting, Gender, User
+from naturerec_model.logic import create_category, get_category
+from naturerec_model.logic import create_species, get_species
+from naturerec_model.logic import create_location, get_location, find_locations_in_bbox
+from naturerec_model.logic import create_sighting, list_sightings
+from naturerec_model.logic import ConflictPolicy
+
+
+class TestConflictPolicies(unittest.TestCase):
+    def setUp(self) -> None:
+        create_database()
+        self._user = User(id=1)
+        self._category = create_category("Birds", True, self._user)
+        self._species = create_species(self._category.id, "Black-Headed Gull", None, self._user)
+        self._location = create_location(name="Radley Lakes", county="Oxfordshire", country="United Kingdom",
+                                         user=self._user)
+        self._date = datetime.date(2021, 12, 14)
+        self._sighting = create_sighting(self._location.id, self._species.id, self._date, 2, Gender.MALE, False,
+                                         "Feeding", self._user)
+
+    def _create_duplicate_sighting(self, policy):
+        return create_sighting(self._location.id, self._species.id, self._date, None, Gender.FEMALE, True,
+                               " Roosting ", self._user, policy)
+
+    def test_cannot_create_duplicate_sighting_by_default(self):
+        with self.assertRaises(ValueError):
+            create_sighting(self._location.id, self._species.id, self._date, 1, Gender.UNKNOWN, False, None,
+                            self._user)
+
+    def test_cannot_create_duplicate_sighting_with_error_policy(self):
+        with self.assertRaises(ValueError):
+            self._create_duplicate_sighting(ConflictPolicy.ERROR)
+
+    def test_cannot_create_sighting_with_invalid_policy(self):
+        with self.assertRaises(ValueError):
+            self._create_duplicate_sighting("merge")
+
+    def test_can_create_sighting_with_each_policy(self):
+        for policy, day in zip(ConflictPolicy, range(1, 5)):
+            sighting = create_sighting(self._location.id, self._species.id, datetime.date(2022, 1, day), 1,
+                                       Gender.UNKNOWN, False, None, self._user, policy)
+            self.assertIsNotNone(sighting.id)
+            self.assertEqual(datetime.date(2022, 1, day), sighting.sighting_date)
+        self.assertEqual(5, len(list_sightings()))
+
+    def test_skip_policy_keeps_existing_sighting(self):
+        sighting = self._create_duplicate_sighting(ConflictPolicy.SKIP)
+        self.assertEqual(self._sighting.id, sighting.id)
+        self.assertEqual(2, sighting.number)
+        self.assertEqual(Gender.MALE, sighting.gender)
+        self.assertEqual(0, sighting.withYoung)
+        self.assertEqual("Feeding", sighting.notes)
+        self.assertEqual(1, len(list_sightings()))
+
+    def test_merge_policy_combines_sightings(self):
+        sighting = self._create_duplicate_sighting(ConflictPolicy.MERGE)
+        self.assertEqual(self._sighting.id, sighting.id)
+        self.assertEqual(3, sighting.number)
+        self.assertEqual(Gender.BOTH, sighting.gender)
+        self.assertEqual(1, sighting.withYoung)
+        self.assertEqual("Feeding\n\nRoosting", sighting.notes)
+        self.assertEqual(1, len(list_sightings()))
+
+    def test_merge_policy_keeps_single_gender_and_notes(self):
+        sighting = create_sighting(self._location.id, self._species.id, self._date, None, Gender.UNKNOWN, False, "  ",
+                                   self._user, ConflictPolicy.MERGE)
+        self.assertEqual(3, sighting.number)
+        self.assertEqual(Gender.MALE, sighting.gender)
+        self.assertEqual(0, sighting.withYoung)
+        self.assertEqual("Feeding", sighting.notes)
+
+    def test_replace_policy_overwrites_sighting(self):
+        sighting = self._create_duplicate_sighting(ConflictPolicy.REPLACE)
+        self.assertEqual(self._sighting.id, sighting.id)
+        self.assertIsNone(sighting.number)
+        self.assertEqual(Gender.FEMALE, sighting.gender)
+        self.assertEqual(1, sighting.withYoung)
+        self.assertEqual(" Roosting ", sighting.notes)
+        self.assertEqual(1, len(list_sightings()))
+
+    def test_replace_policy_preserves_creation_details(self):
+        with Session.begin() as session:
+            session.execute(db.update(Sighting).values(created_by=2))
+        sighting = self._create_duplicate_sighting(ConflictPolicy.REPLACE)
+        with Session.begin() as session:
+            sighting = session.query(Sighting).get(sighting.id)
+        self.assertEqual(2, sighting.created_by)
+        self.assertEqual(1, sighting.updated_by)
+
+    def test_create_sighting_is_one_statement(self):
+        with query_budget(1):
+            create_sighting(self._location.id, self._species.id, datetime.date(2022, 1, 1), 1, Gender.UNKNOWN,
+                            False, None, self._user)
+
+    def test_merge_sighting_is_two_statements(self):
+        with query_budget(2):
+            self._create_duplicate_sighting(ConflictPolicy.MERGE)
+
+    def test_skip_policy_keeps_existing_species(self):
+        species = create_species(self._category.id, " black-headed  gull ", "Chroicocephalus ridibundus",
+                                 self._user, ConflictPolicy.SKIP)
+        self.assertEqual(self._species.id, species.id)
+        self.assertIsNone(get_species(species.id).scientific_name)
+
+    def test_merge_policy_fills_in_missing_species_details(self):
+        species = create_species(self._category.id, "Black-Headed Gull", "Chroicocephalus ridibundus", self._user,
+                                 ConflictPolicy.MERGE)
+        self.assertEqual(self._species.id, species.id)
+        self.assertEqual("Chroicocephalus ridibundus", species.scientific_name)
+        self.assertEqual(1, len(get_category(self._category.id).species))
+
+    def test_cannot_create_duplicate_species(self):
+        with self.assertRaises(ValueError):
+            create_species(self._category.id, "Black-Headed Gull", None, self._user, ConflictPolicy.ERROR)
+
+    def test_cannot_create_species_in_another_category_with_any_policy(self):
+        insects = create_category("Insects", True, self._user)
+        for policy in ConflictPolicy:
+            with self.assertRaises(ValueError):
+                create_species(insects.id, "Black-Headed Gull", None, self._user, policy)
+        self.assertEqual(self._category.id, get_species(self._species.id).categoryId)
+        self.assertEqual(0, len(get_category(insects.id).species))
+
+    def test_merge_policy_keeps_existing_location_details(self):
+        location = create_location(name="Radley Lakes", county="Berkshire", country="United Kingdom",
+                                   user=self._user, city="Abingdon", latitude=51.6741, longitude=-1.2476,
+                                   policy=ConflictPolicy.MERGE)
+        self.assertEqual(self._location.id, location.id)
+        self.assertEqual("Oxfordshire", location.county)
+        self.assertEqual("Abingdon", location.city)
+        self.assertEqual(51.6741, get_location(location.id).latitude)
+
+    def test_replace_policy_updates_location_index(self):
+        create_location(name="Radley Lakes", county="Oxfordshire", country="United Kingdom", user=self._user,
+                        latitude=51.6741, longitude=-1.2476, policy=ConflictPolicy.REPLACE)
+        locations = find_locations_in_bbox(51.6, -1.3, 51.7, -1.2)
+        self.assertEqual([self._location.id], [location.id for location in locations])
+
+    def test_cannot_create_duplicate_location(self):
+        with self.assertRaises(ValueError):
+            create_location(name="Radley Lakes", county="Oxfordshire", country="United Kingdom", user=self._user)
+
+    def test_skip_policy_keeps_existing_category(self):
+        category = create_category("birds", False, self._user, ConflictPolicy.SKIP)
+        self.assertEqual(self._category.id, category.id)
+        self.assertTrue(category.supports_gender)
+
+    def test_replace_policy_overwrites_category(self):
+        category = create_category("Birds", False, self._user, ConflictPolicy.REPLACE)
+        self.assertEqual(self._category.id, category.id)
+        self.assertFalse(get_category(category.id).supports_gender)
+
+
+class TestConflictPoliciesWithoutConstraint(TestConflictPolicies):
+    def setUp(self) -> None:
+        super().setUp()
+        self._remove_sighting_uniqueness_constraint()
+
+    @staticmethod
+    def _remove_sighting_uniqueness_constraint():
+        """
+        The pre-existing database doesn't have the sighting uniqueness constraint so replace the Sightings table
+        with one that doesn't have it, keeping its rows
+        """
+        with Engine.begin() as connection:
+            connection.execute(db.text("ALTER TABLE Sightings RENAME TO OldSightings"))
+            connection.execute(db.text("CREATE TABLE Sightings ("
+                                       "id INTEGER PRIMARY KEY, locationId INTEGER NOT NULL, "
+                                       "speciesId INTEGER NOT NULL, date VARCHAR NOT NULL, number INTEGER, "
+                                       "withYoung INTEGER NOT NULL, gender INTEGER NOT NULL, notes VARCHAR, "
+                                       "created_by INTEGER NOT NULL, updated_by INTEGER NOT NULL, "
+                                       "date_created DATETIME NOT NULL, date_updated DATETIME NOT NULL)"))
+            connection.execute(db.text("INSERT INTO Sightings SELECT id, locationId, speciesId, date, number, "
+                                       "withYoung, gender, notes, created_by, updated_by, date_created, "
+                                       "date_updated FROM OldSightings"))
+            connection.execute(db.text("DROP TABLE OldSightings"))
+
+    def test_create_sighting_is_one_statement(self):
+        # Without the constraint, the existing sighting is looked up before the new one's inserted
+        with query_budget(2):
+            create_sighting(self._location.id, self._species.id, datetime.date(2022, 1, 1), 1, Gender.UNKNOWN,
+                            False, None, self._user)
+
+    def test_merge_sighting_is_two_statements(self):
+        with query_budget(3):
+            self._create_duplicate_sighting(ConflictPolicy.MERGE)
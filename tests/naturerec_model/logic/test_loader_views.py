@@ -0,0 +1,108 @@
+import unittest
+import datetime
+from sqlalchemy.exc import InvalidRequestError
+from sqlalchemy.orm.exc import DetachedInstanceError
+from naturerec_model.model import create_database, Gender, User
+from naturerec_model.logic import create_category, get_category, list_categories
+from naturerec_model.logic import create_species, get_species, list_species
+from naturerec_model.logic import create_location, get_location, list_locations
+from naturerec_model.logic import create_sighting, get_sighting, list_sightings
+from naturerec_model.logic import search_sightings, search_species
+from naturerec_model.logic import LoaderView
+from naturerec_model.logic.loader_views import loader_options
+from naturerec_model.model import Category
+
+
+class TestLoaderViews(unittest.TestCase):
+    def setUp(self) -> None:
+        create_database()
+        user = User(id=1)
+        self._category = create_category("Birds", True, user)
+        self._species = create_species(self._category.id, "Black-Headed Gull", "Chroicocephalus ridibundus", user)
+        self._location = create_location(name="Radley Lakes", county="Oxfordshire", country="United Kingdom",
+                                         user=user, latitude=51.6463, longitude=-1.2432)
+        self._sighting = create_sighting(self._location.id, self._species.id, datetime.date(2021, 12, 14), 3,
+                                         Gender.UNKNOWN, False, "Feeding on the lake", user)
+
+    def test_invalid_view_raises_error(self):
+        with self.assertRaises(ValueError):
+            loader_options(Category, "minimal")
+
+    def test_full_view_is_the_default(self):
+        sighting = get_sighting(self._sighting.id)
+        self.assertEqual("Radley Lakes", sighting.location.name)
+        self.assertEqual("Oxfordshire", sighting.location.county)
+        self.assertEqual("Birds", sighting.species.category.name)
+        self.assertEqual(1, len(list_categories()[0].species))
+
+    def test_minimal_category_view(self):
+        categories = list_categories(LoaderView.MINIMAL)
+        self.assertEqual(1, len(categories))
+        self.assertEqual("Birds", categories[0].name)
+        self.assertTrue(categories[0].supports_gender)
+        with self.assertRaises(InvalidRequestError):
+            _ = categories[0].species
+
+    def test_minimal_category_view_by_name(self):
+        category = get_category("Birds", LoaderView.MINIMAL)
+        self.assertEqual(self._category.id, category.id)
+        with self.assertRaises(InvalidRequestError):
+            _ = category.species
+
+    def test_minimal_species_view(self):
+        species = list_species(self._category.id, LoaderView.MINIMAL)
+        self.assertEqual(1, len(species))
+        self.assertEqual("Black-Headed Gull", species[0].name)
+        self.assertEqual("Chroicocephalus ridibundus", species[0].scientific_name)
+        self.assertEqual(self._category.id, species[0].categoryId)
+        with self.assertRaises(InvalidRequestError):
+            _ = species[0].category
+
+    def test_display_species_view(self):
+        species = get_species(self._species.id, LoaderView.DISPLAY)
+        self.assertEqual("Birds", species.category.name)
+        with self.assertRaises(InvalidRequestError):
+            _ = species.category.species
+
+    def test_minimal_location_view(self):
+        location = get_location(self._location.id, LoaderView.MINIMAL)
+        self.assertEqual("Radley Lakes", location.name)
+        with self.assertRaises(DetachedInstanceError):
+            _ = location.county
+
+    def test_display_location_view(self):
+        locations = list_locations(view=LoaderView.DISPLAY)
+        self.assertEqual(1, len(locations))
+        self.assertEqual("Oxfordshire", locations[0].county)
+        self.assertAlmostEqual(51.6463, locations[0].latitude, places=4)
+        with self.assertRaises(DetachedInstanceError):
+            _ = locations[0].date_created
+
+    def test_minimal_sighting_view(self):
+        sighting = get_sighting(self._sighting.id, LoaderView.MINIMAL)
+        self.assertEqual(datetime.date(2021, 12, 14), sighting.sighting_date)
+        self.assertEqual(self._species.id, sighting.speciesId)
+        with self.assertRaises(InvalidRequestError):
+            _ = sighting.species
+        with self.assertRaises(InvalidRequestError):
+            _ = sighting.location
+
+    def test_display_sighting_view(self):
+        sightings = list_sightings(view=LoaderView.DISPLAY)
+        self.assertEqual(1, len(sightings))
+        self.assertEqual(3, sightings[0].number)
+        self.assertEqual("Radley Lakes", sightings[0].location.name)
+        self.assertEqual("Black-Headed Gull", sightings[0].species.name)
+        self.assertEqual("Birds", sightings[0].species.category.name)
+        with self.assertRaises(DetachedInstanceError):
+            _ = sightings[0].location.county
+        with self.assertRaises(InvalidRequestError):
+            _ = sightings[0].species.category.species
+
+    def test_display_search_views(self):
+        sightings = search_sightings("lake", view=LoaderView.DISPLAY)
+        self.assertEqual(1, len(sightings))
+        self.assertEqual("Radley Lakes", sightings[0].location.name)
+        species = search_species("gul", view=LoaderView.DISPLAY)
+        self.assertEqual(1, len(species))
+        self.assertTrue(species[0].category.supports_gender)
@@ -0,0 +1,61 @@
+import unittest
+from naturerec_model.model import create_database, User
+from naturerec_model.logic import create_location
+from naturerec_model.logic import find_duplicate_locations
+from naturerec_model.logic.location_duplicates import normalise_location_name
+
+
+class TestLocationDuplicates(unittest.TestCase):
+    def setUp(self) -> None:
+        create_database()
+        self._user = User(id=1)
+
+    def create_location(self, name, latitude=None, longitude=None):
+        return create_location(name=name, county="Oxfordshire", country="United Kingdom", user=self._user,
+                               latitude=latitude, longitude=longitude).id
+
+    def test_can_normalise_location_name(self):
+        self.assertEqual("radley lakes", normalise_location_name("The  Radley Lakes!"))
+        self.assertEqual("sainte bruyere", normalise_location_name("Sainte-Bruyère"))
+
+    def test_can_find_duplicates_by_name(self):
+        first_id = self.create_location("Radley Lakes")
+        second_id = self.create_location("Radley Lake")
+        _ = self.create_location("Brock Hill")
+        candidates = find_duplicate_locations()
+        self.assertEqual(1, len(candidates))
+        self.assertEqual(first_id, candidates[0].location_id)
+        self.assertEqual(second_id, candidates[0].duplicate_id)
+        self.assertIsNone(candidates[0].distance)
+        self.assertGreater(candidates[0].name_similarity, 0.9)
+
+    def test_can_find_duplicates_with_reordered_names(self):
+        _ = self.create_location("Lashford Lane Fen")
+        _ = self.create_location("Fen, Lashford Lane")
+        candidates = find_duplicate_locations()
+        self.assertEqual(1, len(candidates))
+
+    def test_can_find_duplicates_by_proximity(self):
+        _ = self.create_location("Farmoor Reservoir", 51.7536, -1.3541)
+        _ = self.create_location("Farmoor Res.", 51.7540, -1.3545)
+        _ = self.create_location("Radley Lakes", 51.6463, -1.2432)
+        candidates = find_duplicate_locations()
+        self.assertEqual(1, len(candidates))
+        self.assertLess(candidates[0].distance, 0.1)
+
+    def test_distant_locations_score_lower(self):
+        _ = self.create_location("Radley Lakes", 51.6463, -1.2432)
+        _ = self.create_location("Radley Lake", 51.6466, -1.2430)
+        _ = self.create_location("Radley Lakes North", 52.6463, -1.2432)
+        candidates = find_duplicate_locations(min_score=0.0)
+        self.assertEqual("Radley Lake", candidates[0].duplicate_name)
+        self.assertGreater(candidates[0].score, candidates[-1].score)
+
+    def test_dissimilar_nearby_locations_are_not_reported(self):
+        _ = self.create_location("Radley Lakes", 51.6463, -1.2432)
+        _ = self.create_location("Abingdon Marina", 51.6470, -1.2440)
+        self.assertEqual(0, len(find_duplicate_locations()))
+
+    def test_cannot_find_duplicates_with_invalid_distance(self):
+        with self.assertRaises(ValueError):
+            _ = find_duplicate_locations(max_distance_km=0)
@@ -1,7 +1,8 @@
 import unittest
 import datetime
-from naturerec_model.model import create_database, Session, Location, Gender, User
+from naturerec_model.model import create_database, Session, Location, Gender, User, LocationIndex
 from naturerec_model.logic import create_location, get_location, list_locations, update_location, delete_location
+from naturerec_model.logic import find_locations_in_bbox, nearest_locations, rebuild_location_index
 from naturerec_model.logic import create_category
 from naturerec_model.logic import create_species
 from naturerec_model.logic import create_sighting
@@ -26,6 +27,12 @@ class TestLocations(unittest.TestCase):
         create_location(name="Puttles Bridge", city="Brockenhurst", county="Hampshire", country="United Kingdom", user=self._user)
         create_location(name="Playa Flamenca", city="Alicante", county="Orihuela Costa", country="España", user=self._user)
 
+    def create_located_locations(self):
+        create_location(name="Radley Lakes", county="Oxfordshire", country="United Kingdom", latitude=51.6463,
+                        longitude=-1.2432, user=self._user)
+        create_location(name="Brock Hill", city="Lyndhurst", county="Hampshire", country="United Kingdom",
+                        latitude=50.8703, longitude=-1.6196, user=self._user)
+
     def test_can_create_location(self):
         with Session.begin() as session:
             location = session.query(Location).one()
@@ -220,3 +227,68 @@ class TestLocations(unittest.TestCase):
                             "Notes", self._user)
         with self.assertRaises(ValueError):
             delete_location(-1)
+
+    def test_can_find_locations_in_bbox(self):
+        self.create_located_locations()
+        locations = find_locations_in_bbox(51.0, -2.0, 52.0, -1.0)
+        names = [location.name for location in locations]
+        self.assertEqual(["Lashford Lane Fen", "Radley Lakes"], names)
+
+    def test_can_find_locations_in_bbox_crossing_antimeridian(self):
+        create_location(name="Suva", county="Rewa", country="Fiji", latitude=-18.1248, longitude=178.4501,
+                        user=self._user)
+        create_location(name="Apia", county="Tuamasaga", country="Samoa", latitude=-13.8333, longitude=-171.7667,
+                        user=self._user)
+        locations = find_locations_in_bbox(-20.0, 170.0, -10.0, -170.0)
+        names = [location.name for location in locations]
+        self.assertEqual(["Apia", "Suva"], names)
+
+    def test_location_without_coordinates_is_not_indexed(self):
+        self.create_additional_locations()
+        locations = find_locations_in_bbox(-90.0, -180.0, 90.0, 180.0)
+        self.assertEqual(1, len(locations))
+        self.assertEqual("Lashford Lane Fen", locations[0].name)
+
+    def test_updated_coordinates_are_indexed(self):
+        update_location(self._location.id, "Lashford Lane Fen", "Oxfordshire", "United Kingdom", self._user,
+                        latitude=50.8, longitude=-1.6)
+        self.assertEqual(0, len(find_locations_in_bbox(51.0, -2.0, 52.0, -1.0)))
+        self.assertEqual(1, len(find_locations_in_bbox(50.0, -2.0, 51.0, -1.0)))
+
+    def test_removed_coordinates_are_removed_from_index(self):
+        update_location(self._location.id, "Lashford Lane Fen", "Oxfordshire", "United Kingdom", self._user)
+        self.assertEqual(0, len(find_locations_in_bbox(-90.0, -180.0, 90.0, 180.0)))
+
+    def test_deleted_location_is_removed_from_index(self):
+        delete_location(self._location.id)
+        self.assertEqual(0, len(find_locations_in_bbox(-90.0, -180.0, 90.0, 180.0)))
+
+    def test_can_find_nearest_locations(self):
+        self.create_located_locations()
+        nearest = nearest_locations(51.6708, -1.2880, 2)
+        self.assertEqual(2, len(nearest))
+        self.assertEqual("Radley Lakes", nearest[0].location.name)
+        self.assertEqual("Lashford Lane Fen", nearest[1].location.name)
+        self.assertLess(nearest[0].distance, nearest[1].distance)
+
+    def test_can_find_distant_nearest_locations(self):
+        self.create_located_locations()
+        nearest = nearest_locations(-33.8688, 151.2093, 10)
+        self.assertEqual(3, len(nearest))
+        self.assertEqual("Radley Lakes", nearest[0].location.name)
+        self.assertEqual("Brock Hill", nearest[2].location.name)
+
+    def test_nearest_locations_limited_by_distance(self):
+        self.create_located_locations()
+        nearest = nearest_locations(51.6708, -1.2880, 10, max_distance=20)
+        names = [n.location.name for n in nearest]
+        self.assertEqual(["Radley Lakes", "Lashford Lane Fen"], names)
+
+    def test_can_rebuild_location_index(self):
+        self.create_located_locations()
+        with Session.begin() as session:
+            session.execute(LocationIndex.delete())
+        self.assertEqual(0, len(find_locations_in_bbox(-90.0, -180.0, 90.0, 180.0)))
+
+        rebuild_location_index()
+        self.assertEqual(3, len(find_locations_in_bbox(-90.0, -180.0, 90.0, 180.0)))
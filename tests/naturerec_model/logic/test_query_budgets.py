@@ -0,0 +1,145 @@
+import unittest
+import datetime
+from naturerec_model.model import create_database, query_budget, Gender, User
+from naturerec_model.logic import create_category, get_category, list_categories
+from naturerec_model.logic import create_species, get_species, list_species
+from naturerec_model.logic import create_location, get_location, list_locations, find_locations_in_bbox, \
+    nearest_locations
+from naturerec_model.logic import create_sighting, get_sighting, list_sightings, aggregate_sightings
+from naturerec_model.logic import search_sightings, search_species
+from naturerec_model.logic import create_status_scheme, create_status_rating, list_status_schemes
+from naturerec_model.logic import create_species_status_rating, list_species_status_ratings, get_current_statuses
+from naturerec_model.logic import find_duplicate_locations
+from naturerec_model.logic import delete_species, delete_status_scheme, delete_unused_reference_data
+
+
+class TestQueryBudgets(unittest.TestCase):
+    """
+    Query budgets for the logic functions. The fixture data has several related records of each type, so a
+    function that loads related records one at a time executes repeated statements and exceeds its budget
+    """
+
+    def setUp(self) -> None:
+        create_database()
+        user = User(id=1)
+        birds = create_category("Birds", True, user)
+        insects = create_category("Insects", True, user)
+        species = [create_species(birds.id, name, None, user) for name in ["Blackbird", "Robin", "Wren"]]
+        species.append(create_species(insects.id, "Stag Beetle", None, user))
+        locations = [
+            create_location(name="Radley Lakes", county="Oxfordshire", country="United Kingdom", user=user,
+                            latitude=51.6463, longitude=-1.2432),
+            create_location(name="Lashford Lane Fen", county="Oxfordshire", country="United Kingdom", user=user,
+                            latitude=51.706694, longitude=-1.324120),
+            create_location(name="Brock Hill", county="Hampshire", country="United Kingdom", user=user,
+                            latitude=50.8703, longitude=-1.6196)
+        ]
+        for i, (location, a_species) in enumerate([(lc, sp) for lc in locations for sp in species]):
+            create_sighting(location.id, a_species.id, datetime.date(2021, 12, 1 + i), 1, Gender.UNKNOWN, False,
+                            "Seen feeding", user)
+
+        scheme = create_status_scheme("BOCC4", user)
+        rating = create_status_rating(scheme.id, "Amber", user)
+        for a_species in species:
+            create_species_status_rating(a_species.id, rating.id, "United Kingdom", datetime.date(2021, 1, 1), user)
+
+        self._category_id = birds.id
+        self._species_id = species[0].id
+        self._location_id = locations[0].id
+
+    def test_get_category(self):
+        with query_budget(1, name="get_category"):
+            get_category(self._category_id)
+
+    def test_list_categories(self):
+        with query_budget(1, name="list_categories"):
+            list_categories()
+
+    def test_get_species(self):
+        with query_budget(1, name="get_species"):
+            get_species(self._species_id)
+
+    def test_list_species(self):
+        with query_budget(1, name="list_species"):
+            list_species(self._category_id)
+
+    def test_get_location(self):
+        with query_budget(1, name="get_location"):
+            get_location(self._location_id)
+
+    def test_list_locations(self):
+        with query_budget(1, name="list_locations"):
+            list_locations()
+
+    def test_find_locations_in_bbox(self):
+        with query_budget(1, name="find_locations_in_bbox"):
+            find_locations_in_bbox(50.0, -2.0, 52.0, -1.0)
+
+    def test_nearest_locations(self):
+        # The search area is expanded, repeating the candidate query, until enough locations have been found
+        with query_budget(2, max_repeats=2, name="nearest_locations"):
+            nearest_locations(51.6, -1.2, k=2)
+
+    def test_get_sighting(self):
+        with query_budget(1, name="get_sighting"):
+            sighting = get_sighting(1)
+            _ = sighting.species.category.name, sighting.location.name
+
+    def test_list_sightings(self):
+        with query_budget(1, name="list_sightings"):
+            for sighting in list_sightings():
+                _ = sighting.species.category.name, sighting.location.name
+
+    def test_aggregate_sightings(self):
+        with query_budget(1, name="aggregate_sightings"):
+            aggregate_sightings(50.0, -3.0, 52.0, 0.0, 6)
+
+    def test_search_sightings(self):
+        with query_budget(1, name="search_sightings"):
+            for sighting in search_sightings("feeding"):
+                _ = sighting.species.category.name, sighting.location.name
+
+    def test_search_species(self):
+        with query_budget(1, name="search_species"):
+            search_species("bl")
+
+    def test_list_status_schemes(self):
+        with query_budget(1, name="list_status_schemes"):
+            for scheme in list_status_schemes():
+                _ = [rating.name for rating in scheme.ratings]
+
+    def test_list_species_status_ratings(self):
+        with query_budget(1, name="list_species_status_ratings"):
+            for species_rating in list_species_status_ratings():
+                _ = species_rating.species.name, species_rating.rating.scheme.name
+
+    def test_list_current_species_status_ratings(self):
+        with query_budget(1, name="list_species_status_ratings"):
+            for species_rating in list_species_status_ratings(scheme_id=1, current_only=True):
+                _ = species_rating.species.name, species_rating.rating.scheme.name
+
+    def test_get_current_statuses(self):
+        with query_budget(1, name="get_current_statuses"):
+            for statuses in get_current_statuses().values():
+                _ = [(status.rating.name, status.rating.scheme.name) for status in statuses]
+
+    def test_find_duplicate_locations(self):
+        with query_budget(1, name="find_duplicate_locations"):
+            find_duplicate_locations()
+
+    def test_delete_species(self):
+        species = create_species(self._category_id, "Red Kite", None, User(id=1))
+        with query_budget(3, name="delete_species"):
+            delete_species(species.id)
+
+    def test_delete_status_scheme(self):
+        user = User(id=1)
+        scheme = create_status_scheme("IUCN", user)
+        for name in ["Least Concern", "Near Threatened", "Vulnerable"]:
+            create_status_rating(scheme.id, name, user)
+        with query_budget(3, name="delete_status_scheme"):
+            delete_status_scheme(scheme.id)
+
+    def test_delete_unused_reference_data(self):
+        with query_budget(4, name="delete_unused_reference_data"):
+            delete_unused_reference_data()
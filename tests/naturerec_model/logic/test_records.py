@@ -0,0 +1,79 @@
+import unittest
+import datetime
+from naturerec_model.model import create_database, Gender, User
+from naturerec_model.logic import create_category, create_species, create_location, create_sighting, list_sightings
+from naturerec_model.logic import list_location_records, list_species_records, list_sighting_records
+
+
+class TestRecords(unittest.TestCase):
+    def setUp(self) -> None:
+        create_database()
+        user = User(id=1)
+        self._birds = create_category("Birds", True, user)
+        insects = create_category("Insects", False, user)
+        self._gull = create_species(self._birds.id, "Black-Headed Gull", "Chroicocephalus ridibundus", user)
+        blackbird = create_species(self._birds.id, "Blackbird", None, user)
+        _ = create_species(insects.id, "Stag Beetle", None, user)
+        self._radley = create_location(name="Radley Lakes", county="Oxfordshire", country="United Kingdom",
+                                       user=user, latitude=51.6463, longitude=-1.2432)
+        _ = create_location(name="Brock Hill", county="Hampshire", country="United Kingdom", user=user)
+        create_sighting(self._radley.id, self._gull.id, datetime.date(2021, 12, 14), 3, Gender.BOTH, True,
+                        "Feeding", user)
+        create_sighting(self._radley.id, blackbird.id, datetime.date(2021, 12, 15), None, Gender.UNKNOWN, False,
+                        None, user)
+
+    def test_can_list_location_records(self):
+        locations = list_location_records()
+        self.assertEqual(["Brock Hill", "Radley Lakes"], [location.name for location in locations])
+        self.assertEqual("Oxfordshire", locations[1].county)
+        self.assertAlmostEqual(51.6463, locations[1].latitude, places=4)
+        self.assertIsNone(locations[0].latitude)
+
+    def test_can_filter_location_records(self):
+        locations = list_location_records(county="Hampshire")
+        self.assertEqual(1, len(locations))
+        self.assertEqual("Brock Hill", locations[0].name)
+
+    def test_location_records_are_immutable(self):
+        location = list_location_records()[0]
+        with self.assertRaises(AttributeError):
+            location.name = "Somewhere Else"
+
+    def test_can_list_species_records(self):
+        species = list_species_records(self._birds.id)
+        self.assertEqual(["Black-Headed Gull", "Blackbird"], [s.name for s in species])
+        self.assertEqual("Chroicocephalus ridibundus", species[0].scientific_name)
+        self.assertEqual(self._birds.id, species[0].category_id)
+        self.assertEqual("Birds", species[0].category_name)
+        self.assertTrue(species[0].supports_gender)
+
+    def test_can_list_sighting_records(self):
+        sightings = list_sighting_records()
+        self.assertEqual(2, len(sightings))
+        sighting = sightings[0]
+        self.assertEqual(datetime.date(2021, 12, 14), sighting.date)
+        self.assertEqual("14/12/2021", sighting.display_date)
+        self.assertEqual(3, sighting.number)
+        self.assertEqual(Gender.BOTH, sighting.gender)
+        self.assertEqual("Both", sighting.gender_name)
+        self.assertEqual("Yes", sighting.with_young_name)
+        self.assertEqual("Feeding", sighting.notes)
+        self.assertEqual("Radley Lakes", sighting.location.name)
+        self.assertEqual("Black-Headed Gull", sighting.species.name)
+        self.assertEqual("Birds", sighting.species.category_name)
+
+    def test_sighting_records_share_related_records(self):
+        sightings = list_sighting_records()
+        self.assertIs(sightings[0].location, sightings[1].location)
+
+    def test_can_filter_sighting_records(self):
+        sightings = list_sighting_records(from_date=datetime.date(2021, 12, 15))
+        self.assertEqual(1, len(sightings))
+        self.assertEqual("Blackbird", sightings[0].species.name)
+        self.assertEqual(1, len(list_sighting_records(species_id=self._gull.id)))
+        self.assertEqual(2, len(list_sighting_records(location_id=self._radley.id)))
+        self.assertEqual(0, len(list_sighting_records(to_date=datetime.date(2021, 12, 1))))
+
+    def test_sighting_record_csv_columns_match_sighting(self):
+        self.assertEqual([sighting.csv_columns for sighting in list_sightings()],
+                         [record.csv_columns for record in list_sighting_records()])
@@ -0,0 +1,50 @@
+import unittest
+import datetime
+import sqlalchemy as db
+from naturerec_model.model import create_database, Session, LocationIndex, Gender, User
+from naturerec_model.logic import create_category, create_species, list_species
+from naturerec_model.logic import create_location, list_locations
+from naturerec_model.logic import create_sighting, list_sightings
+from naturerec_model.logic import create_status_scheme, create_status_rating, create_species_status_rating, \
+    list_status_schemes
+from naturerec_model.logic import delete_unused_reference_data
+
+
+class TestReferenceData(unittest.TestCase):
+    def setUp(self) -> None:
+        create_database()
+        self._user = User(id=1)
+        category = create_category("Birds", True, self._user)
+        self._gull = create_species(category.id, "Black-Headed Gull", None, self._user)
+        self._skua = create_species(category.id, "Arctic Skua", None, self._user)
+        _ = create_species(category.id, "Blackbird", None, self._user)
+        radley = create_location(name="Radley Lakes", county="Oxfordshire", country="United Kingdom", user=self._user,
+                                 latitude=51.6463, longitude=-1.2432)
+        _ = create_location(name="Brock Hill", county="Hampshire", country="United Kingdom", user=self._user,
+                            latitude=50.8703, longitude=-1.6196)
+        _ = create_sighting(radley.id, self._gull.id, datetime.date(2021, 1, 1), 1, Gender.UNKNOWN, False, None,
+                            self._user)
+        scheme = create_status_scheme("BOCC5", self._user)
+        red = create_status_rating(scheme.id, "Red", self._user)
+        _ = create_status_rating(scheme.id, "Amber", self._user)
+        _ = create_species_status_rating(self._skua.id, red.id, "United Kingdom", datetime.date(2015, 1, 1),
+                                         self._user)
+
+    def test_can_delete_unused_reference_data(self):
+        deleted = delete_unused_reference_data()
+        self.assertEqual((1, 1, 1), deleted)
+        species = list_species(self._gull.categoryId)
+        self.assertEqual(["Arctic Skua", "Black-Headed Gull"], [a_species.name for a_species in species])
+        self.assertEqual(["Radley Lakes"], [location.name for location in list_locations()])
+        self.assertEqual(["Red"], [rating.name for rating in list_status_schemes()[0].ratings])
+        self.assertEqual(1, len(list_sightings()))
+
+    def test_unused_locations_are_removed_from_index(self):
+        _ = delete_unused_reference_data()
+        with Session.begin() as session:
+            location_ids = session.execute(db.select(LocationIndex.c.id)).scalars().all()
+        self.assertEqual([location.id for location in list_locations()], location_ids)
+
+    def test_nothing_is_deleted_when_all_data_is_used(self):
+        _ = delete_unused_reference_data()
+        self.assertEqual((0, 0, 0), delete_unused_reference_data())
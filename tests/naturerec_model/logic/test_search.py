@@ -0,0 +1,102 @@
+import unittest
+import datetime
+from naturerec_model.model import create_database, Gender, User
+from naturerec_model.logic import create_category, create_species, update_species, delete_species
+from naturerec_model.logic import create_location
+from naturerec_model.logic import create_sighting, update_sighting, delete_sighting
+from naturerec_model.logic import search_sightings, search_species, rebuild_search_indexes
+
+
+class TestSearch(unittest.TestCase):
+    def setUp(self) -> None:
+        create_database()
+        self._user = User(id=1)
+        self._birds = create_category("Birds", True, self._user)
+        self._insects = create_category("Insects", True, self._user)
+        self._gull = create_species(self._birds.id, "Black-Headed Gull", "Chroicocephalus ridibundus", self._user)
+        self._blackbird = create_species(self._birds.id, "Blackbird", "Turdus merula", self._user)
+        self._beetle = create_species(self._insects.id, "Stag Beetle", "Lucanus cervus", self._user)
+        self._location = create_location(name="Radley Lakes", county="Oxfordshire", country="United Kingdom",
+                                         user=self._user)
+        self._sighting = create_sighting(self._location.id, self._gull.id, datetime.date(2021, 12, 14), None,
+                                         Gender.UNKNOWN, False, "Feeding on the reed bed by the lake", self._user)
+        create_sighting(self._location.id, self._blackbird.id, datetime.date(2021, 12, 15), None, Gender.UNKNOWN,
+                        False, "Singing from the hedge", self._user)
+        create_sighting(self._location.id, self._beetle.id, datetime.date(2021, 6, 1), None, Gender.UNKNOWN,
+                        False, "Under a log by the lake", self._user)
+
+    def test_can_search_sighting_notes(self):
+        sightings = search_sightings("reed")
+        self.assertEqual(1, len(sightings))
+        self.assertEqual("Black-Headed Gull", sightings[0].species.name)
+
+    def test_sighting_search_requires_all_words(self):
+        self.assertEqual(2, len(search_sightings("lake")))
+        self.assertEqual(1, len(search_sightings("lake log")))
+
+    def test_can_filter_sighting_search_by_date(self):
+        sightings = search_sightings("lake", from_date=datetime.date(2021, 12, 1))
+        self.assertEqual(1, len(sightings))
+        self.assertEqual(self._sighting.id, sightings[0].id)
+
+    def test_can_filter_sighting_search_by_category(self):
+        sightings = search_sightings("lake", category_id=self._insects.id)
+        self.assertEqual(1, len(sightings))
+        self.assertEqual("Stag Beetle", sightings[0].species.name)
+
+    def test_can_filter_sighting_search_by_species(self):
+        sightings = search_sightings("lake", species_id=self._gull.id)
+        self.assertEqual(1, len(sightings))
+        self.assertEqual(self._sighting.id, sightings[0].id)
+
+    def test_search_ignores_query_syntax(self):
+        self.assertEqual(0, len(search_sightings('"reed OR -bed*')))
+        self.assertEqual(0, len(search_sightings("   ")))
+
+    def test_updated_sighting_notes_are_searchable(self):
+        update_sighting(self._sighting.id, self._location.id, self._gull.id, datetime.date(2021, 12, 14), None,
+                        Gender.UNKNOWN, False, "Roosting on the island", self._user)
+        self.assertEqual(0, len(search_sightings("reed")))
+        self.assertEqual(1, len(search_sightings("island")))
+
+    def test_deleted_sightings_are_not_found(self):
+        delete_sighting(self._sighting.id)
+        self.assertEqual(0, len(search_sightings("reed")))
+
+    def test_can_autocomplete_common_name(self):
+        species = search_species("bla")
+        self.assertEqual(["Black-Headed Gull", "Blackbird"], sorted([s.name for s in species]))
+
+    def test_can_autocomplete_multiple_words(self):
+        species = search_species("bla gu")
+        self.assertEqual(1, len(species))
+        self.assertEqual("Black-Headed Gull", species[0].name)
+
+    def test_can_autocomplete_scientific_name(self):
+        species = search_species("turd")
+        self.assertEqual(1, len(species))
+        self.assertEqual("Blackbird", species[0].name)
+
+    def test_can_filter_autocomplete_by_category(self):
+        species = search_species("bla", category_id=self._insects.id)
+        self.assertEqual(0, len(species))
+
+    def test_autocomplete_is_limited(self):
+        species = search_species("bla", limit=1)
+        self.assertEqual(1, len(species))
+
+    def test_updated_species_names_are_searchable(self):
+        update_species(self._beetle.id, self._insects.id, "Lesser Stag Beetle", "Dorcus parallelipipedus",
+                       self._user)
+        self.assertEqual(0, len(search_species("lucanus")))
+        self.assertEqual(1, len(search_species("lesser")))
+
+    def test_deleted_species_are_not_found(self):
+        species = create_species(self._insects.id, "Cockchafer", None, self._user)
+        delete_species(species.id)
+        self.assertEqual(0, len(search_species("cock")))
+
+    def test_can_rebuild_search_indexes(self):
+        rebuild_search_indexes()
+        self.assertEqual(1, len(search_sightings("reed")))
+        self.assertEqual(2, len(search_species("bla")))
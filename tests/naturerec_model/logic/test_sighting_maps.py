@@ -0,0 +1,80 @@
+import unittest
+import datetime
+from naturerec_model.model import create_database, Gender, User
+from naturerec_model.logic import create_category, create_species, create_location, create_sighting
+from naturerec_model.logic import aggregate_sightings
+from naturerec_model.logic.sighting_maps import grid_cell_size, MAX_GRID_CELLS_PER_SIDE
+
+
+class TestSightingMaps(unittest.TestCase):
+    def setUp(self) -> None:
+        create_database()
+        self._user = User(id=1)
+        birds = create_category("Birds", True, self._user)
+        insects = create_category("Insects", True, self._user)
+        gull = create_species(birds.id, "Black-Headed Gull", None, self._user)
+        blackbird = create_species(birds.id, "Blackbird", None, self._user)
+        beetle = create_species(insects.id, "Stag Beetle", None, self._user)
+        radley = create_location(name="Radley Lakes", county="Oxfordshire", country="United Kingdom",
+                                 user=self._user, latitude=51.6463, longitude=-1.2432)
+        lashford = create_location(name="Lashford Lane Fen", county="Oxfordshire", country="United Kingdom",
+                                   user=self._user, latitude=51.706694, longitude=-1.324120)
+        brock_hill = create_location(name="Brock Hill", county="Hampshire", country="United Kingdom",
+                                     user=self._user, latitude=50.8703, longitude=-1.6196)
+        _ = create_location(name="Nowhere", county="Oxfordshire", country="United Kingdom", user=self._user)
+        create_sighting(radley.id, gull.id, datetime.date(2021, 12, 14), 3, Gender.UNKNOWN, False, None, self._user)
+        create_sighting(radley.id, blackbird.id, datetime.date(2021, 12, 14), None, Gender.UNKNOWN, False, None,
+                        self._user)
+        create_sighting(lashford.id, gull.id, datetime.date(2021, 12, 15), 2, Gender.UNKNOWN, False, None, self._user)
+        create_sighting(brock_hill.id, beetle.id, datetime.date(2021, 6, 1), 1, Gender.UNKNOWN, False, None,
+                        self._user)
+        self._birds_id = birds.id
+        self._gull_id = gull.id
+
+    def test_can_aggregate_sightings(self):
+        cells = aggregate_sightings(50.0, -3.0, 52.0, 0.0, 6)
+        self.assertEqual(2, len(cells))
+        self.assertEqual(1, cells[0].sightings)
+        self.assertEqual(1, cells[0].species)
+        self.assertEqual(3, cells[1].sightings)
+        self.assertEqual(6, cells[1].individuals)
+        self.assertEqual(2, cells[1].species)
+        self.assertEqual(2, cells[1].locations)
+        self.assertTrue(cells[1].min_latitude <= cells[1].latitude <= cells[1].max_latitude)
+        self.assertTrue(cells[1].min_longitude <= cells[1].longitude <= cells[1].max_longitude)
+
+    def test_higher_zoom_splits_cells(self):
+        cells = aggregate_sightings(51.0, -2.0, 52.0, -1.0, 12)
+        self.assertEqual(2, len(cells))
+        self.assertEqual([1, 2], sorted(cell.sightings for cell in cells))
+
+    def test_can_filter_aggregation_by_date(self):
+        cells = aggregate_sightings(50.0, -3.0, 52.0, 0.0, 6, from_date=datetime.date(2021, 12, 15))
+        self.assertEqual(1, len(cells))
+        self.assertEqual(1, cells[0].sightings)
+
+    def test_can_filter_aggregation_by_category(self):
+        cells = aggregate_sightings(50.0, -3.0, 52.0, 0.0, 6, category_id=self._birds_id)
+        self.assertEqual(1, len(cells))
+        self.assertEqual(3, cells[0].sightings)
+
+    def test_can_filter_aggregation_by_species(self):
+        cells = aggregate_sightings(50.0, -3.0, 52.0, 0.0, 6, species_id=self._gull_id)
+        self.assertEqual(1, len(cells))
+        self.assertEqual(2, cells[0].sightings)
+
+    def test_aggregation_excludes_sightings_outside_viewport(self):
+        cells = aggregate_sightings(10.0, 10.0, 20.0, 20.0, 6)
+        self.assertEqual(0, len(cells))
+
+    def test_cell_count_is_bounded(self):
+        cell_size = grid_cell_size(-90.0, -180.0, 90.0, 180.0, 22)
+        self.assertGreaterEqual(cell_size * MAX_GRID_CELLS_PER_SIDE, 360.0)
+
+    def test_cannot_aggregate_with_invalid_zoom(self):
+        with self.assertRaises(ValueError):
+            _ = aggregate_sightings(50.0, -3.0, 52.0, 0.0, -1)
+
+    def test_cannot_aggregate_with_invalid_bounding_box(self):
+        with self.assertRaises(ValueError):
+            _ = aggregate_sightings(52.0, -3.0, 50.0, 0.0, 6)
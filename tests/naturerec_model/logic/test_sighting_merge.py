@@ -0,0 +1,118 @@
+import unittest
+import datetime
+import sqlalchemy as db
+from naturerec_model.model import create_database, Engine, Session, Sighting, Gender, User
+from naturerec_model.logic import create_category, create_species, create_location
+from naturerec_model.logic import merge_duplicate_sightings
+
+
+class TestSightingMerge(unittest.TestCase):
+    def setUp(self) -> None:
+        create_database()
+        self._user = User(id=1)
+        category = create_category("Birds", True, self._user)
+        self._gull_id = create_species(category.id, "Black-Headed Gull", None, self._user).id
+        self._blackbird_id = create_species(category.id, "Blackbird", None, self._user).id
+        self._location_id = create_location(name="Radley Lakes", county="Oxfordshire", country="United Kingdom",
+                                            user=self._user).id
+        self._remove_sighting_uniqueness_constraint()
+
+    @staticmethod
+    def _remove_sighting_uniqueness_constraint():
+        """
+        Duplicates can only exist in databases without the sighting uniqueness constraint so replace the Sightings
+        table with one that doesn't have it
+        """
+        with Engine.begin() as connection:
+            connection.execute(db.text("DROP TABLE Sightings"))
+            connection.execute(db.text("CREATE TABLE Sightings ("
+                                       "id INTEGER PRIMARY KEY, locationId INTEGER NOT NULL, "
+                                       "speciesId INTEGER NOT NULL, date VARCHAR NOT NULL, number INTEGER, "
+                                       "withYoung INTEGER NOT NULL, gender INTEGER NOT NULL, notes VARCHAR, "
+                                       "created_by INTEGER NOT NULL, updated_by INTEGER NOT NULL, "
+                                       "date_created DATETIME NOT NULL, date_updated DATETIME NOT NULL)"))
+
+    def _add_sighting(self, species_id, date, number, gender, with_young, notes):
+        with Session.begin() as session:
+            sighting = Sighting(locationId=self._location_id,
+                                speciesId=species_id,
+                                sighting_date=date,
+                                number=number,
+                                gender=gender,
+                                withYoung=with_young,
+                                notes=notes,
+                                created_by=self._user.id,
+                                updated_by=self._user.id,
+                                date_created=datetime.datetime.now(),
+                                date_updated=datetime.datetime.now())
+            session.add(sighting)
+        return sighting.id
+
+    def _add_duplicates(self):
+        date = datetime.date(2021, 12, 14)
+        gull_ids = [self._add_sighting(self._gull_id, date, None, Gender.MALE, 0, "Feeding"),
+                    self._add_sighting(self._gull_id, date, 3, Gender.FEMALE, 1, "  "),
+                    self._add_sighting(self._gull_id, date, 2, Gender.UNKNOWN, 0, "Roosting ")]
+        blackbird_ids = [self._add_sighting(self._blackbird_id, date, 1, Gender.UNKNOWN, 0, None),
+                         self._add_sighting(self._blackbird_id, date, 0, Gender.FEMALE, 0, None)]
+        _ = self._add_sighting(self._blackbird_id, datetime.date(2021, 12, 15), 1, Gender.UNKNOWN, 0, None)
+        return gull_ids, blackbird_ids
+
+    def test_dry_run_reports_merged_groups(self):
+        gull_ids, blackbird_ids = self._add_duplicates()
+        groups = merge_duplicate_sightings()
+        self.assertEqual(2, len(groups))
+
+        self.assertEqual(gull_ids[0], groups[0].keeper_id)
+        self.assertEqual(gull_ids[1:], groups[0].other_ids)
+        self.assertEqual(3, groups[0].record_count)
+        self.assertEqual(6, groups[0].number)
+        self.assertEqual(Gender.BOTH, groups[0].gender)
+        self.assertEqual(1, groups[0].with_young)
+        self.assertEqual("Feeding\n\nRoosting", groups[0].notes)
+
+        self.assertEqual(blackbird_ids[0], groups[1].keeper_id)
+        self.assertEqual(2, groups[1].number)
+        self.assertEqual(Gender.FEMALE, groups[1].gender)
+        self.assertEqual(0, groups[1].with_young)
+        self.assertIsNone(groups[1].notes)
+
+    def test_dry_run_does_not_change_sightings(self):
+        self._add_duplicates()
+        _ = merge_duplicate_sightings()
+        with Session.begin() as session:
+            self.assertEqual(6, session.query(Sighting).count())
+
+    def test_can_apply_merge(self):
+        gull_ids, blackbird_ids = self._add_duplicates()
+        _ = merge_duplicate_sightings(apply_changes=True)
+        with Session.begin() as session:
+            self.assertEqual(3, session.query(Sighting).count())
+            gull = session.query(Sighting).get(gull_ids[0])
+            blackbird = session.query(Sighting).get(blackbird_ids[0])
+
+        self.assertEqual(6, gull.number)
+        self.assertEqual(Gender.BOTH, gull.gender)
+        self.assertEqual(1, gull.withYoung)
+        self.assertEqual("Feeding\n\nRoosting", gull.notes)
+        self.assertEqual(2, blackbird.number)
+        self.assertEqual(Gender.FEMALE, blackbird.gender)
+        self.assertEqual([], merge_duplicate_sightings())
+
+    def test_can_limit_merge(self):
+        gull_ids, _ = self._add_duplicates()
+        groups = merge_duplicate_sightings(apply_changes=True, limit=1)
+        self.assertEqual(1, len(groups))
+        self.assertEqual(gull_ids[0], groups[0].keeper_id)
+        self.assertEqual(1, len(merge_duplicate_sightings()))
+
+    def test_can_merge_group_for_sighting(self):
+        _, blackbird_ids = self._add_duplicates()
+        groups = merge_duplicate_sightings(sighting_id=blackbird_ids[1])
+        self.assertEqual(1, len(groups))
+        self.assertEqual(blackbird_ids[0], groups[0].keeper_id)
+        self.assertEqual([blackbird_ids[1]], groups[0].other_ids)
+
+    def test_no_duplicates_found(self):
+        _ = self._add_sighting(self._gull_id, datetime.date(2021, 12, 14), 1, Gender.UNKNOWN, 0, None)
+        self.assertEqual([], merge_duplicate_sightings(apply_changes=True))
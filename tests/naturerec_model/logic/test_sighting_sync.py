@@ -0,0 +1,95 @@
+import unittest
+import datetime
+from naturerec_model.model import create_database, User, Gender, Session, SightingSyncKey, query_budget
+from naturerec_model.logic import create_category, create_species, create_location, list_sightings, delete_sighting
+from naturerec_model.logic import sync_sightings, SyncSighting, WriteOutcome, ConflictPolicy, create_sighting
+
+
+class TestSightingSync(unittest.TestCase):
+    def setUp(self) -> None:
+        create_database()
+        self._user = User(id=1)
+        self._category = create_category("Birds", True, self._user)
+        self._gull = create_species(self._category.id, "Black-Headed Gull", None, self._user)
+        self._location = create_location(name="Radley Lakes", county="Oxfordshire", country="United Kingdom",
+                                         user=self._user)
+
+    @staticmethod
+    def _records(count):
+        return [SyncSighting(f"key-{i}", "black-headed  gull", "radley lakes",
+                             datetime.date(2021, 1, 1) + datetime.timedelta(days=i), 2, Gender.MALE, 1, "Notes")
+                for i in range(count)]
+
+    def test_can_sync_sightings(self):
+        results = sync_sightings(self._records(3), self._user)
+        self.assertEqual([WriteOutcome.CREATED] * 3, [result.outcome for result in results])
+        self.assertEqual(["key-0", "key-1", "key-2"], [result.key for result in results])
+        sightings = list_sightings()
+        self.assertEqual(3, len(sightings))
+        self.assertEqual({self._gull.id}, {sighting.speciesId for sighting in sightings})
+        self.assertEqual({self._location.id}, {sighting.locationId for sighting in sightings})
+        self.assertEqual(sorted(result.sighting_id for result in results), sorted(s.id for s in sightings))
+
+    def test_resync_is_a_no_op(self):
+        first = sync_sightings(self._records(3), self._user)
+        second = sync_sightings(self._records(3), self._user)
+        self.assertEqual([WriteOutcome.ALREADY_APPLIED] * 3, [result.outcome for result in second])
+        self.assertEqual([result.sighting_id for result in first], [result.sighting_id for result in second])
+        self.assertEqual(3, len(list_sightings()))
+
+    def test_deleted_sighting_is_not_resynced(self):
+        results = sync_sightings(self._records(1), self._user)
+        delete_sighting(results[0].sighting_id)
+        results = sync_sightings(self._records(1), self._user)
+        self.assertEqual(WriteOutcome.ALREADY_APPLIED, results[0].outcome)
+        self.assertIsNone(results[0].sighting_id)
+        self.assertEqual(0, len(list_sightings()))
+
+    def test_invalid_sightings_do_not_prevent_sync(self):
+        records = self._records(2) + [
+            SyncSighting("unknown-species", "Robin", "Radley Lakes", datetime.date(2021, 1, 1)),
+            SyncSighting("unknown-location", "Black-Headed Gull", "Nowhere", datetime.date(2021, 1, 1)),
+            SyncSighting("no-number", "Black-Headed Gull", "Radley Lakes", datetime.date(2021, 2, 1), 0),
+            SyncSighting("", "Black-Headed Gull", "Radley Lakes", datetime.date(2021, 3, 1))
+        ]
+        results = sync_sightings(records, self._user)
+        self.assertEqual([WriteOutcome.CREATED] * 2 + [WriteOutcome.FAILED] * 4, [result.outcome for result in results])
+        self.assertEqual([None, None, "Species not found", "Location not found", "Number of individuals must be positive",
+                          "Idempotency key must be specified"], [result.error for result in results])
+        self.assertEqual(2, len(list_sightings()))
+
+    def test_failed_sighting_can_be_resent(self):
+        record = SyncSighting("key", "Black-Headed Gull", "Radley Lakes", datetime.date(2021, 1, 1), 0)
+        _ = sync_sightings([record], self._user)
+        results = sync_sightings([record._replace(number=1)], self._user)
+        self.assertEqual(WriteOutcome.CREATED, results[0].outcome)
+
+    def test_repeated_key_in_batch_fails(self):
+        records = self._records(1) + [self._records(2)[1]._replace(key="key-0")]
+        results = sync_sightings(records, self._user)
+        self.assertEqual([WriteOutcome.CREATED, WriteOutcome.FAILED], [result.outcome for result in results])
+        self.assertEqual("Duplicate idempotency key in batch", results[1].error)
+
+    def test_conflict_policy_applies_to_existing_sightings(self):
+        _ = create_sighting(self._location.id, self._gull.id, datetime.date(2021, 1, 1), 3, Gender.UNKNOWN, False,
+                            None, self._user)
+        results = sync_sightings(self._records(1), self._user)
+        self.assertEqual("Duplicate sighting found", results[0].error)
+        results = sync_sightings(self._records(1), self._user, ConflictPolicy.MERGE)
+        self.assertEqual(WriteOutcome.MERGED, results[0].outcome)
+        self.assertEqual(5, list_sightings()[0].number)
+
+    def test_keys_are_recorded(self):
+        results = sync_sightings(self._records(2), self._user)
+        with Session.begin() as session:
+            keys = {key.idempotencyKey: key.sightingId for key in session.query(SightingSyncKey).all()}
+        self.assertEqual({result.key: result.sighting_id for result in results}, keys)
+
+    def test_sync_uses_bounded_statements(self):
+        with query_budget(20, max_repeats=4):
+            results = sync_sightings(self._records(1000), self._user)
+        self.assertEqual(1000, len(results))
+
+    def test_cannot_sync_with_invalid_policy(self):
+        with self.assertRaises(ValueError):
+            _ = sync_sightings(self._records(1), self._user, "merge")
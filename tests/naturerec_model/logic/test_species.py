@@ -5,6 +5,8 @@ from naturerec_model.logic import create_location
 from naturerec_model.logic import create_category, get_category
 from naturerec_model.logic import create_species, get_species, list_species, update_species, delete_species
 from naturerec_model.logic import create_sighting
+from naturerec_model.logic import create_status_scheme, create_status_rating, create_species_status_rating, \
+    list_species_status_ratings, get_current_statuses
 
 
 class TestSpecies(unittest.TestCase):
@@ -108,6 +110,16 @@ class TestSpecies(unittest.TestCase):
         species = list_species(category_id)
         self.assertEqual(0, len(species))
 
+    def test_can_delete_species_with_status_ratings(self):
+        scheme = create_status_scheme("BOCC5", self._user)
+        rating = create_status_rating(scheme.id, "Red", self._user)
+        _ = create_species_status_rating(self._species.id, rating.id, "United Kingdom", datetime.date(2015, 1, 1),
+                                         self._user)
+        delete_species(self._species.id)
+        self.assertEqual(0, len(list_species(self._species.categoryId)))
+        self.assertEqual(0, len(list_species_status_ratings()))
+        self.assertEqual({}, get_current_statuses())
+
     def test_cannot_delete_missing_species(self):
         with self.assertRaises(ValueError):
             delete_species(-1)
@@ -6,7 +6,7 @@ from naturerec_model.logic import create_species
 from naturerec_model.logic import create_status_scheme
 from naturerec_model.logic import create_status_rating
 from naturerec_model.logic import create_species_status_rating, get_species_status_rating, \
-    list_species_status_ratings, close_species_status_rating, delete_species_status_rating
+    list_species_status_ratings, close_species_status_rating, delete_species_status_rating, get_current_statuses
 
 
 class TestStatusRating(unittest.TestCase):
@@ -56,6 +56,15 @@ class TestStatusRating(unittest.TestCase):
         self.assertEqual(datetime.date(2017, 1, 1), ratings[1].start_date)
         self.assertIsNone(ratings[1].end_date)
 
+    def test_ended_ratings_are_not_closed(self):
+        # The test rating ended in 2015, so adding a new one mustn't change its end date
+        _ = create_species_status_rating(self._species.id, self._rating.id, "United Kingdom",
+                                         datetime.date(2017, 1, 1), self._user, None)
+
+        ratings = sorted(list_species_status_ratings(), key=lambda x: x.start)
+        self.assertEqual(2, len(ratings))
+        self.assertEqual(datetime.date(2015, 12, 31), ratings[0].end_date)
+
     def test_can_close_rating(self):
         with Session.begin() as session:
             rating_id = session.query(SpeciesStatusRating).one().id
@@ -139,6 +148,24 @@ class TestStatusRating(unittest.TestCase):
         self.assertEqual(datetime.date(2016, 1, 1), ratings[0].start_date)
         self.assertIsNone(ratings[0].end_date)
 
+    def test_current_ratings_include_all_open_ratings(self):
+        # Ratings written other than by the business logic, e.g. by the .NET application, may leave more than one
+        # open-ended rating for a species, scheme and region. All of them are current
+        _ = create_species_status_rating(self._species.id, self._rating.id, "United Kingdom",
+                                         datetime.date(2016, 1, 1), self._user)
+        with Session.begin() as session:
+            session.add(SpeciesStatusRating(speciesId=self._species.id,
+                                            statusRatingId=self._rating.id,
+                                            region="United Kingdom",
+                                            start_date=datetime.date(2017, 1, 1),
+                                            created_by=self._user.id,
+                                            updated_by=self._user.id,
+                                            date_created=datetime.datetime.now(),
+                                            date_updated=datetime.datetime.now()))
+        ratings = list_species_status_ratings(current_only=True)
+        self.assertEqual([datetime.date(2016, 1, 1), datetime.date(2017, 1, 1)],
+                         sorted(rating.start_date for rating in ratings))
+
     def test_can_delete_species_status_rating(self):
         ratings = list_species_status_ratings()
         self.assertEqual(1, len(ratings))
@@ -149,3 +176,17 @@ class TestStatusRating(unittest.TestCase):
     def test_cannot_delete_missing_species_status_rating(self):
         with self.assertRaises(ValueError):
             delete_species_status_rating(-1)
+
+    def test_can_get_current_statuses(self):
+        other = create_species(self._category.id, "Reed Warbler", None, self._user)
+        _ = create_species_status_rating(self._species.id, self._rating.id, "United Kingdom",
+                                         datetime.date(2016, 1, 1), self._user)
+        statuses = get_current_statuses([self._species.id, other.id])
+        self.assertEqual([self._species.id], list(statuses.keys()))
+        self.assertEqual(1, len(statuses[self._species.id]))
+        self.assertEqual("BOCC4", statuses[self._species.id][0].rating.scheme.name)
+        self.assertEqual("Amber", statuses[self._species.id][0].rating.name)
+        self.assertEqual("United Kingdom", statuses[self._species.id][0].region)
+
+    def test_ended_ratings_are_not_current_statuses(self):
+        self.assertEqual({}, get_current_statuses())
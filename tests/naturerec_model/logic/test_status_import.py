@@ -0,0 +1,119 @@
+import unittest
+import datetime
+from sqlalchemy.exc import IntegrityError
+from naturerec_model.model import create_database, User, query_budget, Engine
+from naturerec_model.logic import create_category, create_species, create_status_scheme, create_status_rating
+from naturerec_model.logic import create_species_status_rating, list_species_status_ratings, get_category, \
+    get_status_scheme, import_species_status_ratings, StatusRatingImport
+
+
+class TestStatusImport(unittest.TestCase):
+    def setUp(self) -> None:
+        create_database()
+        self._user = User(id=1)
+        category = create_category("Birds", True, self._user)
+        self._species = create_species(category.id, "Arctic Skua", None, self._user)
+        self._scheme = create_status_scheme("BOCC5", self._user)
+        self._red = create_status_rating(self._scheme.id, "Red", self._user)
+
+    @staticmethod
+    def _row(rating, start, end=None, species="Arctic Skua", region="United Kingdom", scheme="BOCC5"):
+        return StatusRatingImport("Birds", species, scheme, rating, region, start, end)
+
+    @staticmethod
+    def _summary():
+        return sorted((r.species.name, r.rating.scheme.name, r.rating.name, r.region, r.start_date, r.end_date)
+                      for r in list_species_status_ratings())
+
+    def test_can_import_ratings(self):
+        result = import_species_status_ratings([self._row("Red", datetime.date(2021, 12, 1))], self._user)
+        self.assertEqual((1, 0), result)
+        self.assertEqual([("Arctic Skua", "BOCC5", "Red", "United Kingdom", datetime.date(2021, 12, 1), None)],
+                         self._summary())
+
+    def test_import_closes_open_ratings(self):
+        today = datetime.date.today()
+        _ = create_species_status_rating(self._species.id, self._red.id, "United Kingdom", datetime.date(2015, 1, 1),
+                                         self._user)
+        result = import_species_status_ratings([self._row("Amber", datetime.date(2021, 12, 1)),
+                                                self._row("Green", datetime.date(2022, 1, 1))], self._user)
+        self.assertEqual((2, 1), result)
+        self.assertEqual([("Arctic Skua", "BOCC5", "Amber", "United Kingdom", datetime.date(2021, 12, 1), today),
+                          ("Arctic Skua", "BOCC5", "Green", "United Kingdom", datetime.date(2022, 1, 1), None),
+                          ("Arctic Skua", "BOCC5", "Red", "United Kingdom", datetime.date(2015, 1, 1), today)],
+                         self._summary())
+
+    def test_import_matches_creating_ratings_in_turn(self):
+        rows = [self._row("Red", datetime.date(2015, 1, 1)),
+                self._row("Amber", datetime.date(2016, 1, 1), datetime.date(2017, 1, 1)),
+                self._row("Green", datetime.date(2018, 1, 1))]
+        _ = import_species_status_ratings(rows, self._user)
+        imported = self._summary()
+
+        create_database()
+        category = create_category("Birds", True, self._user)
+        species = create_species(category.id, "Arctic Skua", None, self._user)
+        scheme = create_status_scheme("BOCC5", self._user)
+        for row in rows:
+            rating = create_status_rating(scheme.id, row.rating, self._user)
+            _ = create_species_status_rating(species.id, rating.id, row.region, row.start, self._user, row.end)
+        self.assertEqual(self._summary(), imported)
+
+    def test_groups_are_resolved_separately(self):
+        rows = [self._row("Red", datetime.date(2021, 12, 1)),
+                self._row("Red", datetime.date(2021, 12, 1), region="Europe"),
+                self._row("Red", datetime.date(2021, 12, 1), scheme="IUCN"),
+                self._row("Red", datetime.date(2021, 12, 1), species="Great Skua")]
+        result = import_species_status_ratings(rows, self._user)
+        self.assertEqual((4, 0), result)
+        self.assertEqual([None] * 4, [end for *_, end in self._summary()])
+
+    def test_import_creates_missing_records(self):
+        _ = import_species_status_ratings([StatusRatingImport(" dragonflies ", "southern  hawker", "IUCN Red  List",
+                                                              "least concern", " Global ", datetime.date(2021, 1, 1))],
+                                          self._user)
+        category = get_category("Dragonflies")
+        self.assertEqual(["Southern Hawker"], [species.name for species in category.species])
+        scheme = get_status_scheme("IUCN Red List")
+        self.assertEqual(["Least Concern"], [rating.name for rating in scheme.ratings])
+        self.assertEqual([("Southern Hawker", "IUCN Red List", "Least Concern", "Global", datetime.date(2021, 1, 1),
+                           None)], self._summary())
+
+    def test_cannot_import_species_in_another_category(self):
+        with self.assertRaises(ValueError):
+            _ = import_species_status_ratings([StatusRatingImport("Mammals", "Arctic Skua", "BOCC5", "Red",
+                                                                  "United Kingdom", datetime.date(2021, 1, 1))],
+                                              self._user)
+
+    def test_cannot_import_future_rating(self):
+        rows = [self._row("Amber", datetime.date(2021, 1, 1)),
+                self._row("Amber", datetime.date.today() + datetime.timedelta(days=1))]
+        with self.assertRaises(ValueError):
+            _ = import_species_status_ratings(rows, self._user)
+        self.assertEqual(0, len(list_species_status_ratings()))
+        self.assertEqual(["Red"], [rating.name for rating in get_status_scheme("BOCC5").ratings])
+
+    def test_cannot_import_rating_ending_before_start(self):
+        with self.assertRaises(ValueError):
+            _ = import_species_status_ratings([self._row("Red", datetime.date(2021, 1, 1), datetime.date(2020, 1, 1))],
+                                              self._user)
+
+    def test_failed_chunk_leaves_open_ratings_unchanged(self):
+        _ = create_species_status_rating(self._species.id, self._red.id, "United Kingdom", datetime.date(2015, 1, 1),
+                                         self._user)
+        with Engine.begin() as connection:
+            connection.exec_driver_sql("CREATE TRIGGER FailImport BEFORE INSERT ON SpeciesStatusRatings "
+                                       "WHEN NEW.region = 'United Kingdom' BEGIN SELECT RAISE(ABORT, 'Failed'); END")
+
+        rows = [self._row("Amber", datetime.date(2021, 12, 1)),
+                self._row("Red", datetime.date(2021, 12, 1), species="Great Skua", region="Scotland")]
+        with self.assertRaises(IntegrityError):
+            _ = import_species_status_ratings(rows, self._user, chunk_size=1)
+        self.assertEqual([("Arctic Skua", "BOCC5", "Red", "United Kingdom", datetime.date(2015, 1, 1), None)],
+                         self._summary())
+
+    def test_import_uses_bounded_statements(self):
+        rows = [self._row("Red", datetime.date(2021, 1, 1), species=f"Species {i}") for i in range(1000)]
+        with query_budget(16, max_repeats=4):
+            result = import_species_status_ratings(rows, self._user, chunk_size=500)
+        self.assertEqual((1000, 0), result)
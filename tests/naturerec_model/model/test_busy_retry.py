@@ -0,0 +1,262 @@
+import unittest
+import datetime
+import multiprocessing
+import os
+import sqlite3
+import threading
+import time
+from sqlalchemy.exc import OperationalError
+from naturerec_model.model import create_database, Engine, Gender, User, unit_of_work, retry_on_busy, \
+    call_with_busy_retry, call_in_unit_of_work, is_busy_error, configure_busy_retry, get_busy_retry_policy, \
+    busy_retry_counters, reset_busy_retry_counters
+from naturerec_model.logic import create_category, create_species, create_location, create_sighting, list_sightings
+
+
+def _locked_error():
+    return OperationalError("INSERT", {}, sqlite3.OperationalError("database is locked"))
+
+
+class FailingOperation:
+    """
+    Callable that fails with a "database is locked" error a set number of times, then succeeds
+    """
+
+    def __init__(self, failures):
+        self.failures = failures
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise _locked_error()
+        return self.calls
+
+
+def _hold_write_lock(db_path, hold_time, count):
+    """
+    Repeatedly take and hold the write lock, as the .NET application does when it writes
+    """
+    connection = sqlite3.connect(db_path, isolation_level=None)
+    try:
+        for _ in range(count):
+            connection.execute("BEGIN IMMEDIATE")
+            time.sleep(hold_time)
+            connection.execute("COMMIT")
+            time.sleep(hold_time / 4)
+    finally:
+        connection.close()
+
+
+def _write_sightings(location_id, species_id, first_day, count):
+    """
+    Create sightings, returning the number of lock errors seen by the caller and the number of retries made
+    """
+    configure_busy_retry(initial_delay=0.01, max_delay=0.2, deadline=20)
+    user = User(id=1)
+    errors = 0
+    for day in range(first_day, first_day + count):
+        try:
+            create_sighting(location_id, species_id, datetime.date(2021, 1, 1) + datetime.timedelta(days=day), 1,
+                            Gender.UNKNOWN, False, None, user)
+        except OperationalError:
+            errors += 1
+    return errors, busy_retry_counters().retries
+
+
+class TestBusyRetry(unittest.TestCase):
+    def setUp(self) -> None:
+        self._policy = get_busy_retry_policy()
+        configure_busy_retry(initial_delay=0.001, max_delay=0.01, deadline=1)
+        reset_busy_retry_counters()
+
+    def tearDown(self) -> None:
+        configure_busy_retry(*self._policy)
+        reset_busy_retry_counters()
+
+    def test_can_identify_busy_error(self):
+        self.assertTrue(is_busy_error(_locked_error()))
+        self.assertFalse(is_busy_error(OperationalError("SELECT", {}, sqlite3.OperationalError("no such table"))))
+        self.assertFalse(is_busy_error(ValueError("database is locked")))
+
+    def test_cannot_configure_invalid_policy(self):
+        with self.assertRaises(ValueError):
+            configure_busy_retry(initial_delay=0)
+        with self.assertRaises(ValueError):
+            configure_busy_retry(initial_delay=2, max_delay=1)
+
+    def test_operation_is_retried_until_it_succeeds(self):
+        operation = FailingOperation(3)
+        self.assertEqual(4, call_with_busy_retry(operation))
+        counters = busy_retry_counters()
+        self.assertEqual(3, counters.retries)
+        self.assertEqual(1, counters.recoveries)
+        self.assertEqual(0, counters.failures)
+
+    def test_error_is_raised_after_deadline(self):
+        configure_busy_retry(initial_delay=0.05, max_delay=0.05, deadline=0.2)
+        with self.assertRaises(OperationalError):
+            call_with_busy_retry(FailingOperation(1000))
+        self.assertEqual(1, busy_retry_counters().failures)
+
+    def test_other_errors_are_not_retried(self):
+        def fail():
+            raise OperationalError("SELECT", {}, sqlite3.OperationalError("no such table"))
+
+        with self.assertRaises(OperationalError):
+            call_with_busy_retry(fail)
+        self.assertEqual(0, busy_retry_counters().retries)
+
+    def test_decorated_function_is_retried(self):
+        operation = retry_on_busy(FailingOperation(2))
+        self.assertEqual(3, operation())
+
+    def test_decorated_function_is_not_retried_in_unit_of_work(self):
+        create_database()
+        operation = FailingOperation(1)
+        with self.assertRaises(OperationalError):
+            with unit_of_work():
+                retry_on_busy(operation)()
+        self.assertEqual(1, operation.calls)
+
+
+class TestBusyRetryInUnitOfWork(unittest.TestCase):
+    def setUp(self) -> None:
+        self._policy = get_busy_retry_policy()
+        configure_busy_retry(initial_delay=0.001, max_delay=0.01, deadline=5)
+        reset_busy_retry_counters()
+
+        # A unit of work only reads from a snapshot that another connection can commit after in WAL mode. In the
+        # rollback journal mode, the other connection waits until the unit of work ends
+        self._journal_mode = os.environ.get("NATURE_RECORDER_JOURNAL_MODE")
+        os.environ["NATURE_RECORDER_JOURNAL_MODE"] = "WAL"
+        create_database()
+        self._user = User(id=1)
+        category = create_category("Birds", True, self._user)
+        self._species_id = create_species(category.id, "Robin", None, self._user).id
+        self._location_id = create_location(name="Radley Lakes", county="Oxfordshire", country="United Kingdom",
+                                            user=self._user).id
+
+    def tearDown(self) -> None:
+        configure_busy_retry(*self._policy)
+        reset_busy_retry_counters()
+        if self._journal_mode is None:
+            del os.environ["NATURE_RECORDER_JOURNAL_MODE"]
+        else:
+            os.environ["NATURE_RECORDER_JOURNAL_MODE"] = self._journal_mode
+
+    def _create_sighting(self, day):
+        return create_sighting(self._location_id, self._species_id, datetime.date(2021, 1, day), 1, Gender.UNKNOWN,
+                               False, None, self._user)
+
+    def _create_sighting_in_other_thread(self, day):
+        thread = threading.Thread(target=self._create_sighting, args=(day,))
+        thread.start()
+        thread.join()
+
+    def test_unit_of_work_fails_writing_after_another_connection_commits(self):
+        with self.assertRaises(OperationalError) as context:
+            with unit_of_work():
+                list_sightings()
+                self._create_sighting_in_other_thread(1)
+                self._create_sighting(2)
+        self.assertTrue(is_busy_error(context.exception))
+        self.assertEqual(1, len(list_sightings()))
+
+    def test_unit_of_work_is_retried_when_another_connection_commits(self):
+        attempts = []
+
+        def work():
+            attempts.append(len(list_sightings()))
+            if len(attempts) == 1:
+                self._create_sighting_in_other_thread(1)
+            return self._create_sighting(2)
+
+        sighting = call_in_unit_of_work(work)
+        self.assertEqual([0, 1], attempts)
+        self.assertEqual(2, len(list_sightings()))
+        self.assertEqual(sighting.id, max(s.id for s in list_sightings()))
+        counters = busy_retry_counters()
+        self.assertEqual(1, counters.retries)
+        self.assertEqual(1, counters.recoveries)
+
+    def test_unit_of_work_waits_while_another_connection_holds_write_lock(self):
+        locked = threading.Event()
+
+        def hold_write_lock():
+            connection = sqlite3.connect(Engine.url.database, isolation_level=None)
+            try:
+                connection.execute("BEGIN IMMEDIATE")
+                locked.set()
+                time.sleep(0.5)
+                connection.execute("COMMIT")
+            finally:
+                connection.close()
+
+        thread = threading.Thread(target=hold_write_lock)
+        thread.start()
+        locked.wait()
+        try:
+            call_in_unit_of_work(lambda: [self._create_sighting(day) for day in range(1, 4)])
+        finally:
+            thread.join()
+        self.assertEqual(3, len(list_sightings()))
+
+    def test_failed_attempt_is_rolled_back_before_retry(self):
+        attempts = []
+
+        def work():
+            self._create_sighting(len(attempts) + 1)
+            attempts.append(len(attempts) + 1)
+            if len(attempts) == 1:
+                raise _locked_error()
+
+        call_in_unit_of_work(work)
+        self.assertEqual([1, 2], attempts)
+        sightings = list_sightings()
+        self.assertEqual(1, len(sightings))
+        self.assertEqual(datetime.date(2021, 1, 2), sightings[0].sighting_date)
+
+    def test_joined_unit_of_work_is_not_retried(self):
+        operation = FailingOperation(1)
+        with self.assertRaises(OperationalError):
+            with unit_of_work():
+                call_in_unit_of_work(operation)
+        self.assertEqual(1, operation.calls)
+
+
+class TestBusyRetryStress(unittest.TestCase):
+    PROCESSES = 4
+    SIGHTINGS_PER_PROCESS = 25
+
+    def setUp(self) -> None:
+        create_database()
+        user = User(id=1)
+        category = create_category("Birds", True, user)
+        self._species_id = create_species(category.id, "Robin", None, user).id
+        self._location_id = create_location(name="Radley Lakes", county="Oxfordshire", country="United Kingdom",
+                                            user=user).id
+
+    def test_no_lock_errors_under_contention(self):
+        # The writer processes use a short busy timeout, so contention with each other and with the process
+        # simulating the .NET application is resolved by the retry layer rather than by the driver
+        previous_timeout = os.environ.get("NATURE_RECORDER_BUSY_TIMEOUT")
+        os.environ["NATURE_RECORDER_BUSY_TIMEOUT"] = "0.01"
+        try:
+            context = multiprocessing.get_context("spawn")
+            with context.Pool(self.PROCESSES + 1) as pool:
+                lock_holder = pool.apply_async(_hold_write_lock, (Engine.url.database, 0.1, 15))
+                writers = [pool.apply_async(_write_sightings, (self._location_id, self._species_id,
+                                                               i * self.SIGHTINGS_PER_PROCESS,
+                                                               self.SIGHTINGS_PER_PROCESS))
+                           for i in range(self.PROCESSES)]
+                results = [writer.get(timeout=120) for writer in writers]
+                lock_holder.get(timeout=120)
+        finally:
+            if previous_timeout is None:
+                del os.environ["NATURE_RECORDER_BUSY_TIMEOUT"]
+            else:
+                os.environ["NATURE_RECORDER_BUSY_TIMEOUT"] = previous_timeout
+
+        self.assertEqual(0, sum(errors for errors, _ in results))
+        self.assertGreater(sum(retries for _, retries in results), 0)
+        self.assertEqual(self.PROCESSES * self.SIGHTINGS_PER_PROCESS, len(list_sightings()))
@@ -0,0 +1,45 @@
+import unittest
+import os
+from naturerec_model.model import create_database, dispose_engine, Engine, User
+from naturerec_model.logic import create_category, list_categories
+
+
+class TestDatabase(unittest.TestCase):
+    def setUp(self) -> None:
+        create_database()
+        self._user = User(id=1)
+        _ = create_category("Birds", True, self._user)
+
+    def test_connections_record_owning_process(self):
+        with Engine.connect() as connection:
+            self.assertEqual(os.getpid(), connection.connection._connection_record.info["pid"])
+
+    @unittest.skipUnless(hasattr(os, "fork"), "Requires os.fork()")
+    def test_engine_is_usable_after_fork(self):
+        pid = os.fork()
+        if pid == 0:
+            # In the child, dispose of inherited connections, as a worker process would, and query the database
+            try:
+                dispose_engine()
+                succeeded = [c.name for c in list_categories()] == ["Birds"]
+            except BaseException:
+                succeeded = False
+            os._exit(0 if succeeded else 1)
+
+        _, status = os.waitpid(pid, 0)
+        self.assertEqual(0, os.waitstatus_to_exitcode(status))
+        self.assertEqual(1, len(list_categories()))
+
+    def test_journal_mode_is_unchanged_by_default(self):
+        with Engine.connect() as connection:
+            self.assertEqual("delete", connection.exec_driver_sql("PRAGMA journal_mode").scalar())
+
+    def test_can_opt_in_to_journal_mode(self):
+        os.environ["NATURE_RECORDER_JOURNAL_MODE"] = "wal"
+        try:
+            create_database()
+            with Engine.connect() as connection:
+                self.assertEqual("wal", connection.exec_driver_sql("PRAGMA journal_mode").scalar())
+        finally:
+            del os.environ["NATURE_RECORDER_JOURNAL_MODE"]
+            create_database()
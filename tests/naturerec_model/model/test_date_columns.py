@@ -0,0 +1,74 @@
+import unittest
+import datetime
+import sqlalchemy as db
+from naturerec_model.model import create_database, Engine, Session, Sighting, JobStatus, SpeciesStatusRating, \
+    Gender, User, to_day_number, to_timestamp, add_shadow_columns
+from naturerec_model.logic import create_category, create_species, create_location, create_sighting, \
+    update_sighting, list_sightings, create_job_status
+
+
+class TestDateColumns(unittest.TestCase):
+    def setUp(self) -> None:
+        create_database()
+        self._user = User(id=1)
+        self._category = create_category("Birds", True, self._user)
+        self._species = create_species(self._category.id, "Red Kite", None, self._user)
+        self._location = create_location(name="Radley Lakes", county="Oxfordshire", country="United Kingdom",
+                                         user=self._user)
+
+    def _day_numbers(self):
+        with Session.begin() as session:
+            return session.execute(db.select(Sighting.__table__.c.dayNumber)
+                                   .order_by(Sighting.__table__.c.dayNumber)).scalars().all()
+
+    def test_day_number_matches_date(self):
+        dates = [datetime.date(1970, 1, 1), datetime.date(2000, 2, 29), datetime.date(2021, 12, 31)]
+        for date in dates:
+            _ = create_sighting(self._location.id, self._species.id, date, None, Gender.UNKNOWN, False, None,
+                                self._user)
+        self.assertEqual([to_day_number(date) for date in dates], self._day_numbers())
+
+    def test_day_number_follows_updates(self):
+        sighting = create_sighting(self._location.id, self._species.id, datetime.date(2021, 1, 1), None,
+                                   Gender.UNKNOWN, False, None, self._user)
+        _ = update_sighting(sighting.id, self._location.id, self._species.id, datetime.date(2021, 6, 1), None,
+                            Gender.UNKNOWN, False, None, self._user)
+        self.assertEqual([to_day_number(datetime.date(2021, 6, 1))], self._day_numbers())
+
+    def test_date_range_is_inclusive(self):
+        for day in range(1, 6):
+            _ = create_sighting(self._location.id, self._species.id, datetime.date(2021, 1, day), None,
+                                Gender.UNKNOWN, False, None, self._user)
+        sightings = list_sightings(from_date=datetime.date(2021, 1, 2), to_date=datetime.date(2021, 1, 4))
+        self.assertEqual([2, 3, 4], [sighting.sighting_date.day for sighting in sightings])
+
+    def test_date_range_uses_index(self):
+        query = db.select(Sighting.id).where(Sighting.__table__.c.dayNumber >= 1)
+        with Engine.connect() as connection:
+            plan = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {query.compile(compile_kwargs={'literal_binds': True})}")
+            details = " ".join(row[-1] for row in plan.all())
+        self.assertIn("IX_Sightings_dayNumber", details)
+
+    def test_timestamp_matches_start(self):
+        start = datetime.datetime(2021, 12, 1, 10, 45, 30)
+        _ = create_job_status("A Test Job", None, start, self._user)
+        with Session.begin() as session:
+            timestamp = session.execute(db.select(JobStatus.__table__.c.startTimestamp)).scalar_one()
+        self.assertEqual(to_timestamp(start), timestamp)
+
+    def test_can_add_shadow_columns_to_existing_database(self):
+        # Recreate the Sightings table as it was before the shadow columns were introduced
+        with Engine.begin() as connection:
+            connection.exec_driver_sql("DROP INDEX IX_Sightings_dayNumber")
+            connection.exec_driver_sql("ALTER TABLE Sightings DROP COLUMN dayNumber")
+            columns = [row[1] for row in connection.exec_driver_sql("PRAGMA table_xinfo(Sightings)").all()]
+            self.assertNotIn("dayNumber", columns)
+
+        _ = create_sighting(self._location.id, self._species.id, datetime.date(2021, 1, 1), None, Gender.UNKNOWN,
+                            False, None, self._user)
+
+        with Engine.begin() as connection:
+            add_shadow_columns(connection, [Sighting.__table__, SpeciesStatusRating.__table__, JobStatus.__table__])
+
+        self.assertEqual([to_day_number(datetime.date(2021, 1, 1))], self._day_numbers())
+        self.assertEqual(1, len(list_sightings(from_date=datetime.date(2021, 1, 1))))
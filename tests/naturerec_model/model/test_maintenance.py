@@ -0,0 +1,70 @@
+import unittest
+import os
+import sqlite3
+import tempfile
+import sqlalchemy as db
+from naturerec_model.model import create_database, Engine, Session, Location, User, backup_database, \
+    optimise_database, incremental_vacuum
+from naturerec_model.logic import create_category, create_location
+
+
+class TestMaintenance(unittest.TestCase):
+    def setUp(self) -> None:
+        create_database()
+        self._user = User(id=1)
+        _ = create_category("Birds", True, self._user)
+
+    def _pragma(self, name):
+        with Engine.connect() as connection:
+            return connection.exec_driver_sql(f"PRAGMA {name}").scalar()
+
+    def _create_and_delete_locations(self):
+        for i in range(200):
+            _ = create_location(name=f"Location {i}", county="Oxfordshire " * 40, country="United Kingdom",
+                                user=self._user)
+
+        with Session.begin() as session:
+            session.execute(db.delete(Location))
+
+    def test_new_database_uses_incremental_vacuum(self):
+        self.assertEqual(2, self._pragma("auto_vacuum"))
+
+    def test_can_backup_database(self):
+        path = os.path.join(tempfile.mkdtemp(), "backup.db")
+        page_count = backup_database(path, pages=1, step_delay=0)
+        with sqlite3.connect(path) as connection:
+            self.assertEqual(page_count, connection.execute("PRAGMA page_count").fetchone()[0])
+            self.assertEqual([("Birds",)], connection.execute("SELECT Name FROM Categories").fetchall())
+        self.assertFalse(os.path.exists(f"{path}.partial"))
+
+    def test_cannot_backup_with_invalid_step(self):
+        with self.assertRaises(ValueError):
+            _ = backup_database(os.path.join(tempfile.mkdtemp(), "backup.db"), pages=0)
+
+    def test_can_optimise_database(self):
+        optimise_database()
+        with Engine.connect() as connection:
+            tables = [row[0] for row in connection.exec_driver_sql("SELECT tbl FROM sqlite_stat1").all()]
+        self.assertIn("Categories", tables)
+
+    def test_can_vacuum_some_pages(self):
+        self._create_and_delete_locations()
+        free_pages = self._pragma("freelist_count")
+        self.assertGreater(free_pages, 2)
+        self.assertEqual(2, incremental_vacuum(2))
+        self.assertEqual(free_pages - 2, self._pragma("freelist_count"))
+
+    def test_can_vacuum_all_pages(self):
+        self._create_and_delete_locations()
+        free_pages = self._pragma("freelist_count")
+        self.assertEqual(free_pages, incremental_vacuum())
+        self.assertEqual(0, self._pragma("freelist_count"))
+
+    def test_vacuum_converts_existing_database(self):
+        with Engine.connect() as connection:
+            connection.exec_driver_sql("PRAGMA auto_vacuum=NONE")
+            connection.exec_driver_sql("VACUUM")
+        self.assertEqual(0, self._pragma("auto_vacuum"))
+
+        _ = incremental_vacuum()
+        self.assertEqual(2, self._pragma("auto_vacuum"))
@@ -0,0 +1,80 @@
+import unittest
+from naturerec_model.model import create_database, Session, Category, User, QueryAuditor, QueryBudgetExceeded, \
+    query_budget
+from naturerec_model.logic import create_category
+from naturerec_model.model.query_auditor import statement_shape
+
+
+class TestQueryAuditor(unittest.TestCase):
+    def setUp(self) -> None:
+        create_database()
+        create_category("Birds", True, User(id=1))
+        create_category("Insects", False, User(id=1))
+
+    @staticmethod
+    def _query_categories_one_by_one():
+        with Session.begin() as session:
+            ids = [row.id for row in session.query(Category.id).all()]
+            for category_id in ids:
+                session.query(Category.name).filter(Category.id == category_id).one()
+
+    def test_statement_shape_ignores_values(self):
+        self.assertEqual(statement_shape("SELECT * FROM T WHERE id = 12 AND name = 'x'"),
+                         statement_shape("SELECT *\n  FROM T WHERE id = 3 AND name = 'y'"))
+
+    def test_statement_shape_collapses_parameter_lists(self):
+        self.assertEqual("SELECT * FROM T WHERE id IN (?)", statement_shape("SELECT * FROM T WHERE id IN (?, ?, ?)"))
+
+    def test_can_count_statements(self):
+        with QueryAuditor("test") as auditor:
+            with Session.begin() as session:
+                session.query(Category).all()
+        self.assertEqual(1, auditor.statement_count)
+        self.assertEqual([], auditor.repeated_statements())
+
+    def test_statements_outside_auditor_are_not_recorded(self):
+        with QueryAuditor("test") as auditor:
+            pass
+        self._query_categories_one_by_one()
+        self.assertEqual(0, auditor.statement_count)
+
+    def test_can_detect_repeated_statements(self):
+        with QueryAuditor("test") as auditor:
+            self._query_categories_one_by_one()
+        self.assertEqual(3, auditor.statement_count)
+        repeated = auditor.repeated_statements()
+        self.assertEqual(1, len(repeated))
+        self.assertEqual(2, repeated[0][1])
+
+    def test_nested_auditors_record_statements(self):
+        with QueryAuditor("outer") as outer:
+            with QueryAuditor("inner") as inner:
+                self._query_categories_one_by_one()
+            with Session.begin() as session:
+                session.query(Category).all()
+        self.assertEqual(3, inner.statement_count)
+        self.assertEqual(4, outer.statement_count)
+
+    def test_repeated_statements_exceed_budget(self):
+        with self.assertRaises(QueryBudgetExceeded):
+            with query_budget(10):
+                self._query_categories_one_by_one()
+
+    def test_statement_count_exceeds_budget(self):
+        with self.assertRaises(QueryBudgetExceeded):
+            with query_budget(2, max_repeats=2):
+                self._query_categories_one_by_one()
+
+    def test_within_budget(self):
+        with query_budget(3, max_repeats=2) as auditor:
+            self._query_categories_one_by_one()
+        self.assertEqual(3, auditor.statement_count)
+
+    def test_slow_queries_are_logged_with_query_plan(self):
+        with self.assertLogs("naturerec_model.model.query_auditor", level="WARNING") as logs:
+            with QueryAuditor("test", slow_query_threshold=0):
+                with Session.begin() as session:
+                    session.query(Category).filter(Category.id == 1).all()
+        self.assertEqual(1, len(logs.output))
+        self.assertIn("Query plan", logs.output[0])
+        self.assertIn("SEARCH Categories", logs.output[0])
@@ -0,0 +1,76 @@
+import unittest
+import datetime
+import sqlalchemy as db
+from naturerec_model.model import create_database, Engine, Session, SpeciesStatusRating, SpeciesCurrentStatus, User, \
+    to_day_number, rebuild_species_current_statuses
+from naturerec_model.logic import create_category, create_species, create_status_scheme, create_status_rating, \
+    create_species_status_rating, close_species_status_rating, delete_species_status_rating
+
+
+class TestSpeciesCurrentStatus(unittest.TestCase):
+    def setUp(self) -> None:
+        create_database()
+        self._user = User(id=1)
+        category = create_category("Birds", True, self._user)
+        self._species = create_species(category.id, "Reed Bunting", None, self._user)
+        self._scheme = create_status_scheme("BOCC4", self._user)
+        self._amber = create_status_rating(self._scheme.id, "Amber", self._user)
+        self._red = create_status_rating(self._scheme.id, "Red", self._user)
+
+    @staticmethod
+    def _current_statuses():
+        with Session.begin() as session:
+            return [(status.speciesStatusRatingId, status.rating.name, status.region, status.startDay, status.endDay)
+                    for status in session.query(SpeciesCurrentStatus)
+                    .order_by(SpeciesCurrentStatus.region).all()]
+
+    def _create_rating(self, rating, start, region="United Kingdom", end=None):
+        return create_species_status_rating(self._species.id, rating.id, region, start, self._user, end)
+
+    def test_new_rating_is_current(self):
+        rating = self._create_rating(self._amber, datetime.date(2015, 1, 1))
+        self.assertEqual([(rating.id, "Amber", "United Kingdom", to_day_number(datetime.date(2015, 1, 1)), None)],
+                         self._current_statuses())
+
+    def test_superseding_rating_is_current(self):
+        _ = self._create_rating(self._amber, datetime.date(2015, 1, 1))
+        rating = self._create_rating(self._red, datetime.date(2017, 1, 1))
+        self.assertEqual([(rating.id, "Red", "United Kingdom", to_day_number(datetime.date(2017, 1, 1)), None)],
+                         self._current_statuses())
+
+    def test_regions_are_cached_separately(self):
+        _ = self._create_rating(self._amber, datetime.date(2015, 1, 1))
+        _ = self._create_rating(self._red, datetime.date(2015, 1, 1), region="Europe")
+        self.assertEqual(["Red", "Amber"], [status[1] for status in self._current_statuses()])
+
+    def test_closed_rating_has_end_day(self):
+        rating = self._create_rating(self._amber, datetime.date(2015, 1, 1))
+        close_species_status_rating(rating.id, self._user)
+        self.assertEqual(to_day_number(datetime.date.today()), self._current_statuses()[0][4])
+
+    def test_deleting_rating_restores_previous_rating(self):
+        previous = self._create_rating(self._amber, datetime.date(2015, 1, 1))
+        rating = self._create_rating(self._red, datetime.date(2017, 1, 1))
+        delete_species_status_rating(rating.id)
+        self.assertEqual([previous.id], [status[0] for status in self._current_statuses()])
+        delete_species_status_rating(previous.id)
+        self.assertEqual([], self._current_statuses())
+
+    def test_cache_follows_direct_updates(self):
+        # The database is shared, so ratings may be changed without using the business logic
+        rating = self._create_rating(self._amber, datetime.date(2015, 1, 1))
+        with Engine.begin() as connection:
+            connection.execute(db.update(SpeciesStatusRating.__table__)
+                               .where(SpeciesStatusRating.__table__.c.id == rating.id)
+                               .values(statusRatingId=self._red.id))
+        self.assertEqual(["Red"], [status[1] for status in self._current_statuses()])
+
+    def test_can_rebuild_cache(self):
+        _ = self._create_rating(self._amber, datetime.date(2015, 1, 1))
+        rating = self._create_rating(self._red, datetime.date(2017, 1, 1))
+        expected = self._current_statuses()
+        with Engine.begin() as connection:
+            connection.exec_driver_sql("DELETE FROM SpeciesCurrentStatuses")
+            rebuild_species_current_statuses(connection)
+        self.assertEqual(expected, self._current_statuses())
+        self.assertEqual(rating.id, expected[0][0])
@@ -0,0 +1,90 @@
+import unittest
+import sqlite3
+import threading
+from naturerec_model.model import create_database, Engine, Session, User, unit_of_work, current_unit_of_work, \
+    suspend_unit_of_work, begin_unit_of_work, end_unit_of_work
+from naturerec_model.logic import create_category, get_category, list_categories, create_species, LoaderView
+
+
+class TestUnitOfWork(unittest.TestCase):
+    def setUp(self) -> None:
+        create_database()
+        self._user = User(id=1)
+
+    @staticmethod
+    def _list_category_names_in_other_thread():
+        names = []
+        thread = threading.Thread(target=lambda: names.extend(category.name for category in list_categories()))
+        thread.start()
+        thread.join()
+        return names
+
+    def test_no_unit_of_work_by_default(self):
+        self.assertIsNone(current_unit_of_work())
+
+    def test_logic_calls_share_session(self):
+        with unit_of_work() as session:
+            with Session.begin() as first:
+                pass
+            with Session.begin() as second:
+                pass
+        self.assertIs(session, first)
+        self.assertIs(session, second)
+        self.assertIsNone(current_unit_of_work())
+
+    def test_changes_are_committed_together(self):
+        with unit_of_work():
+            create_category("Birds", True, self._user)
+            create_category("Insects", True, self._user)
+            self.assertEqual(2, len(list_categories()))
+            self.assertEqual([], self._list_category_names_in_other_thread())
+        self.assertEqual(["Birds", "Insects"], self._list_category_names_in_other_thread())
+
+    def test_changes_are_rolled_back_on_error(self):
+        with self.assertRaises(RuntimeError):
+            with unit_of_work():
+                create_category("Birds", True, self._user)
+                raise RuntimeError("Failed")
+        self.assertEqual(0, len(list_categories()))
+
+    def test_failed_logic_call_does_not_affect_unit_of_work(self):
+        with unit_of_work():
+            birds = create_category("Birds", True, self._user)
+            with self.assertRaises(ValueError):
+                create_species(birds.id, "", None, self._user)
+            create_species(birds.id, "Blackbird", None, self._user)
+        self.assertEqual(["Blackbird"], [species.name for species in get_category("Birds").species])
+
+    def test_nested_unit_of_work_joins_outer(self):
+        with unit_of_work() as outer:
+            with unit_of_work() as inner:
+                create_category("Birds", True, self._user)
+            self.assertIs(outer, inner)
+            self.assertEqual([], self._list_category_names_in_other_thread())
+        self.assertEqual(["Birds"], self._list_category_names_in_other_thread())
+
+    def test_suspended_unit_of_work_commits_immediately(self):
+        with unit_of_work():
+            with suspend_unit_of_work():
+                self.assertIsNone(current_unit_of_work())
+                create_category("Birds", True, self._user)
+            self.assertIsNotNone(current_unit_of_work())
+            self.assertEqual(["Birds"], self._list_category_names_in_other_thread())
+
+    def test_immediate_unit_of_work_holds_write_lock(self):
+        begin_unit_of_work(immediate=True)
+        connection = sqlite3.connect(Engine.url.database, timeout=0)
+        try:
+            with self.assertRaises(sqlite3.OperationalError):
+                connection.execute("BEGIN IMMEDIATE")
+        finally:
+            connection.close()
+            end_unit_of_work()
+
+    def test_can_load_fuller_view_after_smaller_view(self):
+        birds = create_category("Birds", True, self._user)
+        create_species(birds.id, "Blackbird", None, self._user)
+        with unit_of_work():
+            _ = list_categories(LoaderView.MINIMAL)
+            category = get_category(birds.id)
+            self.assertEqual(1, len(category.species))
@@ -0,0 +1,37 @@
+import unittest
+import datetime
+from naturerec_model.model import Sighting, JobStatus, parse_date, parse_date_time, format_date
+
+
+class TestDateCodec(unittest.TestCase):
+    def test_can_parse_date(self):
+        self.assertEqual(datetime.date(2021, 12, 31), parse_date("2021-12-31 00:00:00"))
+
+    def test_can_parse_date_time(self):
+        self.assertEqual(datetime.datetime(2021, 12, 31, 10, 45, 3), parse_date_time("2021-12-31 10:45:03"))
+
+    def test_cannot_parse_invalid_layout(self):
+        for text in ["31/12/2021", "2021-12-31", "2021-12-31T10:45:03", "2021/12/31 10:45:03", "2021-12-31 10:45:03.5"]:
+            with self.assertRaises(ValueError):
+                _ = parse_date_time(text)
+
+    def test_cannot_parse_invalid_date(self):
+        for text in ["2021-02-30 00:00:00", "2021-12-31 25:00:00", "20x1-12-31 00:00:00"]:
+            with self.assertRaises(ValueError):
+                _ = parse_date(text)
+
+    def test_can_format_date(self):
+        self.assertEqual("31/12/2021", format_date(datetime.date(2021, 12, 31), Sighting.DATE_DISPLAY_FORMAT))
+
+    def test_instance_cache_follows_changes(self):
+        sighting = Sighting(date="2021-12-31 00:00:00")
+        self.assertEqual("31/12/2021", sighting.display_date)
+        sighting.sighting_date = datetime.date(2022, 1, 1)
+        self.assertEqual(datetime.date(2022, 1, 1), sighting.sighting_date)
+        self.assertEqual("01/01/2022", sighting.display_date)
+
+    def test_runtime_follows_changes(self):
+        job_status = JobStatus(start="2021-12-01 10:45:00", end="2021-12-01 10:46:00")
+        self.assertEqual("00:01:00", job_status.runtime)
+        job_status.end_date = datetime.datetime(2021, 12, 1, 11, 45, 0)
+        self.assertEqual("01:00:00", job_status.runtime)
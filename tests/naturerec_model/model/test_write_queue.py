@@ -0,0 +1,100 @@
+import unittest
+import datetime
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from naturerec_model.model import create_database, Gender, User, WriteQueue
+from naturerec_model.logic import create_category, list_categories, create_species, create_location
+from naturerec_model.logic import create_sighting, list_sightings
+
+
+class TestWriteQueue(unittest.TestCase):
+    def setUp(self) -> None:
+        create_database()
+        self._user = User(id=1)
+        self._queue = WriteQueue(max_latency=0.05)
+
+    def tearDown(self) -> None:
+        self._queue.stop()
+
+    def test_cannot_create_queue_with_invalid_batch_size(self):
+        with self.assertRaises(ValueError):
+            _ = WriteQueue(max_batch_size=0)
+
+    def test_cannot_create_queue_with_negative_latency(self):
+        with self.assertRaises(ValueError):
+            _ = WriteQueue(max_latency=-1)
+
+    def test_future_is_resolved_with_result(self):
+        category = self._queue.submit(create_category, "Birds", True, self._user).result()
+        self.assertIsNotNone(category.id)
+        self.assertEqual("Birds", category.name)
+        self.assertEqual(["Birds"], [c.name for c in list_categories()])
+
+    def test_operations_are_committed_in_one_batch(self):
+        futures = [self._queue.submit(create_category, name, True, self._user)
+                   for name in ["Birds", "Insects", "Mammals"]]
+        self.assertEqual(3, len([future.result() for future in futures]))
+        self.assertEqual(1, self._queue.batch_count)
+        self.assertEqual(3, self._queue.operation_count)
+        self.assertEqual(3.0, self._queue.mean_batch_size)
+
+    def test_failed_operation_does_not_affect_batch(self):
+        futures = [self._queue.submit(create_category, name, True, self._user)
+                   for name in ["Birds", "Birds", "Insects"]]
+        self.assertIsNotNone(futures[0].result())
+        with self.assertRaises(ValueError):
+            futures[1].result()
+        self.assertIsNotNone(futures[2].result())
+        self.assertEqual(["Birds", "Insects"], [c.name for c in list_categories()])
+
+    def test_batch_size_is_limited(self):
+        queue = WriteQueue(max_batch_size=2, max_latency=0.05)
+        try:
+            futures = [queue.submit(create_category, name, True, self._user)
+                       for name in ["Birds", "Insects", "Mammals"]]
+            _ = [future.result() for future in futures]
+        finally:
+            queue.stop()
+        self.assertEqual(2, queue.batch_count)
+
+    def test_operation_submitted_by_operation_runs_in_batch(self):
+        def create_category_and_species():
+            category = create_category("Birds", True, self._user)
+            return self._queue.submit(create_species, category.id, "Robin", None, self._user).result()
+
+        species = self._queue.submit(create_category_and_species).result()
+        self.assertEqual("Robin", species.name)
+        self.assertEqual(1, self._queue.batch_count)
+
+    def test_stop_writes_submitted_operations(self):
+        future = self._queue.submit(create_category, "Birds", True, self._user)
+        self._queue.stop()
+        self.assertTrue(future.done())
+        self.assertEqual(1, len(list_categories()))
+
+    def test_queue_restarts_after_stop(self):
+        self._queue.stop()
+        self.assertIsNotNone(self._queue.submit(create_category, "Birds", True, self._user).result())
+
+    def test_concurrent_submitters(self):
+        category = create_category("Birds", True, self._user)
+        species = create_species(category.id, "Robin", None, self._user)
+        location = create_location(name="Radley Lakes", county="Oxfordshire", country="United Kingdom",
+                                   user=self._user)
+        start = datetime.date(2021, 1, 1)
+        barrier = threading.Barrier(50)
+
+        def submitter(index):
+            barrier.wait()
+            futures = [self._queue.submit(create_sighting, location.id, species.id,
+                                          start + datetime.timedelta(days=index * 10 + day), 1, Gender.UNKNOWN,
+                                          False, None, self._user)
+                       for day in range(10)]
+            return [future.result().id for future in futures]
+
+        with ThreadPoolExecutor(max_workers=50) as executor:
+            ids = [sighting_id for result in executor.map(submitter, range(50)) for sighting_id in result]
+
+        self.assertEqual(500, len(set(ids)))
+        self.assertEqual(500, len(list_sightings()))
+        self.assertLess(self._queue.batch_count, 500)
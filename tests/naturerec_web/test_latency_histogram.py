@@ -0,0 +1,57 @@
+import unittest
+from naturerec_web.metrics.latency_histogram import LatencyHistogram, merge_snapshots
+
+
+class TestLatencyHistogram(unittest.TestCase):
+    def setUp(self) -> None:
+        self._histogram = LatencyHistogram("test_duration_seconds", "Test durations", ["endpoint"],
+                                           buckets=(0.1, 1.0))
+
+    def test_observations_are_bucketed(self):
+        self._histogram.observe(0.05, "home")
+        self._histogram.observe(0.1, "home")
+        self._histogram.observe(0.5, "home")
+        self._histogram.observe(2.0, "home")
+        counts, total = self._histogram.snapshot()[("home",)]
+        self.assertEqual([2, 1, 1], counts)
+        self.assertAlmostEqual(2.65, total)
+
+    def test_observations_are_partitioned_by_label(self):
+        self._histogram.observe(0.05, "home")
+        self._histogram.observe(0.05, "list")
+        self._histogram.observe(0.05, "list")
+        snapshot = self._histogram.snapshot()
+        self.assertEqual(1, sum(snapshot[("home",)][0]))
+        self.assertEqual(2, sum(snapshot[("list",)][0]))
+
+    def test_can_reset(self):
+        self._histogram.observe(0.05, "home")
+        self._histogram.reset()
+        self.assertEqual({}, self._histogram.snapshot())
+
+    def test_exposition_has_cumulative_buckets(self):
+        self._histogram.observe(0.05, "home")
+        self._histogram.observe(0.5, "home")
+        self._histogram.observe(2.0, "home")
+        self.assertEqual([
+            "# HELP test_duration_seconds Test durations",
+            "# TYPE test_duration_seconds histogram",
+            'test_duration_seconds_bucket{endpoint="home",le="0.1"} 1',
+            'test_duration_seconds_bucket{endpoint="home",le="1.0"} 2',
+            'test_duration_seconds_bucket{endpoint="home",le="+Inf"} 3',
+            'test_duration_seconds_sum{endpoint="home"} 2.55',
+            'test_duration_seconds_count{endpoint="home"} 3'
+        ], self._histogram.exposition())
+
+    def test_exposition_escapes_label_values(self):
+        self._histogram.observe(0.05, 'say "hello"\\')
+        self.assertIn('endpoint="say \\"hello\\"\\\\"', self._histogram.exposition()[2])
+
+    def test_can_merge_snapshots(self):
+        self._histogram.observe(0.05, "home")
+        other = LatencyHistogram("test_duration_seconds", "Test durations", ["endpoint"], buckets=(0.1, 1.0))
+        other.observe(0.5, "home")
+        other.observe(0.5, "list")
+        merged = merge_snapshots([self._histogram.snapshot(), other.snapshot()])
+        self.assertEqual(([1, 1, 0], 0.55), merged[("home",)])
+        self.assertEqual(([0, 1, 0], 0.5), merged[("list",)])
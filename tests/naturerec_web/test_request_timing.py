@@ -0,0 +1,40 @@
+import re
+from naturerec_web.metrics.request_timing import HISTOGRAMS, REQUEST_DURATION, REQUEST_QUERY_COUNT
+from .web_test_case import WebTestCase
+
+
+class TestRequestTiming(WebTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        for histogram in HISTOGRAMS:
+            histogram.reset()
+
+    def test_response_has_server_timing_header(self):
+        response = self._client.get("/sightings/list")
+        self.assertEqual(200, response.status_code)
+        self.assertRegex(response.headers["Server-Timing"],
+                         r'^app;dur=[\d.]+, db;dur=[\d.]+;desc="\d+ queries", render;dur=[\d.]+$')
+
+    def test_request_is_recorded_in_histograms(self):
+        self._client.get("/sightings/list")
+        counts, _ = REQUEST_DURATION.snapshot()[("sightings.list_filtered_sightings", "GET", "200")]
+        self.assertEqual(1, sum(counts))
+        counts, total = REQUEST_QUERY_COUNT.snapshot()[("sightings.list_filtered_sightings",)]
+        self.assertEqual(1, sum(counts))
+        self.assertGreater(total, 0)
+
+    def test_can_get_metrics(self):
+        self._client.get("/sightings/list")
+        response = self._client.get("/metrics/")
+        self.assertEqual(200, response.status_code)
+        self.assertTrue(response.content_type.startswith("text/plain; version=0.0.4"))
+        text = response.get_data(as_text=True)
+        self.assertIn("# TYPE naturerec_request_duration_seconds histogram", text)
+        self.assertTrue(re.search(r'^naturerec_request_duration_seconds_count\{endpoint="sightings.list_filtered_sightings",'
+                                  r'method="GET",status="200"\} 1$', text, re.MULTILINE))
+        self.assertIn("# TYPE naturerec_db_busy_retries_total counter", text)
+
+    def test_metrics_require_administrator(self):
+        self._client.get("/auth/logout")
+        response = self._client.get("/metrics/")
+        self.assertNotEqual(200, response.status_code)
@@ -0,0 +1,67 @@
+import json
+import os
+import re
+import shutil
+import tempfile
+import time
+from naturerec_web.metrics.request_timing import HISTOGRAMS, REQUEST_DURATION
+from naturerec_web.metrics import shared_metrics
+from naturerec_web.metrics.shared_metrics import load_metrics, prepare_metrics_directory
+from .web_test_case import WebTestCase
+
+#: Labels for the sightings list endpoint in the request duration histogram
+LIST_LABELS = ["sightings.list_filtered_sightings", "GET", "200"]
+
+
+class TestSharedMetrics(WebTestCase):
+    def setUp(self) -> None:
+        self._directory = tempfile.mkdtemp()
+        os.environ["NATURE_RECORDER_METRICS_DIR"] = self._directory
+        self._save_interval = shared_metrics.SAVE_INTERVAL
+        shared_metrics.SAVE_INTERVAL = 0.05
+        super().setUp()
+        for histogram in HISTOGRAMS:
+            histogram.reset()
+
+    def tearDown(self) -> None:
+        shared_metrics.SAVE_INTERVAL = self._save_interval
+        del os.environ["NATURE_RECORDER_METRICS_DIR"]
+        shutil.rmtree(self._directory)
+
+    def _write_other_worker_metrics(self, pid, count):
+        buckets = len(REQUEST_DURATION.buckets) + 1
+        data = {
+            "histograms": {REQUEST_DURATION.name: [[LIST_LABELS, [count] + [0] * (buckets - 1), 0.001 * count]]},
+            "busy_retry": {"retries": 2, "recoveries": 1, "failures": 0}
+        }
+        with open(os.path.join(self._directory, f"{pid}.json"), mode="wt", encoding="UTF-8") as f:
+            json.dump(data, f)
+
+    def test_request_metrics_are_saved(self):
+        self._client.get("/sightings/list")
+        time.sleep(0.2)
+        with open(os.path.join(self._directory, f"{os.getpid()}.json"), mode="rt", encoding="UTF-8") as f:
+            data = json.load(f)
+        self.assertIn(LIST_LABELS, [labels for labels, _, _ in data["histograms"][REQUEST_DURATION.name]])
+
+    def test_metrics_are_merged_across_workers(self):
+        self._write_other_worker_metrics(1, 2)
+        self._write_other_worker_metrics(2, 3)
+        self._client.get("/sightings/list")
+        snapshots, counters = load_metrics(HISTOGRAMS)
+        counts, _ = snapshots[REQUEST_DURATION.name][tuple(LIST_LABELS)]
+        self.assertEqual(6, sum(counts))
+        self.assertEqual(4, counters["retries"])
+
+    def test_metrics_endpoint_reports_all_workers(self):
+        self._write_other_worker_metrics(1, 2)
+        self._client.get("/sightings/list")
+        text = self._client.get("/metrics/").get_data(as_text=True)
+        self.assertTrue(re.search(r'^naturerec_request_duration_seconds_count\{endpoint="sightings.list_filtered_'
+                                  r'sightings",method="GET",status="200"\} 3$', text, re.MULTILINE))
+        self.assertIn("naturerec_db_busy_retries_total 2", text)
+
+    def test_previous_metrics_are_removed_when_server_starts(self):
+        self._write_other_worker_metrics(1, 2)
+        self.assertEqual(self._directory, prepare_metrics_directory())
+        self.assertEqual([], os.listdir(self._directory))
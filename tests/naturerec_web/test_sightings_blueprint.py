@@ -0,0 +1,49 @@
+from naturerec_model.logic import create_category, create_species, create_location, list_sightings
+from naturerec_model.model import Gender
+from .web_test_case import WebTestCase
+
+
+class TestSightingsBlueprint(WebTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self._category = create_category("Birds", True, self._user)
+        self._gull = create_species(self._category.id, "Black-Headed Gull", None, self._user)
+        self._location = create_location(name="Radley Lakes", county="Oxfordshire", country="United Kingdom",
+                                         user=self._user)
+
+    def _post_sighting(self, species_id, category_id):
+        return self._client.post("/sightings/edit", data={
+            "date": "01/02/2021",
+            "location": str(self._location.id),
+            "category": category_id,
+            "species": species_id,
+            "species_search": "Black-Headed Gull",
+            "number": "1",
+            "gender": str(Gender.UNKNOWN),
+            "with_young": "0",
+            "notes": ""
+        })
+
+    def test_can_add_sighting(self):
+        response = self._post_sighting(str(self._gull.id), str(self._category.id))
+        self.assertEqual(200, response.status_code)
+        self.assertIn(b"Added sighting of Black-Headed Gull", response.data)
+        self.assertEqual(1, len(list_sightings()))
+
+    def test_category_is_taken_from_species(self):
+        self._post_sighting(str(self._gull.id), "")
+        with self._client.session_transaction() as session:
+            self.assertEqual(self._category.id, session["category_id"])
+
+    def test_cannot_add_sighting_without_selected_species(self):
+        response = self._post_sighting("", "")
+        self.assertEqual(200, response.status_code)
+        self.assertIn(b"Please select a species from the list of suggestions", response.data)
+        self.assertEqual(0, len(list_sightings()))
+
+    def test_can_show_editing_page_after_unselected_species(self):
+        self._post_sighting("", "")
+        with self._client.session_transaction() as session:
+            session["category_id"] = None
+        response = self._client.get("/sightings/edit")
+        self.assertEqual(200, response.status_code)
@@ -0,0 +1,74 @@
+import base64
+from naturerec_model.logic import create_category, create_species, create_location, list_sightings
+from .web_test_case import WebTestCase, USERNAME, PASSWORD
+
+
+class TestSightingsSync(WebTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self._app.config["WTF_CSRF_ENABLED"] = True
+        category = create_category("Birds", True, self._user)
+        create_species(category.id, "Black-Headed Gull", None, self._user)
+        create_location(name="Radley Lakes", county="Oxfordshire", country="United Kingdom", user=self._user)
+
+    @staticmethod
+    def _sightings(count):
+        return {"sightings": [{"key": f"key-{i}", "species": "Black-Headed Gull", "location": "Radley Lakes",
+                               "date": f"2021-01-{i + 1:02d}", "number": 2, "gender": "Male"}
+                              for i in range(count)]}
+
+    @staticmethod
+    def _basic_auth(username, password):
+        credentials = base64.b64encode(f"{username}:{password}".encode()).decode()
+        return {"Authorization": f"Basic {credentials}"}
+
+    def test_can_sync_when_logged_in(self):
+        response = self._client.post("/sightings/sync", json=self._sightings(2))
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(["created", "created"], [result["outcome"] for result in response.json["results"]])
+        self.assertEqual(2, len(list_sightings()))
+
+    def test_can_sync_using_basic_authentication(self):
+        client = self._app.test_client()
+        response = client.post("/sightings/sync", json=self._sightings(2), headers=self._basic_auth(USERNAME, PASSWORD))
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(2, len(list_sightings()))
+
+    def test_cannot_sync_with_invalid_credentials(self):
+        client = self._app.test_client()
+        response = client.post("/sightings/sync", json=self._sightings(2), headers=self._basic_auth(USERNAME, "wrong"))
+        self.assertNotEqual(200, response.status_code)
+        self.assertEqual(0, len(list_sightings()))
+
+    def test_basic_authentication_does_not_create_a_session(self):
+        client = self._app.test_client()
+        client.post("/sightings/sync", json=self._sightings(2), headers=self._basic_auth(USERNAME, PASSWORD))
+        response = client.post("/sightings/sync", json=self._sightings(2))
+        self.assertEqual(302, response.status_code)
+
+    def test_basic_authentication_is_not_accepted_by_other_views(self):
+        client = self._app.test_client()
+        for url in ["/metrics/", "/jobs/list", "/locations/list"]:
+            response = client.get(url, headers=self._basic_auth(USERNAME, PASSWORD))
+            self.assertEqual(302, response.status_code)
+
+    def test_resent_batch_is_not_applied_twice(self):
+        self._client.post("/sightings/sync", json=self._sightings(2))
+        response = self._client.post("/sightings/sync", json=self._sightings(2))
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(["already applied"] * 2, [result["outcome"] for result in response.json["results"]])
+        self.assertEqual(2, len(list_sightings()))
+
+    def test_cannot_sync_without_json_body(self):
+        response = self._client.post("/sightings/sync", data={"sightings": "[]"})
+        self.assertEqual(415, response.status_code)
+        self.assertEqual(0, len(list_sightings()))
+
+    def test_cannot_sync_malformed_batch(self):
+        response = self._client.post("/sightings/sync", json={"sightings": [{"key": "key-0"}]})
+        self.assertEqual(400, response.status_code)
+        self.assertEqual("Malformed sighting at index 0", response.json["error"])
+
+    def test_form_posts_still_require_csrf_token(self):
+        response = self._client.post("/sightings/edit", data={})
+        self.assertEqual(400, response.status_code)
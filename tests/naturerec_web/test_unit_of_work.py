@@ -0,0 +1,105 @@
+import sqlite3
+import threading
+import time
+from sqlalchemy.exc import OperationalError
+from naturerec_model.model import Engine, current_unit_of_work
+from naturerec_model.logic import create_category, list_categories
+from naturerec_web.unit_of_work import without_unit_of_work
+from .web_test_case import WebTestCase
+
+
+class TestRequestUnitOfWork(WebTestCase):
+    def setUp(self) -> None:
+        self._attempts = 0
+        super().setUp()
+
+    def _configure_app(self, app):
+        app.add_url_rule("/test/unit_of_work", "unit_of_work_test", self._in_unit_of_work, methods=["GET", "POST"])
+        app.add_url_rule("/test/without_unit_of_work", "without_unit_of_work_test",
+                         without_unit_of_work(lambda: self._in_unit_of_work()), methods=["POST"])
+        app.add_url_rule("/test/write_lock", "write_lock_test", self._has_write_lock, methods=["POST"])
+        app.add_url_rule("/test/create_category", "create_category_test", self._create_category, methods=["POST"])
+        app.add_url_rule("/test/create_category_error", "create_category_error_test",
+                         self._create_category_with_error_response, methods=["POST"])
+
+    @staticmethod
+    def _in_unit_of_work():
+        return "yes" if current_unit_of_work() is not None else "no"
+
+    @staticmethod
+    def _has_write_lock():
+        connection = sqlite3.connect(Engine.url.database, timeout=0)
+        try:
+            connection.execute("BEGIN IMMEDIATE")
+            connection.execute("ROLLBACK")
+            return "no"
+        except sqlite3.OperationalError:
+            return "yes"
+        finally:
+            connection.close()
+
+    def _create_category(self):
+        self._attempts += 1
+        create_category("Birds", True, self._user)
+        raise OperationalError("INSERT", {}, sqlite3.OperationalError("database is locked"))
+
+    def _create_category_with_error_response(self):
+        create_category("Birds", True, self._user)
+        return "error", 400
+
+    def test_read_only_request_is_not_in_unit_of_work(self):
+        response = self._client.get("/test/unit_of_work")
+        self.assertEqual(b"no", response.data)
+
+    def test_static_request_is_not_in_unit_of_work(self):
+        response = self._client.get("/static/css/site.css")
+        response.close()
+        self.assertEqual(200, response.status_code)
+        self.assertIsNone(current_unit_of_work())
+
+    def test_post_request_is_in_unit_of_work(self):
+        response = self._client.post("/test/unit_of_work")
+        self.assertEqual(b"yes", response.data)
+        self.assertIsNone(current_unit_of_work())
+
+    def test_excluded_post_request_is_not_in_unit_of_work(self):
+        response = self._client.post("/test/without_unit_of_work")
+        self.assertEqual(b"no", response.data)
+
+    def test_unit_of_work_holds_write_lock(self):
+        response = self._client.post("/test/write_lock")
+        self.assertEqual(b"yes", response.data)
+
+    def test_request_waits_while_another_connection_holds_write_lock(self):
+        locked = threading.Event()
+
+        def hold_write_lock():
+            connection = sqlite3.connect(Engine.url.database, isolation_level=None)
+            try:
+                connection.execute("BEGIN IMMEDIATE")
+                locked.set()
+                time.sleep(0.5)
+                connection.execute("COMMIT")
+            finally:
+                connection.close()
+
+        thread = threading.Thread(target=hold_write_lock)
+        thread.start()
+        locked.wait()
+        try:
+            response = self._client.post("/test/unit_of_work")
+        finally:
+            thread.join()
+        self.assertEqual(b"yes", response.data)
+
+    def test_failed_request_is_rolled_back_and_not_retried(self):
+        response = self._client.post("/test/create_category")
+        self.assertEqual(500, response.status_code)
+        self.assertEqual(1, self._attempts)
+        self.assertEqual(0, len(list_categories()))
+        self.assertIsNone(current_unit_of_work())
+
+    def test_error_response_is_rolled_back(self):
+        response = self._client.post("/test/create_category_error")
+        self.assertEqual(400, response.status_code)
+        self.assertEqual(0, len(list_categories()))
@@ -0,0 +1,47 @@
+import os
+import datetime
+import unittest
+from naturerec_model.model import create_database, Session, Role, UserRole, User
+from naturerec_model.logic import create_user
+from naturerec_web import create_app
+
+USERNAME = "tester"
+PASSWORD = "password"
+
+
+class WebTestCase(unittest.TestCase):
+    """
+    Base class for tests that make requests to the web application using the Flask test client. Each test starts
+    with a new database and a client logged in as a user with all the roles. CSRF protection is disabled, so tests
+    that need it must enable it
+    """
+
+    def setUp(self) -> None:
+        create_database()
+        self._user = User(id=1)
+        self._create_logged_in_user()
+
+        os.environ.setdefault("SECRET_KEY", "testing")
+        self._app = create_app("production")
+        self._app.config["WTF_CSRF_ENABLED"] = False
+        self._configure_app(self._app)
+        self._client = self._app.test_client()
+        response = self._client.post("/auth/login", data={"username": USERNAME, "password": PASSWORD})
+        self.assertEqual(302, response.status_code)
+
+    def _configure_app(self, app):
+        """
+        Make any changes to the application, such as adding test routes, needed before the first request
+        """
+
+    def _create_logged_in_user(self):
+        user = create_user(USERNAME, PASSWORD, self._user)
+        now = datetime.datetime.now(datetime.UTC)
+        with Session.begin() as session:
+            for name in ["Administrator", "Reporter", "Reader"]:
+                role = Role(name=name, created_by=self._user.id, updated_by=self._user.id, date_created=now,
+                            date_updated=now)
+                session.add(role)
+                session.flush()
+                session.execute(UserRole.insert().values(user_id=user.id, role_id=role.id,
+                                                         created_by=self._user.id, date_created=now))